@@ -8,6 +8,7 @@ from waveform_analysis.core.plugins.builtin.cpu.hit_merge import (
     HitMergedComponentsPlugin,
     HitMergePlugin,
 )
+from waveform_analysis.core.processing.event_table import EventTable
 
 
 def _make_hit(
@@ -51,8 +52,11 @@ def test_hit_grouped_empty():
         },
     )
 
-    out = plugin.compute(ctx, "run_001")
+    table = plugin.compute(ctx, "run_001")
 
+    assert isinstance(table, EventTable)
+    assert table.empty
+    out = table.to_pandas()
     assert isinstance(out, pd.DataFrame)
     assert out.empty
     assert list(out.columns) == [
@@ -109,7 +113,7 @@ def test_hit_grouped_merges_overlapping_windows_across_channels():
         },
     )
 
-    out = plugin.compute(ctx, "run_001")
+    out = plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 1
     row = out.iloc[0]
@@ -161,7 +165,7 @@ def test_hit_grouped_merges_non_overlapping_windows_with_gap_threshold():
         },
     )
 
-    out = plugin.compute(ctx, "run_001")
+    out = plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 1
     assert out.iloc[0]["t_min"] == 96_000
@@ -204,7 +208,7 @@ def test_hit_grouped_splits_clusters_when_gap_is_too_large():
         },
     )
 
-    out = plugin.compute(ctx, "run_001")
+    out = plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 2
     assert list(out["event_id"]) == [0, 1]
@@ -257,7 +261,7 @@ def test_hit_grouped_keeps_all_hits_and_sorts_by_board_then_channel():
         },
     )
 
-    out = plugin.compute(ctx, "run_001")
+    out = plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 1
     row = out.iloc[0]
@@ -314,7 +318,7 @@ def test_hit_grouped_supports_chain_expansion():
         },
     )
 
-    out = plugin.compute(ctx, "run_001")
+    out = plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 1
     assert out.iloc[0]["n_hits"] == 3
@@ -358,7 +362,7 @@ def test_hit_grouped_merges_different_dt_values_when_absolute_windows_overlap():
             "hit_threshold": hits,
         },
     )
-    out = plugin.compute(ctx, "run_001")
+    out = plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 1
     row = out.iloc[0]
@@ -432,7 +436,7 @@ def test_hit_grouped_uses_components_for_cross_record_merged_windows():
     components = components_plugin.compute(ctx, "run_001")
     ctx._data["hit_merged_components"] = components
 
-    out = grouped_plugin.compute(ctx, "run_001")
+    out = grouped_plugin.compute(ctx, "run_001").to_pandas()
 
     assert len(out) == 1
     row = out.iloc[0]
@@ -441,3 +445,68 @@ def test_hit_grouped_uses_components_for_cross_record_merged_windows():
     assert row["t_max"] == 112_000
     np.testing.assert_array_equal(row["sample_starts"], np.array([-1, 8], dtype=np.int32))
     np.testing.assert_array_equal(row["sample_ends"], np.array([-1, 12], dtype=np.int32))
+
+
+def test_group_hit_windows_resolves_invalid_windows_without_component_offsets():
+    from waveform_analysis.core.processing.event_grouping import group_hit_windows
+
+    components = np.array(
+        [
+            _make_hit(
+                position=10,
+                height=1.0,
+                integral=1.0,
+                edge_start=8,
+                edge_end=12,
+                timestamp=ts,
+                board=0,
+                channel=0,
+                record_id=rid,
+            )
+            for ts, rid in ((100_000, 0), (108_000, 1), (300_000, 2))
+        ],
+        dtype=THRESHOLD_HIT_DTYPE,
+    )
+    merged = components[[0, 2]].copy()
+    merged["edge_start"][0] = -1  # 跨 record 合并：窗口需由组件推回
+    merged["edge_end"][0] = -1
+    merged["timestamp"][1] = 300_000
+    other = merged[1:].copy()
+    other["channel"] = 1
+    other["timestamp"] = 114_000
+    hits = np.concatenate([merged, other])
+    # 乱序的组件行（无 component_offset/component_count 字段）
+    component_rows = np.array(
+        [(1, 2), (0, 1), (0, 0)], dtype=[("merged_index", "i8"), ("hit_index", "i8")]
+    )
+
+    table = group_hit_windows(
+        hits,
+        time_window_ns=0.0,
+        component_rows=component_rows,
+        component_hits=components,
+        as_table=True,
+        use_numba=False,
+    )
+
+    # merged[0] 的窗口来自组件 0/1：[96_000, 112_000]，与 114_000 处的窗口 [110_000, 118_000] 重叠
+    np.testing.assert_array_equal(table.events["n_hits"], [2, 1])
+    assert int(table.events["t_min"][0]) == 96_000
+    assert int(table.events["t_max"][0]) == 118_000
+
+
+def test_group_hit_windows_running_max_matches_sequential_scan():
+    from waveform_analysis.core.processing.event_grouping import (
+        _chain_window_breaks,
+        _chain_window_breaks_numba,
+    )
+
+    rng = np.random.default_rng(7)
+    starts = np.sort(rng.integers(0, 20_000_000, 500)).astype(np.float64)
+    ends = starts + rng.integers(0, 50_000, 500)
+
+    fast = _chain_window_breaks(starts, ends, 20_000.0, use_numba=False)
+    scan = _chain_window_breaks_numba(starts, ends, 20_000.0)
+
+    np.testing.assert_array_equal(fast, scan)
+    assert 0 < int(fast.sum()) < len(starts) - 1
@@ -232,3 +232,45 @@ def test_hit_merged_components_returns_flat_component_rows():
     assert out.dtype == HIT_MERGED_COMPONENTS_DTYPE
     np.testing.assert_array_equal(out["merged_index"], np.array([0, 0, 1], dtype=np.int64))
     np.testing.assert_array_equal(out["hit_index"], np.array([0, 1, 2], dtype=np.int64))
+
+
+def test_hit_merge_anchor_ties_pick_earliest_hit():
+    plugin = HitMergePlugin()
+    h1 = _make_hit(10, 20.0, 1.0, 8.0, 12.0, 100_000, 0, 3)
+    h2 = _make_hit(14, 25.0, 2.0, 13.0, 16.0, 108_000, 0, 3)
+    h3 = _make_hit(18, 25.0, 4.0, 17.0, 20.0, 116_000, 0, 3)
+    hits = np.array([h3, h1, h2], dtype=THRESHOLD_HIT_DTYPE)
+
+    ctx = DummyContext(
+        {"merge_gap_ns": 3.0, "max_total_width_ns": 10000.0, "dt": 2}, {"hit_threshold": hits}
+    )
+    out = plugin.compute(ctx, "run_001")
+
+    assert len(out) == 1
+    assert int(out[0]["position"]) == 14
+    assert int(out[0]["timestamp"]) == 108_000
+    assert abs(float(out[0]["integral"]) - 7.0) < 1e-6
+    assert (int(out[0]["sample_start"]), int(out[0]["sample_end"])) == (8, 20)
+
+
+def test_hit_merge_width_cap_restarts_chain_per_channel():
+    plugin = HitMergePlugin()
+    # 每通道一条连续链：每个 hit 覆盖 4 ns，相邻间距 6 ns（间隙 2 ns）
+    hits = np.array(
+        [
+            _make_hit(10, 1.0, 1.0, 9.0, 11.0, 100_000 + 6_000 * i, channel, i)
+            for channel in (1, 0)
+            for i in range(7)
+        ],
+        dtype=THRESHOLD_HIT_DTYPE,
+    )
+
+    ctx = DummyContext(
+        {"merge_gap_ns": 3.0, "max_total_width_ns": 16.0, "dt": 2}, {"hit_threshold": hits}
+    )
+    out = plugin.compute(ctx, "run_001")
+
+    # 簇宽上限 16 ns：每簇最多 3 个 hit（4 + 6 + 6 ns），链在截断处重新开始
+    np.testing.assert_array_equal(out["channel"], [0, 0, 0, 1, 1, 1])
+    np.testing.assert_array_equal(out["component_count"], [3, 3, 1, 3, 3, 1])
+    np.testing.assert_array_equal(out["component_offset"], [0, 3, 6, 7, 10, 13])
@@ -8,6 +8,7 @@ from waveform_analysis.core.plugins.builtin.cpu.peak_finding import (
     HIT_DTYPE,
     HitFinderPlugin,
 )
+from waveform_analysis.core.processing.dtypes import POLARITY_NEGATIVE
 
 
 def test_hitfinder_empty_dtype():
@@ -126,7 +127,7 @@ def test_hitfinder_reads_records_view_when_wave_source_records():
     )
     records["board"] = 5
     records["channel"] = 2
-    records["polarity"] = ["negative"]
+    records["polarity"] = [POLARITY_NEGATIVE]
     wave_pool = np.array([100, 100, 80, 80, 80, 80, 100, 100], dtype=np.uint16)
     rv = RecordsView(records, wave_pool)
 
@@ -164,7 +165,7 @@ def test_hitfinder_records_use_filtered_reads_filtered_pool():
     )
     records["board"] = 5
     records["channel"] = 2
-    records["polarity"] = ["negative"]
+    records["polarity"] = [POLARITY_NEGATIVE]
     wave_pool_filtered = np.array([100, 100, 80, 80, 80, 80, 100, 100], dtype=np.float32)
     rv = RecordsView(records, wave_pool_filtered)
 
@@ -172,3 +173,69 @@ def test_hitfinder_records_use_filtered_reads_filtered_pool():
         plugin.compute(ctx, "run_001")
 
     assert mocked.call_args.kwargs["wave_pool_name"] == "wave_pool_filtered"
+
+
+def _noisy_pulse_waveforms(n_events: int, n_samples: int) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    st_waveforms = make_st_waveforms(
+        n_events=n_events, n_samples=n_samples, n_channels=3, baseline=1000.0, dt=2
+    )
+    waves = 1000 + rng.normal(0, 3, (n_events, n_samples))
+    for i in range(n_events):
+        start = 10 + (i * 7) % (n_samples - 30)
+        waves[i, start : start + 6] -= rng.uniform(20, 200)
+    st_waveforms["wave"] = np.round(waves).astype(st_waveforms["wave"].dtype)
+    st_waveforms["event_length"][::5] = n_samples - 9
+    st_waveforms["timestamp"] = 1_000_000 + np.arange(n_events, dtype=np.int64) * 5_000
+    return st_waveforms
+
+
+def test_hitfinder_block_engine_matches_scipy():
+    st_waveforms = _noisy_pulse_waveforms(120, 96)
+    plugin = HitFinderPlugin()
+
+    for use_derivative in (True, False):
+        for height_method in ("minmax", "diff"):
+            config = {
+                "use_filtered": False,
+                "use_derivative": use_derivative,
+                "height": 10.0,
+                "prominence": 0.7,
+                "width": 1,
+                "height_method": height_method,
+                "chunk_size": 32,
+                "parallel_min_events": 1,
+                "n_workers": 2,
+            }
+            expected = plugin.compute(
+                DummyContext({**config, "peak_engine": "scipy"}, {"st_waveforms": st_waveforms}),
+                "run_001",
+            )
+            result = plugin.compute(
+                DummyContext({**config, "peak_engine": "numpy"}, {"st_waveforms": st_waveforms}),
+                "run_001",
+            )
+
+            assert len(expected) > 0
+            assert result.dtype == HIT_DTYPE
+            np.testing.assert_array_equal(result, expected)
+
+
+def test_hitfinder_block_engine_matches_scipy_for_records():
+    n_records, event_length = 40, 64
+    rng = np.random.default_rng(3)
+    records = make_records(n_records=n_records, event_length=event_length, baseline=100.0, dt=4)
+    records["polarity"] = POLARITY_NEGATIVE
+    wave_pool = 100 + rng.normal(0, 2, n_records * event_length)
+    for i in range(n_records):
+        wave_pool[i * event_length + 20 : i * event_length + 26] -= 40
+    rv = RecordsView(records, wave_pool.astype(np.float32))
+    plugin = HitFinderPlugin()
+    config = {"wave_source": "records", "height": 5.0, "parallel": False, "dt": 4}
+
+    with patch("waveform_analysis.core.records_view", return_value=rv):
+        expected = plugin.compute(DummyContext(config, {}), "run_001")
+        result = plugin.compute(DummyContext({**config, "peak_engine": "auto"}, {}), "run_001")
+
+    assert len(expected) > 0
+    np.testing.assert_array_equal(result, expected)
@@ -2,6 +2,7 @@ import numpy as np
 
 from tests.utils import DummyContext, register_test_adapter
 from waveform_analysis.core.plugins.builtin.cpu.standard import WaveformsPlugin
+from waveform_analysis.core.processing.dtypes import decode_polarity
 from waveform_analysis.utils.formats import get_adapter, unregister_adapter
 
 
@@ -109,7 +110,7 @@ def test_waveforms_plugin_v1725_outputs_standard_st_waveforms(monkeypatch):
     np.testing.assert_array_equal(st["timestamp"], np.array([40000, 80000], dtype=np.int64))
     np.testing.assert_array_equal(st["dt"], np.array([4, 4], dtype=np.int32))
     assert np.all(np.isnan(st["baseline_upstream"]))
-    np.testing.assert_array_equal(st["polarity"], np.array(["unknown", "unknown"]))
+    np.testing.assert_array_equal(decode_polarity(st["polarity"]), ["unknown", "unknown"])
     assert int(st["wave"][1, 2]) == 0
 
 
@@ -145,4 +146,4 @@ def test_waveforms_plugin_applies_channel_metadata_polarity(monkeypatch):
 
     st = plugin.compute(ctx, "run_001")
 
-    np.testing.assert_array_equal(st["polarity"], np.array(["negative", "positive"]))
+    np.testing.assert_array_equal(decode_polarity(st["polarity"]), ["negative", "positive"])
@@ -144,6 +144,33 @@ def test_threshold_hit_no_event_length_truncation():
     assert int(result[0]["position"]) >= 20
 
 
+def test_threshold_hit_blocked_matches_single_block():
+    rng = np.random.default_rng(7)
+    st = _make_st_waveforms(n_events=40, wave_len=48)
+    st["wave"] = (100 + rng.normal(0, 8, size=st["wave"].shape)).astype(st["wave"].dtype)
+    st["timestamp"] = np.arange(40, dtype=np.int64) * 10_000
+    ctx = DummyContext(
+        {"threshold": 10.0, "left_extension": 2, "right_extension": 3},
+        {"st_waveforms": st},
+    )
+
+    expected = _compute_threshold_hits(ThresholdHitPlugin(), ctx)
+    with (
+        patch("waveform_analysis.core.plugins.builtin.cpu.hit_finder._HIT_BLOCK_SAMPLES", 100),
+        patch("waveform_analysis.core.plugins.builtin.cpu.hit_finder._HIT_GATHER_SAMPLES", 16),
+    ):
+        blocked = _compute_threshold_hits(ThresholdHitPlugin(), ctx)
+
+    assert len(expected) > 40
+    np.testing.assert_array_equal(blocked, expected)
+    for hit in expected[:20]:
+        row = st[int(hit["record_id"])]
+        # 默认负极性：signal = baseline - wave
+        segment = 100.0 - row["wave"][hit["edge_start"] : hit["edge_end"]].astype(np.float64)
+        assert int(hit["position"]) == int(hit["edge_start"]) + int(np.argmax(segment))
+        assert float(hit["integral"]) == pytest.approx(np.maximum(segment, 0.0).sum(), rel=1e-6)
+
+
 def test_threshold_hit_empty_input():
     plugin = ThresholdHitPlugin()
     st = _make_st_waveforms(n_events=0, wave_len=16)
@@ -116,6 +116,39 @@ def test_waveform_width_plugin_basic(mock_context, synthetic_waveform):
     )  # 允许 30% 误差
 
 
+def test_waveform_width_plugin_joins_hits_by_record_id(tmp_path, synthetic_waveform):
+    """hit 按 record_id（非行号）关联波形；同一波形上的多个 hit 与未知 record_id"""
+    ctx = Context(storage_dir=str(tmp_path))
+    ctx.register(WaveformWidthPlugin())
+
+    wave_length = len(synthetic_waveform)
+    st_waveforms = np.zeros(3, dtype=create_record_dtype(wave_length))
+    st_waveforms["wave"][0] = 10.0
+    st_waveforms["wave"][1] = synthetic_waveform
+    st_waveforms["wave"][2] = 10.0
+    st_waveforms["record_id"] = [30, 10, 20]  # 乱序且不等于行号
+
+    from waveform_analysis.core.plugins.builtin.cpu.peak_finding import HIT_DTYPE
+
+    hits = np.zeros(4, dtype=HIT_DTYPE)
+    hits["record_id"] = [10, 99, 10, 20]
+    hits["position"] = [100, 100, 100, 100]
+    hits["timestamp"] = [1, 2, 3, 4]
+
+    run_id = "test_join"
+    ctx._results[(run_id, "st_waveforms")] = st_waveforms
+    ctx._results[(run_id, "hit")] = hits
+    ctx.set_config({"sampling_rate": 1.0}, plugin_name="waveform_width")
+
+    widths = ctx.get_data(run_id, "waveform_width")
+
+    # record_id=99 不存在，record_id=20 的波形平坦（峰高 <= 0），均被跳过
+    assert widths["timestamp"].tolist() == [1, 3]
+    assert widths["record_id"].tolist() == [10, 10]
+    assert widths[0]["rise_time"] > 0
+    assert widths[0]["rise_time"] == widths[1]["rise_time"]
+
+
 def test_waveform_width_plugin_empty_channel(tmp_path):
     """测试空通道的处理"""
     ctx = Context(storage_dir=str(tmp_path))
@@ -10,7 +10,15 @@ from tests.basic_features_helpers import (
     patch_records_view,
 )
 from tests.utils import FakeContext
+from waveform_analysis.core.data.records_view import RecordsView
 from waveform_analysis.core.plugins.builtin.cpu.basic_features import BasicFeaturesPlugin
+from waveform_analysis.core.processing.dtypes import (
+    POLARITY_NEGATIVE,
+    POLARITY_POSITIVE,
+    POLARITY_UNKNOWN,
+    decode_polarity,
+)
+from waveform_analysis.core.processing.records_builder import RECORDS_DTYPE
 
 
 class TestWaveSources:
@@ -88,3 +96,67 @@ class TestWaveSources:
         np.testing.assert_allclose(result["amp"], [0.0, 0.0])
         np.testing.assert_allclose(result["area"], [20.0, 20.0])
         np.testing.assert_allclose(result["max_abs_diff"], [0.0, 0.0])
+
+
+def _reference_record_features(rv, records, fixed, height_range, area_range):
+    """Per-record reference matching the original (unbatched) records implementation."""
+    expected = np.zeros((len(records), 4), dtype=np.float32)
+    for idx, rec in enumerate(records):
+        key = (int(rec["board"]), int(rec["channel"]))
+        baseline = float(fixed.get(key, rec["baseline"]))
+        wave = rv.waves(int(rec["record_id"]))
+        polarity = decode_polarity(rec["polarity"])
+        wave_p, wave_c = wave[slice(*height_range)], wave[slice(*area_range)]
+        if polarity in ("positive", "negative"):
+            signal = -rv.signals(int(rec["record_id"]), baseline=baseline)
+            signal_p, signal_c = signal[slice(*height_range)], signal[slice(*area_range)]
+            if signal_p.size:
+                expected[idx, 0] = float(np.max(signal_p))
+                expected[idx, 1] = float(np.max(signal_p)) - float(np.min(signal_p))
+            if signal_c.size:
+                expected[idx, 2] = float(np.sum(signal_c.astype(np.float64)))
+        else:
+            if wave_p.size:
+                expected[idx, 0] = baseline - float(np.min(wave_p))
+                expected[idx, 1] = float(np.max(wave_p)) - float(np.min(wave_p))
+            if wave_c.size:
+                expected[idx, 2] = float(np.sum(np.float64(baseline) - wave_c.astype(np.float64)))
+        if wave.size > 1:
+            expected[idx, 3] = float(np.max(np.abs(np.diff(wave.astype(np.float64)))))
+    return expected
+
+
+def test_records_batched_features_match_per_record_reference():
+    rng = np.random.default_rng(7)
+    n = 300
+    lengths = rng.choice([0, 1, 5, 40, 97], size=n)
+    records = np.zeros(n, dtype=RECORDS_DTYPE)
+    records["record_id"] = np.arange(n) + 1000
+    records["board"] = rng.integers(0, 2, n)
+    records["channel"] = rng.integers(0, 3, n)
+    records["event_length"] = lengths
+    records["wave_offset"] = np.r_[0, np.cumsum(lengths)[:-1]]
+    records["baseline"] = rng.normal(8000.0, 3.0, n)
+    records["timestamp"] = np.arange(n) * 10
+    records["polarity"] = rng.choice([POLARITY_POSITIVE, POLARITY_NEGATIVE, POLARITY_UNKNOWN], n)
+    wave_pool = rng.integers(7900, 8100, int(lengths.sum())).astype(np.uint16)
+
+    height_range, area_range = (3, -2), (0, None)
+    ctx = FakeContext(
+        config={
+            "wave_source": "records",
+            "height_range": height_range,
+            "area_range": area_range,
+            "channel_config": {"channels": {"1:2": {"fixed_baseline": 8001.5}}},
+        },
+        data={"records": records, "wave_pool": wave_pool},
+    )
+    result = BasicFeaturesPlugin().compute(ctx, "run_001")
+
+    expected = _reference_record_features(
+        RecordsView(records, wave_pool), records, {(1, 2): 8001.5}, height_range, area_range
+    )
+    for col, name in enumerate(("height", "amp", "area", "max_abs_diff")):
+        np.testing.assert_array_equal(result[name], expected[:, col])
+    np.testing.assert_array_equal(result["event_index"], np.arange(n))
+    np.testing.assert_array_equal(result["timestamp"], records["timestamp"])
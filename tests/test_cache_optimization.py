@@ -252,6 +252,38 @@ class TestCacheOptimization:
         np.testing.assert_array_equal(data, np.array([(1,)], dtype=dtype))
         assert executed == ["data_a"]
 
+    def test_disk_cache_probe_compares_lineage_hash(self, tmp_path):
+        """测试磁盘缓存校验只比较元数据中的 lineage_hash"""
+
+        dtype = np.dtype([("v", "i4")])
+
+        class PluginA(Plugin):
+            provides = "data_a"
+            output_dtype = dtype
+            save_when = "always"
+
+            def compute(self, context, run_id):
+                return np.array([(1,)], dtype=self.output_dtype)
+
+        ctx = Context(storage_dir=str(tmp_path))
+        ctx.register_plugin_(PluginA())
+        run_id = "run_hash_probe"
+        ctx.get_data(run_id, "data_a")
+        key = ctx.key_for(run_id, "data_a")
+
+        meta = ctx.storage.get_metadata(key, run_id)
+        lineage_hash = ctx._cache_domain.lineage_hash("data_a")
+        assert meta["lineage_hash"] == lineage_hash
+        assert key.endswith(lineage_hash[:8])
+        assert ctx._cache_domain.is_disk_cache_valid(run_id, "data_a", key)
+
+        # 旧缓存（只有 lineage）仍按 JSON 比较；哈希不一致时判为失效
+        del meta["lineage_hash"]
+        ctx.storage.save_metadata(key, meta, run_id)
+        assert ctx._cache_domain.is_disk_cache_valid(run_id, "data_a", key)
+        ctx.storage.save_metadata(key, {**meta, "lineage_hash": "0" * 40}, run_id)
+        assert not ctx._cache_domain.is_disk_cache_valid(run_id, "data_a", key)
+
     def test_lineage_cache(self):
         """测试血缘缓存"""
 
@@ -9,7 +9,7 @@ import tempfile
 import numpy as np
 import pytest
 
-from waveform_analysis.core.storage import MemmapStorage
+from waveform_analysis.core.storage import BlockCompressedArray, MemmapStorage
 from waveform_analysis.core.storage.compression import (
     Blosc2Compression,
     CompressionManager,
@@ -268,6 +268,71 @@ class TestMemmapStorageCompression:
         assert loaded is not None
         np.testing.assert_array_equal(loaded, data)
 
+    def test_blocked_layout_random_access(self):
+        """测试分块压缩布局:按块随机访问,元数据记录块偏移表"""
+        storage = MemmapStorage(
+            self.temp_dir,
+            compression="gzip",
+            compression_block_bytes=64 * 14,
+            compression_cache_blocks=2,
+        )
+        dtype = np.dtype([("time", "i8"), ("channel", "i2"), ("area", "f4")])
+        data = np.zeros(1000, dtype=dtype)
+        data["time"] = np.arange(1000) * 10
+        data["channel"] = np.arange(1000) % 4
+        data["area"] = np.linspace(0, 1, 1000)
+
+        storage.save_memmap("blocked", data, run_id=self.test_run_id)
+
+        meta = storage.get_metadata("blocked", run_id=self.test_run_id)
+        assert meta["compression_layout"] == "blocked"
+        assert meta["block_records"] == 64
+        assert len(meta["block_offsets"]) == 16 + 1
+        assert meta["block_offsets"][-1] == meta["compressed_size"]
+
+        loaded = storage.load_memmap("blocked", run_id=self.test_run_id)
+        assert isinstance(loaded, BlockCompressedArray)
+        assert len(loaded) == 1000
+        assert loaded.dtype == dtype
+        assert loaded.decoded_blocks == 0
+
+        np.testing.assert_array_equal(loaded[:10], data[:10])
+        assert loaded.decoded_blocks == 1
+        np.testing.assert_array_equal(loaded[100:300], data[100:300])
+        np.testing.assert_array_equal(loaded[-5:], data[-5:])
+        assert loaded[777] == data[777]
+        assert loaded[-1] == data[-1]
+        np.testing.assert_array_equal(loaded[::7], data[::7])
+        np.testing.assert_array_equal(loaded[[999, 0, 500]], data[[999, 0, 500]])
+        mask = data["channel"] == 2
+        np.testing.assert_array_equal(loaded[mask], data[mask])
+        np.testing.assert_array_equal(loaded["time"], data["time"])
+        np.testing.assert_array_equal(np.asarray(loaded), data)
+        assert len(loaded._cache) <= 2
+
+    def test_blocked_layout_multidim_and_exists(self):
+        """测试分块压缩布局支持多维数组,且 exists/verify_integrity 正常"""
+        storage = MemmapStorage(
+            self.temp_dir, compression="gzip", compression_block_bytes=4 * 16 * 10
+        )
+        data = np.arange(95 * 16, dtype=np.float32).reshape(95, 16)
+        storage.save_memmap("blocked_2d", data, run_id=self.test_run_id)
+
+        assert storage.exists("blocked_2d", run_id=self.test_run_id)
+        loaded = storage.load_memmap("blocked_2d", run_id=self.test_run_id)
+        assert loaded.shape == (95, 16)
+        assert loaded.n_blocks == 10
+        np.testing.assert_array_equal(loaded[33:71], data[33:71])
+        np.testing.assert_array_equal(loaded[5, 3:6], data[5, 3:6])
+        np.testing.assert_array_equal(loaded[:, 2], data[:, 2])
+        np.testing.assert_array_equal(np.asarray(loaded), data)
+
+        # 未启用分块的 storage 也能读取(布局由元数据决定)
+        plain = MemmapStorage(self.temp_dir)
+        np.testing.assert_array_equal(
+            np.asarray(plain.load_memmap("blocked_2d", run_id=self.test_run_id)), data
+        )
+
 
 class TestCompressionPerformance:
     """测试压缩性能"""
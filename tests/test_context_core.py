@@ -657,3 +657,184 @@ def test_context_timeout_does_not_cache(tmp_path, monkeypatch):
     key = ctx.key_for("run1", "timeout_data")
     assert not ctx.storage.exists(key)
     assert manager.get_timeout_stats().get("compute", 0) >= 1
+
+
+def _make_diamond_plugins(log, barrier=None):
+    dtype = np.dtype([("val", "i4")])
+
+    class RootPlugin(Plugin):
+        provides = "root_data"
+        output_dtype = dtype
+
+        def compute(self, context, run_id, **kwargs):
+            log.append("root")
+            return np.array([(1,), (2,)], dtype=self.output_dtype)
+
+    def make_branch(name, offset, hint):
+        class BranchPlugin(Plugin):
+            provides = name
+            depends_on = ["root_data"]
+            output_dtype = dtype
+            resource_hint = hint
+
+            def compute(self, context, run_id, **kwargs):
+                if barrier is not None:
+                    barrier.wait(timeout=5)
+                root = context.get_data(run_id, "root_data")
+                log.append(name)
+                return np.array([(int(x["val"]) + offset,) for x in root], dtype=self.output_dtype)
+
+        return BranchPlugin
+
+    class JoinPlugin(Plugin):
+        provides = "join_data"
+        depends_on = ["branch_a", "branch_b"]
+        output_dtype = dtype
+
+        def compute(self, context, run_id, **kwargs):
+            a = context.get_data(run_id, "branch_a")
+            b = context.get_data(run_id, "branch_b")
+            log.append("join")
+            return np.array(
+                [(int(x["val"]) + int(y["val"]),) for x, y in zip(a, b, strict=True)], dtype=dtype
+            )
+
+    return [
+        RootPlugin,
+        make_branch("branch_a", 10, "cpu"),
+        make_branch("branch_b", 100, "io"),
+        JoinPlugin,
+    ]
+
+
+def test_context_parallel_plan_runs_independent_branches_concurrently(tmp_path):
+    log = []
+    barrier = threading.Barrier(2)
+    ctx = Context(
+        storage_dir=str(tmp_path),
+        config={"parallel_plan": True, "parallel_plan_workers": 4, "show_progress": False},
+    )
+    ctx.register(*_make_diamond_plugins(log, barrier=barrier))
+
+    result = ctx.get_data("run1", "join_data")
+
+    # Both branches must have been in flight at the same time to pass the barrier.
+    assert not barrier.broken
+    assert log[0] == "root"
+    assert log[-1] == "join"
+    assert set(log[1:3]) == {"branch_a", "branch_b"}
+    assert result["val"].tolist() == [112, 114]
+
+
+def test_context_parallel_plan_matches_sequential_result(tmp_path):
+    seq_ctx = Context(storage_dir=str(tmp_path / "seq"), config={"show_progress": False})
+    seq_ctx.register(*_make_diamond_plugins([]))
+    par_ctx = Context(
+        storage_dir=str(tmp_path / "par"),
+        config={"parallel_plan": True, "parallel_plan_workers": 3, "show_progress": False},
+    )
+    par_ctx.register(*_make_diamond_plugins([]))
+
+    assert np.array_equal(
+        seq_ctx.get_data("run1", "join_data"), par_ctx.get_data("run1", "join_data")
+    )
+
+
+def test_context_parallel_plan_cpu_workers_limit(tmp_path):
+    dtype = np.dtype([("val", "i4")])
+    active = {"cpu": 0, "max_cpu": 0}
+    lock = threading.Lock()
+
+    def make_leaf(name):
+        class LeafPlugin(Plugin):
+            provides = name
+            output_dtype = dtype
+
+            def compute(self, context, run_id, **kwargs):
+                with lock:
+                    active["cpu"] += 1
+                    active["max_cpu"] = max(active["max_cpu"], active["cpu"])
+                time.sleep(0.02)
+                with lock:
+                    active["cpu"] -= 1
+                return np.array([(1,)], dtype=self.output_dtype)
+
+        return LeafPlugin
+
+    class SinkPlugin(Plugin):
+        provides = "sink"
+        depends_on = ["leaf_0", "leaf_1", "leaf_2", "leaf_3"]
+        output_dtype = dtype
+
+        def compute(self, context, run_id, **kwargs):
+            total = sum(int(context.get_data(run_id, f"leaf_{i}")["val"][0]) for i in range(4))
+            return np.array([(total,)], dtype=self.output_dtype)
+
+    ctx = Context(
+        storage_dir=str(tmp_path),
+        config={
+            "parallel_plan": True,
+            "parallel_plan_workers": 4,
+            "parallel_plan_cpu_workers": 2,
+            "show_progress": False,
+        },
+    )
+    ctx.register(*[make_leaf(f"leaf_{i}") for i in range(4)], SinkPlugin)
+
+    assert ctx.get_data("run1", "sink")["val"][0] == 4
+    assert active["max_cpu"] <= 2
+
+
+def test_context_parallel_plan_failure_propagation(tmp_path):
+    dtype = np.dtype([("val", "i4")])
+    calls = {"ok": 0, "join": 0}
+
+    class OkPlugin(Plugin):
+        provides = "ok_data"
+        save_when = "always"
+        output_dtype = dtype
+
+        def compute(self, context, run_id, **kwargs):
+            calls["ok"] += 1
+            return np.array([(1,)], dtype=self.output_dtype)
+
+    class BadPlugin(Plugin):
+        provides = "bad_data"
+        output_dtype = dtype
+
+        def compute(self, context, run_id, **kwargs):
+            raise ValueError("boom")
+
+    class JoinPlugin(Plugin):
+        provides = "join_data"
+        depends_on = ["ok_data", "bad_data"]
+        output_dtype = dtype
+
+        def compute(self, context, run_id, **kwargs):
+            calls["join"] += 1
+            return np.array([(0,)], dtype=self.output_dtype)
+
+    ctx = Context(
+        storage_dir=str(tmp_path),
+        config={"parallel_plan": True, "parallel_plan_workers": 2, "show_progress": False},
+    )
+    ctx.register(OkPlugin, BadPlugin, JoinPlugin)
+
+    with pytest.raises(RuntimeError, match="Plugin 'bad_data' failed"):
+        ctx.get_data("run1", "join_data")
+
+    assert calls == {"ok": 1, "join": 0}
+    assert ("run1", "join_data") not in ctx._in_progress
+
+
+def test_plugin_resource_hint_validation(tmp_path):
+    class BadHintPlugin(Plugin):
+        provides = "bad_hint"
+        resource_hint = "gpu"
+
+        def compute(self, context, run_id, **kwargs):
+            return None
+
+    ctx = Context(storage_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="resource_hint"):
+        ctx.register(BadHintPlugin)
@@ -0,0 +1,150 @@
+"""Memory-bounded result cache (memory_cache_bytes) tests."""
+
+import numpy as np
+
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.plugins.core.base import Plugin
+from waveform_analysis.core.storage.result_cache import estimate_resident_bytes
+
+N_ROWS = 1000  # 8000 bytes per int64 result
+
+
+def _make_context(tmp_path, calls, save_when="never", **config):
+    class _ArrayPlugin(Plugin):
+        output_dtype = np.dtype("i8")
+
+        def compute(self, context, run_id):
+            calls.append(self.provides)
+            return np.full(N_ROWS, self.fill, dtype=np.int64)
+
+    class _HeadPlugin(Plugin):
+        # 依赖 data_x 的小输出：让 data_x 作为非目标依赖被计算（save_when="target" 时不落盘）
+        save_when = "never"
+        output_dtype = np.dtype("i8")
+
+        def compute(self, context, run_id):
+            return np.asarray(context.get_data(run_id, self.depends_on[0])[:1])
+
+    ctx = Context(storage_dir=str(tmp_path), config={"show_progress": False, **config})
+    for fill, name in enumerate(("data_a", "data_b", "data_c")):
+        attrs = {"provides": name, "fill": fill, "save_when": save_when}
+        ctx.register(type(f"Plugin_{name}", (_ArrayPlugin,), attrs)())
+        attrs = {"provides": f"head_{name}", "depends_on": [name]}
+        ctx.register(type(f"Plugin_head_{name}", (_HeadPlugin,), attrs)())
+    return ctx
+
+
+def test_unbounded_by_default_counts_hits(tmp_path):
+    calls = []
+    ctx = _make_context(tmp_path, calls)
+    for name in ("data_a", "data_b", "data_c"):
+        ctx.get_data("run1", name)
+    ctx.get_data("run1", "data_a")
+
+    stats = ctx._cache_domain.memory_cache_snapshot()
+    assert stats["budget_bytes"] is None
+    assert stats["evictions"] == 0
+    assert stats["resident_bytes"] == 3 * N_ROWS * 8
+    assert stats["hits"] >= 1
+    assert calls == ["data_a", "data_b", "data_c"]
+
+
+def test_lru_eviction_spills_and_reloads_from_memmap(tmp_path):
+    calls = []
+    ctx = _make_context(tmp_path, calls, save_when="target", memory_cache_bytes=2 * N_ROWS * 8 + 64)
+    ctx.get_data("run1", "head_data_a")
+    ctx.get_data("run1", "head_data_b")
+    ctx.get_data("run1", "data_a")  # data_a becomes most recently used
+    ctx.get_data("run1", "head_data_c")
+
+    assert ("run1", "data_b") not in ctx._results
+    assert ("run1", "data_a") in ctx._results
+    assert "data_b" not in ctx.__dict__
+    assert ctx.storage.exists(ctx.key_for("run1", "data_b"), "run1")
+
+    reloaded = ctx.get_data("run1", "data_b")
+    assert isinstance(reloaded, np.memmap)
+    np.testing.assert_array_equal(reloaded, np.full(N_ROWS, 1))
+    assert calls == ["data_a", "data_b", "data_c"]
+
+    stats = ctx._cache_domain.memory_cache_snapshot()
+    assert stats["spills"] == 1
+    assert stats["reloads"] == 1
+    assert stats["resident_bytes"] <= 2 * N_ROWS * 8 + 64
+
+
+def test_never_saved_results_are_dropped_not_spilled(tmp_path):
+    calls = []
+    ctx = _make_context(tmp_path, calls, memory_cache_bytes=N_ROWS * 8)
+    ctx.get_data("run1", "data_a")
+    ctx.get_data("run1", "data_b")
+
+    assert ("run1", "data_a") not in ctx._results
+    assert not ctx.storage.exists(ctx.key_for("run1", "data_a"), "run1")
+    data = ctx.get_data("run1", "data_a")
+    assert not isinstance(data, np.memmap)
+    np.testing.assert_array_equal(data, np.zeros(N_ROWS))
+    assert calls == ["data_a", "data_b", "data_a"]
+
+    stats = ctx._cache_domain.memory_cache_snapshot()
+    assert stats["evictions"] == 2
+    assert stats["spills"] == 0
+
+
+def test_pinned_data_is_not_evicted(tmp_path):
+    calls = []
+    ctx = _make_context(tmp_path, calls, memory_cache_bytes=N_ROWS * 8)
+    ctx.pin_data("data_a")
+    ctx.get_data("run1", "data_a")
+    ctx.get_data("run1", "data_b")
+    ctx.get_data("run1", "data_c")
+
+    assert ("run1", "data_a") in ctx._results
+    assert ("run1", "data_b") not in ctx._results
+    assert ("run1", "data_c") in ctx._results
+
+    ctx.unpin_data("data_a")
+    ctx.get_data("run2", "data_b")
+    assert ("run1", "data_a") not in ctx._results
+
+
+def test_spill_disabled_drops_and_recomputes(tmp_path):
+    calls = []
+    ctx = _make_context(
+        tmp_path,
+        calls,
+        save_when="target",
+        memory_cache_bytes=N_ROWS * 8 + 64,
+        memory_cache_spill=False,
+    )
+    ctx.get_data("run1", "head_data_a")
+    ctx.get_data("run1", "head_data_b")
+
+    assert ("run1", "data_a") not in ctx._results
+    assert not ctx.storage.exists(ctx.key_for("run1", "data_a"), "run1")
+    data = ctx.get_data("run1", "data_a")
+    np.testing.assert_array_equal(data, np.zeros(N_ROWS))
+    assert calls == ["data_a", "data_b", "data_a"]
+
+
+def test_cache_stats_reports_memory_counters(tmp_path):
+    calls = []
+    ctx = _make_context(tmp_path, calls, memory_cache_bytes=N_ROWS * 8)
+    ctx.get_data("run1", "data_a")
+    ctx.get_data("run1", "data_b")
+
+    stats = ctx.cache_stats()
+    assert stats.memory["budget_bytes"] == N_ROWS * 8
+    assert stats.memory["evictions"] == 1
+    assert stats.to_dict()["memory"]["spills"] == 0
+
+
+def test_estimate_resident_bytes_ignores_memmap(tmp_path):
+    path = tmp_path / "arr.bin"
+    np.arange(100, dtype=np.int64).tofile(path)
+    mm = np.memmap(path, dtype=np.int64, mode="r")
+
+    assert estimate_resident_bytes(mm) == 0
+    assert estimate_resident_bytes(mm[10:20]) == 0
+    assert estimate_resident_bytes(np.zeros(10, dtype=np.int64)) == 80
+    assert estimate_resident_bytes([np.zeros(4, dtype=np.int32), mm]) == 16
@@ -6,7 +6,27 @@ import numpy as np
 
 from tests.daq_adapter_helpers import make_v1725_single_wave_blob
 from waveform_analysis.core.processing.records_builder import build_records_from_v1725_files
-from waveform_analysis.utils.formats import RawTimestampMode, V1725Reader, get_adapter
+from waveform_analysis.utils.formats import (
+    RawTimestampMode,
+    V1725Reader,
+    gather_v1725_samples,
+    get_adapter,
+    load_v1725_index,
+)
+
+
+def _write_multi_wave_file(path: Path) -> None:
+    blobs = [
+        make_v1725_single_wave_blob(
+            channel=ch,
+            timestamp=ts,
+            baseline=100 + ch,
+            trunc=bool(i % 2),
+            samples=np.arange(2 * (i + 1), dtype=np.int16) - 3,
+        )
+        for i, (ch, ts) in enumerate([(2, 50), (0, 10), (5, 10), (1, 30)])
+    ]
+    path.write_bytes(b"".join(blobs))
 
 
 class TestV1725Reader:
@@ -45,3 +65,54 @@ class TestV1725Reader:
         assert len(bundle.records) == 2
         np.testing.assert_array_equal(bundle.records["board"], np.array([3, 4], dtype=np.int16))
         np.testing.assert_array_equal(bundle.records["channel"], np.array([0, 1], dtype=np.int16))
+
+    def test_offset_index_matches_iter_waves(self, tmp_path: Path):
+        raw = tmp_path / "test_raw_b2_seg0.bin"
+        _write_multi_wave_file(raw)
+
+        waves = list(V1725Reader().iter_waves([raw]))
+        index = load_v1725_index(raw, use_sidecar=False)
+
+        assert len(index) == len(waves)
+        np.testing.assert_array_equal(index["board"], [w.board for w in waves])
+        np.testing.assert_array_equal(index["channel"], [w.channel for w in waves])
+        np.testing.assert_array_equal(index["timestamp"], [w.timestamp for w in waves])
+        np.testing.assert_array_equal(index["baseline"], [w.baseline for w in waves])
+        np.testing.assert_array_equal(index["trunc"], [w.trunc for w in waves])
+        pool = gather_v1725_samples(raw, index)
+        expected = np.concatenate([w.waveform for w in waves]).astype(np.uint16)
+        np.testing.assert_array_equal(pool, expected)
+
+    def test_offset_index_sidecar_is_reused_and_invalidated(self, tmp_path: Path):
+        raw = tmp_path / "test_raw_b0_seg0.bin"
+        _write_multi_wave_file(raw)
+        sidecar = tmp_path / "test_raw_b0_seg0.bin.idx.npz"
+
+        first = load_v1725_index(raw)
+        assert sidecar.exists()
+        mtime = sidecar.stat().st_mtime_ns
+        np.testing.assert_array_equal(load_v1725_index(raw), first)
+        assert sidecar.stat().st_mtime_ns == mtime
+
+        with raw.open("ab") as f:
+            f.write(make_v1725_single_wave_blob(channel=3, timestamp=99))
+        assert len(load_v1725_index(raw)) == len(first) + 1
+
+    def test_build_records_gathers_sorted_wave_pool(self, tmp_path: Path):
+        raw = tmp_path / "test_raw_b1_seg0.bin"
+        _write_multi_wave_file(raw)
+
+        bundle = build_records_from_v1725_files([str(raw)], dt_ns=4)
+        records = bundle.records
+
+        np.testing.assert_array_equal(records["timestamp"], [40_000, 40_000, 120_000, 200_000])
+        np.testing.assert_array_equal(records["channel"], [0, 5, 1, 2])
+        np.testing.assert_array_equal(records["flags"], [1, 0, 1, 0])
+        waves = {w.channel: w.waveform for w in V1725Reader().iter_waves([raw])}
+        for rec in records:
+            start = int(rec["wave_offset"])
+            stop = start + int(rec["event_length"])
+            np.testing.assert_array_equal(
+                bundle.wave_pool[start:stop], waves[int(rec["channel"])].astype(np.uint16)
+            )
+        np.testing.assert_array_equal(records["record_id"], np.arange(len(records)))
@@ -1,5 +1,7 @@
 """VX2730 and generic CSV reader tests."""
 
+import os
+
 import numpy as np
 
 from waveform_analysis.utils.formats import (
@@ -7,6 +9,8 @@ from waveform_analysis.utils.formats import (
     FormatSpec,
     GenericCSVReader,
     VX2730Reader,
+    convert_vx2730_to_sidecar,
+    load_vx2730_sidecar,
 )
 
 
@@ -82,6 +86,20 @@ HEADER LINE 2
         assert total_rows == 4
         assert data.shape[0] == total_rows
 
+    def test_scan_file_shape_counts_rows_and_columns_without_trailing_newline(self, tmp_path):
+        csv_file = tmp_path / "CH0_0.CSV"
+        csv_file.write_text(
+            "BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;SAMPLES\n"
+            "0;0;1000;0;0;0;1;100;200;300\n"
+            "0;0;2000;0;0;0;1;110;210;310",
+            encoding="utf-8",
+        )
+
+        reader = VX2730Reader()
+
+        assert reader.scan_file_shape(csv_file, is_first_file=True) == (2, 10)
+        assert reader.scan_file_shape(tmp_path / "missing.CSV") == (0, 0)
+
     def test_read_files_streaming_auto_detects_single_header_row(self, tmp_path):
         first = tmp_path / "CH0_0.CSV"
         first.write_text(
@@ -123,6 +141,81 @@ HEADER LINE 2
         )
 
 
+def _write_vx2730_segments(tmp_path):
+    first = tmp_path / "CH0_0.CSV"
+    first.write_text(
+        """BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;SAMPLES
+0;0;1000;0;0;0;1;100;-200;300
+0;0;2000;0;0;0;1;110;210;310
+""",
+        encoding="utf-8",
+    )
+    second = tmp_path / "CH0_1.CSV"
+    second.write_text("0;0;3000;0;0;0;1;120;220;320\n", encoding="utf-8")
+    return [first, second]
+
+
+class TestVX2730Sidecar:
+    def test_readers_prefer_sidecar_with_identical_output(self, tmp_path):
+        files = _write_vx2730_segments(tmp_path)
+        expected = VX2730Reader().read_files(files)
+
+        written = convert_vx2730_to_sidecar(files)
+        assert [path.name for path in written] == ["CH0_0.CSV.wfb", "CH0_1.CSV.wfb"]
+        assert convert_vx2730_to_sidecar(files) == []
+
+        header, samples = load_vx2730_sidecar(files[0])
+        assert isinstance(samples, np.memmap) and samples.dtype == np.int16
+        np.testing.assert_array_equal(header[:, 2], [1000, 2000])
+        np.testing.assert_array_equal(samples[0], [100, -200, 300])
+
+        # 删除 CSV 内容后仍能读出，说明确实走了 sidecar（大小/mtime 保持不变）
+        stats = [os.stat(fp) for fp in files]
+        for fp, st in zip(files, stats, strict=True):
+            fp.write_bytes(b"x" * st.st_size)
+            os.utime(fp, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        reader = VX2730Reader()
+        np.testing.assert_array_equal(reader.read_files(files), expected)
+        chunks = list(reader.read_files_generator(files, chunk_size=1))
+        np.testing.assert_array_equal(np.vstack(chunks), expected)
+        assert reader.scan_file_shape(files[0]) == (2, 10)
+        assert reader.count_total_rows(files) == 3
+
+        output = np.zeros(3, dtype=[("timestamp", "i8"), ("wave", "i2", (3,))])
+
+        def structurizer(raw, out, offset):
+            out["timestamp"][offset : offset + len(raw)] = raw[:, 2]
+            out["wave"][offset : offset + len(raw)] = raw[:, 7:]
+            return len(raw)
+
+        assert reader.read_files_streaming_into(files, output, structurizer) == 3
+        np.testing.assert_array_equal(output["wave"], expected[:, 7:])
+
+    def test_stale_sidecar_falls_back_to_csv(self, tmp_path):
+        files = _write_vx2730_segments(tmp_path)
+        convert_vx2730_to_sidecar(files)
+
+        files[1].write_text("0;0;4000;0;0;0;1;130;230;330\n", encoding="utf-8")
+        st = os.stat(files[1])
+        os.utime(files[1], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert load_vx2730_sidecar(files[1]) is None
+        data = VX2730Reader().read_files(files)
+        np.testing.assert_array_equal(data[:, 2], [1000, 2000, 4000])
+
+    def test_non_integer_rows_are_not_converted(self, tmp_path):
+        csv_file = tmp_path / "CH0_0.CSV"
+        csv_file.write_text(
+            "BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;SAMPLES\n"
+            "0;0;1000;0;0;0x4000;1;10;11\n",
+            encoding="utf-8",
+        )
+
+        assert convert_vx2730_to_sidecar([csv_file]) == []
+        assert not (tmp_path / "CH0_0.CSV.wfb").exists()
+
+
 class TestGenericCSVReaderStreaming:
     def test_generic_reader_supports_streaming_fallback(self, tmp_path):
         spec = FormatSpec(
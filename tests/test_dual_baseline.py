@@ -6,6 +6,8 @@
 
 import numpy as np
 
+from waveform_analysis.core.processing.dtypes import POLARITY_UNKNOWN
+
 
 def test_record_dtype_has_both_baselines():
     """测试 ST_WAVEFORM_DTYPE 包含两个 baseline 字段"""
@@ -33,7 +35,7 @@ def test_record_dtype_has_both_baselines():
     # 验证字段类型
     assert dtype.fields["baseline"][0] == np.float64, "baseline 应为 float64"
     assert dtype.fields["baseline_upstream"][0] == np.float64, "baseline_upstream 应为 float64"
-    assert dtype.fields["polarity"][0].kind == "U", "polarity 应为 unicode 字段"
+    assert dtype.fields["polarity"][0] == np.int8, "polarity 应为 int8 编码字段"
 
     print("✓ ST_WAVEFORM_DTYPE 包含两个 baseline 字段")
 
@@ -52,7 +54,7 @@ def test_create_record_dtype_has_both_baselines():
     # 验证字段类型
     assert dtype.fields["baseline"][0] == np.float64
     assert dtype.fields["baseline_upstream"][0] == np.float64
-    assert dtype.fields["polarity"][0].kind == "U"
+    assert dtype.fields["polarity"][0] == np.int8
 
     print("✓ create_record_dtype() 包含两个 baseline 字段")
 
@@ -98,7 +100,7 @@ def test_waveform_struct_without_upstream_baseline():
 
     # baseline_upstream 应该是 NaN
     assert np.all(np.isnan(st_waveforms["baseline_upstream"]))
-    assert np.all(st_waveforms["polarity"] == "unknown")
+    assert np.all(st_waveforms["polarity"] == POLARITY_UNKNOWN)
 
     print("✓ 无上游 baseline 测试通过")
 
@@ -0,0 +1,104 @@
+"""Columnar EventTable tests."""
+
+import numpy as np
+import pandas as pd
+
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.plugins.core.base import Plugin
+from waveform_analysis.core.processing.event_grouping import group_multi_channel_hits
+from waveform_analysis.core.processing.event_table import EventTable
+
+
+def _make_table():
+    return EventTable.from_columns(
+        {
+            "event_id": np.arange(3, dtype=np.int64),
+            "t_min": np.array([0, 100, 200], dtype=np.int64),
+            "n_hits": np.array([2, 1, 3], dtype=np.int64),
+        },
+        {
+            "channels": np.array([0, 1, 2, 0, 1, 3], dtype=np.int16),
+            "heights": np.arange(6, dtype=np.float32),
+        },
+    )
+
+
+def test_offsets_and_ragged_access():
+    table = _make_table()
+
+    np.testing.assert_array_equal(table.offsets, [0, 2, 3, 6])
+    np.testing.assert_array_equal(table.event_hits(2)["channels"], [0, 1, 3])
+    np.testing.assert_array_equal(table.hit_event_index(), [0, 0, 1, 2, 2, 2])
+    assert [list(part) for part in table["channels"]] == [[0, 1], [2], [0, 1, 3]]
+    np.testing.assert_array_equal(table["t_min"], [0, 100, 200])
+
+
+def test_take_selects_matching_hits():
+    table = _make_table()
+
+    sub = table.take(np.array([False, True, True]))
+
+    np.testing.assert_array_equal(sub["event_id"], [1, 2])
+    np.testing.assert_array_equal(sub.hits["heights"], [2, 3, 4, 5])
+    assert len(table.take([])) == 0
+
+
+def test_to_pandas_matches_array_column_layout():
+    df = _make_table().to_pandas()
+
+    assert list(df.columns) == ["event_id", "t_min", "n_hits", "channels", "heights"]
+    np.testing.assert_array_equal(df.iloc[2]["heights"], [3, 4, 5])
+    assert df.iloc[2]["heights"].dtype == np.float32
+
+
+def test_group_multi_channel_hits_table_matches_dataframe():
+    df = pd.DataFrame(
+        {
+            "timestamp": [1_000_000, 1_000_010, 2_000_000, 2_000_010, 2_000_020],
+            "area": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "height": [10.0, 20.0, 30.0, 40.0, 50.0],
+            "channel": [1, 0, 1, 0, 0],
+        }
+    )
+
+    table = group_multi_channel_hits(df, time_window_ns=100, as_table=True)
+    expected = group_multi_channel_hits(df, time_window_ns=100)
+
+    assert isinstance(table, EventTable)
+    pd.testing.assert_frame_equal(
+        table.to_pandas().drop(columns=["channels", "areas", "heights", "timestamps"]),
+        expected.drop(columns=["channels", "areas", "heights", "timestamps"]),
+    )
+    np.testing.assert_array_equal(table.event_hits(1)["channels"], [0, 0, 1])
+
+
+class EventTablePlugin(Plugin):
+    provides = "event_table_data"
+    save_when = "always"
+    calls = 0
+
+    def compute(self, context, run_id, **kwargs):
+        type(self).calls += 1
+        return _make_table()
+
+
+def test_context_caches_event_table_as_memmap(tmp_path):
+    EventTablePlugin.calls = 0
+    ctx = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+    ctx.register(EventTablePlugin())
+    first = ctx.get_data("run1", "event_table_data")
+
+    assert isinstance(first, EventTable)
+    assert isinstance(first.events, np.memmap)
+
+    ctx2 = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+    ctx2.register(EventTablePlugin())
+    loaded = ctx2.get_data("run1", "event_table_data")
+
+    assert EventTablePlugin.calls == 1
+    assert isinstance(loaded.hits, np.memmap)
+    pd.testing.assert_frame_equal(
+        loaded.to_pandas().drop(columns=["channels", "heights"]),
+        _make_table().to_pandas().drop(columns=["channels", "heights"]),
+    )
+    np.testing.assert_array_equal(loaded.event_hits(0)["channels"], [0, 1])
@@ -0,0 +1,290 @@
+"""Incremental refresh of runs whose raw files are still being written."""
+
+import os
+
+import numpy as np
+import pytest
+
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.plugins.builtin.cpu.basic_features import BasicFeaturesPlugin
+from waveform_analysis.core.plugins.builtin.cpu.hit_finder import ThresholdHitPlugin
+from waveform_analysis.core.plugins.builtin.cpu.raw_files import RawFileNamesPlugin
+from waveform_analysis.core.plugins.builtin.cpu.records import RecordsPlugin, WavePoolPlugin
+from waveform_analysis.core.plugins.builtin.cpu.waveforms import WaveformsPlugin
+from waveform_analysis.core.processing.incremental import (
+    diff_raw_file_manifest,
+    settled_entries,
+)
+from waveform_analysis.core.processing.packed_waveforms import PackedWaveforms
+from waveform_analysis.core.storage.memmap import MemmapStorage
+
+RUN = "run_001"
+
+
+def _write_vx2730_csv(raw_dir, ch, index, t0, n_samples=16):
+    lines = ["BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;S"]
+    for i in range(4):
+        # 偶数事件在 5..8 采样点有一个负脉冲
+        samples = [
+            100 - (40 if 5 <= j < 9 and i % 2 == 0 else 0) + (j + i + ch) % 3
+            for j in range(n_samples)
+        ]
+        lines.append(";".join(map(str, [0, ch, t0 + 1000 * i + ch, 0, 0, 0, 1, *samples])))
+    path = raw_dir / f"CH{ch}_{index}.CSV"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _make_context(storage_dir, data_root, layout="padded"):
+    ctx = Context(
+        storage_dir=str(storage_dir),
+        config={
+            "show_progress": False,
+            "data_root": str(data_root),
+            "daq_adapter": "vx2730",
+            "wave_layout": layout,
+        },
+    )
+    for plugin in (
+        RawFileNamesPlugin(),
+        WaveformsPlugin(),
+        RecordsPlugin(),
+        WavePoolPlugin(),
+        BasicFeaturesPlugin(),
+        ThresholdHitPlugin(),
+    ):
+        ctx.register(plugin)
+    ctx.set_config({"incremental": True, "settle_seconds": 0}, plugin_name="raw_files")
+    ctx.set_config({"threshold": 10}, plugin_name="hit_threshold")
+    return ctx
+
+
+@pytest.fixture
+def daq_run(tmp_path):
+    raw_dir = tmp_path / "DAQ" / RUN / "RAW"
+    raw_dir.mkdir(parents=True)
+    for ch in range(2):
+        _write_vx2730_csv(raw_dir, ch, 0, t0=0)
+    return tmp_path / "DAQ", raw_dir
+
+
+def _sorted_rows(data):
+    return data[np.lexsort((data["channel"], data["timestamp"]))]
+
+
+def _record_waves(ctx):
+    records = ctx.get_data(RUN, "records")
+    wave_pool = ctx.get_data(RUN, "wave_pool")
+    return [
+        wave_pool[int(rec["wave_offset"]) : int(rec["wave_offset"]) + int(rec["event_length"])]
+        for rec in records
+    ]
+
+
+def test_refresh_appends_new_files_and_matches_full_rebuild(tmp_path, daq_run):
+    data_root, raw_dir = daq_run
+    ctx = _make_context(tmp_path / "cache", data_root)
+    for name in ("records", "wave_pool", "st_waveforms", "basic_features", "hit_threshold"):
+        ctx.get_data(RUN, name)
+
+    new_files = [_write_vx2730_csv(raw_dir, ch, 1, t0=10_000) for ch in range(2)]
+    report = ctx.refresh_run(RUN)
+
+    assert report["mode"] == "append"
+    assert report["new_files"] == new_files
+    assert report["invalidated"] == []
+    for name in ("records", "wave_pool", "st_waveforms", "basic_features", "hit_threshold"):
+        assert report["extended"][name]["appended"], name
+    assert ctx.get_data(RUN, "raw_files") == [
+        [str(raw_dir / f"CH{ch}_{i}.CSV") for i in range(2)] for ch in range(2)
+    ]
+
+    full = _make_context(tmp_path / "full", data_root)
+    records, expected = ctx.get_data(RUN, "records"), full.get_data(RUN, "records")
+    assert isinstance(records, np.memmap)
+    for field in ("record_id", "timestamp", "channel", "event_length", "baseline"):
+        np.testing.assert_array_equal(records[field], expected[field])
+    for got, want in zip(_record_waves(ctx), _record_waves(full), strict=True):
+        np.testing.assert_array_equal(got, want)
+
+    # st_waveforms 按摄取批次追加，record_id 顺延
+    st = ctx.get_data(RUN, "st_waveforms")
+    np.testing.assert_array_equal(st["record_id"], np.arange(16))
+    st_full = _sorted_rows(full.get_data(RUN, "st_waveforms"))
+    st_sorted = _sorted_rows(np.asarray(st))
+    for field in ("timestamp", "channel", "baseline", "wave"):
+        np.testing.assert_array_equal(st_sorted[field], st_full[field])
+
+    features = ctx.get_data(RUN, "basic_features")
+    np.testing.assert_array_equal(features["event_index"], np.arange(16))
+    features_full = _sorted_rows(full.get_data(RUN, "basic_features"))
+    for field in ("height", "area", "amp", "timestamp"):
+        np.testing.assert_array_equal(
+            _sorted_rows(np.asarray(features))[field], features_full[field]
+        )
+
+    hits = ctx.get_data(RUN, "hit_threshold")
+    hits_full = full.get_data(RUN, "hit_threshold")
+    assert len(hits) == len(hits_full) == 8
+    np.testing.assert_array_equal(np.sort(hits["timestamp"]), np.sort(hits_full["timestamp"]))
+    np.testing.assert_array_equal(st["channel"][hits["record_id"]], hits["channel"])
+    assert np.all(st["timestamp"][hits["record_id"]] <= hits["timestamp"])
+
+    # 新的 Context 从磁盘缓存与清单恢复同样的结果
+    reloaded = _make_context(tmp_path / "cache", data_root)
+    assert len(reloaded.get_data(RUN, "hit_threshold")) == 8
+    assert reloaded.refresh_run(RUN)["mode"] == "unchanged"
+
+
+def test_failed_refresh_rolls_back_and_retry_does_not_duplicate_rows(
+    tmp_path, daq_run, monkeypatch
+):
+    data_root, raw_dir = daq_run
+    ctx = _make_context(tmp_path / "cache", data_root)
+    for name in ("records", "wave_pool", "st_waveforms", "hit_threshold"):
+        ctx.get_data(RUN, name)
+    _write_vx2730_csv(raw_dir, 0, 1, t0=10_000)
+    _write_vx2730_csv(raw_dir, 1, 1, t0=10_000)
+
+    def fail(self, context, run_id, previous, update):
+        raise RuntimeError("hit finder failed")
+
+    # hit_threshold 排在 records/st_waveforms 之后：失败时它们已在磁盘上扩展
+    with monkeypatch.context() as patch:
+        patch.setattr(ThresholdHitPlugin, "compute_incremental", fail)
+        with pytest.raises(RuntimeError, match="hit finder failed"):
+            ctx.refresh_run(RUN)
+
+    # 清单未更新、已扩展的缓存被清除：新的 Context 看到的是刷新前的一致状态
+    fresh = _make_context(tmp_path / "cache", data_root)
+    assert [len(group) for group in fresh.get_data(RUN, "raw_files")] == [1, 1]
+    assert len(fresh.get_data(RUN, "records")) == 8
+    assert len(fresh.get_data(RUN, "st_waveforms")) == 8
+
+    report = ctx.refresh_run(RUN)
+    assert report["mode"] == "append"
+    assert len(ctx.get_data(RUN, "records")) == 16
+    assert len(ctx.get_data(RUN, "st_waveforms")) == 16
+    assert len(ctx.get_data(RUN, "hit_threshold")) == 8
+
+    reloaded = _make_context(tmp_path / "cache", data_root)
+    assert len(reloaded.get_data(RUN, "records")) == 16
+    assert len(reloaded.get_data(RUN, "st_waveforms")) == 16
+    assert reloaded.refresh_run(RUN)["mode"] == "unchanged"
+
+
+def test_refresh_resorts_records_tail_for_out_of_order_files(tmp_path, daq_run):
+    data_root, raw_dir = daq_run
+    ctx = _make_context(tmp_path / "cache", data_root)
+    ctx.get_data(RUN, "records")
+    ctx.get_data(RUN, "wave_pool")
+
+    # 新文件的时间落在已有记录之间：只有其后的记录被重排
+    _write_vx2730_csv(raw_dir, 0, 1, t0=1500)
+    report = ctx.refresh_run(RUN)
+    assert report["extended"]["records"]["stable_rows"] == 4
+    assert not report["extended"]["records"]["appended"]
+
+    full = _make_context(tmp_path / "full", data_root)
+    records, expected = ctx.get_data(RUN, "records"), full.get_data(RUN, "records")
+    for field in ("record_id", "timestamp", "channel", "event_length"):
+        np.testing.assert_array_equal(records[field], expected[field])
+    for got, want in zip(_record_waves(ctx), _record_waves(full), strict=True):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_refresh_packed_layout_appends_events_and_pool(tmp_path, daq_run):
+    data_root, raw_dir = daq_run
+    ctx = _make_context(tmp_path / "cache", data_root, layout="packed")
+    before = ctx.get_data(RUN, "st_waveforms")
+    assert isinstance(before, PackedWaveforms)
+
+    # 新出现的通道（新的文件分组），记录更长
+    _write_vx2730_csv(raw_dir, 2, 0, t0=10_000, n_samples=24)
+    report = ctx.refresh_run(RUN)
+    assert report["extended"]["st_waveforms"]["appended"]
+
+    st = ctx.get_data(RUN, "st_waveforms")
+    assert isinstance(st, PackedWaveforms)
+    assert len(st) == 12
+    np.testing.assert_array_equal(st["record_id"], np.arange(12))
+    np.testing.assert_array_equal(st.padded(range(8), pad_to=16), before.padded(pad_to=16))
+    assert st.max_length == 24
+
+    full = _make_context(tmp_path / "full", data_root, layout="packed").get_data(
+        RUN, "st_waveforms"
+    )
+    order, order_full = (np.lexsort((x["channel"], x["timestamp"])) for x in (st, full))
+    np.testing.assert_array_equal(st.padded(order), full.padded(order_full))
+
+
+def test_refresh_skips_unsettled_files_and_rebuilds_on_modification(tmp_path, daq_run):
+    data_root, raw_dir = daq_run
+    ctx = _make_context(tmp_path / "cache", data_root)
+    ctx.set_config({"settle_seconds": 60}, plugin_name="raw_files")
+    old = [str(raw_dir / f"CH{ch}_0.CSV") for ch in range(2)]
+    past = 1_000_000_000
+    for path in old:
+        os.utime(path, (past, past))
+    assert len(ctx.get_data(RUN, "records")) == 8
+
+    # 仍在写入的文件（mtime 在 settle_seconds 内）暂不摄取
+    _write_vx2730_csv(raw_dir, 0, 1, t0=10_000)
+    assert ctx.refresh_run(RUN)["mode"] == "unchanged"
+
+    # 已摄取的文件被改写：整个运行失效，下次访问完整重建
+    _write_vx2730_csv(raw_dir, 1, 0, t0=0, n_samples=20)
+    os.utime(old[1], (past + 10, past + 10))
+    report = ctx.refresh_run(RUN)
+    assert report["mode"] == "rebuild"
+    assert "records" in report["invalidated"]
+    ctx.set_config({"settle_seconds": 0}, plugin_name="raw_files")
+    assert len(ctx.get_data(RUN, "records")) == 12
+
+
+def test_refresh_requires_incremental_raw_files(tmp_path, daq_run):
+    data_root, _raw_dir = daq_run
+    ctx = _make_context(tmp_path / "cache", data_root)
+    ctx.set_config({"incremental": False}, plugin_name="raw_files")
+    with pytest.raises(ValueError, match="incremental=True"):
+        ctx.refresh_run(RUN)
+
+
+def test_diff_raw_file_manifest_detects_new_and_changed_files():
+    def entry(path, size=10, mtime_ns=1):
+        return {"path": path, "size": size, "mtime_ns": mtime_ns}
+
+    ingested = [[entry("a0"), entry("a1")], [entry("b0")]]
+    diff = diff_raw_file_manifest(
+        ingested, [[entry("a0"), entry("a1"), entry("a2")], [entry("b0")], [entry("c0")]]
+    )
+    assert diff.new_files == [["a2"], [], ["c0"]]
+    assert diff.changed == [] and diff.n_new == 2
+
+    diff = diff_raw_file_manifest(ingested, [[entry("a0"), entry("a1", size=20)], []])
+    assert diff.changed == ["a1", "b0"]
+
+    now = 100.0
+    entries = [[entry("a0", mtime_ns=int(10e9)), entry("a1", mtime_ns=int(99e9))]]
+    assert [e["path"] for e in settled_entries(entries, 5.0, now=now)[0]] == ["a0"]
+    assert len(settled_entries(entries, 0.0, now=now)[0]) == 2
+
+
+def test_append_memmap_extends_file_and_metadata(tmp_path):
+    storage = MemmapStorage(str(tmp_path))
+    dtype = np.dtype([("time", "<i8"), ("wave", "<i2", (4,))])
+    first = np.zeros(3, dtype=dtype)
+    first["time"] = [1, 2, 3]
+    storage.save_memmap("k", first)
+
+    extra = np.zeros(2, dtype=dtype)
+    extra["time"] = [4, 5]
+    extra["wave"] = 7
+    assert storage.append_memmap("k", extra)
+    loaded = storage.load_memmap("k")
+    np.testing.assert_array_equal(loaded["time"], [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(loaded["wave"][3:], 7)
+    assert storage.get_metadata("k")["count"] == 5
+
+    assert not storage.append_memmap("k", np.zeros(1, dtype=[("time", "<i8")]))
+    assert not storage.append_memmap("missing", extra)
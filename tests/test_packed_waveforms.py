@@ -0,0 +1,134 @@
+"""Packed (variable-length) st_waveforms layout tests."""
+
+import numpy as np
+import pytest
+
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.plugins.builtin.cpu.basic_features import BasicFeaturesPlugin
+from waveform_analysis.core.plugins.builtin.cpu.filtering import (
+    FilteredWaveformsPlugin,
+    apply_filter_to_record_wave,
+)
+from waveform_analysis.core.plugins.builtin.cpu.waveforms import WaveformsPlugin
+from waveform_analysis.core.plugins.core.base import Plugin
+from waveform_analysis.core.processing.dtypes import PACKED_WAVEFORM_DTYPE, create_record_dtype
+from waveform_analysis.core.processing.packed_waveforms import PackedWaveforms
+
+
+def _make_padded():
+    st = np.zeros(4, dtype=create_record_dtype(6))
+    st["event_length"] = [6, 3, 0, 5]
+    st["wave"] = np.arange(24).reshape(4, 6)
+    st["baseline"] = [1.0, 2.0, 3.0, 4.0]
+    st["record_id"] = np.arange(4)
+    return st
+
+
+def test_from_padded_roundtrip_and_ragged_access():
+    st = _make_padded()
+    packed = PackedWaveforms.from_padded(st)
+
+    assert packed.events.dtype == PACKED_WAVEFORM_DTYPE
+    np.testing.assert_array_equal(packed.offsets, [0, 6, 9, 9])
+    np.testing.assert_array_equal(packed.wave(1), [6, 7, 8])
+    assert packed.wave(2).size == 0
+    np.testing.assert_array_equal(packed.padded([3, 1]), [[18, 19, 20, 21, 22], [6, 7, 8, 0, 0]])
+    np.testing.assert_array_equal(packed["baseline"], st["baseline"])
+
+    sub = packed.take(np.array([False, True, False, True]))
+    np.testing.assert_array_equal(sub.pool, [6, 7, 8, 18, 19, 20, 21, 22])
+    np.testing.assert_array_equal(sub.offsets, [0, 3])
+
+    legacy = packed.to_padded(pad_to=6)
+    assert legacy.dtype == st.dtype
+    valid = np.arange(6)[None, :] < st["event_length"][:, None]
+    np.testing.assert_array_equal(legacy["wave"], np.where(valid, st["wave"], 0))
+
+
+def test_rejects_out_of_bounds_events():
+    events = np.zeros(1, dtype=PACKED_WAVEFORM_DTYPE)
+    events["event_length"] = 4
+    with pytest.raises(ValueError, match="outside the wave pool"):
+        PackedWaveforms(events, np.zeros(3, dtype=np.int16))
+
+
+def _write_vx2730_csvs(raw_dir, lengths):
+    groups = []
+    for ch, n_samples in enumerate(lengths):
+        lines = ["BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;S"]
+        for i in range(5):
+            samples = [100 + 7 * ((ch + i * j) % 5) for j in range(n_samples)]
+            lines.append(";".join(map(str, [0, ch, 1000 * i + ch, 0, 0, 0, 1, *samples])))
+        path = raw_dir / f"CH{ch}_0.CSV"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        groups.append([str(path)])
+    return groups
+
+
+def _make_context(storage_dir, raw_groups, layout):
+    class _RawFiles(Plugin):
+        provides = "raw_files"
+        output_dtype = "List[List[str]]"
+        save_when = "never"
+
+        def compute(self, context, run_id):
+            return raw_groups
+
+    ctx = Context(
+        storage_dir=str(storage_dir),
+        config={"show_progress": False, "daq_adapter": "vx2730", "wave_layout": layout},
+    )
+    ctx.register(_RawFiles())
+    ctx.register(WaveformsPlugin())
+    ctx.register(FilteredWaveformsPlugin())
+    ctx.register(BasicFeaturesPlugin())
+    return ctx
+
+
+def test_packed_layout_stores_only_valid_samples_and_reloads_from_cache(tmp_path):
+    raw_groups = _write_vx2730_csvs(tmp_path, lengths=(16, 8, 24))
+
+    padded = _make_context(tmp_path / "padded", raw_groups, "padded").get_data(
+        "run_001", "st_waveforms"
+    )
+    packed = _make_context(tmp_path / "packed", raw_groups, "packed").get_data(
+        "run_001", "st_waveforms"
+    )
+
+    assert isinstance(packed, PackedWaveforms)
+    assert isinstance(packed.pool, np.memmap)
+    assert len(packed.pool) == 5 * (16 + 8 + 24)
+    # padded 布局按首个通道推断 wave_length 并截断更长的记录；packed 保留全部样本
+    width = padded["wave"].shape[1]
+    assert packed.max_length == 24 > width
+    np.testing.assert_array_equal(np.sort(np.unique(packed["event_length"])), [8, 16, 24])
+    for name in ("timestamp", "record_id", "board", "channel", "polarity"):
+        np.testing.assert_array_equal(packed[name], padded[name])
+    np.testing.assert_array_equal(packed.padded(pad_to=width), padded["wave"])
+
+    reloaded = _make_context(tmp_path / "packed", raw_groups, "packed").get_data(
+        "run_001", "st_waveforms"
+    )
+    assert isinstance(reloaded, PackedWaveforms)
+    np.testing.assert_array_equal(reloaded.pool, packed.pool)
+
+
+def test_filtering_and_features_run_on_packed_form(tmp_path):
+    raw_groups = _write_vx2730_csvs(tmp_path, lengths=(16, 16, 16))
+    ctx_padded = _make_context(tmp_path / "padded", raw_groups, "padded")
+    ctx_packed = _make_context(tmp_path / "packed", raw_groups, "packed")
+
+    filtered = ctx_packed.get_data("run_001", "filtered_waveforms")
+    assert isinstance(filtered, PackedWaveforms)
+    assert filtered.pool.dtype == np.float32
+    np.testing.assert_allclose(
+        filtered.padded(), ctx_padded.get_data("run_001", "filtered_waveforms")["wave"]
+    )
+    st = ctx_packed.get_data("run_001", "st_waveforms")
+    expected = apply_filter_to_record_wave(st.wave(3), "SG", sg_window_size=11, sg_poly_order=2)
+    np.testing.assert_allclose(filtered.wave(3), expected)
+
+    features_packed = ctx_packed.get_data("run_001", "basic_features")
+    features_padded = ctx_padded.get_data("run_001", "basic_features")
+    for name in features_padded.dtype.names:
+        np.testing.assert_array_equal(features_packed[name], features_padded[name])
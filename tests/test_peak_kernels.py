@@ -0,0 +1,85 @@
+"""Block peak kernel tests against scipy.signal.find_peaks."""
+
+import numpy as np
+import pytest
+from scipy.signal import find_peaks
+
+from waveform_analysis.core.processing.peak_kernels import (
+    find_peaks_block,
+    find_peaks_block_loops,
+    resolve_peak_backend,
+)
+
+
+def _scipy_block(rows, **kwargs):
+    out = []
+    for r, x in enumerate(rows):
+        peaks, props = find_peaks(x, **kwargs)
+        for i, p in enumerate(peaks):
+            out.append((r, int(p), float(props["left_ips"][i]), float(props["right_ips"][i])))
+    return out
+
+
+def _random_block(rng, integer=False):
+    rows = []
+    for _ in range(int(rng.integers(1, 10))):
+        n = int(rng.integers(0, 120))
+        if integer:
+            rows.append(rng.integers(-4, 5, n).astype(np.float64))
+        else:
+            rows.append(np.cumsum(rng.normal(0, 3, n)))
+    offsets = np.concatenate(([0], np.cumsum([len(r) for r in rows])))
+    return rows, np.concatenate(rows) if rows else np.zeros(0), offsets
+
+
+@pytest.mark.parametrize("integer", [False, True])
+def test_numpy_block_kernel_matches_scipy(integer):
+    rng = np.random.default_rng(11)
+    for _ in range(60):
+        rows, x, offsets = _random_block(rng, integer=integer)
+        kwargs = {
+            "height": float(rng.choice([0.0, 1.0])),
+            "threshold": [None, 0.0][int(rng.integers(0, 2))],
+            "distance": int(rng.choice([1, 2, 4])),
+            "prominence": float(rng.choice([0.5, 2.0])),
+            "width": float(rng.choice([0.0, 2.0])),
+        }
+
+        got = find_peaks_block(x, offsets, backend="numpy", **kwargs)
+
+        assert list(zip(*(a.tolist() for a in got), strict=True)) == _scipy_block(rows, **kwargs)
+
+
+def test_loop_kernel_matches_scipy_on_continuous_data():
+    rng = np.random.default_rng(5)
+    for _ in range(20):
+        rows, x, offsets = _random_block(rng)
+        expected = _scipy_block(rows, height=0.0, distance=3, prominence=0.7, width=1.0)
+
+        got = find_peaks_block_loops(x, offsets, 0.0, None, 3.0, 0.7, 1.0, 0.5)
+
+        assert list(zip(*(a.tolist() for a in got), strict=True)) == expected
+
+
+def test_loop_kernel_matches_scipy_distance_ties_on_integer_data():
+    # 整数 ADC 数据：大量等高峰，distance 的取舍依赖与 scipy 相同的排序顺序
+    rng = np.random.default_rng(3)
+    rows = [
+        (rng.integers(0, 6, 400) + 20 * (rng.random(400) < 0.02)).astype(np.float64)
+        for _ in range(200)
+    ]
+    offsets = np.concatenate(([0], np.cumsum([len(r) for r in rows])))
+    x = np.concatenate(rows)
+    expected = _scipy_block(rows, height=2.0, distance=10, width=0.0)
+
+    got = find_peaks_block_loops(x, offsets, 2.0, None, 10.0, None, 0.0, 0.5)
+
+    assert list(zip(*(a.tolist() for a in got), strict=True)) == expected
+
+
+def test_backend_resolution_and_validation():
+    assert resolve_peak_backend("auto") in ("numba", "numpy")
+    with pytest.raises(ValueError):
+        resolve_peak_backend("cuda")
+    with pytest.raises(ValueError):
+        find_peaks_block(np.zeros(4), np.array([0, 4]), distance=0.5)
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.data.record_index import RecordIndex, record_index
+
+
+@pytest.mark.parametrize(
+    "ids",
+    [
+        np.arange(5, 10, dtype=np.int64),  # 连续
+        np.array([2, 5, 9, 40], dtype=np.int64),  # 严格递增
+        np.array([9, 2, 40, 5], dtype=np.int64),  # 乱序
+    ],
+)
+@pytest.mark.parametrize("lazy", [False, True])
+def test_record_index_resolves_rows(ids, lazy):
+    index = RecordIndex(ids, lazy=lazy)
+    query = np.array([ids[2], ids[0], 1000, ids[-1]], dtype=np.int64)
+
+    rows, found = index.lookup(query)
+
+    assert found.tolist() == [True, True, False, True]
+    assert np.array_equal(ids[rows[found]], query[found])
+    with pytest.raises(KeyError, match="1000"):
+        index.rows(query)
+
+
+def test_record_index_rejects_duplicate_ids():
+    with pytest.raises(ValueError, match="duplicate 3"):
+        RecordIndex(np.array([3, 1, 3], dtype=np.int64))
+
+
+def test_lazy_record_index_keeps_raising_on_duplicate_ids():
+    index = RecordIndex(np.array([3, 1, 3], dtype=np.int64), lazy=True)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="duplicate 3"):
+            index.lookup([1])
+
+
+def test_shared_lazy_record_index_supports_concurrent_lookups():
+    rng = np.random.default_rng(0)
+    # 乱序 id：首次查找触发的 argsort 会释放 GIL，其他线程此时仍在查找
+    ids = rng.permutation(np.cumsum(rng.integers(1, 4, size=200_000))).astype(np.int64)
+    query = rng.choice(ids, size=5_000)
+    expected = np.argsort(ids)[np.searchsorted(np.sort(ids), query)]
+
+    for _ in range(5):
+        index = RecordIndex(ids, lazy=True)
+
+        def resolve(_):
+            rows, found = index.lookup(query)
+            return bool(found.all()) and np.array_equal(rows, expected)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert all(pool.map(resolve, range(64)))
+
+
+def test_record_index_identity_fast_path():
+    assert RecordIndex(np.arange(4, dtype=np.int64)).is_identity
+    assert not RecordIndex(np.arange(1, 5, dtype=np.int64)).is_identity
+
+
+def test_record_index_is_cached_per_run_and_array(tmp_path):
+    ctx = Context(storage_dir=str(tmp_path))
+    data = np.zeros(3, dtype=[("record_id", "i8")])
+    data["record_id"] = [4, 7, 8]
+
+    first = record_index(ctx, "run", "st_waveforms", data=data)
+    assert record_index(ctx, "run", "st_waveforms", data=data) is first
+    assert record_index(ctx, "run", "st_waveforms", data=data.copy()) is not first
+    assert first.rows([8, 4]).tolist() == [2, 0]
+
+
+def test_record_index_without_record_id_field_is_row_number():
+    data = np.zeros(3, dtype=[("timestamp", "i8")])
+    index = record_index(object(), "run", "st_waveforms", data=data)
+
+    rows, found = index.lookup([2, 3, -1])
+
+    assert found.tolist() == [True, False, False]
+    assert rows[0] == 2
@@ -6,7 +6,7 @@ import numpy as np
 import pytest
 
 from waveform_analysis.core.data import RecordsView
-from waveform_analysis.core.processing.dtypes import RECORDS_DTYPE
+from waveform_analysis.core.processing.dtypes import POLARITY_NEGATIVE, RECORDS_DTYPE
 from waveform_analysis.utils.preview import plot_records_waveforms
 
 
@@ -17,7 +17,7 @@ def _make_records_view() -> RecordsView:
     records["board"] = 0
     records["channel"] = np.array([1, 1, 2], dtype=np.int16)
     records["baseline"] = 100.0
-    records["polarity"] = "negative"
+    records["polarity"] = POLARITY_NEGATIVE
     records["dt"] = 2
     records["wave_offset"] = np.array([0, 8, 16], dtype=np.int64)
     records["event_length"] = 8
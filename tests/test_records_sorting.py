@@ -7,10 +7,13 @@ import numpy as np
 from waveform_analysis.core.foundation.utils import Profiler
 from waveform_analysis.core.processing.dtypes import create_record_dtype
 from waveform_analysis.core.processing.records_builder import (
+    RECORDS_DTYPE,
+    RecordsBundle,
     build_records_from_raw_files,
     build_records_from_st_waveforms,
     build_records_from_st_waveforms_sharded,
     build_records_from_v1725_files,
+    merge_records_parts,
 )
 
 
@@ -86,6 +89,35 @@ def test_build_records_from_st_waveforms_sharded_keeps_global_timestamp_order():
     np.testing.assert_array_equal(sharded.wave_pool, baseline.wave_pool)
 
 
+def _make_records_part(timestamps, lengths, fill) -> RecordsBundle:
+    records = np.zeros(len(timestamps), dtype=RECORDS_DTYPE)
+    records["timestamp"] = timestamps
+    records["event_length"] = lengths
+    records["wave_offset"] = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    records["record_id"] = np.arange(len(timestamps))
+    wave_pool = np.repeat(np.asarray(fill, dtype=np.uint16), lengths)
+    return RecordsBundle(records, wave_pool)
+
+
+def test_merge_records_parts_interleaves_and_writes_into_memmap(tmp_path: Path):
+    parts = [
+        _make_records_part([10, 30, 30], [2, 0, 3], [1, 2, 3]),
+        _make_records_part([20, 30], [1, 2], [4, 5]),
+    ]
+    records_out = np.memmap(tmp_path / "records.dat", dtype=RECORDS_DTYPE, mode="w+", shape=(5,))
+    wave_pool_out = np.memmap(tmp_path / "wave_pool.dat", dtype=np.uint16, mode="w+", shape=(8,))
+
+    merged = merge_records_parts(parts, records_out=records_out, wave_pool_out=wave_pool_out)
+
+    assert merged.records is records_out
+    np.testing.assert_array_equal(merged.records["timestamp"], [10, 20, 30, 30, 30])
+    # 同一时间戳保持 part 顺序：part0 的两行在 part1 之前
+    np.testing.assert_array_equal(merged.records["event_length"], [2, 1, 0, 3, 2])
+    np.testing.assert_array_equal(merged.records["wave_offset"], [0, 2, 3, 3, 6])
+    np.testing.assert_array_equal(merged.records["record_id"], np.arange(5))
+    np.testing.assert_array_equal(wave_pool_out, [1, 1, 4, 3, 3, 3, 5, 5])
+
+
 def test_build_records_from_v1725_files_sorts_approximately_ordered_input(tmp_path: Path):
     raw0 = tmp_path / "test_raw_b3_seg0.bin"
     raw1 = tmp_path / "test_raw_b4_seg1.bin"
@@ -373,3 +405,32 @@ def test_build_records_from_raw_files_handles_single_header_first_segment(tmp_pa
             dtype=np.uint16,
         ),
     )
+
+
+def test_build_records_from_raw_files_process_mode_writes_shared_output(tmp_path: Path):
+    header = "BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;SAMPLES\n"
+    raw_files = []
+    for channel, timestamps in enumerate([[5000, 1000, 3000], [2000, 4000], [3000, 1000]]):
+        first = tmp_path / f"DataR_CH{channel}@VX2730_demo.CSV"
+        second = tmp_path / f"DataR_CH{channel}@VX2730_demo_1.CSV"
+        rows = [
+            f"0;{channel};{ts};0;0;0;1;{ts // 1000};{channel};{ts // 100}\n" for ts in timestamps
+        ]
+        first.write_text(header + "".join(rows[:2]), encoding="utf-8")
+        second.write_text("".join(rows[2:]), encoding="utf-8")
+        raw_files.append([str(first), str(second)])
+
+    kwargs = {"adapter_name": "vx2730", "default_dt_ns": 2, "part_size": 1, "epoch_ns": 7}
+    expected = build_records_from_raw_files(raw_files, **kwargs)
+    profiler = Profiler()
+    bundle = build_records_from_raw_files(
+        raw_files, channel_workers=2, channel_executor="process", profiler=profiler, **kwargs
+    )
+
+    for name in RECORDS_DTYPE.names:
+        np.testing.assert_array_equal(bundle.records[name], expected.records[name])
+    np.testing.assert_array_equal(bundle.wave_pool, expected.wave_pool)
+    np.testing.assert_array_equal(bundle.records["record_id"], np.arange(7, dtype=np.int64))
+    assert profiler.counts["records.prepass"] == 1
+    assert profiler.counts["records.part_build"] == 7
+    assert profiler.counts["records.merge"] == 1
@@ -7,6 +7,11 @@ from tests.utils import FakeContext
 from waveform_analysis.core.context import Context
 from waveform_analysis.core.data.records_view import RecordsView, records_view
 from waveform_analysis.core.plugins import profiles
+from waveform_analysis.core.processing.dtypes import (
+    POLARITY_NEGATIVE,
+    decode_polarity,
+    encode_polarity,
+)
 from waveform_analysis.core.processing.records_builder import RECORDS_DTYPE
 
 
@@ -17,7 +22,7 @@ def _make_sample_view():
     records["channel"] = [0, 0, 1]
     records["record_id"] = [10, 11, 12]
     records["baseline"] = [1.0, 2.0, 0.0]
-    records["polarity"] = ["positive", "negative", "unknown"]
+    records["polarity"] = encode_polarity(["positive", "negative", "unknown"])
     records["wave_offset"] = [0, 3, 5]
     records["event_length"] = [3, 2, 1]
     records["time"] = [0, 0, 0]
@@ -33,7 +38,7 @@ def _make_records() -> np.ndarray:
     records["board"] = 0
     records["channel"] = np.array([1, 2], dtype=np.int16)
     records["baseline"] = 100.0
-    records["polarity"] = "negative"
+    records["polarity"] = POLARITY_NEGATIVE
     records["dt"] = 2
     records["wave_offset"] = np.array([0, 4], dtype=np.int64)
     records["event_length"] = 4
@@ -254,3 +259,78 @@ def test_records_view_rejects_out_of_bounds_wave_reference():
 
     with pytest.raises(ValueError, match="wave_pool"):
         RecordsView(records, np.array([1, 2], dtype=np.uint16))
+
+
+def test_records_view_lazy_matches_eager_for_unordered_ids():
+    records = np.zeros(4, dtype=RECORDS_DTYPE)
+    records["record_id"] = [7, 3, 9, 4]
+    records["baseline"] = 10.0
+    records["polarity"] = encode_polarity(["negative", "positive", "negative", "negative"])
+    records["wave_offset"] = [0, 2, 4, 6]
+    records["event_length"] = [2, 2, 2, 1]
+    wave_pool = np.array([1, 2, 3, 4, 5, 6, 7], dtype=np.uint16)
+
+    eager = RecordsView(records, wave_pool)
+    lazy = RecordsView(records, wave_pool, lazy=True)
+
+    for rv in (eager, lazy):
+        waves, mask = rv.waves([9, 3, 4], mask=True)
+        np.testing.assert_array_equal(waves, [[5, 6], [3, 4], [7, 0]])
+        np.testing.assert_array_equal(mask, [[True, True], [True, True], [True, False]])
+        np.testing.assert_allclose(rv.signals([3, 7]), [[7.0, 6.0], [-9.0, -8.0]])
+        with pytest.raises(KeyError, match="Unknown record_id: 5"):
+            rv.waves([3, 5])
+
+
+def test_records_view_lazy_checks_bounds_on_access():
+    records = np.zeros(2, dtype=RECORDS_DTYPE)
+    records["record_id"] = [0, 1]
+    records["wave_offset"] = [0, 1]
+    records["event_length"] = [1, 2]
+    rv = RecordsView(records, np.array([1, 2], dtype=np.uint16), lazy=True)
+
+    np.testing.assert_array_equal(rv.waves(0), [1])
+    with pytest.raises(ValueError, match="wave_pool"):
+        rv.waves([0, 1])
+
+
+def test_records_view_factory_reuses_view_until_cache_cleared():
+    ctx = Context(config={"show_progress": False})
+    ctx.register(*profiles.cpu_default())
+    records = _make_records()
+    wave_pool = np.array([100, 90, 95, 100, 100, 95, 90, 100], dtype=np.uint16)
+    ctx._set_data("run_001", "records", records)
+    ctx._set_data("run_001", "wave_pool", wave_pool)
+
+    rv = records_view(ctx, "run_001")
+
+    assert records_view(ctx, "run_001") is rv
+    ctx.clear_cache_for("run_001", "wave_pool", clear_disk=False, verbose=False)
+    assert ("run_001", "records", "wave_pool") not in ctx._records_view_cache
+
+
+def test_polarity_codes_roundtrip_and_legacy_strings():
+    names = np.array(["positive", "negative", "unknown", "bogus"], dtype="U8")
+    codes = encode_polarity(names)
+
+    assert codes.dtype == np.int8
+    np.testing.assert_array_equal(codes, [1, -1, 0, 0])
+    np.testing.assert_array_equal(encode_polarity(codes), codes)
+    np.testing.assert_array_equal(
+        decode_polarity(codes), ["positive", "negative", "unknown", "unknown"]
+    )
+    assert decode_polarity(np.int8(-1)) == "negative"
+
+    rv = _make_sample_view()
+    assert rv.polarity(10) == "positive"
+    np.testing.assert_array_equal(rv.polarity([12, 11]), ["unknown", "negative"])
+
+    legacy_dtype = [
+        (name, "U8" if name == "polarity" else RECORDS_DTYPE.fields[name][0])
+        for name in RECORDS_DTYPE.names
+    ]
+    legacy = np.zeros(3, dtype=legacy_dtype)
+    for name in RECORDS_DTYPE.names:
+        legacy[name] = rv.records[name] if name != "polarity" else decode_polarity(rv.records[name])
+    legacy_rv = RecordsView(legacy, rv.wave_pool)
+    np.testing.assert_array_equal(legacy_rv.signals([10, 11]), rv.signals([10, 11]))
@@ -82,6 +82,26 @@ class TestMemmapStorage:
         assert result["count"] == 50
         assert result["test"] == "value"
 
+    def test_get_metadata_cached_until_file_changes(self, storage, test_run_id, monkeypatch):
+        """测试元数据读取缓存：文件未变化时不重复解析，重写后失效"""
+        storage.save_metadata("cached_key", {"count": 1}, test_run_id)
+        assert storage.get_metadata("cached_key", test_run_id)["count"] == 1
+
+        loads = []
+        real_load = json.load
+        monkeypatch.setattr(json, "load", lambda f: loads.append(1) or real_load(f))
+        first = storage.get_metadata("cached_key", test_run_id)
+        first["count"] = 99
+        assert storage.get_metadata("cached_key", test_run_id)["count"] == 1
+        assert loads == []
+
+        storage.save_metadata("cached_key", {"count": 2, "extra": True}, test_run_id)
+        assert storage.get_metadata("cached_key", test_run_id)["count"] == 2
+        assert len(loads) == 1
+
+        storage.delete("cached_key", test_run_id)
+        assert storage.get_metadata("cached_key", test_run_id) is None
+
     def test_save_stream_empty(self, storage, sample_dtype, test_run_id):
         """测试保存空流"""
 
@@ -2,6 +2,9 @@
 测试流式处理优化（避免完全物化）
 """
 
+import os
+import threading
+
 import numpy as np
 import pytest
 
@@ -10,6 +13,43 @@ from waveform_analysis.core.execution.manager import ExecutorManager
 from waveform_analysis.core.plugins.core.streaming import StreamingPlugin, _pick_time_field
 from waveform_analysis.core.processing.chunk import TIME_FIELD, TIMESTAMP_FIELD, Chunk
 
+SHM_DTYPE = np.dtype([("time", "i8"), ("dt", "i8"), ("length", "i8"), ("worker", "i8")])
+
+
+class ShmWorkerPidPlugin(StreamingPlugin):
+    """模块级（可导入）插件：带不可 pickle 的属性，在 worker 中原地写入进程号。"""
+
+    provides = "shm_worker_pid"
+    parallel = True
+    executor_type = "process"
+    max_workers = 2
+    parallel_batch_size = 3
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def compute_chunk(self, chunk, context, run_id, **kwargs):
+        if kwargs.get("fail_at") == chunk.start:
+            raise RuntimeError("boom")
+        chunk.data["worker"] = os.getpid()
+        return chunk
+
+
+def _shm_segments():
+    if not os.path.isdir("/dev/shm"):
+        return set()
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def _shm_chunks(n_chunks):
+    for i in range(n_chunks):
+        data = np.zeros(50, dtype=SHM_DTYPE)
+        data["time"] = i * 100 + np.arange(50)
+        data["dt"] = 1
+        data["length"] = 1
+        yield Chunk(data=data, start=i * 100, end=(i + 1) * 100, run_id="run", data_type="input")
+
 
 class TestStreamingOptimization:
     """测试流式处理的批量优化"""
@@ -273,6 +313,108 @@ class TestStreamingOptimization:
         for i, chunk in enumerate(results):
             assert chunk.data["time"][0] == i, f"Expected {i}, got {chunk.data['time'][0]}"
 
+    def test_sliding_window_refills_without_batch_barrier(self):
+        """队首完成后应立即补充新任务，而不是等待整批中最慢的 chunk"""
+        import threading
+
+        dtype = np.dtype([("time", "i8"), ("dt", "i8"), ("length", "i8"), ("value", "f4")])
+        chunk3_started = threading.Event()
+        released = {}
+
+        class UnevenPlugin(StreamingPlugin):
+            provides = "uneven_data"
+            parallel = True
+            max_workers = 2
+            parallel_batch_size = 3
+
+            def compute_chunk(self, chunk, context, run_id, **kwargs):
+                idx = int(chunk.data["time"][0])
+                if idx == 3:
+                    chunk3_started.set()
+                if idx == 1:
+                    # 仅当 chunk 3 在 chunk 1 完成前被提交时才会被及时唤醒
+                    released[idx] = chunk3_started.wait(timeout=2.0)
+                return chunk
+
+        def chunk_generator():
+            for i in range(6):
+                data = np.array([(i, 1, 1, float(i))], dtype=dtype)
+                yield Chunk(data=data, start=i, end=i + 1, run_id="test", data_type="input")
+
+        plugin = UnevenPlugin()
+        results = list(plugin._compute_parallel(chunk_generator(), Context(), "test"))
+
+        assert [int(c.data["time"][0]) for c in results] == list(range(6))
+        assert released == {1: True}
+
+    def test_inflight_bytes_backpressure(self):
+        """在途字节达到 max_inflight_bytes 时应暂停拉取输入"""
+        import threading
+        import time
+
+        dtype = np.dtype([("time", "i8"), ("dt", "i8"), ("length", "i8"), ("value", "f4")])
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        class BoundedPlugin(StreamingPlugin):
+            provides = "bounded_data"
+            parallel = True
+            max_workers = 4
+            parallel_batch_size = 8
+            max_inflight_bytes = 2 * dtype.itemsize
+
+            def compute_chunk(self, chunk, context, run_id, **kwargs):
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                time.sleep(0.005)
+                with lock:
+                    state["active"] -= 1
+                return chunk
+
+        def chunk_generator():
+            for i in range(12):
+                data = np.array([(i, 1, 1, float(i))], dtype=dtype)
+                yield Chunk(data=data, start=i, end=i + 1, run_id="test", data_type="input")
+
+        plugin = BoundedPlugin()
+        results = list(plugin._compute_parallel(chunk_generator(), Context(), "test"))
+
+        assert len(results) == 12
+        assert state["peak"] <= 2
+
+
+class TestSharedMemoryTransport:
+    """进程池共享内存传输"""
+
+    def test_process_transport_uses_shared_memory(self, tmp_path):
+        """不可 pickle 的插件也能在进程池中运行，且不遗留共享内存段"""
+        ctx = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+        plugin = ShmWorkerPidPlugin()
+        ctx.register(plugin)
+        before = _shm_segments()
+
+        results = list(plugin._compute_parallel(_shm_chunks(8), ctx, "run"))
+
+        assert [c.start for c in results] == [i * 100 for i in range(8)]
+        for i, chunk in enumerate(results):
+            np.testing.assert_array_equal(chunk.data["time"], i * 100 + np.arange(50))
+            assert np.all(chunk.data["worker"] != os.getpid())
+            assert not isinstance(chunk.data.base, memoryview)
+        assert _shm_segments() <= before
+
+    def test_process_transport_error_releases_segments(self, tmp_path):
+        """worker 异常应向上抛出，并释放所有在途段"""
+        ctx = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+        plugin = ShmWorkerPidPlugin()
+        ctx.register(plugin)
+        before = _shm_segments()
+
+        with pytest.raises(RuntimeError, match="boom"):
+            list(plugin._compute_parallel(_shm_chunks(8), ctx, "run", fail_at=300))
+
+        assert _shm_segments() <= before
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -9,6 +9,8 @@ from waveform_analysis.core.context import Context
 from waveform_analysis.core.data.query import (
     TimeIndex,
     TimeRangeQueryEngine,
+    load_time_index,
+    save_time_index,
 )
 from waveform_analysis.core.plugins.core.base import Plugin
 
@@ -200,5 +202,56 @@ def test_time_index_with_endtime():
     assert len(indices) >= 1  # 至少包含第一个记录
 
 
+def test_time_index_sidecar_roundtrip(tmp_path):
+    """测试时间索引附属文件的写入与 memmap 加载"""
+    times = np.array([5, 1, 3], dtype=np.int64)
+    engine = TimeRangeQueryEngine()
+    data = np.zeros(3, dtype=[("time", "i8")])
+    data["time"] = times
+    index = engine.build_index("run_001", "test_data", data)
+    path = str(tmp_path / "idx")
+
+    assert save_time_index(index, path, {"timestamp": 1.5, "count": 3})
+    loaded = load_time_index(path, {"timestamp": 1.5, "count": 3})
+
+    assert isinstance(loaded.times, np.memmap)
+    assert (loaded.min_time, loaded.max_time, loaded.n_records) == (1, 5, 3)
+    np.testing.assert_array_equal(loaded.query_range(2, 6), [2, 0])
+    assert load_time_index(path, {"timestamp": 2.0, "count": 3}) is None
+
+
+class SavedDataPlugin(DummyDataPlugin):
+    save_when = "always"
+    output_dtype = np.dtype(DummyDataPlugin.dtype)
+
+
+def test_context_time_index_persists_with_cache(tmp_path):
+    """测试时间索引随缓存持久化，并随数据删除而失效"""
+    ctx = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+    ctx.register_plugin_(SavedDataPlugin())
+    ctx.time_range("run_001", "test_data", start_time=0, end_time=1)
+
+    ctx2 = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+    ctx2.register_plugin_(SavedDataPlugin())
+    filtered = ctx2.time_range("run_001", "test_data", start_time=1000, end_time=3000)
+
+    index = ctx2._time_query_engine.get_index("run_001", "test_data")
+    assert isinstance(index.times, np.memmap)
+    assert index.build_time == 0.0
+    assert len(filtered) == 20
+
+    key = ctx2.key_for("run_001", "test_data")
+    cache_dir = tmp_path / "run_001" / "_cache"
+    assert list(cache_dir.glob(f"{key}.sidecar.*"))
+
+    ctx2.clear_cache_for("run_001", "test_data", verbose=False)
+    assert not list(cache_dir.glob(f"{key}.sidecar.*"))
+    assert ctx2.get_time_index_stats()["total_indices"] == 0
+
+    filtered = ctx2.time_range("run_001", "test_data", start_time=1000, end_time=3000)
+    assert len(filtered) == 20
+    assert list(cache_dir.glob(f"{key}.sidecar.*"))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,7 +3,14 @@ import pytest
 from scipy.signal import butter, savgol_filter, sosfiltfilt
 
 from tests.utils import FakeContext
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.execution.worker_pools import WorkerPoolService
+from waveform_analysis.core.plugins.builtin.cpu.filtering import (
+    apply_filter_to_record_wave,
+    filter_wave_pool_block,
+)
 from waveform_analysis.core.plugins.builtin.cpu.records import WavePoolFilteredPlugin
+from waveform_analysis.core.plugins.core.base import Plugin
 from waveform_analysis.core.processing.dtypes import RECORDS_DTYPE
 
 
@@ -178,3 +185,109 @@ def test_wave_pool_filtered_channel_config_overrides_filter():
 
     assert filtered.dtype == np.float32
     assert not np.allclose(filtered[:9], filtered[9:])
+
+
+def _make_ragged_records() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(7)
+    lengths = np.array([9, 15, 9, 30, 15, 9, 4, 30, 0, 15], dtype=np.int32)
+    records = np.zeros(len(lengths), dtype=RECORDS_DTYPE)
+    records["record_id"] = np.arange(len(lengths), dtype=np.int64)
+    records["channel"] = np.array([0, 1, 0, 0, 1, 1, 0, 1, 0, 0], dtype=np.int16)
+    records["event_length"] = lengths
+    # 记录之间留空隙：不属于任何记录的样本应保持为 0
+    records["wave_offset"] = np.cumsum(lengths + 2) - lengths - 2
+    wave_pool = rng.integers(50, 150, size=int((lengths + 2).sum())).astype(np.int16)
+    return records, wave_pool
+
+
+def _per_record_reference(records, wave_pool, sg_window_size=5, sg_poly_order=2):
+    reference = np.zeros(len(wave_pool), dtype=np.float32)
+    for rec in records:
+        start, length = int(rec["wave_offset"]), int(rec["event_length"])
+        if length:
+            reference[start : start + length] = apply_filter_to_record_wave(
+                wave_pool[start : start + length],
+                "SG",
+                sg_window_size=sg_window_size,
+                sg_poly_order=sg_poly_order,
+            )
+    return reference
+
+
+def test_wave_pool_filtered_block_engine_matches_per_record_filtering():
+    records, wave_pool = _make_ragged_records()
+    ctx = FakeContext(
+        config={"filter_type": "SG", "sg_window_size": 5, "sg_poly_order": 2, "max_workers": 1},
+        data={"records": records, "wave_pool": wave_pool},
+    )
+
+    filtered = WavePoolFilteredPlugin().compute(ctx, "run_001")
+
+    np.testing.assert_allclose(filtered, _per_record_reference(records, wave_pool), rtol=1e-6)
+
+
+def test_filter_wave_pool_block_rejects_out_of_bounds_segment():
+    out = np.zeros(8, dtype=np.float32)
+    with pytest.raises(ValueError, match="out-of-bounds"):
+        filter_wave_pool_block(
+            np.array([4]), np.array([6]), np.zeros(8), out, "SG", sg_window_size=5, sg_poly_order=2
+        )
+
+
+@pytest.mark.parametrize("file_backed", [False, True], ids=["shm", "memmap"])
+def test_wave_pool_filtered_process_pool_matches_serial(tmp_path, file_backed):
+    records, wave_pool = _make_ragged_records()
+    if file_backed:
+        path = tmp_path / "wave_pool.bin"
+        wave_pool.tofile(path)
+        wave_pool = np.memmap(path, dtype=wave_pool.dtype, mode="r", shape=wave_pool.shape)
+    ctx = FakeContext(
+        config={
+            "filter_type": "SG",
+            "sg_window_size": 5,
+            "sg_poly_order": 2,
+            "batch_size": 3,
+            "max_workers": 2,
+            "use_process_pool": True,
+        },
+        data={"records": records, "wave_pool": wave_pool},
+    )
+    ctx.worker_pools = WorkerPoolService(max_concurrency=2, scope="test_wave_pool_filtered")
+
+    try:
+        filtered = WavePoolFilteredPlugin().compute(ctx, "run_001")
+    finally:
+        ctx.worker_pools.shutdown()
+
+    assert isinstance(filtered, np.memmap)
+    np.testing.assert_allclose(filtered, _per_record_reference(records, wave_pool), rtol=1e-6)
+
+
+def test_wave_pool_filtered_writes_into_cache_staging_file(tmp_path):
+    records, wave_pool = _make_ragged_records()
+
+    class _Records(Plugin):
+        provides = "records"
+        output_dtype = RECORDS_DTYPE
+        save_when = "never"
+
+        def compute(self, context, run_id):
+            return records
+
+    class _WavePool(Plugin):
+        provides = "wave_pool"
+        output_dtype = np.dtype(np.int16)
+        save_when = "never"
+
+        def compute(self, context, run_id):
+            return wave_pool
+
+    ctx = Context(storage_dir=str(tmp_path), config={"show_progress": False})
+    ctx.register(_Records(), _WavePool(), WavePoolFilteredPlugin())
+    ctx.set_config({"sg_window_size": 5, "sg_poly_order": 2}, plugin_name="wave_pool_filtered")
+
+    filtered = ctx.get_data("run_001", "wave_pool_filtered")
+
+    assert isinstance(filtered, np.memmap)
+    np.testing.assert_allclose(filtered, _per_record_reference(records, wave_pool), rtol=1e-6)
+    assert not list(tmp_path.rglob("*.staging"))
@@ -1,13 +1,17 @@
 import logging
+import os
 from types import SimpleNamespace
 
 import numpy as np
 
+from waveform_analysis.core.context import Context
 from waveform_analysis.core.plugins.builtin.cpu.waveforms import (
+    WaveformsPlugin,
     WaveformStructConfig,
     _structure_waveforms_streaming,
 )
-from waveform_analysis.core.processing.dtypes import create_record_dtype
+from waveform_analysis.core.plugins.core.base import Plugin
+from waveform_analysis.core.processing.dtypes import POLARITY_UNKNOWN, create_record_dtype
 from waveform_analysis.core.processing.records_builder import (
     build_records_from_st_waveforms_sharded,
 )
@@ -70,6 +74,90 @@ def test_structure_waveforms_streaming_works_without_time_field(monkeypatch):
     )
 
 
+def test_structure_waveforms_streaming_fallback_reader_numbers_records_globally(monkeypatch):
+    raw_arr = np.array(
+        [
+            [0, 3, 1000, 0, 0, 0, 0, 10, 11, 12, 13],
+            [0, 3, 2000, 0, 0, 0, 0, 20, 21, 22, 23],
+        ],
+        dtype=np.int64,
+    )
+    monkeypatch.setattr(
+        "waveform_analysis.utils.formats.get_adapter",
+        lambda name: _FakeAdapter(raw_arr),
+    )
+
+    config = WaveformStructConfig.default_vx2730()
+    config.wave_length = 4
+    output = _structure_waveforms_streaming(
+        context=SimpleNamespace(logger=logging.getLogger(__name__)),
+        run_id="run_001",
+        raw_files=[["a.csv"], [], ["b.csv"]],
+        config=config,
+        baseline_samples=None,
+        upstream_baselines=None,
+        show_progress=False,
+    )
+
+    assert isinstance(output, np.memmap)
+    np.testing.assert_array_equal(output["record_id"], np.arange(4))
+    np.testing.assert_array_equal(output["timestamp"], [1000, 2000, 1000, 2000])
+    assert np.all(output["polarity"] == POLARITY_UNKNOWN)
+
+
+def _write_vx2730_csvs(raw_dir):
+    groups = []
+    for ch in range(3):
+        group = []
+        for seg in range(2):
+            lines = [] if seg else ["BOARD;CHANNEL;TIMETAG;ENERGY;ENERGYSHORT;FLAGS;PROBE_CODE;S"]
+            for i in range(4):
+                samples = [100 + ch + i + j for j in range(16)]
+                lines.append(";".join(map(str, [0, ch, 1000 * (seg * 4 + i) + ch, 0, 0, 0, 1])))
+                lines[-1] += ";" + ";".join(map(str, samples))
+            path = raw_dir / f"CH{ch}_{seg}.CSV"
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            group.append(str(path))
+        groups.append(group)
+    return groups
+
+
+def test_streaming_mode_writes_into_cache_file_and_matches_batch(tmp_path):
+    raw_groups = _write_vx2730_csvs(tmp_path)
+
+    class _RawFiles(Plugin):
+        provides = "raw_files"
+        output_dtype = "List[List[str]]"
+        save_when = "never"
+
+        def compute(self, context, run_id):
+            return raw_groups
+
+    results = {}
+    for streaming in (False, True):
+        ctx = Context(
+            storage_dir=str(tmp_path / f"cache_{streaming}"),
+            config={"show_progress": False, "daq_adapter": "vx2730", "streaming_mode": streaming},
+        )
+        ctx.register(_RawFiles())
+        ctx.register(WaveformsPlugin())
+        copied = []
+        original_save_stream = ctx.storage.save_stream
+        ctx.storage.save_stream = lambda *a, **k: copied.append(a) or original_save_stream(*a, **k)
+        results[streaming] = ctx.get_data("run_001", "st_waveforms")
+        cache_dir = ctx.storage.get_run_data_dir("run_001")
+        if streaming:
+            assert copied == []
+            assert not any(name.endswith(".staging") for name in os.listdir(cache_dir))
+            assert ctx.storage.exists(ctx.key_for("run_001", "st_waveforms"), "run_001")
+
+    batch, streamed = results[False], results[True]
+    assert isinstance(streamed, np.memmap)
+    np.testing.assert_array_equal(streamed["record_id"], np.arange(len(streamed)))
+    for name in batch.dtype.names:
+        np.testing.assert_array_equal(streamed[name], batch[name])
+
+
 def test_build_records_from_st_waveforms_sharded_accepts_none_part_size():
     st_waveforms = np.zeros(1, dtype=create_record_dtype(4))
     st_waveforms["timestamp"] = 123
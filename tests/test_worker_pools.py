@@ -0,0 +1,117 @@
+"""Context-scoped worker pool service tests."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+from waveform_analysis.core.context import Context
+from waveform_analysis.core.execution.worker_pools import WorkerPoolService, get_worker_pools
+
+
+def _square(x):
+    return x * x
+
+
+def _loaded_modules(_):
+    return os.getpid(), "scipy.signal" in sys.modules
+
+
+def test_map_preserves_order_and_reuses_named_executor():
+    pools = WorkerPoolService(max_concurrency=3, scope="test_order")
+    try:
+        assert pools.map(_square, range(10), name="sq") == [x * x for x in range(10)]
+        first = pools.executor("sq")
+        pools.map(_square, range(10), name="sq")
+        assert pools.executor("sq") is first
+        assert pools.stats()["executors"] == {"sq:thread": 3}
+        assert pools.available == 3
+    finally:
+        pools.shutdown()
+
+
+def test_concurrency_cap_applies_across_nested_maps():
+    pools = WorkerPoolService(max_concurrency=2, scope="test_nested")
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def leaf(x):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        threading.Event().wait(0.01)
+        with lock:
+            active -= 1
+        return x
+
+    def outer(x):
+        # 外层已占满令牌：内层退化为当前线程内串行执行
+        return sum(pools.map(leaf, range(4), name="inner"))
+
+    try:
+        assert pools.map(outer, range(4), name="outer") == [6, 6, 6, 6]
+        assert peak <= 2
+        assert pools.stats()["inline_runs"] >= 4
+    finally:
+        pools.shutdown()
+
+
+def test_map_propagates_task_errors():
+    pools = WorkerPoolService(max_concurrency=2, scope="test_errors")
+
+    def fail(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    try:
+        with pytest.raises(ValueError, match="bad item"):
+            pools.map(fail, range(6), name="fail")
+        assert pools.available == 2
+    finally:
+        pools.shutdown()
+
+
+def test_io_bound_map_ignores_token_budget():
+    pools = WorkerPoolService(max_concurrency=1, scope="test_io")
+    try:
+        with pools.lease(1):
+            assert pools.map(_square, range(4), name="io", max_workers=4, cpu_bound=False) == [
+                0,
+                1,
+                4,
+                9,
+            ]
+        assert pools.stats()["executors"] == {"io:thread": 4}
+    finally:
+        pools.shutdown()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="relies on fork start method")
+def test_process_pool_workers_are_warm_and_persistent():
+    pools = WorkerPoolService(max_concurrency=2, warm_modules=("json",), scope="test_warm")
+    try:
+        assert pools.warm("warm_proc") == 2
+        first = pools.map(_loaded_modules, range(4), name="warm_proc", executor_type="process")
+        second = pools.map(_loaded_modules, range(4), name="warm_proc", executor_type="process")
+        pids = {pid for pid, _ in first + second}
+        assert all(loaded for _pid, loaded in first + second)
+        # 两次调用复用同一组 worker 进程
+        assert len(pids) <= 2
+        assert os.getpid() not in pids
+    finally:
+        pools.shutdown()
+
+
+def test_context_exposes_scoped_service(tmp_path):
+    ctx = Context(storage_dir=str(tmp_path), config={"worker_pool_max_concurrency": 3})
+    pools = ctx.worker_pools
+
+    assert pools is ctx.worker_pools
+    assert get_worker_pools(ctx) is pools
+    assert pools.max_concurrency == 3
+    assert get_worker_pools(object()) is get_worker_pools()
+    assert Context(storage_dir=str(tmp_path)).worker_pools is not pools
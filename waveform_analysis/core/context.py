@@ -47,8 +47,10 @@ from .config import (
 from .context_cache import ContextCacheDomain
 from .context_config import ContextConfigDomain
 from .context_execution import ContextExecutionDomain
+from .context_incremental import ContextIncrementalDomain
 from .context_time import ContextTimeDomain
 from .execution.validation import ValidationManager
+from .execution.worker_pools import WorkerPoolService
 from .foundation.error import ErrorManager
 from .foundation.exceptions import ErrorSeverity
 from .foundation.mixins import PluginMixin
@@ -91,6 +93,12 @@ def _apply_memmap_settings(storage: MemmapStorage, spec: dict[str, Any]) -> None
     storage.verify_on_load = spec.get("verify_on_load", storage.verify_on_load)
     storage.data_subdir = spec.get("data_subdir", storage.data_subdir)
     storage.side_effects_subdir = spec.get("side_effects_subdir", storage.side_effects_subdir)
+    storage.compression_block_bytes = spec.get(
+        "compression_block_bytes", storage.compression_block_bytes
+    )
+    storage.compression_cache_blocks = spec.get(
+        "compression_cache_blocks", storage.compression_cache_blocks
+    )
     compression = spec.get("compression")
     if compression:
         storage._setup_compression(compression, {})
@@ -194,6 +202,11 @@ class Context(PluginMixin):
             "plugin_backends",
             "compression",
             "compression_kwargs",
+            "compression_block_bytes",
+            "compression_cache_blocks",
+            "memory_cache_bytes",
+            "memory_cache_spill",
+            "memory_cache_pinned",
             "enable_checksum",
             "verify_on_load",
             "checksum_algorithm",
@@ -201,6 +214,11 @@ class Context(PluginMixin):
             "run_config_path",
             "run_config_filename",
             "run_config_path_template",
+            "parallel_plan",
+            "parallel_plan_workers",
+            "parallel_plan_cpu_workers",
+            "worker_pool_max_concurrency",
+            "worker_pool_warm_modules",
         }
     )
     _CONTEXT_RUNTIME_KEYS = frozenset(
@@ -218,6 +236,11 @@ class Context(PluginMixin):
         "plugin_backends": "按数据名覆盖存储后端",
         "compression": "缓存压缩算法",
         "compression_kwargs": "缓存压缩参数",
+        "compression_block_bytes": "分块压缩的目标块大小（字节，None 为整文件压缩）",
+        "compression_cache_blocks": "分块压缩读取时缓存的解压块数",
+        "memory_cache_bytes": "内存结果缓存预算（字节，None 为不限制）",
+        "memory_cache_spill": "淘汰无磁盘副本的数组时是否先落盘为 memmap",
+        "memory_cache_pinned": "常驻内存、不参与淘汰的数据名列表",
         "enable_checksum": "是否写入缓存校验和",
         "verify_on_load": "读取缓存时是否校验完整性",
         "checksum_algorithm": "缓存校验算法",
@@ -225,6 +248,11 @@ class Context(PluginMixin):
         "run_config_filename": "兼容旧配置的 run 配置文件名",
         "run_config_path_template": "兼容旧配置的 run 配置路径模板",
         "storage_dir": "缓存与处理产物存储目录",
+        "parallel_plan": "是否按 DAG 并行执行执行计划中的独立插件",
+        "parallel_plan_workers": "并行执行计划的最大线程数",
+        "parallel_plan_cpu_workers": "并行执行计划中 CPU 密集插件的并发上限",
+        "worker_pool_max_concurrency": "工作池服务的全局并发任务上限（None 为 CPU 核心数）",
+        "worker_pool_warm_modules": "进程池 worker 额外预加载的模块名列表",
     }
     _TIME_DOMAIN_SYSTEM_NS = "system_ns"
     _TIME_DOMAIN_RAW_PS = "raw_ps"
@@ -310,6 +338,8 @@ class Context(PluginMixin):
             enable_checksum = self.config.get("enable_checksum", False)
             verify_on_load = self.config.get("verify_on_load", False)
             checksum_algorithm = self.config.get("checksum_algorithm", "xxhash64")
+            compression_block_bytes = self.config.get("compression_block_bytes")
+            compression_cache_blocks = self.config.get("compression_cache_blocks", 8)
             self.storage = MemmapStorage(
                 work_dir=storage_dir,
                 profiler=self.profiler,
@@ -318,6 +348,8 @@ class Context(PluginMixin):
                 enable_checksum=enable_checksum,
                 checksum_algorithm=checksum_algorithm,
                 verify_on_load=verify_on_load,
+                compression_block_bytes=compression_block_bytes,
+                compression_cache_blocks=compression_cache_blocks,
             )
 
         # Setup logger
@@ -374,8 +406,12 @@ class Context(PluginMixin):
         # Performance optimization caches
         self._execution_plan_cache: dict[str, list[str]] = {}  # data_name -> execution plan
         self._lineage_cache: dict[str, dict[str, Any]] = {}  # data_name -> lineage dict
-        self._lineage_hash_cache: dict[str, str] = {}  # data_name -> lineage hash
+        self._lineage_hash_cache: dict[str, str] = {}  # data_name -> full lineage sha1
         self._key_cache: dict[tuple, str] = {}  # (run_id, data_name) -> key
+        # (run_id, records_name, wave_pool_name) -> (cache keys, RecordsView)
+        self._records_view_cache: dict[tuple, tuple[tuple[str, str], Any]] = {}
+        # (run_id, data_name) -> (cache key, data, RecordIndex)
+        self._record_index_cache: dict[tuple, tuple[str, Any, Any]] = {}
         # Per-run config cache (loaded from run_config.json) and hash tracking.
         self._run_config_cache: dict[str, dict[str, Any]] = {}
         self._run_config_hash_cache: dict[str, str] = {}
@@ -408,6 +444,32 @@ class Context(PluginMixin):
         self._cache_domain = ContextCacheDomain(self)
         self._execution_domain = ContextExecutionDomain(self)
         self._time_domain = ContextTimeDomain(self)
+        self._incremental_domain = ContextIncrementalDomain(self)
+        # Context-scoped worker pools (created lazily on first use)
+        self._worker_pools: WorkerPoolService | None = None
+        self._worker_pools_lock = threading.Lock()
+
+    @property
+    def worker_pools(self) -> WorkerPoolService:
+        """
+        Context 作用域的工作池服务（复用的线程池/进程池 + 全局并发上限）。
+
+        插件通过 ``get_worker_pools(context)`` 按名称获取执行器；进程池 worker
+        预加载 numpy/scipy、已注册插件所在模块以及 ``worker_pool_warm_modules``。
+        """
+        with self._worker_pools_lock:
+            if self._worker_pools is None:
+                self._worker_pools = WorkerPoolService(
+                    max_concurrency=self.config.get("worker_pool_max_concurrency"),
+                    warm_modules=self._worker_warm_modules,
+                    scope=f"ctx{id(self):x}",
+                )
+            return self._worker_pools
+
+    def _worker_warm_modules(self) -> list[str]:
+        modules = [type(plugin).__module__ for plugin in self._plugins.values()]
+        modules.extend(self.config.get("worker_pool_warm_modules") or [])
+        return modules
 
     def clone(self) -> "Context":
         """
@@ -481,6 +543,8 @@ class Context(PluginMixin):
             "verify_on_load": getattr(self.storage, "verify_on_load", False),
             "data_subdir": getattr(self.storage, "data_subdir", "_cache"),
             "side_effects_subdir": getattr(self.storage, "side_effects_subdir", "side_effects"),
+            "compression_block_bytes": getattr(self.storage, "compression_block_bytes", None),
+            "compression_cache_blocks": getattr(self.storage, "compression_cache_blocks", 8),
         }
 
     def _build_context_factory_spec(self) -> dict[str, Any]:
@@ -951,6 +1015,30 @@ class Context(PluginMixin):
             verbose=verbose,
         )
 
+    def refresh_run(self, run_id: str) -> dict[str, Any]:
+        """
+        增量刷新正在采集的运行：只摄取新写入的原始文件并扩展已缓存的下游数据。
+
+        需要 raw_files 插件开启 ``incremental=True``。新文件只被解析一次，插件通过
+        ``compute_incremental`` 计算新增部分（records/wave_pool/st_waveforms/basic_features/
+        hit_threshold 已支持），已落盘的结果直接在 memmap 末尾追加；不支持增量的下游
+        缓存被清除，下次访问时完整计算。已摄取文件被修改或删除时整个运行重新计算。
+
+        参数:
+            run_id: 运行 ID
+
+        返回:
+            刷新报告：``mode``（initial/unchanged/append/rebuild）、``new_files``、
+            ``extended``（数据名 -> stable_rows/rows/appended）与 ``invalidated``
+
+        示例:
+            >>> ctx.set_config({"incremental": True}, plugin_name="raw_files")
+            >>> hits = ctx.get_data("run_001", "hit_threshold")
+            >>> report = ctx.refresh_run("run_001")   # DAQ 写入新文件后
+            >>> hits = ctx.get_data("run_001", "hit_threshold")  # 已包含新文件
+        """
+        return self._incremental_domain.refresh_run(run_id)
+
     def _collect_downstream_data_names(
         self, data_name: str, run_id: str | None = None
     ) -> list[str]:
@@ -1117,6 +1205,9 @@ class Context(PluginMixin):
                 # We don't set it if it's a property, as the property handles access.
                 setattr(self, name, value)
 
+        # Memory budget accounting (may evict older entries to their disk copy)
+        self._cache_domain.track_result(run_id, name, value)
+
     def _get_data_from_memory(self, run_id: str, name: str) -> Any:
         """Internal helper to get data from _results or attributes."""
         if (run_id, name) in self._results:
@@ -1134,11 +1225,17 @@ class Context(PluginMixin):
                     del self._results[(run_id, name)]
                     if (run_id, name) in self._results_lineage:
                         del self._results_lineage[(run_id, name)]
+                    self._cache_domain.forget_result((run_id, name))
+                    self._cache_domain.touch_result((run_id, name), hit=False)
                     return None
 
             val = self._results[(run_id, name)]
+            self._cache_domain.touch_result((run_id, name), hit=True)
             return val
 
+        if name in self._plugins:
+            self._cache_domain.touch_result((run_id, name), hit=False)
+
         # Fallback for manually set attributes (if any)
         # But ONLY if it's not a reserved name/method to avoid returning the method itself
         # AND ONLY if it's not a plugin-provided data name, because plugin data MUST be run-id specific.
@@ -2504,6 +2601,19 @@ print("✅ 分析完成！")
 
         return issues
 
+    def pin_data(self, data_name: str, run_id: str | None = None) -> None:
+        """固定内存缓存中的数据，使其不参与 memory_cache_bytes 预算淘汰
+
+        Args:
+            data_name: 数据名称
+            run_id: 仅固定指定运行；None 表示所有运行
+        """
+        self._cache_domain.memory_tracker.pin(data_name, run_id)
+
+    def unpin_data(self, data_name: str, run_id: str | None = None) -> None:
+        """取消 pin_data() 的固定"""
+        self._cache_domain.memory_tracker.unpin(data_name, run_id)
+
     def cache_stats(
         self,
         run_id: str | None = None,
@@ -2512,7 +2622,8 @@ print("✅ 分析完成！")
     ) -> CacheStatistics:
         """获取缓存统计信息
 
-        收集并显示缓存使用情况的统计信息。
+        收集并显示缓存使用情况的统计信息。磁盘缓存来自扫描结果，
+        内存结果缓存的计数器（hits/misses/evictions/spills/reloads）位于 ``stats.memory``。
 
         Args:
             run_id: 仅统计指定运行，None 则统计所有
@@ -2543,6 +2654,7 @@ print("✅ 分析完成！")
 
         collector = CacheStatsCollector(analyzer)
         stats = collector.collect(run_id=run_id)
+        stats.memory = self._cache_domain.memory_cache_snapshot()
         collector.print_summary(stats, detailed=detailed)
 
         if export_path:
@@ -3,17 +3,42 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import threading
 from typing import Any
 import warnings
 
 import numpy as np
 
+from waveform_analysis.core.processing.event_table import EVENT_TABLE_HITS_SUFFIX, EventTable
+from waveform_analysis.core.processing.incremental import (
+    drop_raw_file_manifest,
+    raw_file_manifest_path,
+)
+from waveform_analysis.core.processing.packed_waveforms import (
+    PACKED_WAVEFORMS_POOL_SUFFIX,
+    PackedWaveforms,
+)
+from waveform_analysis.core.storage.result_cache import ResultMemoryTracker
+
+
+def hash_lineage(lineage: dict[str, Any]) -> str:
+    """Full sha1 of the canonical lineage JSON (cache keys embed its first 8 chars)."""
+    lineage_json = json.dumps(lineage, sort_keys=True, default=str)
+    return hashlib.sha1(lineage_json.encode()).hexdigest()
+
+
+def lineage_metadata(lineage: dict[str, Any]) -> dict[str, Any]:
+    """Metadata entries written next to a cached result for lineage validation."""
+    return {"lineage": lineage, "lineage_hash": hash_lineage(lineage)}
+
 
 class ContextCacheDomain:
-    """Disk-cache read helpers used by Context."""
+    """Disk-cache read helpers and the in-memory result budget used by Context."""
 
     def __init__(self, context: Any) -> None:
         self.ctx = context
+        self.memory_tracker = ResultMemoryTracker()
+        self._memory_lock = threading.RLock()
 
     def _dtype_from_meta(self, meta: dict[str, Any]) -> np.dtype | None:
         if not meta:
@@ -36,21 +61,40 @@ class ContextCacheDomain:
                 return None
         return None
 
+    def lineage_hash(self, data_name: str) -> str:
+        """Full lineage hash of a data name (cached until its lineage is invalidated)."""
+        lineage_hash = self.ctx._lineage_hash_cache.get(data_name)
+        if lineage_hash is None:
+            lineage_hash = hash_lineage(self.ctx.get_lineage(data_name))
+            self.ctx._lineage_hash_cache[data_name] = lineage_hash
+        return lineage_hash
+
+    def lineage_matches(self, name: str, meta: dict[str, Any] | None) -> bool:
+        """
+        Check cached metadata against the current lineage of ``name``.
+
+        Metadata written with a ``lineage_hash`` is validated by comparing hashes only;
+        older caches that store just the lineage dict fall back to the JSON comparison.
+        """
+        if not meta:
+            return True
+        stored_hash = meta.get("lineage_hash")
+        if stored_hash is not None:
+            return stored_hash == self.lineage_hash(name)
+        if "lineage" in meta:
+            current_lineage = self.ctx.get_lineage(name)
+            s1 = json.dumps(meta["lineage"], sort_keys=True, default=str)
+            s2 = json.dumps(current_lineage, sort_keys=True, default=str)
+            return s1 == s2
+        return True
+
     def key_for(self, run_id: str, data_name: str) -> str:
         """Build the cache identity key for a run/data pair."""
         cache_key = (run_id, data_name)
         if cache_key in self.ctx._key_cache:
             return self.ctx._key_cache[cache_key]
 
-        if data_name in self.ctx._lineage_hash_cache:
-            lineage_hash = self.ctx._lineage_hash_cache[data_name]
-        else:
-            lineage = self.ctx.get_lineage(data_name)
-            lineage_json = json.dumps(lineage, sort_keys=True, default=str)
-            lineage_hash = hashlib.sha1(lineage_json.encode()).hexdigest()[:8]
-            self.ctx._lineage_hash_cache[data_name] = lineage_hash
-
-        key = f"{run_id}-{data_name}-{lineage_hash}"
+        key = f"{run_id}-{data_name}-{self.lineage_hash(data_name)[:8]}"
         self.ctx._key_cache[cache_key] = key
         return key
 
@@ -88,6 +132,7 @@ class ContextCacheDomain:
                     del self.ctx._results[key]
                     if key in self.ctx._results_lineage:
                         del self.ctx._results_lineage[key]
+                    self.forget_result(key)
                     memory_count += 1
                     count += 1
                     if verbose:
@@ -95,6 +140,8 @@ class ContextCacheDomain:
                     self.ctx.logger.debug("Cleared memory cache for (%s, %s)", run_id, name)
                 elif verbose:
                     print(f"  - 内存缓存不存在: ({run_id}, {name})")
+                self.ctx.clear_time_index(run_id, name)
+                self.forget_records_views(run_id, name)
 
                 if name in {"records", "wave_pool"}:
                     removed = self._clear_internal_records_bundle_cache(run_id, verbose=verbose)
@@ -102,6 +149,9 @@ class ContextCacheDomain:
                     count += removed
 
             if clear_disk:
+                if name == "raw_files" and name in self.ctx._plugins:
+                    # 增量模式的已摄取清单随 raw_files 一起失效
+                    drop_raw_file_manifest(raw_file_manifest_path(self.ctx, run_id))
                 try:
                     cache_key = self.key_for(run_id, name)
                     deleted = self.delete_disk_cache(cache_key, run_id, data_name=name)
@@ -129,6 +179,15 @@ class ContextCacheDomain:
 
         return count
 
+    def forget_records_views(self, run_id: str, name: str) -> None:
+        """Drop cached RecordsView/RecordIndex objects of a run that are built on ``name``."""
+        for attr in ("_records_view_cache", "_record_index_cache"):
+            cache = self.ctx.__dict__.get(attr)
+            if not cache:
+                continue
+            for slot in [s for s in cache if s[0] == run_id and name in s[1:]]:
+                cache.pop(slot, None)
+
     def _clear_internal_records_bundle_cache(self, run_id: str, verbose: bool = True) -> int:
         """Clear in-memory shared RecordsBundle cache entries for a run."""
         removed = 0
@@ -147,6 +206,7 @@ class ContextCacheDomain:
             del self.ctx._results[key]
             if key in self.ctx._results_lineage:
                 del self.ctx._results_lineage[key]
+            self.forget_result(key)
             removed += 1
             if verbose:
                 print(f"  ✓ 已清理内部 bundle 缓存: {key}")
@@ -154,6 +214,120 @@ class ContextCacheDomain:
 
         return removed
 
+    # ------------------------------------------------------------------
+    # In-memory result budget (LRU + spill-to-memmap)
+    # ------------------------------------------------------------------
+
+    def memory_budget_bytes(self) -> int | None:
+        """Configured memory budget for _results, or None when unbounded."""
+        value = self.ctx.config.get("memory_cache_bytes")
+        if value is None or value is False:
+            return None
+        value = int(value)
+        return value if value > 0 else None
+
+    def track_result(self, run_id: str, name: str, value: Any) -> None:
+        """Account a newly cached result and evict older entries if over budget."""
+        key = (run_id, name)
+        with self._memory_lock:
+            self.memory_tracker.record(key, value)
+        self.enforce_memory_budget(protect=key)
+
+    def touch_result(self, key: tuple, hit: bool) -> None:
+        """Update LRU order and hit/miss counters for a memory lookup."""
+        with self._memory_lock:
+            if hit:
+                self.memory_tracker.hits += 1
+                self.memory_tracker.touch(key)
+            else:
+                self.memory_tracker.misses += 1
+
+    def forget_result(self, key: tuple) -> None:
+        with self._memory_lock:
+            self.memory_tracker.discard(key)
+
+    def enforce_memory_budget(self, protect: tuple | None = None) -> int:
+        """Evict least-recently-used results until resident bytes fit the budget."""
+        max_bytes = self.memory_budget_bytes()
+        if max_bytes is None:
+            return 0
+        pinned_names = self.ctx.config.get("memory_cache_pinned") or ()
+        evicted = 0
+        with self._memory_lock:
+            tracker = self.memory_tracker
+            for key in [k for k in tracker.keys() if k not in self.ctx._results]:
+                tracker.discard(key)
+            for key in tracker.eviction_candidates(max_bytes, protect=protect):
+                if key[1] in pinned_names:
+                    continue
+                if self.evict_result(key):
+                    evicted += 1
+        return evicted
+
+    def evict_result(self, key: tuple) -> bool:
+        """
+        Drop one result from memory, demoting it to its disk copy.
+
+        Plugin outputs without a valid disk cache are spilled with save_memmap first
+        (``memory_cache_spill``), so the next get_data() reloads them lazily via
+        load_memmap instead of recomputing. Outputs of ``save_when="never"`` plugins
+        are never written to disk: they are dropped and recomputed on next access.
+        """
+        run_id, name = key
+        with self._memory_lock:
+            if key not in self.ctx._results:
+                self.memory_tracker.discard(key)
+                return False
+            value = self.ctx._results[key]
+            spilled = False
+            plugin = self.ctx._plugins.get(name)
+            if plugin is not None and plugin.save_when != "never":
+                cache_key = self.key_for(run_id, name)
+                if not self.is_disk_cache_valid(run_id, name, cache_key):
+                    spilled = self.spill_result(run_id, name, cache_key, value)
+
+            del self.ctx._results[key]
+            self.ctx._results_lineage.pop(key, None)
+            self.forget_records_views(run_id, name)
+            if self.ctx.__dict__.get(name) is value:
+                delattr(self.ctx, name)
+            self.memory_tracker.mark_evicted(key, spilled=spilled)
+        self.ctx.logger.debug(
+            "Evicted (%s, %s) from memory cache%s", run_id, name, " (spilled)" if spilled else ""
+        )
+        return True
+
+    def spill_result(self, run_id: str, name: str, key: str, value: Any) -> bool:
+        """Persist an in-memory array to its memmap cache key before eviction."""
+        if not self.ctx.config.get("memory_cache_spill", True):
+            return False
+        if (
+            not isinstance(value, np.ndarray)
+            or isinstance(value, np.memmap)
+            or value.size == 0
+            or value.dtype.hasobject
+        ):
+            return False
+        storage = self.ctx._get_storage_for_data_name(name)
+        try:
+            self.ctx._storage_call(
+                storage,
+                "save_memmap",
+                key,
+                run_id,
+                value,
+                extra_metadata=lineage_metadata(self.ctx.get_lineage(name)),
+            )
+        except Exception as e:
+            self.ctx.logger.warning("Failed to spill (%s, %s) to disk: %s", run_id, name, e)
+            return False
+        return True
+
+    def memory_cache_snapshot(self) -> dict[str, Any]:
+        """Counters and sizes of the in-memory result cache."""
+        with self._memory_lock:
+            return self.memory_tracker.snapshot(self.memory_budget_bytes())
+
     def load_from_disk_with_check(self, run_id: str, name: str, key: str) -> Any | None:
         """Load cached data from disk after validating storage layout and lineage."""
         storage = self.ctx._get_storage_for_data_name(name)
@@ -173,17 +347,27 @@ class ContextCacheDomain:
         meta = self.ctx._storage_call(storage, "get_metadata", meta_key, run_id)
         if meta is None and has_base and meta_key != key:
             meta = self.ctx._storage_call(storage, "get_metadata", key, run_id)
-        if meta and "lineage" in meta:
-            current_lineage = self.ctx.get_lineage(name)
-            s1 = json.dumps(meta["lineage"], sort_keys=True, default=str)
-            s2 = json.dumps(current_lineage, sort_keys=True, default=str)
-            if s1 != s2:
-                warnings.warn(f"Lineage mismatch for '{name}' in cache. Recomputing.", UserWarning)
-                return None
+        if not self.lineage_matches(name, meta):
+            warnings.warn(f"Lineage mismatch for '{name}' in cache. Recomputing.", UserWarning)
+            return None
 
         meta = meta or {}
         if meta.get("type") == "dataframe":
             data = self.ctx._storage_call(storage, "load_dataframe", key, run_id)
+        elif meta.get("type") == "event_table":
+            events = self.ctx._storage_call(storage, "load_memmap", key, run_id)
+            hits = self.ctx._storage_call(
+                storage, "load_memmap", f"{key}{EVENT_TABLE_HITS_SUFFIX}", run_id
+            )
+            data = EventTable(events, hits) if events is not None and hits is not None else None
+        elif meta.get("type") == "packed_waveforms":
+            events = self.ctx._storage_call(storage, "load_memmap", key, run_id)
+            pool = self.ctx._storage_call(
+                storage, "load_memmap", f"{key}{PACKED_WAVEFORMS_POOL_SUFFIX}", run_id
+            )
+            data = (
+                PackedWaveforms(events, pool) if events is not None and pool is not None else None
+            )
         elif channel_keys:
             channel_count = meta.get("channel_count")
             if isinstance(channel_count, int) and channel_count >= 0:
@@ -238,13 +422,7 @@ class ContextCacheDomain:
         except Exception:
             return False
 
-        if meta and "lineage" in meta:
-            current_lineage = self.ctx.get_lineage(name)
-            s1 = json.dumps(meta["lineage"], sort_keys=True, default=str)
-            s2 = json.dumps(current_lineage, sort_keys=True, default=str)
-            return s1 == s2
-
-        return True
+        return self.lineage_matches(name, meta)
 
     def is_cache_hit(self, run_id: str, name: str, load: bool = False) -> bool:
         """Check memory/disk cache status. Optionally load disk cache into memory."""
@@ -307,6 +485,18 @@ class ContextCacheDomain:
             except Exception as e:
                 self.ctx.logger.warning("Failed to delete cache key %s: %s", key, e)
 
+        for part_key in (
+            f"{key}{EVENT_TABLE_HITS_SUFFIX}",
+            f"{key}{PACKED_WAVEFORMS_POOL_SUFFIX}",
+        ):
+            if not self.ctx._storage_exists(storage, part_key, run_id):
+                continue
+            try:
+                self.ctx._storage_call(storage, "delete", part_key, run_id)
+                count += 1
+            except Exception as e:
+                self.ctx.logger.warning("Failed to delete cache part %s: %s", part_key, e)
+
         for ch_key in self.ctx._list_channel_keys(storage, run_id, key):
             try:
                 self.ctx._storage_call(storage, "delete", ch_key, run_id)
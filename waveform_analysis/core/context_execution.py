@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 import os
+import threading
 from typing import Any, cast
 
 import numpy as np
 import pandas as pd
 
+from .context_cache import lineage_metadata
+from .execution.worker_pools import get_worker_pools
 from .foundation.exceptions import ErrorSeverity
 from .foundation.utils import OneTimeGenerator
 from .plugins.core.base import Plugin
+from .processing.event_table import EVENT_TABLE_HITS_SUFFIX, EventTable
+from .processing.packed_waveforms import PACKED_WAVEFORMS_POOL_SUFFIX, PackedWaveforms
+
+# Marks threads that are executing a plan node, so nested get_data calls stay sequential.
+_plan_worker_state = threading.local()
 
 
 class ContextExecutionDomain:
@@ -129,6 +138,8 @@ class ContextExecutionDomain:
                 return sum(arr.nbytes for arr in result) / (1024 * 1024)
             if isinstance(result, pd.DataFrame):
                 return result.memory_usage(deep=True).sum() / (1024 * 1024)
+            if isinstance(result, EventTable | PackedWaveforms):
+                return result.nbytes / (1024 * 1024)
             return None
         except (AttributeError, TypeError) as e:
             self.ctx.logger.debug("Could not calculate output size: %s", e)
@@ -202,13 +213,65 @@ class ContextExecutionDomain:
                     "save_metadata",
                     key,
                     run_id,
-                    {"lineage": lineage, "type": "dataframe"},
+                    {**lineage_metadata(lineage), "type": "dataframe"},
                 )
             else:
                 raise RuntimeError(
                     f"Storage backend {storage.__class__.__name__} does not support DataFrame."
                 )
             self.ctx._set_data(run_id, name, result)
+        elif isinstance(result, EventTable):
+            if not result.empty:
+                # hits 先落盘，events 的元数据最后写入，标记整张表完整
+                self.ctx._storage_call(
+                    storage,
+                    "save_memmap",
+                    f"{key}{EVENT_TABLE_HITS_SUFFIX}",
+                    run_id,
+                    result.hits,
+                    extra_metadata=lineage_metadata(lineage),
+                )
+                self.ctx._storage_call(
+                    storage,
+                    "save_memmap",
+                    key,
+                    run_id,
+                    result.events,
+                    extra_metadata={**lineage_metadata(lineage), "type": "event_table"},
+                )
+                events = self.ctx._storage_call(storage, "load_memmap", key, run_id)
+                hits = self.ctx._storage_call(
+                    storage, "load_memmap", f"{key}{EVENT_TABLE_HITS_SUFFIX}", run_id
+                )
+                if events is not None and hits is not None:
+                    result = EventTable(events, hits)
+            self.ctx._set_data(run_id, name, result)
+        elif isinstance(result, PackedWaveforms):
+            if not result.empty:
+                # 波形池先落盘，events 的元数据最后写入，标记整体完整
+                self.ctx._storage_call(
+                    storage,
+                    "save_memmap",
+                    f"{key}{PACKED_WAVEFORMS_POOL_SUFFIX}",
+                    run_id,
+                    result.pool,
+                    extra_metadata=lineage_metadata(lineage),
+                )
+                self.ctx._storage_call(
+                    storage,
+                    "save_memmap",
+                    key,
+                    run_id,
+                    result.events,
+                    extra_metadata={**lineage_metadata(lineage), "type": "packed_waveforms"},
+                )
+                events = self.ctx._storage_call(storage, "load_memmap", key, run_id)
+                pool = self.ctx._storage_call(
+                    storage, "load_memmap", f"{key}{PACKED_WAVEFORMS_POOL_SUFFIX}", run_id
+                )
+                if events is not None and pool is not None:
+                    result = PackedWaveforms(events, pool)
+            self.ctx._set_data(run_id, name, result)
         elif isinstance(result, list) and all(isinstance(x, np.ndarray) for x in result):
             if self.ctx._expects_flat_channel_array(name):
                 raise ValueError(
@@ -224,7 +287,7 @@ class ContextExecutionDomain:
                     ch_key,
                     run_id,
                     arr,
-                    extra_metadata={"lineage": lineage, "channel_count": channel_count},
+                    extra_metadata={**lineage_metadata(lineage), "channel_count": channel_count},
                 )
             self.ctx._set_data(run_id, name, result)
         elif target_dtype is not None:
@@ -244,7 +307,7 @@ class ContextExecutionDomain:
                     key,
                     run_id,
                     result,
-                    extra_metadata={"lineage": lineage},
+                    extra_metadata=lineage_metadata(lineage),
                 )
                 data = self.ctx._storage_call(storage, "load_memmap", key, run_id)
                 self.ctx._set_data(run_id, name, data)
@@ -345,6 +408,11 @@ class ContextExecutionDomain:
                 tracker, bar_name = self.init_progress_tracking(
                     show_progress, plan, run_id, data_name, progress_desc
                 )
+                if self.use_parallel_plan(plan, needed_set):
+                    self.run_plan_parallel(
+                        run_id, data_name, plan, needed_set, kwargs, tracker, bar_name
+                    )
+                    return self.ctx._get_data_from_memory(run_id, data_name)
                 for name in plan:
                     if name not in needed_set:
                         key = self.ctx.key_for(run_id, name)
@@ -363,6 +431,142 @@ class ContextExecutionDomain:
                 with self.ctx._in_progress_lock:
                     self.ctx._in_progress.pop((run_id, data_name), None)
 
+    def resolve_parallel_workers(self) -> tuple[int, int]:
+        """Return (max_workers, cpu_workers) for parallel plan execution."""
+        max_workers = self.ctx.config.get("parallel_plan_workers")
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        max_workers = max(1, int(max_workers))
+        cpu_workers = self.ctx.config.get("parallel_plan_cpu_workers")
+        if cpu_workers is None:
+            # Leave headroom for plugins that run their own inner pools.
+            cpu_workers = max(1, max_workers // 2)
+        cpu_workers = max(1, min(int(cpu_workers), max_workers))
+        return max_workers, cpu_workers
+
+    def use_parallel_plan(self, plan: list[str], needed_set: set[str]) -> bool:
+        if not self.ctx.config.get("parallel_plan", False):
+            return False
+        if getattr(_plan_worker_state, "active", False):
+            # Nested get_data inside a plan worker: avoid oversubscribing the shared pool.
+            return False
+        if self.resolve_parallel_workers()[0] < 2:
+            return False
+        return sum(1 for name in plan if name in needed_set) > 1
+
+    def plan_dependencies(self, run_id: str, nodes: list[str]) -> dict[str, set[str]]:
+        """Map each plan node to the plan nodes it must wait for."""
+        node_set = set(nodes)
+        deps: dict[str, set[str]] = {}
+        for name in nodes:
+            plugin = self.ctx._plugins.get(name)
+            if plugin is None:
+                deps[name] = set()
+                continue
+            dep_names = self.ctx._get_plugin_dependency_names(plugin, run_id=run_id)
+            deps[name] = {dep for dep in dep_names if dep in node_set and dep != name}
+        return deps
+
+    def plugin_resource_hint(self, name: str) -> str:
+        plugin = self.ctx._plugins.get(name)
+        hint = getattr(plugin, "resource_hint", "cpu")
+        return hint if hint in ("cpu", "io") else "cpu"
+
+    def _run_plan_node(
+        self,
+        name: str,
+        run_id: str,
+        data_name: str,
+        kwargs: dict,
+        tracker: Any | None,
+        bar_name: str | None,
+    ) -> None:
+        _plan_worker_state.active = True
+        # CPU 型节点占用一个工作池并发令牌，插件内部的 map 只能使用剩余的核心
+        n_tokens = 1 if self.plugin_resource_hint(name) == "cpu" else 0
+        try:
+            with get_worker_pools(self.ctx).lease(n_tokens):
+                # Go back through Context so subclasses overriding the hook still see executions.
+                self.ctx._execute_single_plugin(
+                    name, run_id, data_name, kwargs, tracker, bar_name, skip_cache_check=True
+                )
+        finally:
+            _plan_worker_state.active = False
+
+    def run_plan_parallel(
+        self,
+        run_id: str,
+        data_name: str,
+        plan: list[str],
+        needed_set: set[str],
+        kwargs: dict,
+        tracker: Any | None,
+        bar_name: str | None,
+    ) -> None:
+        """Execute needed plan nodes on a thread pool as soon as their inputs are ready.
+
+        Cache-hit nodes are loaded first (in plan order). Needed nodes are then
+        submitted in plan order once all of their in-plan dependencies have
+        finished. ``max_workers`` bounds the total number of running plugins and
+        ``cpu_workers`` additionally bounds plugins with ``resource_hint="cpu"``.
+        On failure no new nodes are submitted; running nodes are drained and the
+        first error is re-raised.
+        """
+        for name in plan:
+            if name in needed_set:
+                continue
+            key = self.ctx.key_for(run_id, name)
+            self.ctx._cache_manager.check_cache(run_id, name, key)
+            if tracker and bar_name:
+                tracker.update(bar_name, n=1)
+
+        pending = [name for name in plan if name in needed_set]
+        deps = self.plan_dependencies(run_id, pending)
+        max_workers, cpu_workers = self.resolve_parallel_workers()
+        done: set[str] = set()
+        running: dict[Future, str] = {}
+        cpu_running = 0
+        first_error: BaseException | None = None
+
+        # 执行计划线程池取自 Context 的工作池服务，跨 get_data 调用复用
+        executor = get_worker_pools(self.ctx).executor("context_plan", max_workers=max_workers)
+        while pending or running:
+            if first_error is None:
+                for name in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if not deps[name] <= done:
+                        continue
+                    is_cpu = self.plugin_resource_hint(name) == "cpu"
+                    if is_cpu and cpu_running >= cpu_workers:
+                        continue
+                    future = executor.submit(
+                        self._run_plan_node, name, run_id, data_name, kwargs, tracker, bar_name
+                    )
+                    running[future] = name
+                    pending.remove(name)
+                    if is_cpu:
+                        cpu_running += 1
+            if not running:
+                if first_error is not None:
+                    break
+                raise RuntimeError(
+                    f"Parallel plan for '{data_name}' is stuck; unresolved nodes: {pending}"
+                )
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if self.plugin_resource_hint(name) == "cpu":
+                    cpu_running -= 1
+                error = future.exception()
+                if error is None:
+                    done.add(name)
+                elif first_error is None:
+                    first_error = error
+
+        if first_error is not None:
+            raise first_error
+
     def wrap_generator_to_save(
         self,
         run_id: str,
@@ -426,7 +630,7 @@ class ContextExecutionDomain:
                     pbar.close()
 
                 self.ctx.storage.finalize_save(
-                    key, total_count, dtype, extra_metadata={"lineage": lineage}
+                    key, total_count, dtype, extra_metadata=lineage_metadata(lineage)
                 )
 
                 if total_count > 0:
@@ -0,0 +1,248 @@
+# DOC: docs/features/context/DATA_ACCESS.md#增量刷新正在采集的运行
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .plugins.core.base import Plugin
+from .processing.incremental import (
+    IncrementalUpdate,
+    diff_raw_file_manifest,
+    load_raw_file_manifest,
+    manifest_files,
+    raw_file_manifest_path,
+    save_raw_file_manifest,
+    settled_entries,
+    stat_raw_files,
+)
+from .processing.packed_waveforms import PACKED_WAVEFORMS_POOL_SUFFIX, PackedWaveforms
+
+RAW_FILES = "raw_files"
+
+
+class ContextIncrementalDomain:
+    """Incremental refresh of runs whose raw files are still being written."""
+
+    def __init__(self, context: Any) -> None:
+        self.ctx = context
+
+    def raw_files_plugin(self) -> Plugin:
+        plugin = self.ctx._plugins.get(RAW_FILES)
+        if (
+            plugin is None
+            or not hasattr(plugin, "scan")
+            or "incremental" not in plugin.options
+            or not self.ctx.get_config(plugin, "incremental")
+        ):
+            raise ValueError(
+                "refresh_run requires a raw_files plugin with incremental=True "
+                "(ctx.set_config({'incremental': True}, plugin_name='raw_files'))"
+            )
+        return plugin
+
+    def refresh_run(self, run_id: str) -> dict[str, Any]:
+        ctx = self.ctx
+        plugin = self.raw_files_plugin()
+        report: dict[str, Any] = {
+            "run_id": run_id,
+            "mode": "unchanged",
+            "new_files": [],
+            "extended": {},
+            "invalidated": [],
+        }
+        path = raw_file_manifest_path(ctx, run_id)
+        ingested = load_raw_file_manifest(path)
+        if ingested is None:
+            # 首次刷新：建立清单（与 get_data 计算 raw_files 相同）
+            ctx.clear_cache_for(run_id, RAW_FILES, clear_disk=False, verbose=False)
+            files = ctx.get_data(run_id, RAW_FILES)
+            report.update(mode="initial", new_files=[p for group in files for p in group])
+            return report
+
+        settle_seconds = ctx.get_config(plugin, "settle_seconds")
+        current = settled_entries(stat_raw_files(plugin.scan(ctx, run_id)), settle_seconds)
+        diff = diff_raw_file_manifest(ingested, current)
+        if diff.changed:
+            # 已摄取的文件被改动：增量结果不再可信，整个运行重新计算
+            downstream = ctx._collect_downstream_data_names(RAW_FILES, run_id=run_id)
+            ctx.clear_cache_for(run_id, RAW_FILES, downstream=True, verbose=False)
+            report.update(mode="rebuild", invalidated=sorted(downstream))
+            return report
+        if diff.n_new == 0:
+            return report
+
+        update = IncrementalUpdate(
+            run_id=run_id, new_files=diff.new_files, all_files=manifest_files(current)
+        )
+        report.update(mode="append", new_files=[p for group in diff.new_files for p in group])
+        ctx._set_data(run_id, RAW_FILES, update.all_files)
+
+        touched: list[str] = []
+        try:
+            self.extend_downstream(run_id, update, report, touched)
+        except Exception:
+            # 部分缓存已在磁盘上扩展而清单仍是旧的：丢弃内存中的新文件列表与本次触及的
+            # 缓存，保留清单，下次刷新重新摄取这批文件，不会重复追加
+            ctx.clear_cache_for(run_id, RAW_FILES, clear_disk=False, verbose=False)
+            for name in touched:
+                ctx.clear_cache_for(run_id, name, verbose=False)
+            ctx.logger.warning(
+                "refresh_run(%s) failed; invalidated raw_files and %s", run_id, touched
+            )
+            raise
+
+        save_raw_file_manifest(path, current)
+        return report
+
+    def extend_downstream(
+        self,
+        run_id: str,
+        update: IncrementalUpdate,
+        report: dict[str, Any],
+        touched: list[str],
+    ) -> None:
+        """按依赖深度扩展已缓存的下游数据；``touched`` 记录已开始扩展的数据名。"""
+        ctx = self.ctx
+        # 记录刷新前已缓存的数据，按依赖深度依次扩展
+        dropped: set[str] = set()
+        for name in self.downstream_order(run_id):
+            target = ctx._plugins[name]
+            deps = ctx._get_plugin_dependency_names(target, run_id=run_id)
+            if any(dep in dropped for dep in deps):
+                self.invalidate(run_id, name, dropped, report)
+                continue
+            if not ctx._is_cache_hit(run_id, name, load=True):
+                # 未缓存：下次访问时完整计算；依赖它的缓存同样不能增量扩展
+                dropped.add(name)
+                continue
+            previous = ctx._get_data_from_memory(run_id, name)
+            touched.append(name)
+            result = target.compute_incremental(ctx, run_id, previous, update)
+            stored = None
+            if result is not None:
+                tail, stable_rows = result
+                stored = self.store_extended(run_id, name, target, previous, tail, stable_rows)
+            if stored is None:
+                self.invalidate(run_id, name, dropped, report)
+                continue
+            rows, appended = stored
+            update.stable_rows[name] = int(result[1])
+            report["extended"][name] = {
+                "stable_rows": int(result[1]),
+                "rows": rows,
+                "appended": appended,
+            }
+            ctx.clear_time_index(run_id, name)
+            ctx._cache_domain.forget_records_views(run_id, name)
+            if name in {"records", "wave_pool"}:
+                # 共享 bundle 缓存指向旧数组，下游读取时由已扩展的 records/wave_pool 重新组合
+                ctx._cache_domain._clear_internal_records_bundle_cache(run_id, verbose=False)
+
+    def downstream_order(self, run_id: str) -> list[str]:
+        """raw_files 的下游数据名，按距 raw_files 的最长路径排序（同层按名称）。"""
+        ctx = self.ctx
+        names = set(ctx._collect_downstream_data_names(RAW_FILES, run_id=run_id))
+        depth: dict[str, int] = {}
+
+        def visit(name: str) -> int:
+            if name not in depth:
+                depth[name] = 0  # 防御环依赖
+                deps = ctx._get_plugin_dependency_names(ctx._plugins[name], run_id=run_id)
+                depth[name] = 1 + max((visit(dep) for dep in deps if dep in names), default=0)
+            return depth[name]
+
+        return sorted(names, key=lambda name: (visit(name), name))
+
+    def invalidate(self, run_id: str, name: str, dropped: set[str], report: dict[str, Any]) -> None:
+        self.ctx.clear_cache_for(run_id, name, verbose=False)
+        dropped.add(name)
+        report["invalidated"].append(name)
+
+    def store_extended(
+        self,
+        run_id: str,
+        name: str,
+        plugin: Plugin,
+        previous: Any,
+        tail: Any,
+        stable_rows: int,
+    ) -> tuple[int, bool] | None:
+        """
+        保存 ``previous[:stable_rows] + tail``，返回 (总行数, 是否为原地追加)。
+
+        已落盘且前缀完整保留时直接在 memmap 文件末尾追加，否则拼接后整体重写；
+        不支持的结果类型返回 None（调用方清除缓存）。
+        """
+        ctx = self.ctx
+        stable_rows = int(stable_rows)
+        key = ctx.key_for(run_id, name)
+        storage = ctx._get_storage_for_data_name(name)
+        on_disk = ctx._storage_exists(storage, key, run_id)
+        can_append = on_disk and hasattr(storage, "append_memmap")
+
+        if isinstance(previous, PackedWaveforms):
+            if not isinstance(tail, PackedWaveforms) or stable_rows != len(previous):
+                return None
+            events = np.array(tail.events, dtype=previous.events.dtype)
+            events["wave_offset"] += len(previous.pool)
+            pool = np.asarray(tail.pool, dtype=previous.pool.dtype)
+            pool_key = f"{key}{PACKED_WAVEFORMS_POOL_SUFFIX}"
+            # 波形池先追加，events 最后写入元数据
+            if can_append and self.append(storage, pool_key, run_id, pool):
+                if self.append(storage, key, run_id, events):
+                    merged = PackedWaveforms(
+                        ctx._storage_call(storage, "load_memmap", key, run_id),
+                        ctx._storage_call(storage, "load_memmap", pool_key, run_id),
+                    )
+                    ctx._set_data(run_id, name, merged)
+                    return len(merged), True
+            merged = PackedWaveforms(
+                np.concatenate([np.asarray(previous.events), events]),
+                np.concatenate([np.asarray(previous.pool), pool]),
+            )
+            self.save(plugin, name, run_id, merged, key, on_disk, None)
+            return len(merged), False
+
+        if not isinstance(previous, np.ndarray) or not isinstance(tail, np.ndarray):
+            return None
+        if not 0 <= stable_rows <= len(previous):
+            return None
+        tail = np.asarray(tail)
+        if tail.dtype != previous.dtype:
+            tail = tail.astype(previous.dtype)
+        if stable_rows == len(previous) and can_append and len(previous):
+            if self.append(storage, key, run_id, tail):
+                merged = ctx._storage_call(storage, "load_memmap", key, run_id)
+                ctx._set_data(run_id, name, merged)
+                return len(merged), True
+        merged = np.concatenate([np.asarray(previous[:stable_rows]), tail])
+        self.save(plugin, name, run_id, merged, key, on_disk, previous.dtype)
+        return len(merged), False
+
+    def append(self, storage: Any, key: str, run_id: str, data: np.ndarray) -> bool:
+        if len(data) == 0:
+            return True
+        return bool(self.ctx._storage_call(storage, "append_memmap", key, run_id, data))
+
+    def save(
+        self,
+        plugin: Plugin,
+        name: str,
+        run_id: str,
+        result: Any,
+        key: str,
+        on_disk: bool,
+        target_dtype: np.dtype | None,
+    ) -> None:
+        ctx = self.ctx
+        if on_disk and len(result) == 0:
+            # 空结果不会落盘：删除旧文件，只保留内存结果
+            ctx._cache_domain.delete_disk_cache(key, run_id, data_name=name)
+            on_disk = False
+        if not on_disk:
+            ctx._set_data(run_id, name, result)
+            return
+        ctx._execution_domain.save_plugin_result(
+            plugin, name, run_id, result, key, ctx.get_lineage(name), False, target_dtype
+        )
@@ -100,14 +100,15 @@ class ContextTimeDomain:
             resolved_time_field, derived_time_values = self.resolve_time_axis(
                 data, data_name, time_domain, time_field=time_field
             )
-            engine.build_index(
+            self.ensure_single_time_index(
+                engine,
                 run_id,
                 data_name,
                 data,
                 resolved_time_field,
                 endtime_field,
-                force_rebuild,
-                time_values=derived_time_values,
+                derived_time_values,
+                force_rebuild=force_rebuild,
             )
             index = engine.get_index(run_id, data_name)
             return {
@@ -124,6 +125,67 @@ class ContextTimeDomain:
         self.ctx.logger.warning("Data '%s' is not a supported type for time indexing", data_name)
         return {"type": "unsupported", "indices": [], "stats": {}}
 
+    def time_index_sidecar(
+        self, run_id: str, data_name: str, tag: str
+    ) -> tuple[str, dict[str, Any]] | None:
+        """
+        返回持久化时间索引的 (路径前缀, 来源戳)；数据未落盘或存储不支持时返回 None。
+
+        来源戳取自数据元数据的写入时间与记录数，数据被重写后旧索引自动失效；
+        路径位于同一缓存键之下，删除缓存时一并删除。
+        """
+        storage = self.ctx._get_storage_for_data_name(data_name)
+        if not hasattr(storage, "sidecar_path"):
+            return None
+        key = self.ctx.key_for(run_id, data_name)
+        try:
+            meta = self.ctx._storage_call(storage, "get_metadata", key, run_id)
+        except Exception:
+            return None
+        if not meta or "timestamp" not in meta:
+            return None
+        path = self.ctx._storage_call(storage, "sidecar_path", key, run_id, f"tindex-{tag}")
+        return path, {"timestamp": meta["timestamp"], "count": meta.get("count")}
+
+    def ensure_single_time_index(
+        self,
+        engine: Any,
+        run_id: str,
+        data_name: str,
+        data: np.ndarray,
+        time_field: str,
+        endtime_field: str | None,
+        time_values: np.ndarray | None,
+        force_rebuild: bool = False,
+    ) -> Any:
+        """优先加载磁盘上的时间索引；缺失或过期时构建并写回。"""
+        from waveform_analysis.core.data.query import load_time_index, save_time_index
+
+        if engine.has_index(run_id, data_name) and not force_rebuild:
+            return engine.get_index(run_id, data_name)
+        tag = time_field if endtime_field is None else f"{time_field}-{endtime_field}"
+        sidecar = self.time_index_sidecar(run_id, data_name, tag)
+        if sidecar is not None and not force_rebuild:
+            index = load_time_index(*sidecar)
+            if index is not None and index.n_records == len(data):
+                self.ctx.logger.debug("Loaded time index for (%s, %s)", run_id, data_name)
+                return engine.add_index(run_id, data_name, index)
+        index = engine.build_index(
+            run_id,
+            data_name,
+            data,
+            time_field,
+            endtime_field,
+            force_rebuild,
+            time_values=time_values,
+        )
+        if sidecar is not None:
+            try:
+                save_time_index(index, *sidecar)
+            except OSError as e:
+                self.ctx.logger.warning("Failed to persist time index for %s: %s", data_name, e)
+        return index
+
     def time_range(
         self,
         run_id: str,
@@ -239,13 +301,14 @@ class ContextTimeDomain:
             data, data_name, time_domain, time_field=time_field
         )
         if auto_build_index and not engine.has_index(run_id, data_name):
-            engine.build_index(
+            self.ensure_single_time_index(
+                engine,
                 run_id,
                 data_name,
                 data,
                 resolved_time_field,
                 endtime_field,
-                time_values=derived_time_values,
+                derived_time_values,
             )
         if engine.has_index(run_id, data_name):
             indices = engine.query(run_id, data_name, start_time, end_time)
@@ -23,6 +23,7 @@ from .query import (
     TimeRangeCache,
     TimeRangeQueryEngine,
 )
+from .record_index import RecordIndex, record_index
 from .records_view import RecordsView, records_view
 
 __all__ = [
@@ -32,6 +33,8 @@ __all__ = [
     "TimeRangeCache",
     "RecordsView",
     "records_view",
+    "RecordIndex",
+    "record_index",
     # 批量处理和导出
     "BatchProcessor",
     "DataExporter",
@@ -14,6 +14,7 @@ import numpy as np
 import pandas as pd
 
 from waveform_analysis.core.foundation.utils import exporter
+from waveform_analysis.core.processing.dtypes import decode_polarity
 
 from .batch_processor import BatchProcessor
 
@@ -135,7 +136,7 @@ class DataExporter:
             frames = []
             for idx, arr in enumerate(data):
                 if arr.dtype.names:
-                    df = pd.DataFrame(arr)
+                    df = _structured_frame(arr)
                 else:
                     df = pd.DataFrame({"data": arr})
                 if "channel" not in df.columns:
@@ -147,7 +148,7 @@ class DataExporter:
         elif isinstance(data, np.ndarray):
             if data.dtype.names:
                 # 结构化数组
-                return pd.DataFrame(data)
+                return _structured_frame(data)
             else:
                 # 普通数组
                 return pd.DataFrame({"data": data})
@@ -157,6 +158,14 @@ class DataExporter:
             raise TypeError(f"Cannot convert {type(data)} to DataFrame")
 
 
+def _structured_frame(arr: np.ndarray) -> pd.DataFrame:
+    """结构化数组转 DataFrame；int8 极性编码列解码为可读的名称。"""
+    df = pd.DataFrame(arr)
+    if "polarity" in df.columns and arr.dtype["polarity"].kind == "i":
+        df["polarity"] = decode_polarity(arr["polarity"])
+    return df
+
+
 @export
 def batch_export(
     context: Any,
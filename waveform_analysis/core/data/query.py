@@ -10,7 +10,9 @@
 
 from dataclasses import dataclass
 from datetime import datetime
+import json
 import logging
+import os
 from typing import TYPE_CHECKING, Any, Optional
 
 import numpy as np
@@ -64,6 +66,9 @@ class TimeIndex:
 
     def __post_init__(self):
         """初始化后处理"""
+        if self.n_records == len(self.times) and self.n_records > 0:
+            # 从持久化索引恢复时 min/max 已给出，避免对 memmap 整列扫描
+            return
         if len(self.times) > 0:
             self.min_time = int(self.times[0])
             self.max_time = int(self.times[-1])
@@ -402,6 +407,11 @@ class TimeRangeQueryEngine:
 
             return index.query_range(start_time, end_time)
 
+    def add_index(self, run_id: str, data_name: str, index: TimeIndex) -> TimeIndex:
+        """登记一个外部构建（或从磁盘加载）的时间索引"""
+        self._indices[(run_id, data_name)] = index
+        return index
+
     def has_index(self, run_id: str, data_name: str) -> bool:
         """检查是否存在索引"""
         return (run_id, data_name) in self._indices
@@ -451,6 +461,90 @@ class TimeRangeQueryEngine:
         }
 
 
+# ===========================
+# 时间索引持久化
+# ===========================
+
+TIME_INDEX_SIDECAR_VERSION = 1
+
+
+def _replace_atomic(path: str, write: Any) -> None:
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@export
+def save_time_index(index: TimeIndex, path: str, source: dict[str, Any]) -> bool:
+    """
+    把时间索引写成附属文件 ``{path}.npy`` + ``{path}.meta``
+
+    .npy 为 (2 或 3, n) 的 int64 表，行依次为 times / indices / endtimes，
+    每行连续存放，可直接 memmap 后 searchsorted。.meta 记录边界与数据来源戳
+    ``source``（如数据元数据的写入时间与记录数），加载时据此判断是否过期。
+
+    Returns:
+        是否写入（非整数时间轴不持久化）
+    """
+    rows = [index.times, index.indices]
+    if index.endtimes is not None:
+        rows.append(index.endtimes)
+    if any(np.asarray(row).dtype.kind not in "iu" for row in rows):
+        return False
+    table = np.empty((len(rows), index.n_records), dtype=np.int64)
+    for i, row in enumerate(rows):
+        table[i] = row
+    meta = {
+        "version": TIME_INDEX_SIDECAR_VERSION,
+        "n_records": int(index.n_records),
+        "min_time": int(index.min_time),
+        "max_time": int(index.max_time),
+        "has_endtimes": index.endtimes is not None,
+        "source": source,
+    }
+    # 先写数据再写 .meta：.meta 存在即表示 .npy 完整
+    _replace_atomic(f"{path}.npy", lambda f: np.save(f, table))
+    _replace_atomic(f"{path}.meta", lambda f: f.write(json.dumps(meta).encode("utf-8")))
+    return True
+
+
+@export
+def load_time_index(path: str, source: dict[str, Any]) -> TimeIndex | None:
+    """
+    以 memmap 方式加载 ``save_time_index`` 写出的时间索引
+
+    来源戳与 ``source`` 不一致、文件缺失或损坏时返回 None（需要重建）。
+    """
+    meta_path, npy_path = f"{path}.meta", f"{path}.npy"
+    if not (os.path.exists(meta_path) and os.path.exists(npy_path)):
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != TIME_INDEX_SIDECAR_VERSION or meta.get("source") != source:
+            return None
+        table = np.load(npy_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        logger.debug("Ignoring unreadable time index %s: %s", path, e)
+        return None
+    n_rows = 3 if meta["has_endtimes"] else 2
+    if table.shape != (n_rows, meta["n_records"]):
+        return None
+    return TimeIndex(
+        times=table[0],
+        indices=table[1],
+        endtimes=table[2] if meta["has_endtimes"] else None,
+        min_time=meta["min_time"],
+        max_time=meta["max_time"],
+        n_records=meta["n_records"],
+    )
+
+
 # ===========================
 # Context集成辅助函数
 # ===========================
@@ -0,0 +1,157 @@
+"""
+RecordIndex - record_id -> row index shared by records/st_waveforms consumers.
+
+RecordsView, hit_threshold and the waveform width plugins all join by ``record_id``;
+the index is built once per data array (and cached per run on a Context) instead of
+every consumer scanning the ids or building a per-record Python dict.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+
+@export
+class RecordIndex:
+    """
+    Vectorized ``record_id -> row`` lookup.
+
+    Contiguous ids (the normal records/st_waveforms layout) resolve by subtracting the
+    first id; other strictly increasing ids use searchsorted directly; anything else is
+    argsorted once and checked for duplicates.
+
+    Args:
+        record_ids: record_id column (a field view is fine; it is not copied)
+        lazy: skip the full scan at construction. Contiguous ids are assumed and every
+            lookup verifies the rows it returns; the full index is built on the first
+            mismatch. Construction is then O(1) regardless of the number of rows.
+    """
+
+    def __init__(self, record_ids: np.ndarray, lazy: bool = False):
+        self.record_ids = record_ids
+        # (id_base, sorted_ids, sorted_order, built)：整体替换，不原地修改，
+        # 同一个实例由多个线程共享查找时读到的总是一致的快照
+        self._state: tuple[int | None, np.ndarray | None, np.ndarray | None, bool]
+        if lazy:
+            # 先假定 record_id 连续，查找时逐个校验，失败再建立完整索引
+            id_base = int(record_ids[0]) if len(record_ids) else None
+            self._state = (id_base, None, None, False)
+        else:
+            self._state = (None, None, None, False)
+            self.build()
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+    @property
+    def is_identity(self) -> bool:
+        """True when record_id == row for every row (lookups are a bounds check)."""
+        if not self._state[3]:
+            self.build()
+        return self._state[0] == 0
+
+    def build(self) -> None:
+        """Build the full index (raises ValueError on duplicate ids)."""
+        self._state = self._build_state()
+
+    def _build_state(self) -> tuple[int | None, np.ndarray | None, np.ndarray | None, bool]:
+        if len(self.record_ids) == 0:
+            return None, None, None, True
+        ids = np.asarray(self.record_ids).astype(np.int64, copy=False)
+        steps = np.diff(ids)
+        if np.all(steps == 1):
+            return int(ids[0]), None, None, True
+        if np.all(steps > 0):
+            return None, ids, None, True
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        duplicated = np.flatnonzero(sorted_ids[1:] == sorted_ids[:-1])
+        if duplicated.size:
+            duplicate = int(sorted_ids[duplicated[0]])
+            raise ValueError(f"records field record_id must be unique, got duplicate {duplicate}")
+        return None, sorted_ids, order, True
+
+    def lookup(self, record_ids: Iterable[int] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Resolve ids without raising.
+
+        Returns:
+            (rows, found): int64 row indices and a bool mask; ``rows`` is only meaningful
+            where ``found`` is True.
+        """
+        if not isinstance(record_ids, np.ndarray):
+            record_ids = list(record_ids)
+        ids = np.asarray(record_ids, dtype=np.int64).reshape(-1)
+        n_rows = len(self.record_ids)
+        if ids.size == 0 or n_rows == 0:
+            return np.zeros(ids.size, dtype=np.int64), np.zeros(ids.size, dtype=bool)
+        id_base, sorted_ids, sorted_order, built = self._state
+        if id_base is not None:
+            rows = ids - id_base
+            found = (rows >= 0) & (rows < n_rows)
+            if not built:
+                # 假定的连续映射：核对取到的行，全部命中即可直接返回
+                found &= self.record_ids[np.where(found, rows, 0)] == ids
+                if not found.all():
+                    self.build()
+                    return self.lookup(ids)
+            return rows, found
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), n_rows - 1)
+        found = sorted_ids[pos] == ids
+        rows = pos if sorted_order is None else sorted_order[pos]
+        return rows, found
+
+    def rows(self, record_ids: Iterable[int] | np.ndarray) -> np.ndarray:
+        """Row indices for ``record_ids``; raises KeyError on the first unknown id."""
+        rows, found = self.lookup(record_ids)
+        if not found.all():
+            missing = int(np.asarray(record_ids, dtype=np.int64).reshape(-1)[np.argmin(found)])
+            raise KeyError(f"Unknown record_id: {missing}")
+        return rows
+
+
+@export
+def record_index(
+    source: Any,
+    run_id: str,
+    data_name: str = "records",
+    data: Any = None,
+) -> RecordIndex:
+    """
+    Return the RecordIndex of ``data_name`` for a run.
+
+    ``data`` may be passed when the caller already holds the array (it must be the
+    ``data_name`` result of ``run_id``). Sources with a ``_record_index_cache`` (Context)
+    reuse the index as long as the cache key (lineage) and the underlying array are
+    unchanged; rows without a ``record_id`` field get the identity index.
+    """
+    if data is None:
+        data = source.get_data(run_id, data_name)
+    names = getattr(getattr(data, "dtype", None), "names", None) or ()
+    if "record_id" in names:
+        ids = data["record_id"]
+    else:
+        ids = np.arange(len(data), dtype=np.int64)
+
+    cache = getattr(source, "_record_index_cache", None)
+    if not isinstance(cache, dict):
+        return RecordIndex(ids, lazy=True)
+
+    slot = (run_id, data_name)
+    try:
+        cache_key = source.key_for(run_id, data_name)
+    except (KeyError, ValueError):
+        return RecordIndex(ids, lazy=True)
+    cached = cache.get(slot)
+    if cached is not None:
+        cached_key, cached_data, index = cached
+        if cached_key == cache_key and cached_data is data:
+            return index
+    index = RecordIndex(ids, lazy=True)
+    cache[slot] = (cache_key, data, index)
+    return index
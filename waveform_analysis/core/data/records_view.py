@@ -7,14 +7,41 @@ from typing import Any
 
 import numpy as np
 
+from waveform_analysis.core.data.record_index import RecordIndex, record_index
 from waveform_analysis.core.foundation.utils import exporter
+from waveform_analysis.core.processing.dtypes import (
+    POLARITY_POSITIVE,
+    decode_polarity,
+    encode_polarity,
+)
 
 export, __all__ = exporter()
 
 
 @export
 class RecordsView:
-    def __init__(self, records: np.ndarray, wave_pool: np.ndarray):
+    """
+    Read-only record/wave access on top of ``records`` + ``wave_pool``.
+
+    Args:
+        records: records structured array (record_id, wave_offset, event_length, ...)
+        wave_pool: flat sample pool referenced by ``wave_offset``/``event_length``
+        lazy: skip the full-array checks at construction. The record_id index
+            (:class:`RecordIndex`) is then built on first lookup (contiguous ids are
+            resolved by offset and verified per lookup, so it is usually never built) and
+            wave bounds are checked for the rows actually read. Construction is O(1)
+            regardless of the number of records.
+        index: prebuilt RecordIndex over ``records["record_id"]`` (e.g. the per-run index
+            from :func:`record_index`), shared instead of building a private one.
+    """
+
+    def __init__(
+        self,
+        records: np.ndarray,
+        wave_pool: np.ndarray,
+        lazy: bool = False,
+        index: RecordIndex | None = None,
+    ):
         if records.dtype.names is None:
             raise ValueError("records must be a structured array")
         required = ("record_id", "wave_offset", "event_length", "timestamp", "baseline")
@@ -24,56 +51,75 @@ class RecordsView:
 
         self.records = records
         self.wave_pool = wave_pool
-        self._record_ids = records["record_id"].astype(np.int64, copy=False)
-        self._wave_offsets = records["wave_offset"].astype(np.int64, copy=False)
-        self._event_lengths = records["event_length"].astype(np.int64, copy=False)
-        self._wave_ends = self._wave_offsets + self._event_lengths
+        # 字段视图（不拷贝）；按需在取出的行上转换为 int64
+        self._record_ids = records["record_id"]
+        self._wave_offsets = records["wave_offset"]
+        self._event_lengths = records["event_length"]
         self._timestamps = records["timestamp"]
-        self._record_id_lookup = self._build_record_id_lookup()
-        self._validate_wave_bounds()
+        self._bounds_checked = False
+        # record_id -> 行索引（lazy 时假定连续并逐次校验，首次失配才建立完整索引）
+        self._index = index if index is not None else RecordIndex(self._record_ids, lazy=lazy)
+        if not lazy:
+            self._validate_wave_bounds()
 
     def __len__(self) -> int:
         return len(self.records)
 
-    def _build_record_id_lookup(self) -> dict[int, int]:
-        lookup: dict[int, int] = {}
-        for idx, record_id in enumerate(self._record_ids.tolist()):
-            key = int(record_id)
-            if key in lookup:
-                raise ValueError(f"records field record_id must be unique, got duplicate {key}")
-            lookup[key] = idx
-        return lookup
-
-    def _validate_wave_bounds(self) -> None:
-        if len(self.records) == 0:
-            return
-        if np.any(self._wave_offsets < 0):
+    def _validate_wave_bounds(self, indices: np.ndarray | None = None) -> None:
+        """Check wave references of all records (or only ``indices``)."""
+        if indices is None:
+            if len(self.records) == 0 or self._bounds_checked:
+                return
+            offsets = self._wave_offsets
+            lengths = self._event_lengths
+        else:
+            offsets = self._wave_offsets[indices]
+            lengths = self._event_lengths[indices]
+        if np.any(offsets < 0):
             raise ValueError("records contain negative wave_offset values")
-        if np.any(self._event_lengths < 0):
+        if np.any(lengths < 0):
             raise ValueError("records contain negative event_length values")
         wave_pool_size = len(self.wave_pool)
-        if np.any(self._wave_ends > wave_pool_size):
+        if np.any(offsets.astype(np.int64) + lengths.astype(np.int64) > wave_pool_size):
             raise ValueError("records reference samples outside wave_pool bounds")
+        if indices is None:
+            self._bounds_checked = True
 
     def _resolve_record_index(self, record_id: int) -> int:
-        key = int(record_id)
-        if key not in self._record_id_lookup:
-            raise KeyError(f"Unknown record_id: {key}")
-        return self._record_id_lookup[key]
+        return int(self._resolve_record_indices(np.array([int(record_id)], dtype=np.int64))[0])
 
     def _resolve_record_indices(self, record_ids: Iterable[int] | np.ndarray) -> np.ndarray:
-        ids = np.asarray(list(record_ids), dtype=np.int64)
-        if ids.size == 0:
-            return np.zeros(0, dtype=np.int64)
-        try:
-            return np.fromiter(
-                (self._record_id_lookup[int(record_id)] for record_id in ids),
-                dtype=np.int64,
-                count=ids.size,
-            )
-        except KeyError as exc:
-            missing = int(exc.args[0])
-            raise KeyError(f"Unknown record_id: {missing}") from None
+        return self._index.rows(record_ids)
+
+    def _positive_polarity(self, indices: np.ndarray) -> np.ndarray:
+        """Rows (of ``indices``) whose signal must be negated to become a negative pulse."""
+        if "polarity" not in self.records.dtype.names:
+            return np.zeros(len(indices), dtype=bool)
+        return encode_polarity(self.records["polarity"][indices]) == POLARITY_POSITIVE
+
+    def _event_baselines(self, indices: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        return np.asarray(self.records["baseline"][indices]).astype(dtype, copy=False)
+
+    def _gather_windows(
+        self,
+        indices: np.ndarray,
+        lengths: np.ndarray,
+        pad_len: int,
+        sample_start: int = 0,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gather the requested sample windows from wave_pool in one fancy-index pass.
+
+        Returns (valid, samples): ``valid`` is the (rows, pad_len) mask of filled cells and
+        ``samples`` holds the raw wave_pool values in the same row-major order.
+        """
+        if not self._bounds_checked:
+            self._validate_wave_bounds(indices)
+        starts = np.clip(int(sample_start), 0, self._event_lengths[indices].astype(np.int64))
+        cols = np.arange(pad_len, dtype=np.int64)
+        valid = cols[None, :] < lengths[:, None]
+        src = (self._wave_offsets[indices].astype(np.int64) + starts)[:, None] + cols[None, :]
+        return valid, self.wave_pool[src[valid]]
 
     def _resolve_signal_baseline(
         self,
@@ -94,8 +140,7 @@ class RecordsView:
         signal = wave.astype(dtype, copy=False) - self._resolve_signal_baseline(
             rec, dtype, baseline=baseline
         )
-        polarity = str(rec["polarity"]) if "polarity" in rec.dtype.names else "unknown"
-        if polarity == "positive":
+        if "polarity" in rec.dtype.names and encode_polarity(rec["polarity"]) == POLARITY_POSITIVE:
             signal = -signal
         return signal
 
@@ -125,7 +170,10 @@ class RecordsView:
         return values[start:end]
 
     def _record_wave(self, rec_idx: int) -> np.ndarray:
-        return self.wave_pool[self._wave_offsets[rec_idx] : self._wave_ends[rec_idx]]
+        if not self._bounds_checked:
+            self._validate_wave_bounds(np.array([rec_idx], dtype=np.int64))
+        start = int(self._wave_offsets[rec_idx])
+        return self.wave_pool[start : start + int(self._event_lengths[rec_idx])]
 
     def _wave_one(
         self,
@@ -196,7 +244,7 @@ class RecordsView:
         sample_start: int = 0,
         sample_end: int | None = None,
     ) -> np.ndarray:
-        lengths = self._event_lengths[indices]
+        lengths = self._event_lengths[indices].astype(np.int64)
         starts = np.clip(int(sample_start), 0, lengths)
         if sample_end is None:
             ends = lengths
@@ -234,23 +282,15 @@ class RecordsView:
             mask=mask,
         )
 
-        for out_idx, rec_idx in enumerate(indices):
-            start, end = self._resolve_window_bounds(
-                int(self._event_lengths[rec_idx]),
-                sample_start=sample_start,
-                sample_end=sample_end,
-            )
-            if start == end:
-                continue
-            wave = self._record_wave(int(rec_idx))[start:end]
-            if baseline_correct:
-                baseline = np.asarray(self.records[int(rec_idx)]["baseline"], dtype=out_dtype)
-                wave = wave.astype(out_dtype, copy=False) - baseline
-            elif wave.dtype != out_dtype:
-                wave = wave.astype(out_dtype, copy=False)
-            waves_out[out_idx, : len(wave)] = wave
-            if mask_out is not None:
-                mask_out[out_idx, : len(wave)] = True
+        valid, samples = self._gather_windows(
+            indices, lengths, waves_out.shape[1], sample_start=sample_start
+        )
+        if baseline_correct:
+            baselines = self._event_baselines(indices, out_dtype)
+            samples = samples.astype(out_dtype, copy=False) - baselines[valid.nonzero()[0]]
+        waves_out[valid] = samples
+        if mask_out is not None:
+            mask_out[...] = valid
 
         if mask_out is not None:
             return waves_out, mask_out
@@ -284,20 +324,19 @@ class RecordsView:
             mask=mask,
         )
 
-        for out_idx, rec_idx in enumerate(indices):
-            rec = self.records[int(rec_idx)]
-            start, end = self._resolve_window_bounds(
-                int(self._event_lengths[rec_idx]),
-                sample_start=sample_start,
-                sample_end=sample_end,
-            )
-            if start == end:
-                continue
-            wave = self._record_wave(int(rec_idx))[start:end]
-            signal = self._normalize_polarity_wave(rec, wave, out_dtype)
-            signals_out[out_idx, : len(signal)] = signal
-            if mask_out is not None:
-                mask_out[out_idx, : len(signal)] = True
+        valid, samples = self._gather_windows(
+            indices, lengths, signals_out.shape[1], sample_start=sample_start
+        )
+        rows = valid.nonzero()[0]
+        samples = (
+            samples.astype(out_dtype, copy=False) - self._event_baselines(indices, out_dtype)[rows]
+        )
+        flip = self._positive_polarity(indices)
+        if flip.any():
+            samples[flip[rows]] *= -1
+        signals_out[valid] = samples
+        if mask_out is not None:
+            mask_out[...] = valid
 
         if mask_out is not None:
             return signals_out, mask_out
@@ -360,6 +399,19 @@ class RecordsView:
             sample_end=sample_end,
         )
 
+    def polarity(self, record_ids: int | Iterable[int] | np.ndarray) -> str | np.ndarray:
+        """Decoded polarity names ('positive' | 'negative' | 'unknown') for record_ids."""
+        if np.isscalar(record_ids):
+            indices = self._resolve_record_indices([int(record_ids)])
+        else:
+            indices = self._resolve_record_indices(record_ids)
+        if "polarity" not in self.records.dtype.names:
+            codes = np.zeros(len(indices), dtype=np.int8)
+        else:
+            codes = self.records["polarity"][indices]
+        names = decode_polarity(codes)
+        return str(names[0]) if np.isscalar(record_ids) else names
+
     def query_time_window(
         self,
         t_min: int | None = None,
@@ -388,6 +440,9 @@ def records_view(
 ) -> RecordsView:
     """
     Factory function to create a RecordsView from a Context-like source.
+
+    Sources with a ``_records_view_cache`` (Context) reuse the view per run as long as
+    the records/wave_pool cache keys (lineage) and the underlying arrays are unchanged.
     """
     records = source.get_data(run_id, records_name)
     wave_pool = source.get_data(run_id, wave_pool_name)
@@ -397,4 +452,18 @@ def records_view(
     if not isinstance(wave_pool, np.ndarray):
         raise ValueError(f"records_view requires formal '{wave_pool_name}' plugin output")
 
-    return RecordsView(records, wave_pool)
+    cache = getattr(source, "_records_view_cache", None)
+    if not isinstance(cache, dict):
+        return RecordsView(records, wave_pool, lazy=True)
+
+    slot = (run_id, records_name, wave_pool_name)
+    lineage_keys = (source.key_for(run_id, records_name), source.key_for(run_id, wave_pool_name))
+    cached = cache.get(slot)
+    if cached is not None:
+        cached_keys, rv = cached
+        if cached_keys == lineage_keys and rv.records is records and rv.wave_pool is wave_pool:
+            return rv
+    index = record_index(source, run_id, records_name, data=records)
+    rv = RecordsView(records, wave_pool, lazy=True, index=index)
+    cache[slot] = (lineage_keys, rv)
+    return rv
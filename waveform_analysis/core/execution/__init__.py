@@ -7,6 +7,8 @@ Execution 子模块 - 并行执行和超时管理
 - ExecutorManager: 执行器池管理
 - TimeoutManager: 超时控制管理
 - Executor Configs: 预定义的执行器配置
+- Shared-memory transport: 进程池之间以共享内存描述符传递数组/Chunk
+- WorkerPoolService: Context 作用域的复用执行器与全局并发上限
 
 向后兼容：
 所有导出的类和函数可以通过以下方式导入：
@@ -37,6 +39,19 @@ from .manager import (
     parallel_progress,
 )
 
+# 共享内存传输
+from .shm_transport import (
+    SharedArrayRef,
+    SharedChunkRef,
+    attach_array,
+    attach_chunk,
+    receive_array,
+    receive_chunk,
+    release_shared,
+    share_array,
+    share_chunk,
+)
+
 # 超时管理
 from .timeout import (
     TimeoutManager,
@@ -47,6 +62,9 @@ from .timeout import (
 # 验证管理
 from .validation import ValidationManager
 
+# 工作池服务
+from .worker_pools import WorkerPoolService, get_worker_pools
+
 __all__ = [
     # 执行器管理
     "ExecutorManager",
@@ -68,10 +86,23 @@ __all__ = [
     "EXECUTOR_CONFIGS",
     "get_config",
     "register_config",
+    # 共享内存传输
+    "SharedArrayRef",
+    "SharedChunkRef",
+    "share_array",
+    "attach_array",
+    "receive_array",
+    "share_chunk",
+    "attach_chunk",
+    "receive_chunk",
+    "release_shared",
     # 超时管理
     "TimeoutManager",
     "get_timeout_manager",
     "with_timeout",
     # 验证管理
     "ValidationManager",
+    # 工作池服务
+    "WorkerPoolService",
+    "get_worker_pools",
 ]
@@ -0,0 +1,180 @@
+# DOC: docs/plugins/guides/STREAMING_PLUGINS_GUIDE.md#共享内存传输
+"""
+共享内存传输模块 - 在进程执行器之间以描述符传递 NumPy 数组与 Chunk。
+
+进程池默认会为每个任务 pickle 整个数组；本模块改为：
+- 发送方把数组写入 ``multiprocessing.shared_memory`` 段，只传递轻量描述符
+- 接收方按描述符 attach 为零拷贝视图（attach_array / attach_chunk）
+- 结果回传时由接收方拷贝一次后立即 close + unlink（receive_array / receive_chunk）
+
+段的生命周期约定：创建方负责在对方使用完毕后 unlink；
+object dtype 与空数组不走共享内存，直接内联在描述符中。
+"""
+
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+import os
+from typing import Any
+
+import numpy as np
+
+from waveform_analysis.core.foundation.utils import exporter
+from waveform_analysis.core.processing.chunk import Chunk
+
+export, __all__ = exporter()
+
+# 重建 Chunk 所需的属性（data 之外）
+_CHUNK_ATTRS = (
+    "start",
+    "end",
+    "run_id",
+    "data_type",
+    "data_kind",
+    "time_field",
+    "dt_field",
+    "length_field",
+    "endtime_field",
+    "dt",
+    "metadata",
+)
+
+# close 时仍被视图引用的段：保持存活，避免析构时抛出 BufferError
+_lingering: list[shared_memory.SharedMemory] = []
+
+
+@export
+@dataclass(frozen=True)
+class SharedArrayRef:
+    """共享数组描述符（可 pickle，只包含段名、dtype 与 shape）。"""
+
+    name: str | None  # None 表示数组内联在 inline 中
+    dtype: np.dtype
+    shape: tuple[int, ...]
+    inline: np.ndarray | None = None
+
+
+@export
+@dataclass(frozen=True)
+class SharedChunkRef:
+    """共享 Chunk 描述符：数据走共享内存，时间范围等属性随描述符传递。"""
+
+    data: SharedArrayRef
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+@export
+def ensure_resource_tracker() -> None:
+    """
+    在创建进程池之前启动 resource_tracker。
+
+    fork 出的 worker 会继承同一个 tracker，创建方与 attach 方的登记因此合并为一条，
+    由 unlink 统一注销；否则每个 worker 会各自启动 tracker 并在退出时误报泄漏。
+    """
+    if os.name != "posix":
+        return
+    from multiprocessing import resource_tracker
+
+    resource_tracker.ensure_running()
+
+
+@export
+def share_array(
+    arr: np.ndarray,
+) -> tuple[shared_memory.SharedMemory | None, SharedArrayRef]:
+    """把数组拷贝进新的共享内存段，返回 (段句柄, 描述符)。"""
+    arr = np.asarray(arr)
+    if arr.dtype.hasobject or arr.nbytes == 0:
+        return None, SharedArrayRef(None, arr.dtype, arr.shape, inline=arr)
+    shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+    try:
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+        view[...] = arr
+        del view
+    except BaseException:
+        release_shared(shm, unlink=True)
+        raise
+    return shm, SharedArrayRef(shm.name, arr.dtype, arr.shape)
+
+
+@export
+def attach_array(
+    ref: SharedArrayRef,
+) -> tuple[shared_memory.SharedMemory | None, np.ndarray]:
+    """按描述符 attach 为零拷贝视图；使用完毕后需 release_shared(段句柄)。"""
+    if ref.name is None:
+        return None, ref.inline
+    shm = shared_memory.SharedMemory(name=ref.name, create=False)
+    return shm, np.ndarray(ref.shape, dtype=ref.dtype, buffer=shm.buf)
+
+
+@export
+def release_shared(shm: shared_memory.SharedMemory | None, unlink: bool = False) -> None:
+    """
+    关闭段句柄（可选 unlink）。
+
+    若仍有视图引用缓冲区（例如插件把输入缓存到了自身属性上），
+    句柄会被保留到进程退出，unlink 照常执行。
+    """
+    if shm is None:
+        return
+    try:
+        shm.close()
+    except BufferError:
+        _lingering.append(shm)
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@export
+def receive_array(ref: SharedArrayRef) -> np.ndarray:
+    """拷贝出共享数组并立即释放段（close + unlink）。"""
+    if ref.name is None:
+        return ref.inline
+    shm, view = attach_array(ref)
+    try:
+        out = view.copy()
+        del view
+    finally:
+        release_shared(shm, unlink=True)
+    return out
+
+
+@export
+def discard_array(ref: SharedArrayRef) -> None:
+    """不读取数据，直接 unlink 描述符指向的段（用于丢弃的结果）。"""
+    if ref.name is None:
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=ref.name, create=False)
+    except FileNotFoundError:
+        return
+    release_shared(shm, unlink=True)
+
+
+@export
+def share_chunk(chunk: Chunk) -> tuple[shared_memory.SharedMemory | None, SharedChunkRef]:
+    """把 Chunk 数据写入共享内存，返回 (段句柄, 描述符)。"""
+    shm, data_ref = share_array(chunk.data)
+    attrs = {name: getattr(chunk, name) for name in _CHUNK_ATTRS}
+    return shm, SharedChunkRef(data_ref, attrs)
+
+
+@export
+def attach_chunk(ref: SharedChunkRef) -> tuple[shared_memory.SharedMemory | None, Chunk]:
+    """按描述符重建 Chunk，数据为共享内存上的零拷贝视图。"""
+    shm, data = attach_array(ref.data)
+    try:
+        return shm, Chunk(data, **ref.attrs)
+    except BaseException:
+        del data
+        release_shared(shm)
+        raise
+
+
+@export
+def receive_chunk(ref: SharedChunkRef) -> Chunk:
+    """拷贝出共享 Chunk 并立即释放段。"""
+    return Chunk(receive_array(ref.data), **ref.attrs)
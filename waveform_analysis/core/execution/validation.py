@@ -14,6 +14,7 @@ import numpy as np
 
 # 3. Local imports
 from ..foundation.utils import OneTimeGenerator, exporter
+from ..processing.packed_waveforms import PackedWaveforms
 
 if TYPE_CHECKING:
     from ..context import Context
@@ -163,7 +164,7 @@ class ValidationManager:
             isinstance(result, list)
             and len(result) > 0
             and all(isinstance(item, np.ndarray) for item in result)
-        )
+        ) or isinstance(result, PackedWaveforms)
         if skip_dtype_conversion:
             return result
 
@@ -0,0 +1,288 @@
+# DOC: docs/features/advanced/EXECUTOR_MANAGER_GUIDE.md#context-级工作池服务
+"""
+工作池服务 - Context 作用域的可复用线程池/进程池与全局并发上限。
+
+插件按名称向服务申请执行器，而不是在每次 compute 中自行创建/销毁线程池或进程池：
+- 执行器通过 ExecutorManager 创建并在 Context 生命周期内复用（名称带 Context 作用域前缀）
+- 进程池 worker 由 initializer 预先导入 numpy/scipy 与已注册插件所在模块（warm worker），
+  ``warm()`` 可以提前拉起 worker，后续插件调用不再承担进程启动与导入开销
+- 所有 ``map`` 调用共享一个并发令牌池（``max_concurrency``，默认 CPU 核心数）：
+  外层并行（执行计划并行、插件内部并行）已占满令牌时，嵌套调用退化为在调用线程内串行执行，
+  因此嵌套并行不会超额订阅 CPU，也不会因等待令牌而死锁
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from contextlib import contextmanager
+import importlib
+import logging
+import os
+import threading
+from typing import Any
+
+from waveform_analysis.core.execution.manager import get_executor_manager
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+logger = logging.getLogger(__name__)
+
+# 进程池 worker 默认预加载的模块
+DEFAULT_WARM_MODULES = export(("numpy", "scipy.signal"), name="DEFAULT_WARM_MODULES")
+
+
+def _warm_worker(modules: tuple[str, ...]) -> None:
+    """进程池 initializer：在 worker 启动时导入模块，避免首个任务承担导入开销。"""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as exc:  # noqa: BLE001 - 预加载失败不影响任务执行
+            logger.debug("worker warm-up failed to import %s: %s", module, exc)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+@export
+class WorkerPoolService:
+    """
+    可复用的命名执行器集合，带全局并发上限。
+
+    Args:
+        max_concurrency: 所有 map 调用同时运行的任务总数上限（None 为 CPU 核心数）
+        warm_modules: 进程池 worker 预加载的模块名；可以是可调用对象，
+            在创建进程池时求值（用于包含之后注册的插件模块）
+        scope: 执行器名称前缀，区分不同 Context 的执行器
+
+    Examples:
+        >>> pools = ctx.worker_pools
+        >>> results = pools.map(func, tasks, name="wave_pool_filtered")
+        >>> pools.warm("wave_pool_filtered")                  # 提前拉起进程池 worker
+        >>> results = pools.map(
+        ...     func, tasks, name="wave_pool_filtered", executor_type="process"
+        ... )
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        warm_modules: Iterable[str] | Callable[[], Iterable[str]] = (),
+        scope: str | None = None,
+    ):
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._warm_modules = warm_modules
+        self._scope = scope or f"pools{id(self):x}"
+        self._lock = threading.Lock()
+        self._available = self.max_concurrency
+        self._executors: dict[tuple[str, str], tuple[Executor, int]] = {}
+        self._inline_runs = 0
+
+    # ------------------------------------------------------------------
+    # 执行器
+    # ------------------------------------------------------------------
+
+    def _resolve_warm_modules(self) -> tuple[str, ...]:
+        modules = self._warm_modules() if callable(self._warm_modules) else self._warm_modules
+        return tuple(dict.fromkeys([*DEFAULT_WARM_MODULES, *modules]))
+
+    def executor(
+        self, name: str, executor_type: str = "thread", max_workers: int | None = None
+    ) -> Executor:
+        """
+        返回名为 ``name`` 的复用执行器（首次请求时创建）。
+
+        执行器大小在首次创建时确定：max(max_concurrency, max_workers)，之后按名称复用
+        （IO 型任务可以请求多于 CPU 核心数的 worker）。直接向执行器提交任务不受并发令牌约束；
+        需要全局上限时使用 ``map``。
+        """
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"executor_type must be 'thread' or 'process', got '{executor_type}'")
+        key = (name, executor_type)
+        workers = max(self.max_concurrency, int(max_workers or 0))
+        manager = get_executor_manager()
+        with self._lock:
+            entry = self._executors.get(key)
+            if entry is not None:
+                return entry[0]
+            kwargs: dict[str, Any] = {}
+            if executor_type == "process":
+                from waveform_analysis.core.execution.shm_transport import (
+                    ensure_resource_tracker,
+                )
+
+                # fork 出的 worker 继承同一个 resource_tracker（共享内存输入的清理约定）
+                ensure_resource_tracker()
+                kwargs = {"initializer": _warm_worker, "initargs": (self._resolve_warm_modules(),)}
+            else:
+                kwargs = {"thread_name_prefix": f"{self._scope}:{name}"}
+            executor = manager.get_executor(
+                f"{self._scope}:{name}",
+                executor_type=executor_type,
+                max_workers=workers,
+                reuse=True,
+                **kwargs,
+            )
+            self._executors[key] = (executor, workers)
+            return executor
+
+    def warm(self, name: str, executor_type: str = "process") -> int:
+        """拉起执行器的全部 worker（进程池会执行预加载），返回 worker 数。"""
+        executor = self.executor(name, executor_type)
+        workers = self._executors[(name, executor_type)][1]
+        futures = [executor.submit(_ping) for _ in range(workers)]
+        for future in futures:
+            future.result()
+        return workers
+
+    # ------------------------------------------------------------------
+    # 并发令牌
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def lease(self, n: int) -> Iterator[int]:
+        """
+        尝试占用至多 n 个并发令牌（不阻塞），产出实际获得的数量（可能为 0）。
+
+        获得 0 个令牌说明外层并行已占满 CPU，调用方应在当前线程内串行执行。
+        """
+        with self._lock:
+            granted = max(0, min(int(n), self._available))
+            self._available -= granted
+        try:
+            yield granted
+        finally:
+            with self._lock:
+                self._available += granted
+
+    @property
+    def available(self) -> int:
+        """当前未被占用的并发令牌数。"""
+        return self._available
+
+    def map(
+        self,
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        *,
+        name: str,
+        executor_type: str = "thread",
+        max_workers: int | None = None,
+        cpu_bound: bool = True,
+        on_result: Callable[[int, Any], None] | None = None,
+    ) -> list[Any]:
+        """
+        在命名执行器上并行执行 ``func(item)``，按输入顺序返回结果。
+
+        CPU 密集任务（默认）同时在途的任务数为 min(max_workers, 可用令牌)，不足 2 个时
+        在调用线程内串行执行；``cpu_bound=False``（文件 IO 等）不占用令牌，只受 max_workers
+        约束。``on_result(index, result)`` 在调用线程中按完成顺序回调（用于进度条）。
+        任务抛出的异常原样向上传播，其余未开始的任务会被取消。
+        """
+        items = list(items)
+        if not items:
+            return []
+        want = len(items) if max_workers is None else min(max(1, int(max_workers)), len(items))
+        if not cpu_bound:
+            if want < 2:
+                return self._run_inline(func, items, on_result)
+            executor = self.executor(name, executor_type, max_workers=want)
+            return self._run_windowed(executor, func, items, want, on_result)
+        with self.lease(want) as granted:
+            if granted < 2:
+                with self._lock:
+                    self._inline_runs += 1
+                return self._run_inline(func, items, on_result)
+            executor = self.executor(name, executor_type)
+            return self._run_windowed(executor, func, items, granted, on_result)
+
+    @staticmethod
+    def _run_inline(
+        func: Callable[[Any], Any],
+        items: list[Any],
+        on_result: Callable[[int, Any], None] | None,
+    ) -> list[Any]:
+        results = []
+        for idx, item in enumerate(items):
+            results.append(func(item))
+            if on_result is not None:
+                on_result(idx, results[-1])
+        return results
+
+    @staticmethod
+    def _run_windowed(
+        executor: Executor,
+        func: Callable[[Any], Any],
+        items: list[Any],
+        window: int,
+        on_result: Callable[[int, Any], None] | None = None,
+    ) -> list[Any]:
+        results: list[Any] = [None] * len(items)
+        running: dict[Future, int] = {}
+        next_idx = 0
+        try:
+            while next_idx < len(items) or running:
+                while next_idx < len(items) and len(running) < window:
+                    running[executor.submit(func, items[next_idx])] = next_idx
+                    next_idx += 1
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    idx = running.pop(future)
+                    results[idx] = future.result()
+                    if on_result is not None:
+                        on_result(idx, results[idx])
+        finally:
+            for future in running:
+                future.cancel()
+        return results
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """返回执行器与令牌使用情况。"""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "available": self._available,
+                "inline_runs": self._inline_runs,
+                "executors": {
+                    f"{name}:{executor_type}": workers
+                    for (name, executor_type), (_, workers) in self._executors.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭本服务创建的全部执行器（之后再次请求会重新创建）。"""
+        manager = get_executor_manager()
+        with self._lock:
+            entries = list(self._executors.items())
+            self._executors.clear()
+        for (name, executor_type), (_executor, workers) in entries:
+            manager.shutdown_executor(
+                f"{self._scope}:{name}", executor_type, max_workers=workers, wait=wait
+            )
+
+
+_default_service: WorkerPoolService | None = None
+_default_lock = threading.Lock()
+
+
+@export
+def get_worker_pools(context: Any = None) -> WorkerPoolService:
+    """
+    返回 context 的工作池服务；context 为空或不提供服务时返回进程级默认服务。
+
+    插件与工具函数统一通过该函数获取执行器，测试用的轻量上下文无需实现 worker_pools。
+    """
+    pools = getattr(context, "worker_pools", None) if context is not None else None
+    if isinstance(pools, WorkerPoolService):
+        return pools
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = WorkerPoolService(scope="default")
+        return _default_service
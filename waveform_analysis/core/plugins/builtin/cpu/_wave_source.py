@@ -10,6 +10,8 @@ from typing import Any
 
 import numpy as np
 
+from waveform_analysis.core.processing.packed_waveforms import PackedWaveforms
+
 logger = logging.getLogger(__name__)
 
 WAVE_SOURCE_AUTO = "auto"
@@ -42,6 +44,11 @@ class LoadedWaveInput:
     records: np.ndarray | None = None
     waveform_data: np.ndarray | None = None
     records_view: Any | None = None
+    # wave_layout="packed" 的 st_waveforms/filtered_waveforms（仅 accept_packed=True 时设置，
+    # 此时 waveform_data 为其元数据 events）
+    packed: PackedWaveforms | None = None
+    # start_row > 0 时加载的是输入的尾部切片，row_offset 为其首行在完整输入中的行号
+    row_offset: int = 0
 
 
 def _ensure_registered_plugin(
@@ -172,7 +179,18 @@ def load_wave_input(
     *,
     use_filtered_option: str = "use_filtered",
     needs_wave_samples: bool = True,
+    accept_packed: bool = False,
+    start_row: int = 0,
 ) -> LoadedWaveInput:
+    """
+    加载插件的波形输入。
+
+    packed 布局的 st_waveforms 在 ``accept_packed=True`` 时原样返回（``packed`` 字段），
+    否则物化为定长 ``wave`` 的结构化数组，供只支持二维波形的插件使用。
+    ``start_row`` 只加载第 start_row 行之后的输入（增量刷新），波形池保持完整，
+    因此 ``wave_offset`` 等偏移无需调整。
+    """
+    start_row = max(int(start_row), 0)
     spec = resolve_wave_input_spec(
         context,
         plugin,
@@ -200,7 +218,9 @@ def load_wave_input(
             from waveform_analysis.core import records_view
 
             rv = records_view(context, run_id, wave_pool_name=spec.wave_pool_name or "wave_pool")
-            return LoadedWaveInput(spec=spec, records=rv.records, records_view=rv)
+            return LoadedWaveInput(
+                spec=spec, records=rv.records[start_row:], records_view=rv, row_offset=start_row
+            )
 
         _ensure_registered_plugin(
             context,
@@ -213,7 +233,7 @@ def load_wave_input(
             raise ValueError(
                 f"{plugin.provides} expects {WAVE_SOURCE_RECORDS} as a single structured array"
             )
-        return LoadedWaveInput(spec=spec, records=records)
+        return LoadedWaveInput(spec=spec, records=records[start_row:], row_offset=start_row)
 
     _ensure_registered_plugin(
         context,
@@ -222,8 +242,21 @@ def load_wave_input(
         plugin_hint="FilteredWaveformsPlugin" if spec.data_name == WAVE_SOURCE_FILTERED else None,
     )
     waveform_data = context.get_data(run_id, spec.data_name)
+    if isinstance(waveform_data, PackedWaveforms):
+        if accept_packed:
+            if start_row:
+                waveform_data = PackedWaveforms(
+                    waveform_data.events[start_row:], waveform_data.pool
+                )
+            return LoadedWaveInput(
+                spec=spec,
+                waveform_data=waveform_data.events,
+                packed=waveform_data,
+                row_offset=start_row,
+            )
+        waveform_data = waveform_data.to_padded()
     if not isinstance(waveform_data, np.ndarray):
         raise ValueError(
             f"{plugin.provides} expects {spec.expected_name} as a single structured array"
         )
-    return LoadedWaveInput(spec=spec, waveform_data=waveform_data)
+    return LoadedWaveInput(spec=spec, waveform_data=waveform_data[start_row:], row_offset=start_row)
@@ -11,6 +11,8 @@ Basic Features Plugin - 基础特征计算插件
 - max_abs_diff: 波形相邻采样点差分绝对值最大值
 
 支持可选的滤波波形输入，可配置计算范围。
+计算按硬件通道解析一次 channel_config，再对等长波形块做 NumPy 批量归约，
+结果与逐条记录计算逐位一致。
 """
 
 from typing import Any
@@ -18,13 +20,22 @@ from typing import Any
 import numpy as np
 
 from waveform_analysis.core.foundation.constants import FeatureDefaults
-from waveform_analysis.core.hardware.channel import resolve_effective_channel_config
+from waveform_analysis.core.hardware.channel import (
+    group_indices_by_hardware_channel,
+    resolve_effective_channel_config,
+)
 from waveform_analysis.core.plugins.builtin.cpu._wave_source import (
     WAVE_SOURCE_AUTO,
     load_wave_input,
     resolve_wave_input_spec,
 )
 from waveform_analysis.core.plugins.core.base import Option, Plugin
+from waveform_analysis.core.processing.dtypes import (
+    POLARITY_NEGATIVE,
+    POLARITY_POSITIVE,
+    encode_polarity,
+)
+from waveform_analysis.core.processing.incremental import IncrementalUpdate
 
 BASIC_FEATURES_DTYPE = np.dtype(
     [
@@ -40,6 +51,105 @@ BASIC_FEATURES_DTYPE = np.dtype(
 )
 
 
+# 批量计算模式：归一化信号（records 的 positive/negative 极性）或原始波形
+_SIGNAL_POSITIVE = 0
+_SIGNAL_NEGATIVE = 1
+_RAW_POSITIVE = 2
+_RAW_NEGATIVE = 3
+_N_MODES = 4
+
+# 单个二维块的最大采样数：限制临时数组内存，并让 float64 中间结果留在缓存中
+_BLOCK_SAMPLES = 1 << 16
+
+
+def _iter_row_chunks(rows: np.ndarray, wave_length: int):
+    step = max(1, _BLOCK_SAMPLES // max(wave_length, 1))
+    for begin in range(0, len(rows), step):
+        yield rows[begin : begin + step]
+
+
+def _fill_block_features(
+    features: np.ndarray,
+    rows: np.ndarray,
+    waves: np.ndarray,
+    baselines: np.ndarray,
+    mode: int,
+    height_slice: slice,
+    area_slice: slice,
+) -> None:
+    """
+    对等长波形块 (n_rows, length) 批量计算 height/amp/area/max_abs_diff。
+
+    逐行归约与逐条记录计算的运算顺序一致（行内 pairwise 求和），结果逐位相同。
+    """
+    baseline64 = baselines[:, None]
+    if mode in (_SIGNAL_POSITIVE, _SIGNAL_NEGATIVE):
+        # 与 RecordsView.signals 相同：float32 下减基线，positive 翻转，再整体取反
+        signal = waves.astype(np.float32) - baselines.astype(np.float32)[:, None]
+        if mode == _SIGNAL_POSITIVE:
+            signal = -signal
+        signal = -signal
+        signal_p = signal[:, height_slice]
+        if signal_p.shape[1] > 0:
+            s_min = signal_p.min(axis=1).astype(np.float64)
+            s_max = signal_p.max(axis=1).astype(np.float64)
+            features["height"][rows] = s_max
+            features["amp"][rows] = s_max - s_min
+        signal_c = signal[:, area_slice]
+        if signal_c.shape[1] > 0:
+            features["area"][rows] = signal_c.astype(np.float64).sum(axis=1)
+    else:
+        wave_p = waves[:, height_slice]
+        if wave_p.shape[1] > 0:
+            w_min = wave_p.min(axis=1).astype(np.float64)
+            w_max = wave_p.max(axis=1).astype(np.float64)
+            if mode == _RAW_POSITIVE:
+                features["height"][rows] = w_max - baselines
+            else:
+                features["height"][rows] = baselines - w_min
+            features["amp"][rows] = w_max - w_min
+        wave_c = waves[:, area_slice].astype(np.float64)
+        if wave_c.shape[1] > 0:
+            if mode == _RAW_POSITIVE:
+                features["area"][rows] = (wave_c - baseline64).sum(axis=1)
+            else:
+                features["area"][rows] = (baseline64 - wave_c).sum(axis=1)
+
+    if waves.shape[1] > 1:
+        # 整数波形的差分在 int64 下精确，避免整块转换为 float64
+        diff_dtype = np.int64 if waves.dtype.kind in "iu" else np.float64
+        diff = np.diff(waves.astype(diff_dtype), axis=1)
+        features["max_abs_diff"][rows] = np.abs(diff).max(axis=1).astype(np.float64)
+
+
+def _fill_pooled_features(
+    features: np.ndarray,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    wave_pool: np.ndarray,
+    baselines: np.ndarray,
+    codes: np.ndarray,
+    height_slice: slice,
+    area_slice: slice,
+) -> None:
+    """波形池输入（records/wave_pool 或 packed st_waveforms）按 (长度, 模式) 分组批量计算。"""
+    # 按 (波形长度, 极性模式) 分组，组内波形可直接拼成二维块做批量归约
+    group_keys = lengths * _N_MODES + codes
+    order = np.argsort(group_keys, kind="stable")
+    bounds = np.flatnonzero(np.diff(group_keys[order])) + 1
+    for group in np.split(order, bounds):
+        if group.size == 0:
+            continue
+        length = int(lengths[group[0]])
+        mode = int(codes[group[0]])
+        samples = np.arange(length, dtype=np.int64)
+        for rows in _iter_row_chunks(group, length):
+            waves = wave_pool[offsets[rows][:, None] + samples]
+            _fill_block_features(
+                features, rows, waves, baselines[rows], mode, height_slice, area_slice
+            )
+
+
 class BasicFeaturesPlugin(Plugin):
     """Plugin to compute basic height/area features from structured waveforms."""
 
@@ -98,13 +208,28 @@ class BasicFeaturesPlugin(Plugin):
         Returns:
             np.ndarray: 结构化数组，包含 height/area 字段
         """
+        return self._compute_features(context, run_id)
+
+    def compute_incremental(
+        self, context: Any, run_id: str, previous: Any, update: IncrementalUpdate
+    ) -> tuple[np.ndarray, int] | None:
+        """特征逐行独立：只计算输入中变化/新增的行。"""
+        spec = resolve_wave_input_spec(context, self)
+        if spec.data_name not in update.stable_rows:
+            return None
+        stable = min(int(update.stable_rows[spec.data_name]), len(previous))
+        return self._compute_features(context, run_id, start_row=stable), stable
+
+    def _compute_features(self, context: Any, run_id: str, start_row: int = 0) -> np.ndarray:
         channel_config_cfg = context.get_config(self, "channel_config")
         height_range = context.get_config(self, "height_range")
         area_range = context.get_config(self, "area_range")
-        wave_input = load_wave_input(context, self, run_id, needs_wave_samples=True)
+        wave_input = load_wave_input(
+            context, self, run_id, needs_wave_samples=True, accept_packed=True, start_row=start_row
+        )
 
-        start_p, end_p = height_range
-        start_c, end_c = area_range
+        height_slice = slice(*height_range)
+        area_slice = slice(*area_range)
         if wave_input.spec.is_records:
             records = wave_input.records
             rv = wave_input.records_view
@@ -112,86 +237,42 @@ class BasicFeaturesPlugin(Plugin):
                 raise ValueError("basic_features failed to load records_view for records source")
             if len(records) == 0:
                 return np.zeros(0, dtype=BASIC_FEATURES_DTYPE)
+            names = records.dtype.names
+            n_events = len(records)
+            boards = records["board"] if "board" in names else np.zeros(n_events, dtype=np.int16)
             channels = (
-                records["channel"]
-                if "channel" in records.dtype.names
-                else np.zeros(len(records), dtype=np.int16)
+                records["channel"] if "channel" in names else np.zeros(n_events, dtype=np.int16)
             )
-            boards = (
-                records["board"]
-                if "board" in records.dtype.names
-                else np.zeros(len(records), dtype=np.int16)
+            baselines = self._resolve_baselines(
+                context, run_id, boards, channels, records["baseline"], channel_config_cfg
             )
-            record_ids = (
-                records["record_id"].astype(np.int64, copy=False)
-                if "record_id" in records.dtype.names
-                else np.arange(len(records), dtype=np.int64)
-            )
-            features = np.zeros(len(records), dtype=BASIC_FEATURES_DTYPE)
-            for idx, rec in enumerate(records):
-                board = int(boards[idx])
-                ch = int(rec["channel"]) if "channel" in records.dtype.names else 0
-                effective_rule = resolve_effective_channel_config(
-                    context=context,
-                    plugin=self,
-                    run_id=run_id,
-                    board=board,
-                    channel=ch,
-                    base_values={"fixed_baseline": None},
-                    channel_config=channel_config_cfg,
-                ).values
-                fixed_baseline = effective_rule.get("fixed_baseline")
-                baseline = (
-                    float(rec["baseline"]) if fixed_baseline is None else float(fixed_baseline)
-                )
-                wave = rv.waves(int(record_ids[idx]))
-                data_polarity = str(rec["polarity"]) if "polarity" in records.dtype.names else None
-                use_normalized_signal = data_polarity in ("positive", "negative")
-                signal = (
-                    -rv.signals(int(record_ids[idx]), baseline=baseline)
-                    if use_normalized_signal
-                    else None
-                )
-                wave_p = wave[start_p:end_p]
-                wave_c = wave[start_c:end_c]
-                signal_p = signal[start_p:end_p] if signal is not None else None
-                signal_c = signal[start_c:end_c] if signal is not None else None
-                effective_polarity = (
-                    data_polarity if data_polarity in ("positive", "negative") else "negative"
+            # 记录级极性：positive/negative 使用归一化信号，其余按 negative 处理原始波形
+            if "polarity" in names:
+                polarity = encode_polarity(records["polarity"])
+                codes = np.where(
+                    polarity == POLARITY_POSITIVE,
+                    _SIGNAL_POSITIVE,
+                    np.where(polarity == POLARITY_NEGATIVE, _SIGNAL_NEGATIVE, _RAW_NEGATIVE),
                 )
+            else:
+                codes = np.full(n_events, _RAW_NEGATIVE)
+
+            features = np.zeros(n_events, dtype=BASIC_FEATURES_DTYPE)
+            _fill_pooled_features(
+                features,
+                records["wave_offset"].astype(np.int64, copy=False),
+                records["event_length"].astype(np.int64, copy=False),
+                rv.wave_pool,
+                baselines,
+                codes,
+                height_slice,
+                area_slice,
+            )
 
-                if use_normalized_signal and signal_p is not None and signal_p.size > 0:
-                    s_min = float(np.min(signal_p))
-                    s_max = float(np.max(signal_p))
-                    features["height"][idx] = s_max
-                    features["amp"][idx] = s_max - s_min
-                elif wave_p.size > 0:
-                    w_min = float(np.min(wave_p))
-                    w_max = float(np.max(wave_p))
-                    if effective_polarity == "positive":
-                        features["height"][idx] = w_max - baseline
-                    else:
-                        features["height"][idx] = baseline - w_min
-                    features["amp"][idx] = w_max - w_min
-
-                if use_normalized_signal and signal_c is not None and signal_c.size > 0:
-                    features["area"][idx] = float(np.sum(signal_c.astype(np.float64, copy=False)))
-                elif wave_c.size > 0:
-                    wave_c64 = wave_c.astype(np.float64)
-                    baseline64 = np.asarray(baseline, dtype=np.float64)
-                    if effective_polarity == "positive":
-                        features["area"][idx] = float(np.sum(wave_c64 - baseline64))
-                    else:
-                        features["area"][idx] = float(np.sum(baseline64 - wave_c64))
-
-                if wave.size > 1:
-                    diff = np.diff(wave.astype(np.float64, copy=False))
-                    features["max_abs_diff"][idx] = float(np.max(np.abs(diff)))
-
-                features["timestamp"][idx] = int(rec["timestamp"])
-                features["board"][idx] = board
-                features["channel"][idx] = ch
-                features["event_index"][idx] = idx
+            features["timestamp"] = records["timestamp"]
+            features["board"] = boards
+            features["channel"] = channels
+            features["event_index"] = wave_input.row_offset + np.arange(n_events)
             return features
 
         waveform_data = wave_input.waveform_data
@@ -200,79 +281,80 @@ class BasicFeaturesPlugin(Plugin):
         if len(waveform_data) == 0:
             return np.zeros(0, dtype=BASIC_FEATURES_DTYPE)
 
-        waves = waveform_data["wave"]
-        baselines = waveform_data["baseline"].copy()
-        timestamps = waveform_data["timestamp"]
-        boards = (
-            waveform_data["board"]
-            if "board" in waveform_data.dtype.names
-            else np.zeros(len(waveform_data), dtype=np.int16)
-        )
+        names = waveform_data.dtype.names
+        n_events = len(waveform_data)
+        boards = waveform_data["board"] if "board" in names else np.zeros(n_events, dtype=np.int16)
         channels = (
-            waveform_data["channel"]
-            if "channel" in waveform_data.dtype.names
-            else np.zeros(len(waveform_data), dtype="i2")
+            waveform_data["channel"] if "channel" in names else np.zeros(n_events, dtype="i2")
         )
-        n_events = len(waveform_data)
-
-        # 计算 height/amp/area；极性可由 metadata 按通道覆盖。
-        height_vals = np.zeros(n_events, dtype=np.float32)
-        amp_vals = np.zeros(n_events, dtype=np.float32)
-        area_vals = np.zeros(n_events, dtype=np.float32)
-        max_abs_diff_vals = np.zeros(n_events, dtype=np.float32)
-
-        for idx in range(n_events):
-            wave = waves[idx]
-            baseline = float(baselines[idx])
-            board = int(boards[idx])
-            ch = int(channels[idx])
-            effective_rule = resolve_effective_channel_config(
-                context=context,
-                plugin=self,
-                run_id=run_id,
-                board=board,
-                channel=ch,
-                base_values={"fixed_baseline": None},
-                channel_config=channel_config_cfg,
-            ).values
-            fixed_baseline = effective_rule.get("fixed_baseline")
-            if fixed_baseline is not None:
-                baseline = float(fixed_baseline)
-            effective_polarity = (
-                str(waveform_data["polarity"][idx])
-                if "polarity" in waveform_data.dtype.names
-                else "negative"
-            )
-
-            wave_p = wave[start_p:end_p]
-            if wave_p.size > 0:
-                w_min = float(np.min(wave_p))
-                w_max = float(np.max(wave_p))
-                if effective_polarity == "positive":
-                    height_vals[idx] = w_max - baseline
-                else:
-                    height_vals[idx] = baseline - w_min
-                amp_vals[idx] = w_max - w_min
-
-            wave_c = wave[start_c:end_c].astype(np.float64, copy=False)
-            if wave_c.size > 0:
-                if effective_polarity == "positive":
-                    area_vals[idx] = float(np.sum(wave_c - baseline))
-                else:
-                    area_vals[idx] = float(np.sum(baseline - wave_c))
-            if wave.size > 1:
-                diff = np.diff(wave.astype(np.float64, copy=False))
-                max_abs_diff_vals[idx] = float(np.max(np.abs(diff)))
+        baselines = self._resolve_baselines(
+            context, run_id, boards, channels, waveform_data["baseline"], channel_config_cfg
+        )
+        # 极性可由 metadata 按通道覆盖；非 positive 一律按 negative 计算
+        if "polarity" in names:
+            positive = encode_polarity(waveform_data["polarity"]) == POLARITY_POSITIVE
+        else:
+            positive = np.zeros(n_events, dtype=bool)
 
         # 构建输出（包含元数据）
         features = np.zeros(n_events, dtype=BASIC_FEATURES_DTYPE)
-        features["height"] = height_vals
-        features["amp"] = amp_vals
-        features["area"] = area_vals
-        features["max_abs_diff"] = max_abs_diff_vals
-        features["timestamp"] = timestamps
+        packed = wave_input.packed
+        if packed is not None:
+            # packed 布局：直接在波形池上按有效长度计算，不物化填充
+            _fill_pooled_features(
+                features,
+                packed.offsets,
+                packed.lengths,
+                packed.pool,
+                baselines,
+                np.where(positive, _RAW_POSITIVE, _RAW_NEGATIVE),
+                height_slice,
+                area_slice,
+            )
+        else:
+            waves_all = waveform_data["wave"]
+            wave_length = int(waves_all.shape[1]) if waves_all.ndim > 1 else 0
+            for mode, selected in ((_RAW_POSITIVE, positive), (_RAW_NEGATIVE, ~positive)):
+                group = np.flatnonzero(selected)
+                for rows in _iter_row_chunks(group, wave_length):
+                    _fill_block_features(
+                        features,
+                        rows,
+                        waves_all[rows],
+                        baselines[rows],
+                        mode,
+                        height_slice,
+                        area_slice,
+                    )
+
+        features["timestamp"] = waveform_data["timestamp"]
         features["board"] = boards
         features["channel"] = channels
-        features["event_index"] = np.arange(n_events)
+        features["event_index"] = wave_input.row_offset + np.arange(n_events)
 
         return features
+
+    def _resolve_baselines(
+        self,
+        context: Any,
+        run_id: str,
+        boards: np.ndarray,
+        channels: np.ndarray,
+        baselines: np.ndarray,
+        channel_config_cfg: Any,
+    ) -> np.ndarray:
+        """Per-event baseline with channel_config fixed_baseline overrides (resolved per channel)."""
+        resolved = np.asarray(baselines, dtype=np.float64).copy()
+        for hw_channel, indices in group_indices_by_hardware_channel(boards, channels).items():
+            fixed_baseline = resolve_effective_channel_config(
+                context=context,
+                plugin=self,
+                run_id=run_id,
+                board=hw_channel.board,
+                channel=hw_channel.channel,
+                base_values={"fixed_baseline": None},
+                channel_config=channel_config_cfg,
+            ).values.get("fixed_baseline")
+            if fixed_baseline is not None:
+                resolved[indices] = float(fixed_baseline)
+        return resolved
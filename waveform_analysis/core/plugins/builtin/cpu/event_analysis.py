@@ -4,6 +4,9 @@ Event Analysis Plugins - 事件分组与配对插件
 **加速器**: CPU (NumPy/Numba)
 **功能**: 多通道事件的时间窗口分组和符合配对
 
+分组插件输出列式 EventTable（标量事件列 + 扁平 hit 列），以 memmap 缓存；
+需要数组列 DataFrame 时调用 ``.to_pandas()``。
+
 本模块包含三个相关的事件分析插件：
 - GroupedEventsPlugin: 按时间窗口分组多通道事件
 - HitGroupedPlugin: 按 hit 窗口分组多通道 hit_merged 事件
@@ -26,6 +29,7 @@ class GroupedEventsPlugin(Plugin):
     provides = "df_events"
     depends_on = ["df"]
     description = "Group events across channels within a configurable time window."
+    version = "0.1.0"
     save_when = "always"
     options = {
         "time_window_ns": Option(default=100.0, type=float),
@@ -44,11 +48,11 @@ class GroupedEventsPlugin(Plugin):
             **kwargs: 依赖数据，包含 df
 
         Returns:
-            pd.DataFrame: 分组后的事件
+            EventTable: 分组后的事件（列式，``.to_pandas()`` 得到 DataFrame）
 
         Examples:
             >>> df_events = ctx.get_data('run_001', 'df_events')
-            >>> print(f"事件组数: {df_events['event_id'].nunique()}")
+            >>> print(f"事件组数: {len(df_events)}")
         """
         from waveform_analysis.core.processing.analyzer import EventAnalyzer
 
@@ -63,7 +67,9 @@ class GroupedEventsPlugin(Plugin):
         # 从context配置中获取优化参数（如果存在）
         use_numba = context.config.get("use_numba", True)
         n_processes = context.config.get("n_processes", None)
-        return analyzer.group_events(df, tw, use_numba=use_numba, n_processes=n_processes)
+        return analyzer.group_events(
+            df, tw, use_numba=use_numba, n_processes=n_processes, as_table=True
+        )
 
 
 class HitGroupedPlugin(Plugin):
@@ -72,7 +78,7 @@ class HitGroupedPlugin(Plugin):
     provides = "hit_grouped"
     depends_on = ["hit_merged", "hit_merged_components", "hit_threshold"]
     description = "Group merged hits across channels into event-level coincidence windows."
-    version = "0.5.0"
+    version = "0.6.0"
     save_when = "always"
     options = {
         "time_window_ns": Option(default=100.0, type=float),
@@ -103,6 +109,7 @@ class HitGroupedPlugin(Plugin):
             dt_values=dt_values,
             component_rows=component_rows,
             component_hits=component_hits,
+            as_table=True,
         )
 
 
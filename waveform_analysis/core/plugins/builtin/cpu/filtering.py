@@ -5,29 +5,48 @@ CPU Filtering Plugin - 使用 scipy 进行波形滤波
 **功能**: 波形滤波（Butterworth 带通滤波、Savitzky-Golay 滤波）
 
 本模块提供共享的滤波执行层，同时服务：
-- `filtered_waveforms`：结构化数组输出，`wave` 字段为 float32
+- `filtered_waveforms`：结构化数组输出，`wave` 字段为 float32；
+  packed 布局的 st_waveforms 输入时输出 float32 波形池的 PackedWaveforms
 - `wave_pool_filtered`：records-backed float32 波形池
+
+波形池路径（filter_wave_pool）按硬件通道把等长的记录段收集成二维块向量化滤波，
+结果直接写入输出池（缓存暂存 memmap）；可选进程池时 worker 通过文件映射或
+共享内存读取输入，不为每个任务复制波形池。
 """
 
 from __future__ import annotations
 
 from collections.abc import Mapping
+from dataclasses import dataclass
 import logging
+import os
 from typing import Any
 
 import numpy as np
 from scipy.signal import butter, savgol_filter, sosfiltfilt
 
+from waveform_analysis.core.execution.shm_transport import (
+    SharedArrayRef,
+    attach_array,
+    ensure_resource_tracker,
+    release_shared,
+    share_array,
+)
+from waveform_analysis.core.execution.worker_pools import get_worker_pools
 from waveform_analysis.core.hardware.channel import (
     group_indices_by_hardware_channel,
     resolve_effective_channel_config,
 )
 from waveform_analysis.core.plugins.core.base import Option, Plugin
 from waveform_analysis.core.processing.dtypes import ST_WAVEFORM_DTYPE
+from waveform_analysis.core.processing.packed_waveforms import PackedWaveforms
 
 logger = logging.getLogger(__name__)
 BatchSelector = slice | np.ndarray
 FILTER_ENGINE_VERSION = "3.0.0"
+# 波形池分块滤波：单个二维块的样本上限，以及并行时单个任务的样本数上限
+_FILTER_BLOCK_CELLS = 1 << 21
+_FILTER_TASK_SAMPLES = 1 << 24
 FILTER_OPTION_NAMES = (
     "filter_type",
     "lowcut",
@@ -374,37 +393,268 @@ def build_filter_batches(
     return planned
 
 
-def filter_wave_pool_batch(args) -> list[tuple[int, np.ndarray]]:
-    """Apply one channel-scoped filter config to a batch of records-backed waves."""
-    records, wave_pool, selector, filter_type, bw_sos, sg_window_size, sg_poly_order = args
-    filtered_segments: list[tuple[int, np.ndarray]] = []
-    for idx in _selector_to_indices(selector):
-        rec = records[int(idx)]
-        length = int(rec["event_length"])
-        if length <= 0:
-            continue
-        offset = int(rec["wave_offset"])
-        end = offset + length
-        if offset < 0 or end > len(wave_pool):
-            raise ValueError(
-                "wave_pool_filtered found out-of-bounds wave slice "
-                f"(offset={offset}, length={length}, wave_pool_size={len(wave_pool)})"
+@dataclass(frozen=True)
+class _MemmapRef:
+    """文件支撑数组的描述符：worker 进程按文件重新映射，不复制数据。"""
+
+    filename: str
+    dtype: np.dtype
+    shape: tuple[int, ...]
+    offset: int
+    mode: str
+
+
+def _memmap_ref(arr: np.ndarray, mode: str) -> _MemmapRef | None:
+    """若 arr 是完整覆盖某个 memmap 文件区间的连续视图，返回其描述符。"""
+    base = arr
+    while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+        base = base.base
+    filename = getattr(base, "filename", None)
+    if not filename or not arr.flags.c_contiguous:
+        return None
+    offset = int(getattr(base, "offset", 0)) + (arr.ctypes.data - base.ctypes.data)
+    return _MemmapRef(str(filename), arr.dtype, tuple(arr.shape), offset, mode)
+
+
+def _open_pool(ref: Any) -> tuple[Any, np.ndarray]:
+    """在 worker 中打开波形池：memmap 描述符重新映射，共享内存描述符零拷贝 attach。"""
+    if isinstance(ref, _MemmapRef):
+        return None, np.memmap(
+            ref.filename, dtype=ref.dtype, mode=ref.mode, shape=ref.shape, offset=ref.offset
+        )
+    if isinstance(ref, SharedArrayRef):
+        return attach_array(ref)
+    return None, ref
+
+
+def filter_wave_pool_block(
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    wave_pool: np.ndarray,
+    out: np.ndarray,
+    filter_type: str,
+    bw_sos: np.ndarray | None = None,
+    sg_window_size: int | None = None,
+    sg_poly_order: int | None = None,
+) -> int:
+    """
+    滤波一组记录的波形段并直接写入 out（与 wave_pool 同址）。
+
+    等长的段被收集为 (rows, length) 二维块，沿 axis=1 一次调用
+    sosfiltfilt / savgol_filter；每块不超过 _FILTER_BLOCK_CELLS 个样本。
+    返回写入的样本数。
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    keep = lengths > 0
+    if not keep.all():
+        offsets = offsets[keep]
+        lengths = lengths[keep]
+    if offsets.size == 0:
+        return 0
+    ends = offsets + lengths
+    if int(offsets.min()) < 0 or int(ends.max()) > len(wave_pool):
+        bad = int(np.flatnonzero((offsets < 0) | (ends > len(wave_pool)))[0])
+        raise ValueError(
+            "wave_pool_filtered found out-of-bounds wave slice "
+            f"(offset={int(offsets[bad])}, length={int(lengths[bad])}, "
+            f"wave_pool_size={len(wave_pool)})"
+        )
+
+    order = np.argsort(lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    bounds = np.flatnonzero(np.diff(sorted_lengths)) + 1
+    group_starts = np.r_[0, bounds]
+    group_stops = np.r_[bounds, sorted_lengths.size]
+    for g_start, g_stop in zip(group_starts, group_stops, strict=False):
+        length = int(sorted_lengths[g_start])
+        cols = np.arange(length, dtype=np.int64)
+        rows_per_block = max(1, _FILTER_BLOCK_CELLS // length)
+        for b_start in range(int(g_start), int(g_stop), rows_per_block):
+            rows = order[b_start : min(b_start + rows_per_block, int(g_stop))]
+            index = offsets[rows, None] + cols[None, :]
+            block = np.asarray(wave_pool[index], dtype=np.float32)
+            filtered = _apply_filter_core(
+                block,
+                filter_type,
+                bw_sos=bw_sos,
+                sg_window_size=sg_window_size,
+                sg_poly_order=sg_poly_order,
             )
-        raw_wave = wave_pool[offset:end]
-        filtered_wave = apply_filter_to_record_wave(
-            raw_wave,
+            out[index] = filtered
+    return int(lengths.sum())
+
+
+def filter_wave_pool_batch(args) -> int:
+    """Apply one channel-scoped filter config to a batch of records-backed waves.
+
+    ``args`` 为 (offsets, lengths, wave_pool, out, filter_type, bw_sos,
+    sg_window_size, sg_poly_order)；wave_pool / out 可以是数组本身，也可以是
+    进程池使用的 memmap 或共享内存描述符。
+    """
+    offsets, lengths, pool_ref, out_ref, filter_type, bw_sos, sg_window_size, sg_poly_order = args
+    pool_shm, wave_pool = _open_pool(pool_ref)
+    _, out = _open_pool(out_ref)
+    try:
+        written = filter_wave_pool_block(
+            offsets,
+            lengths,
+            wave_pool,
+            out,
             filter_type,
             bw_sos=bw_sos,
             sg_window_size=sg_window_size,
             sg_poly_order=sg_poly_order,
         )
-        if filtered_wave.shape[0] != length:
-            raise ValueError(
-                "wave_pool_filtered produced mismatched waveform length "
-                f"for offset={offset}: expected {length}, got {filtered_wave.shape[0]}"
+        if isinstance(out, np.memmap) and out_ref is not out:
+            out.flush()
+    finally:
+        del wave_pool, out
+        release_shared(pool_shm)
+    return written
+
+
+def _split_by_samples(
+    indices: np.ndarray, lengths: np.ndarray, max_samples: int
+) -> list[np.ndarray]:
+    """把记录行号按累计样本数切分为若干任务（滤波逐记录独立，切分不改变结果）。"""
+    if indices.size == 0:
+        return []
+    cumulative = np.cumsum(lengths[indices])
+    task_ids = (cumulative - 1) // max(1, max_samples)
+    cuts = np.flatnonzero(np.diff(task_ids)) + 1
+    return np.split(indices, cuts)
+
+
+def filter_wave_pool(
+    context: Any,
+    plugin: Plugin,
+    run_id: str,
+    records: np.ndarray,
+    wave_pool: np.ndarray,
+    executor_name: str = "wave_pool_filtered",
+    data_name: str | None = None,
+) -> np.ndarray:
+    """
+    按 records 的 (wave_offset, event_length) 分块滤波整个波形池。
+
+    滤波参数按硬件通道解析（plugin 的 filter 选项与 channel_config），
+    每个通道内等长的段组成二维块向量化滤波，结果直接写入与 wave_pool
+    等长的 float32 输出池；不属于任何记录的样本保持为 0。
+
+    Args:
+        data_name: 结果将以该数据名缓存时传入，输出池直接分配在缓存暂存文件上
+            （memmap），保存阶段只需重命名，内存中不会同时存在两份完整波形池
+    """
+    n_samples = len(wave_pool)
+    if len(records) == 0 or n_samples == 0:
+        return np.zeros(n_samples, dtype=np.float32)
+
+    names = records.dtype.names
+    boards = records["board"] if "board" in names else np.zeros(len(records), dtype=np.int16)
+    channels = records["channel"] if "channel" in names else np.zeros(len(records), dtype=np.int16)
+
+    batch_size = int(context.get_config(plugin, "batch_size"))
+    if batch_size < 0:
+        raise ValueError(f"batch_size ({batch_size}) 必须大于等于 0")
+
+    filter_batches = build_filter_batches(context, plugin, run_id, boards, channels, batch_size)
+    if not filter_batches:
+        return np.zeros(n_samples, dtype=np.float32)
+
+    max_workers = context.get_config(plugin, "max_workers")
+    allow_parallel = max_workers is None or (isinstance(max_workers, int) and max_workers > 1)
+    use_process_pool = bool(
+        "use_process_pool" in getattr(plugin, "options", {})
+        and context.get_config(plugin, "use_process_pool")
+    )
+
+    offsets = records["wave_offset"].astype(np.int64, copy=False)
+    lengths = records["event_length"].astype(np.int64, copy=False)
+    # 每个通道批次再按样本数切分为任务，使单通道的 run 也能在多核上并行
+    planned: list[tuple[np.ndarray, dict[str, Any]]] = []
+    for _channel, batch_selector, filter_config in filter_batches:
+        indices = _selector_to_indices(batch_selector)
+        planned.extend(
+            (task_indices, filter_config)
+            for task_indices in _split_by_samples(indices, lengths, _FILTER_TASK_SAMPLES)
+        )
+    use_parallel = allow_parallel and len(planned) > 1
+    use_process_pool = use_process_pool and use_parallel
+
+    output_path = None
+    staged = False
+    if data_name is not None or use_process_pool:
+        from waveform_analysis.core.plugins.builtin.cpu.waveforms import staged_output_path
+
+        output_path, staged = staged_output_path(context, run_id, data_name)
+        filtered_pool = np.memmap(output_path, dtype=np.float32, mode="w+", shape=(n_samples,))
+    else:
+        filtered_pool = np.zeros(n_samples, dtype=np.float32)
+
+    pool_shm = None
+    try:
+        pool_ref: Any = wave_pool
+        out_ref: Any = filtered_pool
+        if use_process_pool:
+            # worker 直接映射输入/输出文件；非文件支撑的输入复制一次到共享内存
+            out_ref = _memmap_ref(filtered_pool, "r+")
+            pool_ref = _memmap_ref(wave_pool, "r")
+            if pool_ref is None:
+                ensure_resource_tracker()
+                pool_shm, pool_ref = share_array(wave_pool)
+
+        tasks = [
+            (
+                offsets[task_indices],
+                lengths[task_indices],
+                pool_ref,
+                out_ref,
+                filter_config["filter_type"],
+                filter_config["bw_sos"],
+                filter_config["sg_window_size"],
+                filter_config["sg_poly_order"],
+            )
+            for task_indices, filter_config in planned
+        ]
+        logger.debug(
+            "波形池分块滤波: tasks=%s max_workers=%s process_pool=%s",
+            len(tasks),
+            max_workers,
+            use_process_pool,
+        )
+        if use_parallel:
+            get_worker_pools(context).map(
+                filter_wave_pool_batch,
+                tasks,
+                name=executor_name,
+                executor_type="process" if use_process_pool else "thread",
+                max_workers=max_workers,
             )
-        filtered_segments.append((offset, filtered_wave.astype(np.float32, copy=False)))
-    return filtered_segments
+        else:
+            for task in tasks:
+                filter_wave_pool_batch(task)
+    except BaseException:
+        if output_path is not None:
+            del filtered_pool
+            _unlink_quietly(output_path)
+        raise
+    finally:
+        release_shared(pool_shm, unlink=True)
+
+    if output_path is not None:
+        filtered_pool.flush()
+        if not staged:
+            # 映射建立后即可删除临时文件（POSIX 下数据在 memmap 释放前保持可用）
+            _unlink_quietly(output_path)
+    return filtered_pool
+
+
+def _unlink_quietly(path: Any) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
 
 
 class FilteredWaveformsPlugin(Plugin):
@@ -441,8 +691,20 @@ class FilteredWaveformsPlugin(Plugin):
         ),
     }
 
-    def compute(self, context: Any, run_id: str, **_kwargs) -> np.ndarray:
+    def compute(self, context: Any, run_id: str, **_kwargs) -> np.ndarray | PackedWaveforms:
         st_waveforms = context.get_data(run_id, "st_waveforms")
+        if isinstance(st_waveforms, PackedWaveforms):
+            # packed 输入：逐记录滤波波形池，只处理有效样本，输出同样为 packed
+            events = st_waveforms.events
+            filtered_pool = filter_wave_pool(
+                context,
+                self,
+                run_id,
+                events,
+                st_waveforms.pool,
+                executor_name="filtered_waveforms",
+            )
+            return PackedWaveforms(np.array(events), filtered_pool)
         if not isinstance(st_waveforms, np.ndarray):
             raise ValueError("filtered_waveforms expects st_waveforms as a single structured array")
 
@@ -484,8 +746,6 @@ class FilteredWaveformsPlugin(Plugin):
         use_parallel = allow_parallel and len(filter_batches) > 1
 
         if use_parallel:
-            from waveform_analysis.core.execution.manager import parallel_map
-
             tasks = [
                 (
                     waves,
@@ -503,12 +763,11 @@ class FilteredWaveformsPlugin(Plugin):
                 max_workers,
                 batch_size,
             )
-            results = parallel_map(
+            results = get_worker_pools(context).map(
                 _filter_channel,
                 tasks,
-                executor_type="thread",
+                name="filtered_waveforms",
                 max_workers=max_workers,
-                executor_name="filtered_waveforms",
             )
             for (_channel, batch_selector, _filter_config), filtered_f32 in zip(
                 filter_batches, results, strict=False
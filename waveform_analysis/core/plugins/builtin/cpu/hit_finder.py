@@ -11,6 +11,7 @@ import warnings
 
 import numpy as np
 
+from waveform_analysis.core.data.record_index import record_index
 from waveform_analysis.core.hardware.channel import resolve_effective_channel_config
 from waveform_analysis.core.plugins.builtin.cpu._dt_compat import (
     require_dt_array,
@@ -28,7 +29,13 @@ from waveform_analysis.core.plugins.builtin.cpu.peak_finding import (
     HitFinderPlugin as _CanonicalHitFinderPlugin,
 )
 from waveform_analysis.core.plugins.core.base import Option, Plugin
+from waveform_analysis.core.processing.dtypes import (
+    POLARITY_POSITIVE,
+    POLARITY_UNKNOWN,
+    encode_polarity,
+)
 from waveform_analysis.core.processing.event_grouping import find_hits
+from waveform_analysis.core.processing.incremental import IncrementalUpdate
 
 THRESHOLD_HIT_DTYPE = np.dtype(
     [
@@ -48,12 +55,10 @@ THRESHOLD_HIT_DTYPE = np.dtype(
     ]
 )
 
-
-def _build_record_lookup(records: np.ndarray) -> dict[int, tuple[int, int]]:
-    return {
-        int(rec["record_id"]): (int(rec["wave_offset"]), int(rec["event_length"]))
-        for rec in records
-    }
+# 每个信号块的最大采样数：按行分块构建 padded 信号矩阵，限制峰值内存
+_HIT_BLOCK_SAMPLES = 1 << 20
+# 单批分段归约展开的最大采样数
+_HIT_GATHER_SAMPLES = 1 << 22
 
 
 def _resolve_source_event_lengths(waveform_data: np.ndarray) -> np.ndarray:
@@ -65,6 +70,41 @@ def _resolve_source_event_lengths(waveform_data: np.ndarray) -> np.ndarray:
     raise ValueError("waveform source is missing both 'event_length' and 'wave' fields")
 
 
+def _segment_peak_reductions(
+    flat: np.ndarray, offsets: np.ndarray, lengths: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    对扁平信号上的 (offset, length) 分段批量计算 (argmax 相对位置, 峰高, 正值积分)。
+
+    分段之间可以重叠（左右扩展），因此先展开成连续的 gather 数组再用 reduceat 归约；
+    展开长度按 _HIT_GATHER_SAMPLES 分批，argmax 与 np.argmax 一致取首个最大值（NaN 优先）。
+    """
+    n_segments = len(lengths)
+    positions = np.zeros(n_segments, dtype=np.int64)
+    heights = np.zeros(n_segments, dtype=np.float64)
+    integrals = np.zeros(n_segments, dtype=np.float64)
+    cum = np.cumsum(lengths)
+    begin = 0
+    while begin < n_segments:
+        base = int(cum[begin - 1]) if begin else 0
+        end = int(np.searchsorted(cum, base + _HIT_GATHER_SAMPLES, side="right"))
+        end = max(end, begin + 1)
+        seg_lengths = lengths[begin:end]
+        seg_heads = cum[begin:end] - seg_lengths - base
+        total = int(cum[end - 1]) - base
+        rel = np.arange(total, dtype=np.int64) - np.repeat(seg_heads, seg_lengths)
+        values = flat[np.repeat(offsets[begin:end], seg_lengths) + rel]
+
+        maxima = np.maximum.reduceat(values, seg_heads)
+        is_max = (values == np.repeat(maxima, seg_lengths)) | np.isnan(values)
+        first = np.minimum.reduceat(np.where(is_max, rel, total), seg_heads)
+        positions[begin:end] = first
+        heights[begin:end] = values[seg_heads + first]
+        integrals[begin:end] = np.add.reduceat(np.maximum(values, 0.0), seg_heads)
+        begin = end
+    return positions, heights, integrals
+
+
 class HitFinderPlugin(_CanonicalHitFinderPlugin):
     """Deprecated import-path alias for peak_finding.HitFinderPlugin."""
 
@@ -120,6 +160,26 @@ class ThresholdHitPlugin(Plugin):
         return list(spec.depends_on)
 
     def compute(self, context: Any, run_id: str, **_kwargs) -> np.ndarray:
+        return self._compute_hits(context, run_id)
+
+    def compute_incremental(
+        self, context: Any, run_id: str, previous: Any, update: IncrementalUpdate
+    ) -> tuple[np.ndarray, int] | None:
+        """
+        hit 按输入行序输出且 record_id 即输入行号：只重新寻找变化/新增行上的 hit，
+        之前的 hit 在第一个 record_id >= stable_rows 处截断。
+        """
+        spec = resolve_wave_input_spec(context, self)
+        if spec.data_name not in update.stable_rows:
+            return None
+        prev_ids = np.asarray(previous["record_id"])
+        if len(prev_ids) > 1 and np.any(np.diff(prev_ids) < 0):
+            return None
+        stable = int(update.stable_rows[spec.data_name])
+        tail = self._compute_hits(context, run_id, start_row=stable)
+        return tail, int(np.searchsorted(prev_ids, stable, side="left"))
+
+    def _compute_hits(self, context: Any, run_id: str, start_row: int = 0) -> np.ndarray:
         threshold = float(context.get_config(self, "threshold"))
         left_extension = max(0, int(context.get_config(self, "left_extension")))
         right_extension = max(0, int(context.get_config(self, "right_extension")))
@@ -127,7 +187,10 @@ class ThresholdHitPlugin(Plugin):
             context, self, deprecated_keys=("sampling_interval_ns", "dt_ns")
         )
         channel_config_cfg = context.get_config(self, "channel_config")
-        wave_input = load_wave_input(context, self, run_id, needs_wave_samples=True)
+        wave_input = load_wave_input(
+            context, self, run_id, needs_wave_samples=True, start_row=start_row
+        )
+        row_offset = wave_input.row_offset
 
         if wave_input.spec.is_records:
             records = wave_input.records
@@ -141,10 +204,8 @@ class ThresholdHitPlugin(Plugin):
             record_ids_for_view = (
                 records["record_id"].astype(np.int64, copy=False)
                 if "record_id" in record_names
-                else np.arange(len(records), dtype=np.int64)
+                else row_offset + np.arange(len(records), dtype=np.int64)
             )
-            waves, valid_mask = rv.waves(record_ids_for_view, mask=True, dtype=np.float64)
-            record_names = records.dtype.names or ()
 
             baselines = records["baseline"].astype(np.float64, copy=False)
             timestamps = records["timestamp"].astype(np.int64, copy=False)
@@ -161,12 +222,10 @@ class ThresholdHitPlugin(Plugin):
             record_ids = (
                 records["record_id"].astype(np.int64, copy=False)
                 if "record_id" in record_names
-                else np.arange(len(records), dtype=np.int64)
+                else row_offset + np.arange(len(records), dtype=np.int64)
             )
             data_polarities = (
-                np.asarray(records["polarity"]).astype("U16", copy=False)
-                if "polarity" in record_names
-                else None
+                encode_polarity(records["polarity"]) if "polarity" in record_names else None
             )
             dt_values = require_dt_array(
                 records,
@@ -175,6 +234,13 @@ class ThresholdHitPlugin(Plugin):
                 data_name="records",
             )
             record_lengths = records["event_length"].astype(np.int64, copy=False)
+            n_samples = int(record_lengths.max())
+
+            def load_waves(rows: slice) -> tuple[np.ndarray, np.ndarray | None]:
+                return rv.waves(
+                    record_ids_for_view[rows], pad_to=n_samples, mask=True, dtype=np.float64
+                )
+
         else:
             waveform_data = wave_input.waveform_data
             if waveform_data is None:
@@ -183,12 +249,17 @@ class ThresholdHitPlugin(Plugin):
                 return np.zeros(0, dtype=THRESHOLD_HIT_DTYPE)
 
             waveform_names = waveform_data.dtype.names or ()
-            waves = np.asarray(waveform_data["wave"]).astype(np.float64, copy=False)
-            valid_mask = None
+            wave_field = waveform_data["wave"]
+            n_samples = int(wave_field.shape[1])
+
+            def load_waves(rows: slice) -> tuple[np.ndarray, np.ndarray | None]:
+                return np.asarray(wave_field[rows]).astype(np.float64, copy=False), None
+
+            # 缺少 baseline 字段时按块用波形均值代替
             baselines = (
                 waveform_data["baseline"].astype(np.float64, copy=False)
                 if "baseline" in waveform_names
-                else waves.mean(axis=1, dtype=np.float64)
+                else None
             )
             timestamps = (
                 waveform_data["timestamp"].astype(np.int64, copy=False)
@@ -208,12 +279,10 @@ class ThresholdHitPlugin(Plugin):
             record_ids = (
                 waveform_data["record_id"].astype(np.int64, copy=False)
                 if "record_id" in waveform_names
-                else np.arange(len(waveform_data), dtype=np.int64)
+                else row_offset + np.arange(len(waveform_data), dtype=np.int64)
             )
             data_polarities = (
-                np.asarray(waveform_data["polarity"]).astype("U16", copy=False)
-                if "polarity" in waveform_names
-                else None
+                encode_polarity(waveform_data["polarity"]) if "polarity" in waveform_names else None
             )
             dt_values = require_dt_array(
                 waveform_data,
@@ -237,22 +306,40 @@ class ThresholdHitPlugin(Plugin):
             channel_config_cfg=channel_config_cfg,
             data_polarities=data_polarities,
         )
-        baseline_2d = baselines[:, np.newaxis]
-        signal = np.where(positive_mask[:, np.newaxis], waves - baseline_2d, baseline_2d - waves)
 
-        return self._build_hits_from_signal_matrix(
-            signal=signal,
-            thresholds=thresholds,
-            timestamps=timestamps,
-            boards=boards,
-            channels=channels,
-            record_ids=record_ids,
-            left_extension=left_extension,
-            right_extension=right_extension,
-            dt_values=dt_values,
-            valid_mask=valid_mask,
-            record_lengths=record_lengths,
-        )
+        # 按行分块：每块只物化 (rows, n_samples) 的信号矩阵，结果按行序拼接
+        n_rows = len(thresholds)
+        rows_per_block = max(1, _HIT_BLOCK_SAMPLES // max(n_samples, 1))
+        hit_blocks = []
+        for begin in range(0, n_rows, rows_per_block):
+            rows = slice(begin, begin + rows_per_block)
+            waves, valid_mask = load_waves(rows)
+            block_baselines = (
+                baselines[rows] if baselines is not None else waves.mean(axis=1, dtype=np.float64)
+            )
+            baseline_2d = block_baselines[:, np.newaxis]
+            signal = np.where(
+                positive_mask[rows, np.newaxis], waves - baseline_2d, baseline_2d - waves
+            )
+            block_hits = self._build_hits_from_signal_matrix(
+                signal=signal,
+                thresholds=thresholds[rows],
+                timestamps=timestamps[rows],
+                boards=boards[rows],
+                channels=channels[rows],
+                record_ids=record_ids[rows],
+                left_extension=left_extension,
+                right_extension=right_extension,
+                dt_values=dt_values[rows],
+                valid_mask=valid_mask,
+                record_lengths=record_lengths[rows],
+            )
+            if len(block_hits):
+                hit_blocks.append(block_hits)
+
+        if not hit_blocks:
+            return np.zeros(0, dtype=THRESHOLD_HIT_DTYPE)
+        return np.concatenate(hit_blocks)
 
     def _resolve_wave_pool_metadata(
         self,
@@ -265,24 +352,22 @@ class ThresholdHitPlugin(Plugin):
 
         bundle = get_records_bundle(context, run_id)
         records = bundle.records
-        lookup = _build_record_lookup(records)
-        wave_offsets = np.zeros(len(record_ids), dtype=np.int64)
-        record_lengths = np.zeros(len(record_ids), dtype=np.int64)
-
-        for idx, record_id in enumerate(record_ids.tolist()):
-            if int(record_id) not in lookup:
-                raise ValueError(
-                    f"hit_threshold could not resolve record_id={int(record_id)} into records/wave_pool"
-                )
-            wave_offset, record_length = lookup[int(record_id)]
-            source_length = int(source_event_lengths[idx])
-            if source_length != int(record_length):
-                raise ValueError(
-                    "hit_threshold waveform source length does not match records/wave_pool length for "
-                    f"record_id={int(record_id)}: source={source_length}, records={int(record_length)}"
-                )
-            wave_offsets[idx] = wave_offset
-            record_lengths[idx] = record_length
+        rows, found = record_index(context, run_id, "records", data=records).lookup(record_ids)
+        if not found.all():
+            missing = int(record_ids[np.argmin(found)])
+            raise ValueError(
+                f"hit_threshold could not resolve record_id={missing} into records/wave_pool"
+            )
+        wave_offsets = records["wave_offset"][rows].astype(np.int64)
+        record_lengths = records["event_length"][rows].astype(np.int64)
+        mismatch = np.flatnonzero(source_event_lengths != record_lengths)
+        if mismatch.size:
+            idx = int(mismatch[0])
+            raise ValueError(
+                "hit_threshold waveform source length does not match records/wave_pool length for "
+                f"record_id={int(record_ids[idx])}: source={int(source_event_lengths[idx])}, "
+                f"records={int(record_lengths[idx])}"
+            )
         return wave_offsets, record_lengths
 
     def _resolve_thresholds(
@@ -321,8 +406,10 @@ class ThresholdHitPlugin(Plugin):
             thresholds[selector] = float(rule.get("threshold", threshold))
 
         if data_polarities is not None:
-            valid_override = np.isin(data_polarities, ("positive", "negative"))
-            positive_mask = np.where(valid_override, data_polarities == "positive", positive_mask)
+            valid_override = data_polarities != POLARITY_UNKNOWN
+            positive_mask = np.where(
+                valid_override, data_polarities == POLARITY_POSITIVE, positive_mask
+            )
 
         return thresholds, positive_mask
 
@@ -360,57 +447,41 @@ class ThresholdHitPlugin(Plugin):
         if not np.array_equal(start_rows, end_rows):
             raise RuntimeError("hit_threshold region alignment failed")
 
-        hits: list[tuple] = []
         n_samples = signal.shape[1]
-
-        for hit_idx, event_idx in enumerate(start_rows.tolist()):
-            start = int(starts[hit_idx])
-            end = int(ends[hit_idx])
-            seg_start = max(0, start - left_extension)
-            seg_end = min(n_samples, end + right_extension)
-            if seg_end <= seg_start:
-                continue
-
-            segment = signal[event_idx, seg_start:seg_end]
-            if segment.size == 0:
-                continue
-
-            rel_pos = int(np.argmax(segment))
-            pos = seg_start + rel_pos
-            height = float(segment[rel_pos])
-            integral = float(np.sum(np.maximum(segment, 0.0)))
-            dt_ns = int(dt_values[event_idx])
-            sampling_interval_ps = float(dt_ns) * 1e3
-            rise_time = float(max(pos - start, 0) * dt_ns)
-            fall_time = float(max((end - 1) - pos, 0) * dt_ns)
-            global_timestamp = int(timestamps[event_idx] + pos * sampling_interval_ps)
-
-            record_length = max(int(record_lengths[event_idx]), 0)
-            edge_start = min(max(seg_start, 0), record_length)
-            edge_end = min(max(seg_end, 0), record_length)
-            edge_end = max(edge_end, edge_start)
-
-            hits.append(
-                (
-                    int(pos),
-                    height,
-                    integral,
-                    edge_start,
-                    edge_end,
-                    float(edge_end - edge_start),
-                    dt_ns,
-                    rise_time,
-                    fall_time,
-                    global_timestamp,
-                    int(boards[event_idx]),
-                    int(channels[event_idx]),
-                    int(record_ids[event_idx]),
-                )
-            )
-
-        if hits:
-            return np.array(hits, dtype=THRESHOLD_HIT_DTYPE)
-        return np.zeros(0, dtype=THRESHOLD_HIT_DTYPE)
+        starts = starts.astype(np.int64, copy=False)
+        ends = ends.astype(np.int64, copy=False)
+        seg_starts = np.maximum(starts - left_extension, 0)
+        seg_ends = np.minimum(ends + right_extension, n_samples)
+        positions, heights, integrals = _segment_peak_reductions(
+            np.ascontiguousarray(signal, dtype=np.float64).reshape(-1),
+            start_rows.astype(np.int64) * n_samples + seg_starts,
+            seg_ends - seg_starts,
+        )
+        positions += seg_starts
+
+        dt_ns = np.asarray(dt_values, dtype=np.int64)[start_rows]
+        record_length = np.maximum(np.asarray(record_lengths, dtype=np.int64)[start_rows], 0)
+        edge_start = np.minimum(seg_starts, record_length)
+        edge_end = np.maximum(np.minimum(seg_ends, record_length), edge_start)
+
+        hits = np.zeros(len(start_rows), dtype=THRESHOLD_HIT_DTYPE)
+        hits["position"] = positions
+        hits["height"] = heights
+        hits["integral"] = integrals
+        hits["edge_start"] = edge_start
+        hits["edge_end"] = edge_end
+        hits["width"] = edge_end - edge_start
+        hits["dt"] = dt_ns
+        hits["rise_time"] = np.maximum(positions - starts, 0) * dt_ns
+        hits["fall_time"] = np.maximum((ends - 1) - positions, 0) * dt_ns
+        hits["timestamp"] = (
+            np.asarray(timestamps, dtype=np.int64)[start_rows]
+            + positions * (dt_ns.astype(np.float64) * 1e3)
+        ).astype(np.int64)
+        hits["board"] = np.asarray(boards)[start_rows]
+        hits["channel"] = np.asarray(channels)[start_rows]
+        hits["record_id"] = np.asarray(record_ids)[start_rows]
+        return hits
 
 
 __all__ = [
@@ -6,7 +6,6 @@ from typing import Any
 
 import numpy as np
 
-from waveform_analysis.core.hardware.channel import group_indices_by_hardware_channel
 from waveform_analysis.core.plugins.builtin.cpu._dt_compat import (
     require_dt_array,
     resolve_dt_config,
@@ -49,10 +48,10 @@ HIT_MERGE_CLUSTERS_DTYPE = np.dtype(
 )
 
 
-def _pick(hit: np.void, *candidates: str) -> Any:
+def _pick_field(hits: np.ndarray, *candidates: str) -> np.ndarray:
     for name in candidates:
-        if name in hit.dtype.names:
-            return hit[name]
+        if name in hits.dtype.names:
+            return hits[name]
     raise KeyError(f"Missing fields {candidates} in HIT_DTYPE")
 
 
@@ -65,261 +64,259 @@ def _resolve_merge_config(context: Any, plugin: Plugin) -> tuple[float, float, i
     return merge_gap_ns, max_total_width_ns, explicit_dt
 
 
-def _build_enriched_hits(
-    hits: np.ndarray,
-    dt_values: np.ndarray,
-    source_indices: np.ndarray,
-) -> list[dict[str, Any]]:
-    enriched: list[dict[str, Any]] = []
-    for hit, dt_ns, source_index in zip(hits, dt_values, source_indices, strict=False):
-        timestamp = float(_pick(hit, "timestamp", "hit_timestamp_ps"))
-        position = float(_pick(hit, "position", "hit_sample_idx"))
-        edge_start = float(_pick(hit, "edge_start", "sample_start", "hit_left_sample_idx"))
-        edge_end = float(_pick(hit, "edge_end", "sample_end", "hit_right_sample_idx"))
-        dt_ps = float(int(dt_ns)) * 1e3
-        abs_start_ps = timestamp + (edge_start - position) * dt_ps
-        abs_end_ps = timestamp + (edge_end - position) * dt_ps
-        enriched.append(
-            {
-                "hit": hit,
-                "source_index": int(source_index),
-                "abs_start_ps": abs_start_ps,
-                "abs_end_ps": abs_end_ps,
-                "dt_ns": int(dt_ns),
-                "dt_ps": dt_ps,
-            }
-        )
-    return enriched
+def _hit_dt(hits: np.ndarray, explicit_dt: int | None, plugin_name: str) -> np.ndarray:
+    return require_dt_array(
+        hits,
+        explicit_dt=explicit_dt,
+        plugin_name=plugin_name,
+        data_name="hit_threshold",
+    )
 
 
-def _resolve_cluster_sample_window(cluster: list[dict[str, Any]]) -> tuple[int, int]:
-    record_ids = {int(item["hit"]["record_id"]) for item in cluster}
-    if len(record_ids) != 1:
-        return -1, -1
+def _absolute_hit_bounds(hits: np.ndarray, dt_ns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """每个 hit 窗口的绝对起止时间（ps）。"""
+    timestamp = _pick_field(hits, "timestamp", "hit_timestamp_ps").astype(np.float64)
+    position = _pick_field(hits, "position", "hit_sample_idx").astype(np.float64)
+    edge_start = _pick_field(hits, "edge_start", "sample_start", "hit_left_sample_idx")
+    edge_end = _pick_field(hits, "edge_end", "sample_end", "hit_right_sample_idx")
+    dt_ps = dt_ns.astype(np.float64) * 1e3
+    abs_start_ps = timestamp + (edge_start.astype(np.float64) - position) * dt_ps
+    abs_end_ps = timestamp + (edge_end.astype(np.float64) - position) * dt_ps
+    return abs_start_ps, abs_end_ps
+
+
+def _segmented_cummax(values: np.ndarray, breaks: np.ndarray) -> np.ndarray:
+    """每段（``breaks`` 为 True 处开始新段）内的累计最大值。"""
+    n = len(values)
+    seg = np.cumsum(breaks) - 1
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order] = np.arange(n, dtype=np.int64)
+    # 段号作为高位：前面段的 key 总小于本段任一元素，累计最大值不会跨段
+    offsets = seg.astype(np.int64) * n
+    return values[order[np.maximum.accumulate(offsets + ranks) - offsets]]
+
+
+def _greedy_cluster_breaks(
+    start_ps: np.ndarray,
+    end_ps: np.ndarray,
+    dt_ps: np.ndarray,
+    merge_gap_ps: float,
+    max_total_width_ps: float,
+) -> np.ndarray:
+    """逐 hit 的贪心链式合并（仅用于触发 max_total_width 截断的段）。"""
+    starts = start_ps.tolist()
+    ends = end_ps.tolist()
+    dts = dt_ps.tolist()
+    breaks = np.zeros(len(starts), dtype=bool)
+    breaks[0] = True
+    cluster_start = starts[0]
+    cluster_end = ends[0]
+    for i in range(1, len(starts)):
+        next_end = max(cluster_end, ends[i])
+        if (
+            dts[i] == dts[i - 1]
+            and starts[i] - cluster_end <= merge_gap_ps
+            and next_end - cluster_start <= max_total_width_ps
+        ):
+            cluster_end = next_end
+        else:
+            breaks[i] = True
+            cluster_start = starts[i]
+            cluster_end = ends[i]
+    return breaks
+
+
+def _cluster_breaks(
+    start_ps: np.ndarray,
+    end_ps: np.ndarray,
+    dt_ps: np.ndarray,
+    channel_breaks: np.ndarray,
+    merge_gap_ns: float,
+    max_total_width_ns: float,
+) -> np.ndarray:
+    """
+    按（硬件通道, 起始时间）排序的 hit 的簇边界（True 表示新簇的第一个 hit）。
 
-    names = set(cluster[0]["hit"].dtype.names or ())
-    if {"sample_start", "sample_end"}.issubset(names):
-        start_name = "sample_start"
-        end_name = "sample_end"
-    elif {"edge_start", "edge_end"}.issubset(names):
-        start_name = "edge_start"
-        end_name = "edge_end"
-    else:
-        return -1, -1
+    通道变化、dt 变化与间隙超限处必然断开：间隙以段内结束时间的累计最大值判定，新增断点
+    后重新计算直至不变。只有簇宽超过 max_total_width 的段需要逐 hit 贪心处理，
+    因为截断会重置簇的起点与结束时间。
+    """
+    n = len(start_ps)
+    if merge_gap_ns <= 0:
+        return np.ones(n, dtype=bool)
 
-    sample_start = min(int(item["hit"][start_name]) for item in cluster)
-    sample_end = max(int(item["hit"][end_name]) for item in cluster)
-    return sample_start, sample_end
+    merge_gap_ps = merge_gap_ns * 1e3
+    max_total_width_ps = max_total_width_ns * 1e3
+    breaks = channel_breaks.copy()
+    breaks[1:] |= dt_ps[1:] != dt_ps[:-1]
+    while True:
+        cluster_end = _segmented_cummax(end_ps, breaks)
+        gap_breaks = ~breaks[1:] & ~(start_ps[1:] - cluster_end[:-1] <= merge_gap_ps)
+        if not gap_breaks.any():
+            break
+        breaks[1:] |= gap_breaks
+
+    seg_starts = np.flatnonzero(breaks)
+    seg = np.cumsum(breaks) - 1
+    too_wide = ~breaks & ~(cluster_end - start_ps[seg_starts][seg] <= max_total_width_ps)
+    if too_wide.any():
+        seg_ends = np.r_[seg_starts[1:], n]
+        for s in np.unique(seg[too_wide]):
+            lo, hi = int(seg_starts[s]), int(seg_ends[s])
+            breaks[lo:hi] = _greedy_cluster_breaks(
+                start_ps[lo:hi],
+                end_ps[lo:hi],
+                dt_ps[lo:hi],
+                merge_gap_ps,
+                max_total_width_ps,
+            )
+    return breaks
 
 
-def _build_merged_clusters(
+def _compute_cluster_rows(
     hits: np.ndarray,
     merge_gap_ns: float,
     max_total_width_ns: float,
     explicit_dt: int | None,
     plugin_name: str,
-) -> list[list[dict[str, Any]]]:
+) -> np.ndarray:
     if len(hits) == 0:
-        return []
+        return np.zeros(0, dtype=HIT_MERGE_CLUSTERS_DTYPE)
 
     if "board" in hits.dtype.names:
-        boards = hits["board"]
+        boards = hits["board"].astype(np.int32)
     else:
-        boards = np.zeros(len(hits), dtype=np.int16)
+        boards = np.zeros(len(hits), dtype=np.int32)
     if "channel" not in hits.dtype.names:
         raise ValueError(f"{plugin_name} requires hit data with a 'channel' field")
-    channels = hits["channel"]
-
-    clusters_out: list[list[dict[str, Any]]] = []
-    merge_gap_ps = merge_gap_ns * 1e3
-    max_total_width_ps = max_total_width_ns * 1e3
-
-    for _hw_channel, indices in group_indices_by_hardware_channel(boards, channels).items():
-        ch_hits = hits[indices]
-        if len(ch_hits) == 0:
-            continue
+    channels = hits["channel"].astype(np.int32)
+
+    dt_ns = _hit_dt(hits, explicit_dt, plugin_name)
+    abs_start_ps, abs_end_ps = _absolute_hit_bounds(hits, dt_ns)
+
+    # 按 (board, channel) 分组、组内按绝对起始时间稳定排序，一次 lexsort 完成
+    order = np.lexsort((abs_start_ps, channels, boards))
+    boards = boards[order]
+    channels = channels[order]
+    channel_breaks = np.ones(len(order), dtype=bool)
+    channel_breaks[1:] = (boards[1:] != boards[:-1]) | (channels[1:] != channels[:-1])
+    breaks = _cluster_breaks(
+        abs_start_ps[order],
+        abs_end_ps[order],
+        dt_ns[order].astype(np.float64) * 1e3,
+        channel_breaks,
+        merge_gap_ns,
+        max_total_width_ns,
+    )
 
-        channel_dt = require_dt_array(
-            ch_hits,
-            explicit_dt=explicit_dt,
-            plugin_name=plugin_name,
-            data_name="hit_threshold[channel]",
-        )
-        enriched = _build_enriched_hits(ch_hits, channel_dt, indices.astype(np.int64, copy=False))
-        order = np.argsort(
-            np.array([x["abs_start_ps"] for x in enriched], dtype=np.float64),
-            kind="mergesort",
-        )
-        enriched = [enriched[i] for i in order]
-
-        cluster: list[dict[str, Any]] = [enriched[0]]
-        cluster_start = enriched[0]["abs_start_ps"]
-        cluster_end = enriched[0]["abs_end_ps"]
-
-        for item in enriched[1:]:
-            gap_ps = item["abs_start_ps"] - cluster_end
-            next_end = max(cluster_end, item["abs_end_ps"])
-            total_width_ps = next_end - cluster_start
-            same_dt = item["dt_ps"] == cluster[-1]["dt_ps"]
-
-            if (
-                merge_gap_ns > 0
-                and same_dt
-                and gap_ps <= merge_gap_ps
-                and total_width_ps <= max_total_width_ps
-            ):
-                cluster.append(item)
-                cluster_end = next_end
-            else:
-                clusters_out.append(cluster)
-                cluster = [item]
-                cluster_start = item["abs_start_ps"]
-                cluster_end = item["abs_end_ps"]
-
-        clusters_out.append(cluster)
-
-    return clusters_out
-
-
-def _build_cluster_rows(clusters: list[list[dict[str, Any]]]) -> np.ndarray:
-    cluster_rows: list[tuple[int, int]] = []
-    for cluster_index, cluster in enumerate(clusters):
-        for item in cluster:
-            cluster_rows.append((cluster_index, int(item["source_index"])))
-    if cluster_rows:
-        return np.array(cluster_rows, dtype=HIT_MERGE_CLUSTERS_DTYPE)
-    return np.zeros(0, dtype=HIT_MERGE_CLUSTERS_DTYPE)
-
-
-def _build_enriched_lookup(
-    hits: np.ndarray,
-    explicit_dt: int | None,
-    plugin_name: str,
-) -> dict[int, dict[str, Any]]:
-    if len(hits) == 0:
-        return {}
+    rows = np.zeros(len(hits), dtype=HIT_MERGE_CLUSTERS_DTYPE)
+    rows["cluster_index"] = np.cumsum(breaks) - 1
+    rows["hit_index"] = order
+    return rows
 
-    if "board" in hits.dtype.names:
-        boards = hits["board"]
-    else:
-        boards = np.zeros(len(hits), dtype=np.int16)
-    channels = hits["channel"]
-
-    enriched_lookup: dict[int, dict[str, Any]] = {}
-    for _hw_channel, indices in group_indices_by_hardware_channel(boards, channels).items():
-        ch_hits = hits[indices]
-        if len(ch_hits) == 0:
-            continue
-        channel_dt = require_dt_array(
-            ch_hits,
-            explicit_dt=explicit_dt,
-            plugin_name=plugin_name,
-            data_name="hit_threshold[channel]",
-        )
-        enriched = _build_enriched_hits(ch_hits, channel_dt, indices.astype(np.int64, copy=False))
-        for item in enriched:
-            enriched_lookup[int(item["source_index"])] = item
-    return enriched_lookup
 
+def _cluster_bounds(cluster_rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (offsets, counts) of the clusters in ``cluster_rows``.
 
-def _cluster_bounds(cluster_rows: np.ndarray) -> list[tuple[int, int, int]]:
+    Raises ValueError unless the rows are grouped by cluster_index 0, 1, 2, ...
+    """
     if len(cluster_rows) == 0:
-        return []
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
 
     cluster_indices = np.asarray(cluster_rows["cluster_index"], dtype=np.int64)
-    boundaries = np.flatnonzero(np.diff(cluster_indices) != 0) + 1
-    starts = np.concatenate(([0], boundaries))
-    ends = np.concatenate((boundaries, [len(cluster_rows)]))
-    return [
-        (int(cluster_indices[start]), int(start), int(end))
-        for start, end in zip(starts, ends, strict=False)
-    ]
+    offsets = np.flatnonzero(np.r_[True, cluster_indices[1:] != cluster_indices[:-1]])
+    if not np.array_equal(cluster_indices[offsets], np.arange(len(offsets))):
+        raise ValueError("hit_merge_clusters rows are not ordered by cluster_index without gaps")
+    counts = np.diff(np.r_[offsets, len(cluster_rows)])
+    return offsets, counts
 
 
-def _compute_cluster_rows(
+def _emit_merged(
     hits: np.ndarray,
-    merge_gap_ns: float,
-    max_total_width_ns: float,
-    explicit_dt: int | None,
-    plugin_name: str,
+    cluster_rows: np.ndarray,
+    dt_ns: np.ndarray,
 ) -> np.ndarray:
-    clusters = _build_merged_clusters(
-        hits,
-        merge_gap_ns=merge_gap_ns,
-        max_total_width_ns=max_total_width_ns,
-        explicit_dt=explicit_dt,
-        plugin_name=plugin_name,
+    """
+    Reduce cluster membership rows to one HIT_MERGED_DTYPE row per cluster.
+
+    The anchor hit (highest, then earliest, then first in cluster order) supplies
+    position/dt/rise/fall/timestamp/board/channel/record_id; height is the cluster max,
+    integral the sum, and the sample window spans the members when they share one record
+    (-1 otherwise). Single-hit clusters copy their hit unchanged.
+    """
+    offsets, counts = _cluster_bounds(cluster_rows)
+    out = np.zeros(len(offsets), dtype=HIT_MERGED_DTYPE)
+    if len(offsets) == 0:
+        return out
+
+    names = hits.dtype.names
+    members = np.asarray(cluster_rows["hit_index"], dtype=np.int64)
+    cluster_of = np.repeat(np.arange(len(offsets)), counts)
+    heights = hits["height"][members].astype(np.float64)
+    max_heights = np.maximum.reduceat(heights, offsets)
+    # 锚点：簇内最高的 hit；等高时取时间戳最早者，再按簇内顺序取第一个
+    candidates = heights == max_heights[cluster_of]
+    timestamps = hits["timestamp"][members].astype(np.int64)
+    earliest = np.minimum.reduceat(
+        np.where(candidates, timestamps, np.iinfo(np.int64).max), offsets
     )
-    return _build_cluster_rows(clusters)
-
-
-def _emit_cluster(
-    cluster: list[dict[str, Any]],
-    cluster_start_ps: float,
-    cluster_end_ps: float,
-    dt_ps: float,
-    component_offset: int,
-) -> tuple:
-    component_count = len(cluster)
-    sample_start_window, sample_end_window = _resolve_cluster_sample_window(cluster)
-
-    if len(cluster) == 1:
-        h = cluster[0]["hit"]
-        return (
-            int(h["position"]),
-            float(h["height"]),
-            float(h["integral"]),
-            int(_pick(h, "sample_start", "edge_start")),
-            int(_pick(h, "sample_end", "edge_end")),
-            float(h["width"]),
-            int(h["dt"]) if "dt" in h.dtype.names else int(cluster[0]["dt_ns"]),
-            float(h["rise_time"]) if "rise_time" in h.dtype.names else 0.0,
-            float(h["fall_time"]) if "fall_time" in h.dtype.names else 0.0,
-            int(h["timestamp"]),
-            int(h["board"]) if "board" in h.dtype.names else 0,
-            int(h["channel"]),
-            int(h["record_id"]),
-            component_offset,
-            component_count,
-        )
-
-    heights = np.array([float(x["hit"]["height"]) for x in cluster], dtype=np.float64)
-    max_h = float(np.max(heights))
-    candidates = [i for i, x in enumerate(cluster) if float(x["hit"]["height"]) == max_h]
-    if len(candidates) == 1:
-        anchor_idx = candidates[0]
-    else:
-        anchor_idx = min(
-            candidates,
-            key=lambda i: int(cluster[i]["hit"]["timestamp"]),
-        )
-
-    anchor = cluster[anchor_idx]["hit"]
-
-    merged_sample_start = sample_start_window
-    merged_sample_end = sample_end_window
-    merged_width = float(max(merged_sample_end - merged_sample_start, 0.0))
-    if merged_sample_start < 0 or merged_sample_end < 0:
-        merged_width = -1.0
-    merged_integral = float(np.sum([float(x["hit"]["integral"]) for x in cluster]))
-
-    return (
-        int(anchor["position"]),
-        max_h,
-        merged_integral,
-        int(merged_sample_start),
-        int(merged_sample_end),
-        merged_width,
-        int(anchor["dt"]) if "dt" in anchor.dtype.names else int(cluster[anchor_idx]["dt_ns"]),
-        float(anchor["rise_time"]) if "rise_time" in anchor.dtype.names else 0.0,
-        float(anchor["fall_time"]) if "fall_time" in anchor.dtype.names else 0.0,
-        int(anchor["timestamp"]),
-        int(anchor["board"]) if "board" in anchor.dtype.names else 0,
-        int(anchor["channel"]),
-        int(anchor["record_id"]),
-        component_offset,
-        component_count,
+    candidates &= timestamps == earliest[cluster_of]
+    rows = np.flatnonzero(candidates)
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = cluster_of[rows[1:]] != cluster_of[rows[:-1]]
+    anchors = members[rows[first]]
+    single = counts == 1
+
+    def anchor_field(*candidates: str) -> np.ndarray:
+        return _pick_field(hits, *candidates)[anchors]
+
+    record_ids = hits["record_id"][members]
+    same_record = np.minimum.reduceat(record_ids, offsets) == np.maximum.reduceat(
+        record_ids, offsets
     )
+    if {"sample_start", "sample_end"}.issubset(names):
+        window_fields: tuple[str, str] | None = ("sample_start", "sample_end")
+    elif {"edge_start", "edge_end"}.issubset(names):
+        window_fields = ("edge_start", "edge_end")
+    else:
+        window_fields = None
+    sample_start = np.full(len(offsets), -1, dtype=np.int64)
+    sample_end = np.full(len(offsets), -1, dtype=np.int64)
+    if window_fields is not None:
+        starts = hits[window_fields[0]][members].astype(np.int64)
+        ends = hits[window_fields[1]][members].astype(np.int64)
+        sample_start = np.where(same_record, np.minimum.reduceat(starts, offsets), -1)
+        sample_end = np.where(same_record, np.maximum.reduceat(ends, offsets), -1)
+    width = np.maximum(sample_end - sample_start, 0).astype(np.float64)
+    width[(sample_start < 0) | (sample_end < 0)] = -1.0
+
+    if single.any():
+        sample_start[single] = anchor_field("sample_start", "edge_start")[single]
+        sample_end[single] = anchor_field("sample_end", "edge_end")[single]
+        width[single] = anchor_field("width")[single]
+    integrals = np.add.reduceat(hits["integral"][members].astype(np.float64), offsets)
+
+    out["position"] = anchor_field("position")
+    out["height"] = np.where(single, anchor_field("height"), max_heights)
+    out["integral"] = np.where(single, anchor_field("integral"), integrals)
+    out["sample_start"] = sample_start
+    out["sample_end"] = sample_end
+    out["width"] = width
+    out["dt"] = anchor_field("dt") if "dt" in names else dt_ns[anchors]
+    if "rise_time" in names:
+        out["rise_time"] = anchor_field("rise_time")
+    if "fall_time" in names:
+        out["fall_time"] = anchor_field("fall_time")
+    out["timestamp"] = anchor_field("timestamp")
+    if "board" in names:
+        out["board"] = anchor_field("board")
+    out["channel"] = anchor_field("channel")
+    out["record_id"] = anchor_field("record_id")
+    out["component_offset"] = offsets
+    out["component_count"] = counts
+    return out
 
 
 class HitMergePlugin(Plugin):
@@ -379,35 +376,8 @@ class HitMergePlugin(Plugin):
         if not isinstance(cluster_rows, np.ndarray):
             raise ValueError("hit_merged expects hit_merge_clusters as a structured array")
 
-        enriched_lookup = _build_enriched_lookup(
-            hits, explicit_dt=explicit_dt, plugin_name=self.provides
-        )
-
-        merged_rows: list[tuple] = []
-        for cluster_index, start, end in _cluster_bounds(cluster_rows):
-            hit_indices = np.asarray(cluster_rows["hit_index"][start:end], dtype=np.int64)
-            cluster = [enriched_lookup[int(hit_idx)] for hit_idx in hit_indices]
-            if len(cluster) == 0:
-                continue
-            cluster_start = cluster[0]["abs_start_ps"]
-            cluster_end = max(item["abs_end_ps"] for item in cluster)
-            merged_rows.append(
-                _emit_cluster(
-                    cluster,
-                    cluster_start_ps=cluster_start,
-                    cluster_end_ps=cluster_end,
-                    dt_ps=cluster[0]["dt_ps"],
-                    component_offset=start,
-                )
-            )
-            if cluster_index != len(merged_rows) - 1:
-                raise ValueError(
-                    "hit_merge_clusters rows are not ordered by cluster_index without gaps"
-                )
-
-        if merged_rows:
-            return np.array(merged_rows, dtype=HIT_MERGED_DTYPE)
-        return np.zeros(0, dtype=HIT_MERGED_DTYPE)
+        dt_ns = _hit_dt(hits, explicit_dt, self.provides)
+        return _emit_merged(hits, cluster_rows, dt_ns)
 
 
 class HitMergeClustersPlugin(Plugin):
@@ -432,14 +402,13 @@ class HitMergeClustersPlugin(Plugin):
             return np.zeros(0, dtype=HIT_MERGE_CLUSTERS_DTYPE)
 
         merge_gap_ns, max_total_width_ns, explicit_dt = _resolve_merge_config(context, self)
-        clusters = _build_merged_clusters(
+        return _compute_cluster_rows(
             hits,
             merge_gap_ns=merge_gap_ns,
             max_total_width_ns=max_total_width_ns,
             explicit_dt=explicit_dt,
             plugin_name=self.provides,
         )
-        return _build_cluster_rows(clusters)
 
 
 class HitMergedComponentsPlugin(Plugin):
@@ -496,42 +465,28 @@ class HitMergedComponentsPlugin(Plugin):
         if len(cluster_rows) == 0:
             return np.zeros(0, dtype=HIT_MERGED_COMPONENTS_DTYPE)
 
-        cluster_bounds = _cluster_bounds(cluster_rows)
-        if len(cluster_bounds) != len(merged):
+        offsets, counts = _cluster_bounds(cluster_rows)
+        if len(offsets) != len(merged):
             raise ValueError(
                 "hit_merged_components cluster count does not match hit_merged rows: "
-                f"clusters={len(cluster_bounds)}, hit_merged={len(merged)}"
+                f"clusters={len(offsets)}, hit_merged={len(merged)}"
             )
 
-        component_rows: list[tuple[int, int]] = []
-        for merged_idx, (cluster_index, start, end) in enumerate(cluster_bounds):
-            count = end - start
-            if (
-                "component_offset" in merged.dtype.names
-                and int(merged[merged_idx]["component_offset"]) != start
-            ):
-                raise ValueError(
-                    f"hit_merged[{merged_idx}] component_offset mismatch: "
-                    f"expected {start}, got {int(merged[merged_idx]['component_offset'])}"
-                )
-            if (
-                "component_count" in merged.dtype.names
-                and int(merged[merged_idx]["component_count"]) != count
-            ):
-                raise ValueError(
-                    f"hit_merged[{merged_idx}] component_count mismatch: "
-                    f"expected {count}, got {int(merged[merged_idx]['component_count'])}"
-                )
-            if cluster_index != merged_idx:
+        for field, expected in (("component_offset", offsets), ("component_count", counts)):
+            if field not in merged.dtype.names:
+                continue
+            mismatch = np.flatnonzero(merged[field] != expected)
+            if mismatch.size:
+                merged_idx = int(mismatch[0])
                 raise ValueError(
-                    "hit_merge_clusters rows are not ordered by cluster_index without gaps"
+                    f"hit_merged[{merged_idx}] {field} mismatch: "
+                    f"expected {int(expected[merged_idx])}, got {int(merged[merged_idx][field])}"
                 )
-            for hit_index in np.asarray(cluster_rows["hit_index"][start:end], dtype=np.int64):
-                component_rows.append((merged_idx, int(hit_index)))
 
-        if component_rows:
-            return np.array(component_rows, dtype=HIT_MERGED_COMPONENTS_DTYPE)
-        return np.zeros(0, dtype=HIT_MERGED_COMPONENTS_DTYPE)
+        components = np.zeros(len(cluster_rows), dtype=HIT_MERGED_COMPONENTS_DTYPE)
+        components["merged_index"] = np.repeat(np.arange(len(offsets)), counts)
+        components["hit_index"] = cluster_rows["hit_index"]
+        return components
 
 
 __all__ = [
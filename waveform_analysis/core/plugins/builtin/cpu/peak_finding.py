@@ -8,15 +8,17 @@ CPU Peak Finding Plugin - 使用 scipy 进行峰值检测
 计算峰值的位置、高度、积分、边缘等特征。
 
 支持使用原始波形或滤波后的波形进行检测。
+peak_engine 不为 'scipy' 时改用 peak_kernels 的按块内核（numba 或 NumPy），
+一次处理 chunk_size 条波形，结果与逐波形 find_peaks 一致。
 """
 
-from concurrent.futures import ThreadPoolExecutor
 import os
 from typing import Any, Optional, Union
 
 import numpy as np
 from scipy.signal import find_peaks
 
+from waveform_analysis.core.execution.worker_pools import WorkerPoolService, get_worker_pools
 from waveform_analysis.core.plugins.builtin.cpu._dt_compat import resolve_dt_config
 from waveform_analysis.core.plugins.builtin.cpu._wave_source import (
     WAVE_SOURCE_AUTO,
@@ -25,6 +27,13 @@ from waveform_analysis.core.plugins.builtin.cpu._wave_source import (
     resolve_wave_input_spec,
 )
 from waveform_analysis.core.plugins.core.base import Option, Plugin
+from waveform_analysis.core.processing.peak_kernels import (
+    PEAK_KERNEL_BACKENDS,
+    find_peaks_block,
+    resolve_peak_backend,
+)
+
+PEAK_ENGINES = ("scipy",) + PEAK_KERNEL_BACKENDS
 
 # 定义峰值数据类型（扩展自原始 PEAK_DTYPE，增加边缘信息）
 HIT_DTYPE = np.dtype(
@@ -144,6 +153,11 @@ class HitFinderPlugin(Plugin):
             type=int,
             help="触发并行的最小事件数（小数据量时自动串行）",
         ),
+        "peak_engine": Option(
+            default="scipy",
+            type=str,
+            help="峰值检测实现: scipy（逐波形 find_peaks）|auto|numba|numpy（按块内核，auto 优先 numba）",
+        ),
     }
 
     def resolve_depends_on(self, context: Any, run_id: str | None = None) -> list[str]:
@@ -187,6 +201,9 @@ class HitFinderPlugin(Plugin):
         n_workers = context.get_config(self, "n_workers")
         chunk_size = context.get_config(self, "chunk_size")
         parallel_min_events = context.get_config(self, "parallel_min_events")
+        peak_engine = str(context.get_config(self, "peak_engine")).lower()
+        if peak_engine not in PEAK_ENGINES:
+            raise ValueError(f"[hit] unknown peak_engine '{peak_engine}', expected {PEAK_ENGINES}")
         # st_waveforms 的 timestamp 已统一为 ps
         timestamp_unit = "ps"
         wave_input = load_wave_input(context, self, run_id, needs_wave_samples=True)
@@ -207,8 +224,12 @@ class HitFinderPlugin(Plugin):
             n_workers=int(n_workers),
             chunk_size=int(chunk_size),
             parallel_min_events=int(parallel_min_events),
+            peak_engine=peak_engine,
+            pools=get_worker_pools(context),
         )
 
+        if isinstance(peaks, np.ndarray):
+            return peaks
         if peaks:
             return np.array(peaks, dtype=HIT_DTYPE)
         return np.zeros(0, dtype=HIT_DTYPE)
@@ -230,7 +251,14 @@ class HitFinderPlugin(Plugin):
         n_workers: int,
         chunk_size: int,
         parallel_min_events: int,
-    ) -> list[tuple]:
+        peak_engine: str = "scipy",
+        pools: WorkerPoolService | None = None,
+    ) -> list[tuple] | np.ndarray:
+        if pools is None:
+            pools = get_worker_pools()
+        block_backend = None
+        if peak_engine != "scipy":
+            block_backend = resolve_peak_backend(peak_engine)
         if wave_input.spec.is_records:
             rv = wave_input.records_view
             records = wave_input.records
@@ -242,6 +270,9 @@ class HitFinderPlugin(Plugin):
 
             process_fn = self._process_records_range
             process_args = (rv,)
+            if block_backend is not None:
+                process_fn = self._process_records_block
+                process_args = (rv, block_backend)
         else:
             waveform_data = wave_input.waveform_data
             if waveform_data is None:
@@ -253,41 +284,64 @@ class HitFinderPlugin(Plugin):
 
             process_fn = self._process_event_range
             process_args = (waveform_data,)
+            if block_backend is not None:
+                process_fn = self._process_event_block
+                process_args = (waveform_data, block_backend)
 
         peaks: list[tuple] = []
         use_parallel = bool(parallel) and n_events >= max(1, int(parallel_min_events))
         resolved_workers = self._resolve_parallel_workers(int(n_workers), n_events)
         resolved_chunk_size = max(1, int(chunk_size))
 
+        if block_backend is not None:
+            # 块内核一次处理 chunk_size 条波形；串行时也分块，限制填充矩阵的内存
+            if not use_parallel:
+                resolved_workers = 1
+            return self._run_blocks(
+                pools,
+                process_fn,
+                process_args,
+                n_events,
+                resolved_chunk_size,
+                resolved_workers,
+                use_derivative,
+                height,
+                distance,
+                prominence,
+                width,
+                threshold,
+                height_method,
+                height_window_extension,
+                explicit_dt,
+                timestamp_unit,
+            )
+
         if use_parallel and resolved_workers > 1:
             ranges = [
                 (start, min(start + resolved_chunk_size, n_events))
                 for start in range(0, n_events, resolved_chunk_size)
             ]
-            with ThreadPoolExecutor(max_workers=resolved_workers) as executor:
-                futures = [
-                    executor.submit(
-                        process_fn,
-                        *process_args,
-                        start,
-                        end,
-                        use_derivative,
-                        height,
-                        distance,
-                        prominence,
-                        width,
-                        threshold,
-                        height_method,
-                        height_window_extension,
-                        explicit_dt,
-                        timestamp_unit,
-                    )
-                    for start, end in ranges
-                ]
-                for future in futures:
-                    chunk_peaks = future.result()
-                    if chunk_peaks:
-                        peaks.extend(chunk_peaks)
+            peak_args = (
+                use_derivative,
+                height,
+                distance,
+                prominence,
+                width,
+                threshold,
+                height_method,
+                height_window_extension,
+                explicit_dt,
+                timestamp_unit,
+            )
+            results = pools.map(
+                lambda bounds: process_fn(*process_args, *bounds, *peak_args),
+                ranges,
+                name="hit",
+                max_workers=resolved_workers,
+            )
+            for chunk_peaks in results:
+                if chunk_peaks:
+                    peaks.extend(chunk_peaks)
             return peaks
 
         return process_fn(
@@ -313,6 +367,258 @@ class HitFinderPlugin(Plugin):
         auto_workers = min(32, cpu_count)
         return min(auto_workers, max(1, n_events))
 
+    def _run_blocks(
+        self,
+        pools: WorkerPoolService,
+        process_fn: Any,
+        process_args: tuple,
+        n_events: int,
+        chunk_size: int,
+        n_workers: int,
+        *peak_args: Any,
+    ) -> np.ndarray:
+        ranges = [
+            (start, min(start + chunk_size, n_events)) for start in range(0, n_events, chunk_size)
+        ]
+        if n_workers > 1 and len(ranges) > 1:
+            parts = pools.map(
+                lambda bounds: process_fn(*process_args, *bounds, *peak_args),
+                ranges,
+                name="hit",
+                max_workers=n_workers,
+            )
+        else:
+            parts = [process_fn(*process_args, start, end, *peak_args) for start, end in ranges]
+        if not parts:
+            return np.zeros(0, dtype=HIT_DTYPE)
+        return np.concatenate(parts)
+
+    def _process_event_block(
+        self,
+        waveform_data: np.ndarray,
+        backend: str,
+        start: int,
+        end: int,
+        use_derivative: bool,
+        height: float,
+        distance: int,
+        prominence: float,
+        width: int,
+        threshold: float | None,
+        height_method: str,
+        height_window_extension: int,
+        explicit_dt: int | None,
+        timestamp_unit: str | None,
+    ) -> np.ndarray:
+        block = waveform_data[start:end]
+        names = block.dtype.names
+        waves = np.asarray(block["wave"])
+        n_rows, n_samples = waves.shape
+        # 与逐波形路径一致：event_length 在 (0, n_samples) 内时截断，否则使用整行
+        lengths = np.full(n_rows, n_samples, dtype=np.int64)
+        if "event_length" in names:
+            event_len = block["event_length"].astype(np.int64)
+            use_len = (event_len > 0) & (event_len < n_samples)
+            lengths[use_len] = event_len[use_len]
+
+        if "dt" in names:
+            dt_ns = block["dt"].astype(np.int64)
+        elif explicit_dt is not None:
+            dt_ns = np.full(n_rows, int(explicit_dt), dtype=np.int64)
+        else:
+            raise ValueError(
+                "[hit] st_waveforms is missing required field 'dt'; provide explicit config 'dt'."
+            )
+
+        if use_derivative:
+            detection = -np.diff(waves, axis=1)
+        elif "baseline" in names:
+            detection = block["baseline"][:, None] - waves
+        else:
+            means = np.array([np.mean(waves[i, : lengths[i]]) for i in range(n_rows)])
+            detection = means[:, None] - waves
+
+        record_ids = (
+            block["record_id"] if "record_id" in names else np.arange(start, end, dtype=np.int64)
+        )
+        return self._find_peaks_in_block(
+            waves,
+            lengths,
+            detection,
+            use_derivative,
+            backend,
+            block["timestamp"],
+            block["board"] if "board" in names else np.zeros(n_rows, dtype=np.int16),
+            block["channel"] if "channel" in names else np.zeros(n_rows, dtype=np.int16),
+            record_ids,
+            dt_ns,
+            height,
+            distance,
+            prominence,
+            width,
+            threshold,
+            height_method,
+            height_window_extension,
+            timestamp_unit,
+        )
+
+    def _process_records_block(
+        self,
+        rv: Any,
+        backend: str,
+        start: int,
+        end: int,
+        use_derivative: bool,
+        height: float,
+        distance: int,
+        prominence: float,
+        width: int,
+        threshold: float | None,
+        height_method: str,
+        height_window_extension: int,
+        explicit_dt: int | None,
+        timestamp_unit: str | None,
+    ) -> np.ndarray:
+        block = rv.records[start:end]
+        names = block.dtype.names
+        n_rows = len(block)
+        record_ids = (
+            block["record_id"] if "record_id" in names else np.arange(start, end, dtype=np.int64)
+        )
+        signals, valid = rv.signals(record_ids, mask=True)
+        # 正极性信号：与逐记录路径的 -rv.signals(record_id) 相同
+        waves = -signals.astype(np.float64, copy=False)
+        lengths = valid.sum(axis=1).astype(np.int64)
+
+        if "dt" in names:
+            dt_ns = block["dt"].astype(np.int64)
+        elif explicit_dt is not None:
+            dt_ns = np.full(n_rows, int(explicit_dt), dtype=np.int64)
+        else:
+            raise ValueError(
+                "[hit] records is missing required field 'dt'; provide explicit config 'dt'."
+            )
+
+        detection = np.diff(waves, axis=1) if use_derivative else waves
+        return self._find_peaks_in_block(
+            waves,
+            lengths,
+            detection,
+            use_derivative,
+            backend,
+            block["timestamp"],
+            block["board"] if "board" in names else np.zeros(n_rows, dtype=np.int16),
+            block["channel"] if "channel" in names else np.zeros(n_rows, dtype=np.int16),
+            record_ids,
+            dt_ns,
+            height,
+            distance,
+            prominence,
+            width,
+            threshold,
+            height_method,
+            height_window_extension,
+            timestamp_unit,
+        )
+
+    def _find_peaks_in_block(
+        self,
+        waves: np.ndarray,
+        lengths: np.ndarray,
+        detection: np.ndarray,
+        use_derivative: bool,
+        backend: str,
+        timestamps: np.ndarray,
+        boards: np.ndarray,
+        channels: np.ndarray,
+        record_ids: np.ndarray,
+        dt_ns: np.ndarray,
+        height: float,
+        distance: int,
+        prominence: float,
+        width: int,
+        threshold: float | None,
+        height_method: str,
+        height_window_extension: int,
+        timestamp_unit: str | None,
+    ) -> np.ndarray:
+        """
+        对一块波形做峰值检测并计算峰值特征（_find_peaks_in_waveform 的按块版本）。
+
+        Args:
+            waves: (n_rows, n_samples) 填充后的波形矩阵，用于计算峰高
+            lengths: 每行的有效采样数
+            detection: 与 waves 按行对齐的检测信号矩阵（导数时少一列）
+        """
+        if height_method not in ("diff", "minmax"):
+            raise ValueError(f"不支持的峰高计算方法: {height_method}")
+        if timestamp_unit not in (None, "ps"):
+            raise ValueError(
+                f"[hit] unsupported timestamp_unit in standardized pipeline: {timestamp_unit}"
+            )
+
+        n_rows = len(lengths)
+        det_lengths = np.maximum(lengths - 1, 0) if use_derivative else lengths
+        offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(det_lengths, out=offsets[1:])
+        valid = np.arange(detection.shape[1])[None, :] < det_lengths[:, None]
+        rows, positions, left_ips, right_ips = find_peaks_block(
+            detection[valid],
+            offsets,
+            height=height,
+            threshold=threshold,
+            distance=distance,
+            prominence=prominence,
+            width=width,
+            backend=backend,
+        )
+
+        out = np.zeros(len(rows), dtype=HIT_DTYPE)
+        if len(rows) == 0:
+            return out
+        dt_rows = dt_ns[rows]
+        if np.any(dt_rows <= 0):
+            raise ValueError("[hit] dt must be > 0")
+
+        # 峰高：与 _calculate_peak_height 相同的取整与边界裁剪
+        row_len = lengths[rows]
+        start_idx = np.maximum(np.round(left_ips).astype(np.int64), 0)
+        end_idx = np.minimum(np.round(right_ips).astype(np.int64), row_len - 1)
+        flat = waves.reshape(-1)
+        row_base = rows.astype(np.int64) * waves.shape[1]
+        if height_method == "diff":
+            # sum(diff(-w)[s:e]) 逐项相消为 w[s] - w[e]
+            has_span = end_idx > start_idx
+            heights = np.zeros(len(rows), dtype=np.float64)
+            heights[has_span] = flat[row_base + start_idx][has_span].astype(np.float64) - flat[
+                row_base + end_idx
+            ][has_span].astype(np.float64)
+        else:
+            ext = max(0, int(height_window_extension))
+            window_start = np.maximum(start_idx - ext, 0)
+            window_len = np.minimum(end_idx + ext, row_len) - window_start
+            if np.any(window_len <= 0):
+                raise ValueError("[hit] empty minmax height window")
+            seg_starts = np.zeros(len(rows), dtype=np.int64)
+            np.cumsum(window_len[:-1], out=seg_starts[1:])
+            gather = np.arange(int(window_len.sum()), dtype=np.int64)
+            gather += np.repeat(row_base + window_start - seg_starts, window_len)
+            values = flat[gather]
+            heights = np.maximum.reduceat(values, seg_starts) - np.minimum.reduceat(
+                values, seg_starts
+            )
+
+        out["position"] = positions
+        out["height"] = heights
+        out["edge_start"] = left_ips
+        out["edge_end"] = right_ips
+        out["dt"] = dt_rows
+        out["timestamp"] = timestamps[rows] + positions * (dt_rows * 1e3)
+        out["board"] = boards[rows]
+        out["channel"] = channels[rows]
+        out["record_id"] = record_ids[rows]
+        return out
+
     def _process_event_range(
         self,
         waveform_data: np.ndarray,
@@ -6,6 +6,8 @@ Raw Files Plugin - 原始文件扫描插件
 
 本模块包含原始文件扫描插件，是数据处理流程的起点。
 支持 DAQ 集成，可以直接从 DAQ 元数据中获取文件列表。
+增量模式（``incremental=True``）下记录已摄取文件的 size/mtime，
+配合 ``Context.refresh_run`` 只处理运行中新写入的文件。
 """
 
 from typing import Any, List
@@ -19,9 +21,24 @@ class RawFileNamesPlugin(Plugin):
     provides = "raw_files"
     description = "Scan the data directory and group raw CSV files by channel number."
     version = "0.0.2"
+    resource_hint = "io"
     options = {
         "data_root": Option(default="DAQ", type=str, help="Root directory for data"),
         "daq_adapter": Option(default="vx2730", type=str, help="DAQ adapter name (e.g., 'vx2730')"),
+        "incremental": Option(
+            default=False,
+            type=bool,
+            help="Track ingested files (size/mtime) and return that snapshot; new files are "
+            "picked up by Context.refresh_run instead of invalidating the whole run.",
+            track=False,
+        ),
+        "settle_seconds": Option(
+            default=5.0,
+            type=float,
+            help="Incremental mode: skip files modified within the last N seconds "
+            "(still being written by the DAQ).",
+            track=False,
+        ),
     }
 
     def compute(self, context: Any, run_id: str, **kwargs) -> List[List[str]]:
@@ -32,6 +49,8 @@ class RawFileNamesPlugin(Plugin):
         支持 DAQ 集成，可以直接从 DAQ 元数据中获取文件列表。
         支持通过 daq_adapter 参数指定 DAQ 适配器来处理不同格式。
         通道选择由 DAQ 适配器或 DAQ 元数据决定，不再通过插件配置裁剪。
+        增量模式下返回已摄取文件的快照（首次计算时建立清单），新文件由
+        ``Context.refresh_run`` 摄取。
 
         Args:
             context: Context 实例，用于访问配置和缓存
@@ -45,17 +64,24 @@ class RawFileNamesPlugin(Plugin):
             >>> raw_files = ctx.get_data('run_001', 'raw_files')
             >>> print(f"通道数: {len(raw_files)}")
         """
-        from waveform_analysis.core.processing.loader import get_raw_files
+        raw_files = self.scan(context, run_id)
+        if not context.get_config(self, "incremental"):
+            return raw_files
 
-        data_root = context.get_config(self, "data_root")
-        daq_adapter = context.get_config(self, "daq_adapter")
+        from waveform_analysis.core.processing.incremental import ingest_raw_files
 
-        # Support DAQ integration if daq_run is present in context
-        daq_run = getattr(context, "daq_run", None)
+        return ingest_raw_files(
+            context, run_id, raw_files, context.get_config(self, "settle_seconds")
+        )
 
+    def scan(self, context: Any, run_id: str) -> List[List[str]]:
+        """扫描数据目录（不经过已摄取清单），增量刷新用它发现新文件。"""
+        from waveform_analysis.core.processing.loader import get_raw_files
+
+        # Support DAQ integration if daq_run is present in context
         return get_raw_files(
             run_name=run_id,
-            data_root=data_root,
-            daq_run=daq_run,
-            daq_adapter=daq_adapter,
+            data_root=context.get_config(self, "data_root"),
+            daq_run=getattr(context, "daq_run", None),
+            daq_adapter=context.get_config(self, "daq_adapter"),
         )
@@ -9,19 +9,20 @@ import numpy as np
 from waveform_analysis.core.plugins.builtin.cpu._dt_compat import resolve_dt_config
 from waveform_analysis.core.plugins.builtin.cpu.filtering import (
     FILTER_ENGINE_VERSION,
-    build_filter_batches,
-    filter_wave_pool_batch,
+    filter_wave_pool,
 )
 from waveform_analysis.core.plugins.builtin.cpu.waveforms import (
-    _build_polarity_lookup,
+    _resolve_polarity_codes,
     _validate_baseline_samples,
 )
 from waveform_analysis.core.plugins.core.base import Option, Plugin
-from waveform_analysis.core.processing.dtypes import RECORDS_DTYPE
+from waveform_analysis.core.processing.dtypes import POLARITY_UNKNOWN, RECORDS_DTYPE
+from waveform_analysis.core.processing.incremental import IncrementalUpdate
 from waveform_analysis.core.processing.records_builder import (
     RecordsBundle,
     build_records_from_raw_files,
     build_records_from_v1725_files,
+    extend_records,
 )
 
 _BUNDLE_CACHE_NAME = "_records_bundle"
@@ -50,16 +51,10 @@ def _apply_records_polarity(context: Any, run_id: str, bundle: RecordsBundle) ->
     if len(records) == 0:
         return bundle
 
-    records["polarity"] = "unknown"
-    polarity_map = _build_polarity_lookup(context, run_id, records["board"], records["channel"])
-    if not polarity_map:
-        return bundle
-
-    from waveform_analysis.core.hardware.channel import HardwareChannel
-
-    for idx in range(len(records)):
-        hw_channel = HardwareChannel(int(records["board"][idx]), int(records["channel"][idx]))
-        records["polarity"][idx] = polarity_map.get(hw_channel, "unknown")
+    records["polarity"] = POLARITY_UNKNOWN
+    codes = _resolve_polarity_codes(context, run_id, records["board"], records["channel"])
+    if codes is not None:
+        records["polarity"] = codes
     return bundle
 
 
@@ -130,8 +125,34 @@ def _build_records_bundle(
         _cleanup_stale_bundles(context, run_id, cache_key)
         return cached
 
-    if adapter_name == "v1725":
+    # records/wave_pool 已在内存中（例如增量刷新之后）时直接组合，不再重新解析原始文件
+    get_memory = getattr(context, "_get_data_from_memory", None)
+    records = get_memory(run_id, "records") if get_memory else None
+    wave_pool = get_memory(run_id, "wave_pool") if get_memory else None
+    if isinstance(records, np.ndarray) and isinstance(wave_pool, np.ndarray):
+        bundle = RecordsBundle(records=records, wave_pool=wave_pool)
+    else:
         raw_files = context.get_data(run_id, "raw_files")
+        bundle = _build_bundle_from_files(
+            context, run_id, plugin, adapter_name, part_size, dt_ns, raw_files
+        )
+    context._set_data(run_id, cache_key, bundle)
+    _cleanup_stale_bundles(context, run_id, cache_key)
+    return bundle
+
+
+def _build_bundle_from_files(
+    context: Any,
+    run_id: str,
+    plugin: Plugin,
+    adapter_name: str | None,
+    part_size: int,
+    dt_ns: int,
+    raw_files: list[list[str]],
+    epoch_file: str | None = None,
+) -> RecordsBundle:
+    """Build a polarity-resolved bundle from the given file groups (no caching)."""
+    if adapter_name == "v1725":
         file_list = []
         for group in raw_files:
             if group:
@@ -146,12 +167,8 @@ def _build_records_bundle(
             deduped.append(path)
 
         bundle = build_records_from_v1725_files(deduped, dt_ns=dt_ns)
-        bundle = _apply_records_polarity(context, run_id, bundle)
-        context._set_data(run_id, cache_key, bundle)
-        _cleanup_stale_bundles(context, run_id, cache_key)
-        return bundle
+        return _apply_records_polarity(context, run_id, bundle)
 
-    raw_files = context.get_data(run_id, "raw_files")
     if not isinstance(raw_files, list):
         raise ValueError("records expects raw_files as a list of per-channel file groups")
 
@@ -166,16 +183,17 @@ def _build_records_bundle(
     profiler = getattr(context, "profiler", None)
 
     epoch_ns = None
+    if epoch_file is None:
+        epoch_file = next((group[0] for group in raw_files if group), None)
     if adapter_name:
         from pathlib import Path
 
         from waveform_analysis.utils.formats import get_adapter
 
         adapter = get_adapter(adapter_name)
-        first_file = next((group[0] for group in raw_files if group), None)
-        if first_file is not None:
+        if epoch_file is not None:
             try:
-                epoch_ns = adapter.get_file_epoch(Path(first_file))
+                epoch_ns = adapter.get_file_epoch(Path(epoch_file))
             except (FileNotFoundError, OSError):
                 epoch_ns = None
 
@@ -195,10 +213,48 @@ def _build_records_bundle(
         channel_executor=channel_executor,
         profiler=profiler,
     )
-    bundle = _apply_records_polarity(context, run_id, bundle)
-    context._set_data(run_id, cache_key, bundle)
-    _cleanup_stale_bundles(context, run_id, cache_key)
-    return bundle
+    return _apply_records_polarity(context, run_id, bundle)
+
+
+def _extend_records_bundle(
+    context: Any, run_id: str, update: IncrementalUpdate
+) -> dict[str, tuple[np.ndarray, int]] | None:
+    """
+    Incremental refresh shared by records and wave_pool: build a bundle from the new
+    files only and merge it into the cached outputs.
+
+    Returns ``{"records": (tail, stable_rows), "wave_pool": (tail, stable_rows)}``
+    computed once per refresh from the pre-refresh records/wave_pool, or None when
+    either output is not cached (it is then rebuilt in full on next access).
+    """
+    if "records_bundle" in update.scratch:
+        return update.scratch["records_bundle"]
+
+    result = None
+    if context._is_cache_hit(run_id, "records", load=True) and context._is_cache_hit(
+        run_id, "wave_pool", load=True
+    ):
+        records = context._get_data_from_memory(run_id, "records")
+        wave_pool = context._get_data_from_memory(run_id, "wave_pool")
+        plugin, adapter_name, dt_ns, part_size = _resolve_bundle_settings(context)
+        first_file = next((group[0] for group in update.all_files if group), None)
+        new_bundle = _build_bundle_from_files(
+            context,
+            run_id,
+            plugin,
+            adapter_name,
+            part_size,
+            dt_ns,
+            update.new_files,
+            epoch_file=first_file,
+        )
+        tail, stable = extend_records(records, len(wave_pool), new_bundle)
+        result = {
+            "records": (tail, stable),
+            "wave_pool": (np.asarray(new_bundle.wave_pool, dtype=np.uint16), len(wave_pool)),
+        }
+    update.scratch["records_bundle"] = result
+    return result
 
 
 def _resolve_records_upstream_depends(context: Any, plugin: Plugin) -> list[str]:
@@ -225,7 +281,10 @@ class _RecordsBundlePluginBase(Plugin):
         "channel_executor": Option(
             default="thread",
             type=str,
-            help="Channel-level executor type: 'thread' or 'process'.",
+            help=(
+                "Channel-level executor type: 'thread' or 'process' "
+                "(process writes into a shared memmap)."
+            ),
             track=False,
         ),
         "n_jobs": Option(
@@ -279,7 +338,7 @@ class _RecordsBundlePluginBase(Plugin):
             "None=adapter default.",
         ),
     }
-    version = "0.10.0"
+    version = "0.11.0"
 
     def resolve_depends_on(self, context: Any, run_id: str | None = None) -> list[str]:
         """Resolve raw-file upstream data for shared records bundle outputs."""
@@ -317,6 +376,13 @@ class RecordsPlugin(_RecordsBundlePluginBase):
         bundle = get_records_bundle(context, run_id)
         return bundle.records
 
+    def compute_incremental(
+        self, context: Any, run_id: str, previous: Any, update: IncrementalUpdate
+    ) -> tuple[np.ndarray, int] | None:
+        """Merge records of the new files; rows sorting before them are kept."""
+        extended = _extend_records_bundle(context, run_id, update)
+        return None if extended is None else extended["records"]
+
 
 class WavePoolPlugin(_RecordsBundlePluginBase):
     """Expose wave_pool as a formal plugin output backed by RecordsBundle."""
@@ -330,6 +396,13 @@ class WavePoolPlugin(_RecordsBundlePluginBase):
         bundle = get_records_bundle(context, run_id)
         return bundle.wave_pool
 
+    def compute_incremental(
+        self, context: Any, run_id: str, previous: Any, update: IncrementalUpdate
+    ) -> tuple[np.ndarray, int] | None:
+        """Append the waveforms of the new files after the existing wave_pool."""
+        extended = _extend_records_bundle(context, run_id, update)
+        return None if extended is None else extended["wave_pool"]
+
 
 class WavePoolFilteredPlugin(Plugin):
     """Build a filtered wave_pool aligned to the existing records layout."""
@@ -358,6 +431,13 @@ class WavePoolFilteredPlugin(Plugin):
             type=int,
             help="每批次记录数（0 表示不分批，整个通道一次处理）",
         ),
+        "use_process_pool": Option(
+            default=False,
+            type=bool,
+            help="使用进程池并行滤波（worker 通过文件映射/共享内存读取 wave_pool，"
+            "直接写入输出 memmap）；False 使用线程池",
+            track=False,
+        ),
         "channel_config": Option(
             default=None,
             type=dict,
@@ -379,72 +459,11 @@ class WavePoolFilteredPlugin(Plugin):
         if missing:
             raise ValueError(f"wave_pool_filtered records missing required fields: {missing}")
 
-        filtered_pool = np.zeros(len(wave_pool), dtype=np.float32)
-        if len(records) == 0 or len(wave_pool) == 0:
-            return filtered_pool
-
-        boards = (
-            records["board"]
-            if "board" in records.dtype.names
-            else np.zeros(len(records), dtype=np.int16)
-        )
-        channels = (
-            records["channel"]
-            if "channel" in records.dtype.names
-            else np.zeros(len(records), dtype=np.int16)
-        )
-
-        batch_size = int(context.get_config(self, "batch_size"))
-        if batch_size < 0:
-            raise ValueError(f"batch_size ({batch_size}) 必须大于等于 0")
-
-        filter_batches = build_filter_batches(context, self, run_id, boards, channels, batch_size)
-        if not filter_batches:
-            return filtered_pool
-
-        max_workers = context.get_config(self, "max_workers")
-        allow_parallel = max_workers is None or (isinstance(max_workers, int) and max_workers > 1)
-        use_parallel = allow_parallel and len(filter_batches) > 1
-
-        tasks = [
-            (
-                records,
-                wave_pool,
-                batch_selector,
-                filter_config["filter_type"],
-                filter_config["bw_sos"],
-                filter_config["sg_window_size"],
-                filter_config["sg_poly_order"],
-            )
-            for _channel, batch_selector, filter_config in filter_batches
-        ]
-        if use_parallel:
-            from waveform_analysis.core.execution.manager import parallel_map
-
-            results = parallel_map(
-                filter_wave_pool_batch,
-                tasks,
-                executor_type="thread",
-                max_workers=max_workers,
-                executor_name="wave_pool_filtered",
-            )
-        else:
-            results = [filter_wave_pool_batch(task) for task in tasks]
-
-        for batch_segments in results:
-            for offset, filtered_wave in batch_segments:
-                filtered_pool[offset : offset + len(filtered_wave)] = filtered_wave
-
-        return filtered_pool
-
+        return filter_wave_pool(context, self, run_id, records, wave_pool, data_name=self.provides)
 
-def get_records_bundle(context: Any, run_id: str) -> RecordsBundle:
-    """Get records + wave_pool bundle for a run (internal cache).
 
-    Records now build from raw_files for all adapters. Non-V1725 adapters use
-    the generic incremental builder, while V1725 keeps its dedicated iter_waves
-    path for compatibility and performance.
-    """
+def _resolve_bundle_settings(context: Any) -> tuple[Plugin, str | None, int, int]:
+    """Return (plugin, adapter_name, dt_ns, part_size) used to build the shared bundle."""
     try:
         plugin = context.get_plugin("records")
     except Exception:
@@ -454,6 +473,17 @@ def get_records_bundle(context: Any, run_id: str) -> RecordsBundle:
     part_size = context.get_config(plugin, "records_part_size")
     if part_size is None:
         part_size = plugin.options["records_part_size"].default
+    return plugin, adapter_name, dt_ns, part_size
+
+
+def get_records_bundle(context: Any, run_id: str) -> RecordsBundle:
+    """Get records + wave_pool bundle for a run (internal cache).
+
+    Records now build from raw_files for all adapters. Non-V1725 adapters use
+    the generic incremental builder, while V1725 keeps its dedicated iter_waves
+    path for compatibility and performance.
+    """
+    plugin, adapter_name, dt_ns, part_size = _resolve_bundle_settings(context)
     return _build_records_bundle(
         context,
         run_id,
@@ -16,7 +16,9 @@ from typing import Any
 
 import numpy as np
 
+from waveform_analysis.core.data.record_index import record_index
 from waveform_analysis.core.plugins.core.base import Option, Plugin
+from waveform_analysis.core.processing.packed_waveforms import PackedWaveforms
 
 # 定义波形宽度数据类型
 WAVEFORM_WIDTH_DTYPE = np.dtype(
@@ -36,6 +38,9 @@ WAVEFORM_WIDTH_DTYPE = np.dtype(
     ]
 )
 
+# 每块 hit 展开的二维波形最多包含的采样点数（控制峰值附近阈值搜索的内存）
+_WIDTH_BLOCK_SAMPLES = 1 << 22
+
 
 class WaveformWidthPlugin(Plugin):
     """
@@ -52,7 +57,7 @@ class WaveformWidthPlugin(Plugin):
     provides = "waveform_width"
     depends_on = []  # 动态依赖，由 resolve_depends_on 决定
     description = "Calculate rise/fall time based on peak detection results."
-    version = "3.0.0"  # 版本升级：输出使用 record_id 替代 event_index
+    version = "3.1.0"  # 版本升级：按 record_id 索引批量计算宽度
     save_when = "always"
     output_dtype = WAVEFORM_WIDTH_DTYPE
 
@@ -134,50 +139,59 @@ class WaveformWidthPlugin(Plugin):
         hits = context.get_data(run_id, "hit")
 
         # 根据 use_filtered 选择波形数据源
-        if use_filtered:
-            waveform_data = context.get_data(run_id, "filtered_waveforms")
-        else:
-            waveform_data = context.get_data(run_id, "st_waveforms")
+        waveform_name = "filtered_waveforms" if use_filtered else "st_waveforms"
+        waveform_data = context.get_data(run_id, waveform_name)
 
         if not isinstance(hits, np.ndarray):
             raise ValueError("waveform_width expects hit as a single structured array")
-        if not isinstance(waveform_data, np.ndarray):
+        if not isinstance(waveform_data, (np.ndarray, PackedWaveforms)):
             raise ValueError("waveform_width expects st_waveforms as a single structured array")
 
         if len(hits) == 0 or len(waveform_data) == 0:
             return np.zeros(0, dtype=WAVEFORM_WIDTH_DTYPE)
 
-        widths = []
-        waveform_names = waveform_data.dtype.names or ()
+        hit_names = hits.dtype.names or ()
+        id_field = "record_id" if "record_id" in hit_names else "event_index"
+        record_ids = hits[id_field].astype(np.int64, copy=False)
+        # record_id -> 行号：每个 run 只建一次索引，按块批量解析，不再逐 hit 扫描 st_waveforms
+        index = record_index(context, run_id, waveform_name, data=waveform_data)
+        rows, found = index.lookup(record_ids)
 
-        for peak in hits:
-            record_id = (
-                int(peak["record_id"])
-                if "record_id" in peak.dtype.names
-                else int(peak["event_index"])
-            )
-            peak_position = peak["position"]
-            timestamp = peak["timestamp"]
-            board = peak["board"] if "board" in peak.dtype.names else 0
-            channel = peak["channel"]
-
-            if "record_id" in waveform_names:
-                matches = np.flatnonzero(waveform_data["record_id"] == record_id)
-                if len(matches) == 0:
-                    continue
-                waveform = waveform_data[int(matches[0])]["wave"]
-            else:
-                if record_id < 0 or record_id >= len(waveform_data):
-                    continue
-                waveform = waveform_data[record_id]["wave"]
-
-            width_features = self._calculate_width_from_peak(
-                waveform,
-                peak_position,
-                timestamp,
-                board,
-                channel,
-                record_id,
+        hit_rows = np.flatnonzero(found)
+        out = np.zeros(len(hit_rows), dtype=WAVEFORM_WIDTH_DTYPE)
+        keep = np.zeros(len(hit_rows), dtype=bool)
+        if len(hit_rows) == 0:
+            return out
+
+        if isinstance(waveform_data, PackedWaveforms):
+            wave_length = waveform_data.max_length
+
+            def gather(block_rows: np.ndarray) -> np.ndarray:
+                return waveform_data.padded(block_rows, pad_to=wave_length)
+
+        else:
+            wave_length = int(waveform_data.dtype["wave"].shape[0])
+
+            def gather(block_rows: np.ndarray) -> np.ndarray:
+                return waveform_data["wave"][block_rows]
+
+        out["record_id"] = record_ids[hit_rows]
+        out["peak_position"] = hits["position"][hit_rows]
+        out["timestamp"] = hits["timestamp"][hit_rows]
+        out["channel"] = hits["channel"][hit_rows]
+        if "board" in hit_names:
+            out["board"] = hits["board"][hit_rows]
+
+        step = max(1, _WIDTH_BLOCK_SAMPLES // max(wave_length, 1))
+        for start in range(0, len(hit_rows), step):
+            stop = min(start + step, len(hit_rows))
+            block = hit_rows[start:stop]
+            self._widths_block(
+                gather,
+                rows[block],
+                hits["position"][block].astype(np.int64),
+                out[start:stop],
+                keep[start:stop],
                 rise_low,
                 rise_high,
                 fall_high,
@@ -186,12 +200,7 @@ class WaveformWidthPlugin(Plugin):
                 interpolation,
             )
 
-            if width_features is not None:
-                widths.append(width_features)
-
-        if widths:
-            return np.array(widths, dtype=WAVEFORM_WIDTH_DTYPE)
-        return np.zeros(0, dtype=WAVEFORM_WIDTH_DTYPE)
+        return out[keep]
 
     def resolve_depends_on(self, context: Any, run_id: str | None = None) -> list[str]:
         # Dynamic dependency:
@@ -202,173 +211,99 @@ class WaveformWidthPlugin(Plugin):
             return ["hit", "filtered_waveforms"]
         return ["hit", "st_waveforms"]
 
-    def _calculate_width_from_peak(
+    def _widths_block(
         self,
-        waveform: np.ndarray,
-        peak_position: int,
-        timestamp: int,
-        board: int,
-        channel: int,
-        record_id: int,
+        gather: Any,
+        rows: np.ndarray,
+        positions: np.ndarray,
+        out: np.ndarray,
+        keep: np.ndarray,
         rise_low: float,
         rise_high: float,
         fall_high: float,
         fall_low: float,
         sampling_rate: float,
         interpolation: bool,
-    ) -> tuple | None:
+    ) -> None:
         """
-        基于峰值位置计算宽度特征
+        计算一个 hit 块的宽度特征（原地写入 ``out``/``keep``）
+
+        同一条波形上的多个 hit 只读取、校正一次波形；阈值交叉点在二维块上用
+        argmax 一次求出，结果与逐峰计算一致。
 
         Args:
-            waveform: 波形数组
-            peak_position: 峰值位置（采样点索引）
-            timestamp: 事件时间戳
-            channel: 通道号
-            record_id: 来源波形/记录 ID
+            gather: 行号 -> 二维波形块 的取数函数
+            rows: 每个 hit 的来源波形行号
+            positions: 每个 hit 的峰值位置（采样点索引）
+            out: 本块的输出行（WAVEFORM_WIDTH_DTYPE）
+            keep: 本块的有效标记（峰值越界或峰高 <= 0 的 hit 被丢弃）
             rise_low: 上升低阈值比例
             rise_high: 上升高阈值比例
             fall_high: 下降高阈值比例
             fall_low: 下降低阈值比例
             sampling_rate: 采样率（GHz）
             interpolation: 是否使用插值
-
-        Returns:
-            宽度特征元组，如果计算失败返回 None
         """
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        waves = gather(unique_rows)
         # 计算基线（使用波形前50个点）
-        baseline = np.mean(waveform[:50])
-        waveform_corrected = waveform - baseline
-
-        # 获取峰值高度
-        if peak_position >= len(waveform_corrected):
-            return None
-
-        peak_value = waveform_corrected[peak_position]
-
-        # 如果峰值太小，跳过
-        if peak_value <= 0:
-            return None
-
-        # 计算阈值
-        rise_low_threshold = peak_value * rise_low
-        rise_high_threshold = peak_value * rise_high
-        fall_high_threshold = peak_value * fall_high
-        fall_low_threshold = peak_value * fall_low
-
-        # 计算上升时间（峰值左侧）
-        rise_low_pos = self._find_threshold_crossing(
-            waveform_corrected[:peak_position],
-            rise_low_threshold,
-            direction="rising",
-            interpolation=interpolation,
-        )
-        rise_high_pos = self._find_threshold_crossing(
-            waveform_corrected[:peak_position],
-            rise_high_threshold,
-            direction="rising",
-            interpolation=interpolation,
-        )
-
-        if rise_low_pos is not None and rise_high_pos is not None:
-            rise_time_samples = rise_high_pos - rise_low_pos
-            rise_time = rise_time_samples / sampling_rate
-        else:
-            rise_time_samples = 0.0
-            rise_time = 0.0
-
-        # 计算下降时间（峰值右侧）
-        fall_high_pos = self._find_threshold_crossing(
-            waveform_corrected[peak_position:],
-            fall_high_threshold,
-            direction="falling",
-            interpolation=interpolation,
-        )
-        fall_low_pos = self._find_threshold_crossing(
-            waveform_corrected[peak_position:],
-            fall_low_threshold,
-            direction="falling",
-            interpolation=interpolation,
-        )
-
-        if fall_high_pos is not None and fall_low_pos is not None:
-            # 调整为相对于整个波形的位置
-            fall_high_pos += peak_position
-            fall_low_pos += peak_position
-            fall_time_samples = fall_low_pos - fall_high_pos
-            fall_time = fall_time_samples / sampling_rate
-        else:
-            fall_time_samples = 0.0
-            fall_time = 0.0
-
-        # 计算总宽度
-        if rise_low_pos is not None and fall_low_pos is not None:
-            total_width_samples = fall_low_pos - rise_low_pos
-            total_width = total_width_samples / sampling_rate
-        else:
-            total_width_samples = 0.0
-            total_width = 0.0
-
-        return (
-            float(rise_time),  # rise_time
-            float(fall_time),  # fall_time
-            float(total_width),  # total_width
-            float(rise_time_samples),  # rise_time_samples
-            float(fall_time_samples),  # fall_time_samples
-            float(total_width_samples),  # total_width_samples
-            int(peak_position),  # peak_position
-            float(peak_value),  # peak_height
-            int(timestamp),  # timestamp
-            int(board),  # board
-            int(channel),  # channel
-            int(record_id),  # record_id
-        )
-
-    def _find_threshold_crossing(
-        self,
-        waveform: np.ndarray,
-        threshold: float,
-        direction: str,
-        interpolation: bool,
-    ) -> float | None:
-        """
-        找到波形与阈值的交叉点
-
-        Args:
-            waveform: 波形数组
-            threshold: 阈值
-            direction: 'rising' (上升) 或 'falling' (下降)
-            interpolation: 是否使用插值
-
-        Returns:
-            交叉点位置（可能是浮点数），如果未找到返回 None
-        """
-        if len(waveform) == 0:
-            return None
-
-        if direction == "rising":
-            # 找到第一个超过阈值的点
-            indices = np.where(waveform >= threshold)[0]
-        else:  # falling
-            # 找到第一个低于阈值的点
-            indices = np.where(waveform <= threshold)[0]
-
-        if len(indices) == 0:
-            return None
-
-        idx = indices[0]
-
-        if not interpolation or idx == 0:
-            return float(idx)
-
-        # 使用线性插值计算精确交叉点
-        y0 = waveform[idx - 1]
-        y1 = waveform[idx]
-
-        # 避免除零
-        if abs(y1 - y0) < 1e-10:
-            return float(idx)
-
-        # 线性插值: x = (idx-1) + (threshold - y0) / (y1 - y0)
-        fraction = (threshold - y0) / (y1 - y0)
-        return float(idx - 1) + fraction
+        baselines = np.mean(waves[:, :50], axis=1)
+        corrected = (waves - baselines[:, None])[inverse]
+
+        n_hits, wave_length = corrected.shape
+        hit_idx = np.arange(n_hits)
+        in_range = (positions >= 0) & (positions < wave_length)
+        peak_values = corrected[hit_idx, np.where(in_range, positions, 0)]
+        valid = in_range & (peak_values > 0)
+        keep[:] = valid
+        if not valid.any():
+            return
+
+        cols = np.arange(wave_length)
+        before_peak = cols[None, :] < positions[:, None]
+
+        def crossing(threshold: np.ndarray, rising: bool) -> tuple[np.ndarray, np.ndarray]:
+            if rising:
+                # 峰值左侧第一个超过阈值的点
+                hit_mask = (corrected >= threshold[:, None]) & before_peak
+                first = np.zeros(n_hits, dtype=np.int64)
+            else:
+                # 峰值右侧（含峰值）第一个低于阈值的点
+                hit_mask = (corrected <= threshold[:, None]) & ~before_peak
+                first = positions
+            idx = np.argmax(hit_mask, axis=1)
+            found = hit_mask[hit_idx, idx]
+            rel = (idx - first).astype(np.float64)
+            if interpolation:
+                # 线性插值: x = (idx-1) + (threshold - y0) / (y1 - y0)
+                y0 = corrected[hit_idx, np.maximum(idx - 1, 0)]
+                y1 = corrected[hit_idx, idx]
+                step = y1 - y0
+                interp = found & (idx > first) & (np.abs(step) >= 1e-10)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    fraction = (threshold - y0) / step
+                rel = np.where(interp, (rel - 1.0) + fraction, rel)
+            return rel, found
+
+        rise_low_pos, rise_low_found = crossing(peak_values * rise_low, rising=True)
+        rise_high_pos, rise_high_found = crossing(peak_values * rise_high, rising=True)
+        fall_high_pos, fall_high_found = crossing(peak_values * fall_high, rising=False)
+        fall_low_pos, fall_low_found = crossing(peak_values * fall_low, rising=False)
+        # 调整为相对于整个波形的位置
+        fall_high_pos = fall_high_pos + positions
+        fall_low_pos = fall_low_pos + positions
+
+        rise_ok = rise_low_found & rise_high_found
+        fall_ok = fall_high_found & fall_low_found
+        total_ok = rise_low_found & fall_low_found
+        rise_samples = np.where(rise_ok, rise_high_pos - rise_low_pos, 0.0)
+        fall_samples = np.where(fall_ok, fall_low_pos - fall_high_pos, 0.0)
+        total_samples = np.where(total_ok, fall_low_pos - rise_low_pos, 0.0)
+
+        out["rise_time_samples"] = rise_samples
+        out["fall_time_samples"] = fall_samples
+        out["total_width_samples"] = total_samples
+        out["rise_time"] = rise_samples / sampling_rate
+        out["fall_time"] = fall_samples / sampling_rate
+        out["total_width"] = total_samples / sampling_rate
+        out["peak_height"] = peak_values
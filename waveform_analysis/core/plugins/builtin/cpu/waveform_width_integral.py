@@ -21,6 +21,7 @@ from waveform_analysis.core.plugins.builtin.cpu._wave_source import (
     resolve_wave_input_spec,
 )
 from waveform_analysis.core.plugins.core.base import Option, Plugin
+from waveform_analysis.core.processing.dtypes import decode_polarity
 
 WAVEFORM_WIDTH_INTEGRAL_DTYPE = np.dtype(
     [
@@ -177,9 +178,9 @@ class WaveformWidthIntegralPlugin(Plugin):
                 and records is not None
                 and "polarity" in records.dtype.names
             ):
-                data_polarity = str(records[event_idx]["polarity"])
+                data_polarity = decode_polarity(records[event_idx]["polarity"])
             elif waveform_data is not None and "polarity" in waveform_data.dtype.names:
-                data_polarity = str(waveform_data[event_idx]["polarity"])
+                data_polarity = decode_polarity(waveform_data[event_idx]["polarity"])
 
             if wave_input.spec.is_records and data_polarity in ("positive", "negative"):
                 signal = -get_signal(event_idx).astype(np.float64, copy=False)
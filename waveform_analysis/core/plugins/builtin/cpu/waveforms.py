@@ -25,23 +25,33 @@ from __future__ import annotations
 from contextlib import nullcontext
 from dataclasses import dataclass
 import logging
+import os
+from pathlib import Path
+import tempfile
 from typing import TYPE_CHECKING, Any, Optional, Union
 
 import numpy as np
 
+from waveform_analysis.core.execution.worker_pools import WorkerPoolService, get_worker_pools
 from waveform_analysis.core.foundation.utils import exporter
 from waveform_analysis.core.hardware.channel import (
     HardwareChannel,
     get_channel_metadata_config,
+    group_indices_by_hardware_channel,
     resolve_channel_metadata_map,
 )
 from waveform_analysis.core.plugins.builtin.cpu._dt_compat import resolve_dt_config
+from waveform_analysis.core.plugins.builtin.cpu.raw_files import RawFileNamesPlugin
 from waveform_analysis.core.plugins.core.base import Option, Plugin
 from waveform_analysis.core.processing.dtypes import (
     DEFAULT_WAVE_LENGTH,
+    PACKED_WAVEFORM_DTYPE,
+    POLARITY_UNKNOWN,
     ST_WAVEFORM_DTYPE,
     create_record_dtype,
+    encode_polarity,
 )
+from waveform_analysis.core.processing.packed_waveforms import PackedWaveforms
 
 if TYPE_CHECKING:
     from waveform_analysis.utils.formats.base import ColumnMapping, FormatSpec
@@ -52,6 +62,14 @@ logger = logging.getLogger(__name__)
 # 初始化 exporter
 export, __all__ = exporter()
 
+# 流式模式回退路径中逐块复制的字节数
+_STREAMING_COPY_BYTES = 64 << 20
+
+# st_waveforms 的波形布局
+WAVE_LAYOUT_PADDED = export("padded", name="WAVE_LAYOUT_PADDED")
+WAVE_LAYOUT_PACKED = export("packed", name="WAVE_LAYOUT_PACKED")
+WAVE_LAYOUTS = (WAVE_LAYOUT_PADDED, WAVE_LAYOUT_PACKED)
+
 
 def _parse_file_to_npy(
     args: tuple[int, int, str, int, int | None, str, str],
@@ -259,7 +277,7 @@ def _convert_v1725_to_st_waveforms(
     st_waveforms["baseline"] = np.asarray(baselines, dtype=np.float64)
     st_waveforms["baseline_upstream"] = np.nan
     if "polarity" in st_waveforms.dtype.names:
-        st_waveforms["polarity"] = "unknown"
+        st_waveforms["polarity"] = POLARITY_UNKNOWN
     st_waveforms["board"] = np.asarray(boards, dtype=np.int16)
     st_waveforms["channel"] = np.asarray(channels, dtype=np.int16)
     if "record_id" in st_waveforms.dtype.names:
@@ -290,28 +308,41 @@ def _convert_v1725_to_st_waveforms(
     return st_waveforms
 
 
-def _build_polarity_lookup(
+def _resolve_polarity_codes(
     context: Any,
     run_id: str,
     boards: np.ndarray,
     channels: np.ndarray,
-) -> dict[HardwareChannel, str]:
+) -> np.ndarray | None:
+    """
+    按 (board, channel) 解析每行的极性编码（POLARITY_CODES）。
+
+    只对去重后的硬件通道查询一次元数据，再用 inverse 索引广播回每一行；
+    没有通道元数据配置时返回 None。
+    """
     if boards.size == 0 or channels.size == 0:
-        return {}
+        return None
 
     metadata_layers = get_channel_metadata_config(context, run_id)
     if not metadata_layers:
-        return {}
+        return None
 
-    hardware_channels = [
-        HardwareChannel(int(board), int(channel))
-        for board, channel in zip(boards, channels, strict=False)
-    ]
+    pairs, inverse = np.unique(
+        np.stack([np.asarray(boards, dtype=np.int64), np.asarray(channels, dtype=np.int64)], 1),
+        axis=0,
+        return_inverse=True,
+    )
+    hardware_channels = [HardwareChannel(int(board), int(channel)) for board, channel in pairs]
     resolved = resolve_channel_metadata_map(
         channel_metadata=metadata_layers,
         channels=hardware_channels,
     )
-    return {hw_channel: metadata.polarity for hw_channel, metadata in resolved.items()}
+    pair_codes = np.full(len(pairs), POLARITY_UNKNOWN, dtype=np.int8)
+    for i, hw_channel in enumerate(hardware_channels):
+        metadata = resolved.get(hw_channel)
+        if metadata is not None:
+            pair_codes[i] = encode_polarity(metadata.polarity)
+    return pair_codes[np.asarray(inverse).reshape(-1)]
 
 
 def _apply_polarity_metadata(
@@ -326,27 +357,99 @@ def _apply_polarity_metadata(
     ):
         return st_waveforms
 
-    st_waveforms["polarity"] = "unknown"
+    st_waveforms["polarity"] = POLARITY_UNKNOWN
     if "board" not in st_waveforms.dtype.names or "channel" not in st_waveforms.dtype.names:
         return st_waveforms
 
-    polarity_map = _build_polarity_lookup(
+    codes = _resolve_polarity_codes(
         context,
         run_id,
         st_waveforms["board"],
         st_waveforms["channel"],
     )
-    if not polarity_map:
-        return st_waveforms
+    if codes is not None:
+        st_waveforms["polarity"] = codes
 
-    for idx in range(len(st_waveforms)):
-        hw_channel = HardwareChannel(
-            int(st_waveforms["board"][idx]),
-            int(st_waveforms["channel"][idx]),
+    return st_waveforms
+
+
+def _empty_st_waveforms(config: WaveformStructConfig, packed: bool) -> np.ndarray | PackedWaveforms:
+    if packed:
+        return PackedWaveforms(
+            np.zeros(0, dtype=PACKED_WAVEFORM_DTYPE), np.zeros(0, dtype=np.int16)
         )
-        st_waveforms["polarity"][idx] = polarity_map.get(hw_channel, "unknown")
+    return np.zeros(0, dtype=config.get_record_dtype())
 
-    return st_waveforms
+
+def staged_output_path(
+    context: Any,
+    run_id: str,
+    data_name: str | None,
+) -> tuple[Path, bool]:
+    """Return (path, staged) for a file-backed plugin output.
+
+    When the result will be cached and the storage supports staging, rows are
+    written straight into the cache staging file so the save step only renames
+    it. Otherwise a temporary file is used. Shared by the streaming
+    st_waveforms path and the wave_pool_filtered block filter.
+    """
+    if data_name is not None:
+        get_storage = getattr(context, "_get_storage_for_data_name", None)
+        storage = get_storage(data_name) if get_storage is not None else None
+        if storage is not None and hasattr(storage, "staging_path"):
+            key = context.key_for(run_id, data_name)
+            return Path(context._storage_call(storage, "staging_path", key, run_id)), True
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".dat") as tmp:
+        return Path(tmp.name), False
+
+
+def _append_channels_via_reader_files(
+    reader: Any,
+    raw_files: list[list[str]],
+    output_path: Path,
+    output_dtype: np.dtype,
+    make_structurizer,
+    upstream_baselines: list[np.ndarray] | None,
+    show_progress: bool,
+) -> int:
+    """Fallback for readers without read_files_streaming_into: append per-channel
+    memmaps to the output file block by block, renumbering record_id."""
+    block_rows = max(1, _STREAMING_COPY_BYTES // output_dtype.itemsize)
+    cursor = 0
+    with open(output_path, "wb") as sink:
+        for ch_idx, channel_files in enumerate(raw_files):
+            if not channel_files:
+                continue
+            ch_upstream_baseline = None
+            if upstream_baselines is not None and ch_idx < len(upstream_baselines):
+                ch_upstream_baseline = upstream_baselines[ch_idx]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".dat") as tmp:
+                tmp_path = Path(tmp.name)
+            try:
+                result = reader.read_files_streaming(
+                    file_paths=channel_files,
+                    output_dtype=output_dtype,
+                    output_path=tmp_path,
+                    structurizer=make_structurizer(ch_idx, ch_upstream_baseline),
+                    show_progress=show_progress,
+                )
+                n_rows = len(result)
+                for start in range(0, n_rows, block_rows):
+                    block = np.array(result[start : start + block_rows])
+                    if "record_id" in output_dtype.names:
+                        block["record_id"] = np.arange(
+                            cursor + start, cursor + start + len(block), dtype=np.int64
+                        )
+                    sink.write(block.tobytes())
+                cursor += n_rows
+                del result
+            finally:
+                try:
+                    tmp_path.unlink()
+                except Exception:
+                    pass
+    return cursor
 
 
 def _structure_waveforms_streaming(
@@ -357,11 +460,16 @@ def _structure_waveforms_streaming(
     baseline_samples: int | tuple[int, int] | list[int] | None,
     upstream_baselines: list[np.ndarray] | None,
     show_progress: bool,
+    data_name: str | None = None,
 ) -> np.ndarray:
-    """Structure raw files incrementally into a temporary memmap-backed array."""
-    from pathlib import Path
-    import tempfile
+    """Structure raw files out-of-core into a single memmap-backed array.
 
+    All channels are written into one file preallocated from
+    ``count_total_rows`` (the cache staging file of ``data_name`` when
+    available), ``record_id`` is assigned in place, and the result is returned
+    as a memmap, so peak memory stays at one parsed file instead of the full
+    ``st_waveforms``.
+    """
     from waveform_analysis.utils.formats import get_adapter
 
     daq_adapter = config.format_spec.name.replace("_csv", "")
@@ -375,20 +483,7 @@ def _structure_waveforms_streaming(
     _validate_baseline_samples(baseline_samples)
     baseline_warned = False
 
-    st_waveforms: list[np.ndarray] = []
-
-    for ch_idx, channel_files in enumerate(raw_files):
-        if not channel_files:
-            st_waveforms.append(np.zeros(0, dtype=output_dtype))
-            continue
-
-        ch_upstream_baseline = None
-        if upstream_baselines is not None and ch_idx < len(upstream_baselines):
-            ch_upstream_baseline = upstream_baselines[ch_idx]
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".dat") as tmp:
-            tmp_path = Path(tmp.name)
-
+    def make_structurizer(ch_idx: int, ch_upstream_baseline: np.ndarray | None):
         def structurizer(raw_arr: np.ndarray, output: np.memmap, offset: int) -> int:
             nonlocal baseline_warned
             n = len(raw_arr)
@@ -469,34 +564,75 @@ def _structure_waveforms_streaming(
                 output[offset : offset + n]["baseline_upstream"] = np.nan
             else:
                 output[offset : offset + n]["baseline_upstream"] = np.nan
+            if "polarity" in output.dtype.names:
+                output[offset : offset + n]["polarity"] = POLARITY_UNKNOWN
 
             return n
 
-        try:
-            result = reader.read_files_streaming(
-                file_paths=channel_files,
-                output_dtype=output_dtype,
-                output_path=tmp_path,
-                structurizer=structurizer,
-                show_progress=show_progress,
+        return structurizer
+
+    n_channels = sum(1 for channel_files in raw_files if channel_files)
+    output_path, staged = staged_output_path(context, run_id, data_name)
+    n_rows = 0
+    try:
+        if hasattr(reader, "read_files_streaming_into") and hasattr(reader, "count_total_rows"):
+            total_rows = sum(
+                reader.count_total_rows(channel_files)
+                for channel_files in raw_files
+                if channel_files
             )
-            st_waveforms.append(np.array(result))
-        finally:
-            try:
-                tmp_path.unlink()
-            except Exception:
-                pass
+            if total_rows > 0:
+                output = np.memmap(output_path, dtype=output_dtype, mode="w+", shape=(total_rows,))
+                for ch_idx, channel_files in enumerate(raw_files):
+                    if not channel_files:
+                        continue
+                    ch_upstream_baseline = None
+                    if upstream_baselines is not None and ch_idx < len(upstream_baselines):
+                        ch_upstream_baseline = upstream_baselines[ch_idx]
+                    n_rows += reader.read_files_streaming_into(
+                        channel_files,
+                        output,
+                        make_structurizer(ch_idx, ch_upstream_baseline),
+                        offset=n_rows,
+                        show_progress=show_progress,
+                    )
+                output.flush()
+                del output
+                if n_rows < total_rows:
+                    os.truncate(output_path, n_rows * output_dtype.itemsize)
+        else:
+            n_rows = _append_channels_via_reader_files(
+                reader,
+                raw_files,
+                output_path,
+                output_dtype,
+                make_structurizer,
+                upstream_baselines,
+                show_progress,
+            )
+    except BaseException:
+        _unlink_quietly(output_path)
+        raise
 
-    context.logger.info("流式模式完成，处理了 %d 个通道", len(st_waveforms))
-    non_empty = [ch for ch in st_waveforms if len(ch) > 0]
-    if not non_empty:
+    context.logger.info("流式模式完成，处理了 %d 个通道", n_channels)
+    if n_rows == 0:
+        _unlink_quietly(output_path)
         return np.zeros(0, dtype=output_dtype)
-    structured = np.concatenate(non_empty)
-    if "record_id" in structured.dtype.names:
-        structured["record_id"] = np.arange(len(structured), dtype=np.int64)
+
+    structured = np.memmap(output_path, dtype=output_dtype, mode="r+", shape=(n_rows,))
+    if not staged:
+        # 映射建立后即可删除临时文件（POSIX 下数据在 memmap 释放前保持可用）
+        _unlink_quietly(output_path)
     return structured
 
 
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink()
+    except Exception:
+        pass
+
+
 @export
 @dataclass
 class WaveformStructConfig:
@@ -646,19 +782,24 @@ class WaveformStruct:
         waves: np.ndarray | None = None,
         channel_mapping: dict[tuple[int, int], int] | None = None,
         channel_idx: int = 0,
-    ) -> np.ndarray:
-        """将波形数组转换为结构化数组。"""
+        packed: bool = False,
+    ) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+        """将波形数组转换为结构化数组。
+
+        ``packed=True`` 时返回 (元数据, 二维样本)，元数据使用 PACKED_WAVEFORM_DTYPE，
+        样本只保留有效长度（仅在显式 wave_length 时截断），不做填充。
+        """
+        out_dtype = PACKED_WAVEFORM_DTYPE if packed else self.record_dtype
         if waves is None:
-            if not self.waveforms:
-                return np.zeros(0, dtype=self.record_dtype)
-            waves = self.waveforms[0]
+            waves = self.waveforms[0] if self.waveforms else np.zeros((0, 0))
 
         if len(waves) == 0:
-            return np.zeros(0, dtype=self.record_dtype)
+            empty = np.zeros(0, dtype=out_dtype)
+            return (empty, np.zeros((0, 0), dtype=np.int16)) if packed else empty
 
         cols = self.config.format_spec.columns
         wave_length = self._target_wave_length
-        if wave_length is None:
+        if wave_length is None and not packed:
             wave_length = self.record_dtype["wave"].shape[0]
 
         samples_end = cols.samples_end if cols.samples_end is not None else waves.shape[1]
@@ -668,6 +809,8 @@ class WaveformStruct:
             wave_data = np.zeros((len(waves), 0))
         actual_wave_length = wave_data.shape[1] if wave_data.size > 0 else 0
 
+        if wave_length is None:
+            wave_length = actual_wave_length
         if actual_wave_length > wave_length and not self._wave_length_warned:
             logger.warning(
                 "Wave length %s exceeds target wave_length %s; truncating.",
@@ -676,7 +819,7 @@ class WaveformStruct:
             )
             self._wave_length_warned = True
 
-        waveform_structured = np.zeros(len(waves), dtype=self.record_dtype)
+        waveform_structured = np.zeros(len(waves), dtype=out_dtype)
 
         try:
             board_vals = waves[:, cols.board].astype(int)
@@ -770,7 +913,7 @@ class WaveformStruct:
         else:
             waveform_structured["baseline_upstream"] = np.nan
         if "polarity" in waveform_structured.dtype.names:
-            waveform_structured["polarity"] = "unknown"
+            waveform_structured["polarity"] = POLARITY_UNKNOWN
 
         waveform_structured["timestamp"] = timestamps
         waveform_structured["board"] = board_vals.astype(np.int16, copy=False)
@@ -785,6 +928,14 @@ class WaveformStruct:
             else:
                 waveform_structured["time"] = timestamps // 1000
 
+        if packed:
+            n_samples = min(actual_wave_length, wave_length)
+            samples = np.asarray(wave_data[:, :n_samples])
+            if samples.dtype != np.int16:
+                samples = samples.astype(np.int16, casting="unsafe")
+            waveform_structured["event_length"] = np.int32(n_samples)
+            return waveform_structured, samples
+
         if wave_data.size > 0:
             n_samples = min(wave_data.shape[1], wave_length)
             dest = waveform_structured["wave"][:, :n_samples]
@@ -803,8 +954,15 @@ class WaveformStruct:
         show_progress: bool = False,
         start_channel_slice: int = 0,
         n_jobs: int | None = None,
-    ) -> np.ndarray:
-        """将所有通道的波形转换为结构化数组。"""
+        packed: bool = False,
+        pools: WorkerPoolService | None = None,
+    ) -> np.ndarray | PackedWaveforms:
+        """将所有通道的波形转换为结构化数组。
+
+        ``packed=True`` 时返回 PackedWaveforms：各通道样本按有效长度拼接进波形池，
+        不再填充到整个 run 的最大长度。``n_jobs > 1`` 时按通道并行，执行器取自
+        ``pools``（默认进程级工作池服务）。
+        """
         cols = self.config.format_spec.columns
 
         has_data = False
@@ -827,9 +985,12 @@ class WaveformStruct:
 
         self._target_wave_length = target_wave_length
         self.record_dtype = create_record_dtype(target_wave_length)
+        if packed:
+            # packed 只在显式 wave_length 时截断，否则保留每个通道的实际长度
+            self._target_wave_length = self.config.wave_length
 
         if not has_data:
-            return np.zeros(0, dtype=self.record_dtype)
+            return self._empty_result(packed)
 
         n_channels = len(self.waveforms)
         if n_jobs is None:
@@ -858,16 +1019,14 @@ class WaveformStruct:
                 pbar = enumerate(self.waveforms)
 
             self.waveform_structureds = [
-                self._structure_waveform(waves, channel_idx=idx) for idx, waves in pbar
+                self._structure_waveform(waves, channel_idx=idx, packed=packed)
+                for idx, waves in pbar
             ]
 
             # 正确关闭进度条
             if show_progress and hasattr(pbar, "close"):
                 pbar.close()
         else:
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-
-            self.waveform_structureds = [None] * n_channels
             pbar = None
             if show_progress:
                 try:
@@ -884,23 +1043,26 @@ class WaveformStruct:
                 except ImportError:
                     pbar = None
 
-            def _do(idx: int, waves: np.ndarray) -> np.ndarray:
-                return self._structure_waveform(waves, channel_idx=idx)
-
-            with ThreadPoolExecutor(max_workers=effective_jobs) as executor:
-                futures = {
-                    executor.submit(_do, idx, waves): idx
-                    for idx, waves in enumerate(self.waveforms)
-                }
-                for future in as_completed(futures):
-                    idx = futures[future]
-                    self.waveform_structureds[idx] = future.result()
-                    if pbar:
-                        pbar.update(1)
+            def _do(item: tuple[int, np.ndarray]) -> Any:
+                idx, waves = item
+                return self._structure_waveform(waves, channel_idx=idx, packed=packed)
+
+            if pools is None:
+                pools = get_worker_pools()
+            self.waveform_structureds = pools.map(
+                _do,
+                list(enumerate(self.waveforms)),
+                name="st_waveforms_structure",
+                max_workers=effective_jobs,
+                on_result=(lambda _idx, _res: pbar.update(1)) if pbar else None,
+            )
 
             if pbar:
                 pbar.close()
 
+        if packed:
+            return self._concatenate_packed(self.waveform_structureds)
+
         if not self.waveform_structureds:
             return np.zeros(0, dtype=self.record_dtype)
 
@@ -912,59 +1074,38 @@ class WaveformStruct:
             structured["record_id"] = np.arange(len(structured), dtype=np.int64)
         return structured
 
+    def _empty_result(self, packed: bool) -> np.ndarray | PackedWaveforms:
+        if packed:
+            return _empty_st_waveforms(self.config, packed=True)
+        return np.zeros(0, dtype=self.record_dtype)
+
+    def _concatenate_packed(
+        self, parts: list[tuple[np.ndarray, np.ndarray]] | None
+    ) -> PackedWaveforms:
+        """把各通道的 (元数据, 二维样本) 拼接为一个 PackedWaveforms。"""
+        non_empty = [(events, samples) for events, samples in parts or [] if len(events) > 0]
+        if not non_empty:
+            return self._empty_result(packed=True)
+
+        events = np.concatenate([part[0] for part in non_empty])
+        pool = np.empty(sum(part[1].size for part in non_empty), dtype=np.int16)
+        cursor = 0
+        for _events, samples in non_empty:
+            pool[cursor : cursor + samples.size] = samples.reshape(-1)
+            cursor += samples.size
+        lengths = events["event_length"].astype(np.int64)
+        events["wave_offset"] = np.cumsum(lengths) - lengths
+        events["record_id"] = np.arange(len(events), dtype=np.int64)
+        return PackedWaveforms(events, pool)
+
     def get_event_length(self) -> np.ndarray:
         """Compute per-channel event lengths."""
         self.event_length = np.array([len(wave) for wave in self.waveforms])
         return self.event_length
 
 
-@export
-class RawFileNamesPlugin(Plugin):
-    """Plugin to find raw CSV files."""
-
-    provides = "raw_files"
-    description = "Scan the data directory and group raw CSV files by channel number."
-    version = "0.0.2"
-    options = {
-        "data_root": Option(default="DAQ", type=str, help="Root directory for data"),
-        "daq_adapter": Option(default="vx2730", type=str, help="DAQ adapter name (e.g., 'vx2730')"),
-    }
-
-    def compute(self, context: Any, run_id: str, **kwargs) -> list[list[str]]:
-        """
-        扫描数据目录并按通道分组原始 CSV 文件
-
-        从配置的数据目录中查找指定运行的所有原始波形文件，并按通道号分组。
-        支持 DAQ 集成，可以直接从 DAQ 元数据中获取文件列表。
-        支持通过 daq_adapter 参数指定 DAQ 适配器来处理不同格式。
-        通道选择由 DAQ 适配器或 DAQ 元数据决定，不再通过插件配置裁剪。
-
-        Args:
-            context: Context 实例，用于访问配置和缓存
-            run_id: 运行标识符（运行名称）
-            **kwargs: 依赖数据（此插件无依赖）
-
-        Returns:
-            List[List[str]]: 按通道分组的文件路径列表
-
-        Examples:
-            >>> raw_files = ctx.get_data('run_001', 'raw_files')
-            >>> print(f"通道数: {len(raw_files)}")
-        """
-        from waveform_analysis.core.processing.loader import get_raw_files
-
-        data_root = context.get_config(self, "data_root")
-        daq_adapter = context.get_config(self, "daq_adapter")
-
-        # Support DAQ integration if daq_run is present in context
-        daq_run = getattr(context, "daq_run", None)
-
-        return get_raw_files(
-            run_name=run_id,
-            data_root=data_root,
-            daq_run=daq_run,
-            daq_adapter=daq_adapter,
-        )
+# RawFileNamesPlugin 定义在 raw_files.py，这里保留原导入路径
+RawFileNamesPlugin = export(RawFileNamesPlugin, name="RawFileNamesPlugin")
 
 
 @export
@@ -976,7 +1117,7 @@ class WaveformsPlugin(Plugin):
     2. 将波形数据结构化为 NumPy 结构化数组（ST_WAVEFORM_DTYPE）
     """
 
-    version = "0.10.0"
+    version = "0.11.0"
     provides = "st_waveforms"
     depends_on = []
     uses_run_config = True
@@ -1046,9 +1187,19 @@ class WaveformsPlugin(Plugin):
             default=False,
             type=bool,
             help="Enable streaming mode: read files and structure waveforms incrementally to reduce memory usage. "
-            "When enabled, uses memmap for output to avoid full vstack memory overhead.",
+            "When enabled, all channels are written straight into the memmap cache file "
+            "(preallocated from row counts) and a memmap is returned, so runs larger than RAM "
+            "can be structured.",
             track=False,
         ),
+        "wave_layout": Option(
+            default=WAVE_LAYOUT_PADDED,
+            type=str,
+            validate=lambda v: v in WAVE_LAYOUTS,
+            help="st_waveforms layout: 'padded' (fixed-length wave field, padded to the run-wide "
+            "max length) | 'packed' (PackedWaveforms: metadata rows + flat wave pool addressed "
+            "by wave_offset/event_length, padded view built on demand).",
+        ),
     }
 
     def resolve_depends_on(self, context: Any, run_id: str | None = None) -> list[str]:
@@ -1102,13 +1253,16 @@ class WaveformsPlugin(Plugin):
             "depends_on": self._build_depends_lineage(context),
         }
         try:
-            dtype = self._get_record_dtype(daq_adapter, wave_length)
+            if config.get("wave_layout") == WAVE_LAYOUT_PACKED:
+                dtype = PACKED_WAVEFORM_DTYPE
+            else:
+                dtype = self._get_record_dtype(daq_adapter, wave_length)
             lineage["dtype"] = np.dtype(dtype).descr
         except Exception:
             lineage["dtype"] = str(self.output_dtype)
         return lineage
 
-    def compute(self, context: Any, run_id: str, **kwargs) -> np.ndarray:
+    def compute(self, context: Any, run_id: str, **kwargs) -> np.ndarray | PackedWaveforms:
         """
         从原始 CSV 文件中提取波形数据并结构化为 NumPy 结构化数组
 
@@ -1126,13 +1280,64 @@ class WaveformsPlugin(Plugin):
             **kwargs: 依赖数据
 
         Returns:
-            np.ndarray: 结构化波形数据数组（包含 channel 字段）
+            np.ndarray: 结构化波形数据数组（包含 channel 字段）；
+            ``wave_layout="packed"`` 时返回 PackedWaveforms
+        """
+        raw_files = context.get_data(run_id, "raw_files")
+        return self._structure_raw_files(context, run_id, raw_files)
+
+    def compute_incremental(
+        self, context: Any, run_id: str, previous: Any, update: Any
+    ) -> tuple[np.ndarray | PackedWaveforms, int] | None:
+        """
+        增量刷新：只解析新增文件并追加在已有行之后（record_id 顺延）。
+
+        定长布局沿用已有的 wave 长度；新增行按“摄取批次、批内按通道”排列。
         """
+        if context.get_config(self, "daq_adapter") == "v1725":
+            return None
+        if isinstance(previous, PackedWaveforms):
+            wave_length = None
+        elif (
+            isinstance(previous, np.ndarray)
+            and previous.dtype.names
+            and "wave" in previous.dtype.names
+        ):
+            wave_length = (
+                int(previous.dtype["wave"].shape[0]) if previous.dtype["wave"].shape else 0
+            )
+        else:
+            return None
+        first_file = next((group[0] for group in update.all_files if group), None)
+        tail = self._structure_raw_files(
+            context,
+            run_id,
+            update.new_files,
+            wave_length=wave_length,
+            epoch_file=first_file,
+            allow_streaming=False,
+        )
+        n_previous = len(previous)
+        events = tail.events if isinstance(tail, PackedWaveforms) else tail
+        if len(events) and "record_id" in events.dtype.names:
+            events["record_id"] += n_previous
+        return tail, n_previous
+
+    def _structure_raw_files(
+        self,
+        context: Any,
+        run_id: str,
+        raw_files: list[list[str]],
+        *,
+        wave_length: int | None = None,
+        epoch_file: str | None = None,
+        allow_streaming: bool = True,
+    ) -> np.ndarray | PackedWaveforms:
+        """解析并结构化给定的文件分组；增量刷新时固定 wave 长度与 epoch 来源文件。"""
         from pathlib import Path
 
         from waveform_analysis.utils.formats import get_adapter
 
-        raw_files = context.get_data(run_id, "raw_files")
         n_channels = len(raw_files)
 
         # ========== 获取配置 ==========
@@ -1141,11 +1346,13 @@ class WaveformsPlugin(Plugin):
         chunksize = context.get_config(self, "chunksize")
         parse_engine = context.get_config(self, "parse_engine")
         daq_adapter = context.get_config(self, "daq_adapter")
-        wave_length = context.get_config(self, "wave_length")
+        if wave_length is None:
+            wave_length = context.get_config(self, "wave_length")
         dt_ns = resolve_dt_config(context, self, deprecated_keys=("dt_ns", "sampling_interval_ns"))
         use_upstream_baseline = context.get_config(self, "use_upstream_baseline")
         baseline_samples = context.get_config(self, "baseline_samples")
-        streaming_mode = context.get_config(self, "streaming_mode")
+        streaming_mode = allow_streaming and context.get_config(self, "streaming_mode")
+        packed = context.get_config(self, "wave_layout") == WAVE_LAYOUT_PACKED
         show_progress = context.config.get("show_progress", True)
 
         if isinstance(daq_adapter, str):
@@ -1178,8 +1385,9 @@ class WaveformsPlugin(Plugin):
         if dt_ns is not None:
             config.dt_ns = dt_ns
 
+        self.output_dtype = PACKED_WAVEFORM_DTYPE if packed else type(self).output_dtype
         if n_channels == 0:
-            return np.zeros(0, dtype=config.get_record_dtype())
+            return _empty_st_waveforms(config, packed)
 
         # ========== V1725 特殊处理 ==========
         if daq_adapter == "v1725":
@@ -1198,13 +1406,15 @@ class WaveformsPlugin(Plugin):
                 file_list.append(path)
 
             if not file_list:
-                return np.zeros(0, dtype=config.get_record_dtype())
+                return _empty_st_waveforms(config, packed)
 
             data = adapter.format_reader.read_files(file_list, show_progress=show_progress)
             if data.size == 0:
-                return np.zeros(0, dtype=config.get_record_dtype())
+                return _empty_st_waveforms(config, packed)
             st_waveforms = _convert_v1725_to_st_waveforms(data, config)
             st_waveforms = _apply_polarity_metadata(st_waveforms, context, run_id)
+            if packed:
+                return PackedWaveforms.from_padded(st_waveforms)
             context.logger.info(
                 "v1725 converted to standard st_waveforms (n_events=%d, wave_length=%d)",
                 len(st_waveforms),
@@ -1216,7 +1426,7 @@ class WaveformsPlugin(Plugin):
             )
             return st_waveforms
 
-        if wave_length is None:
+        if wave_length is None and not packed:
             default_delimiter = ";"
             if daq_adapter:
                 try:
@@ -1232,10 +1442,12 @@ class WaveformsPlugin(Plugin):
 
         # ========== 获取 epoch ==========
         epoch_ns = None
+        if epoch_file is None and raw_files and raw_files[0]:
+            epoch_file = raw_files[0][0]
         if daq_adapter:
             adapter = get_adapter(daq_adapter)
-            if raw_files and raw_files[0]:
-                first_file = Path(raw_files[0][0])
+            if epoch_file is not None:
+                first_file = Path(epoch_file)
                 try:
                     epoch_ns = adapter.get_file_epoch(first_file)
                 except (FileNotFoundError, OSError):
@@ -1243,7 +1455,8 @@ class WaveformsPlugin(Plugin):
                     pass
 
         config.epoch_ns = epoch_ns
-        self.output_dtype = config.get_record_dtype()
+        if not packed:
+            self.output_dtype = config.get_record_dtype()
 
         profiler = getattr(context, "profiler", None)
         timer = profiler.timeit if profiler else None
@@ -1251,7 +1464,7 @@ class WaveformsPlugin(Plugin):
         # ========== 流式模式 ==========
         if streaming_mode:
             with timer("st_waveforms.streaming") if timer else nullcontext():
-                return self._compute_streaming(
+                st_waveforms = self._compute_streaming(
                     context=context,
                     run_id=run_id,
                     raw_files=raw_files,
@@ -1260,6 +1473,9 @@ class WaveformsPlugin(Plugin):
                     upstream_baselines=upstream_baselines,
                     show_progress=show_progress,
                 )
+            st_waveforms = _apply_polarity_metadata(st_waveforms, context, run_id)
+            # 流式结果已落盘为定长 memmap；packed 布局按块压缩为波形池
+            return PackedWaveforms.from_padded(st_waveforms) if packed else st_waveforms
 
         # ========== 批量模式（扁平化文件读取）==========
         with timer("st_waveforms.read") if timer else nullcontext():
@@ -1292,8 +1508,13 @@ class WaveformsPlugin(Plugin):
             st_waveforms = waveform_struct.structure_waveforms(
                 show_progress=show_progress,
                 n_jobs=n_jobs,
+                packed=packed,
+                pools=get_worker_pools(context),
             )
 
+        if packed:
+            _apply_polarity_metadata(st_waveforms.events, context, run_id)
+            return st_waveforms
         st_waveforms = _apply_polarity_metadata(st_waveforms, context, run_id)
         return st_waveforms
 
@@ -1473,4 +1694,5 @@ class WaveformsPlugin(Plugin):
             baseline_samples=baseline_samples,
             upstream_baselines=upstream_baselines,
             show_progress=show_progress,
+            data_name=self.provides if self.save_when == "always" else None,
         )
@@ -26,6 +26,7 @@ from waveform_analysis.core.processing.chunk import (
     Chunk,
     get_endtime,
 )
+from waveform_analysis.core.processing.packed_waveforms import as_padded_waveforms
 
 export, __all__ = exporter()
 
@@ -111,8 +112,8 @@ class SignalPeaksStreamPlugin(StreamingPlugin):
         self.endtime_field = "endtime"
 
     def _get_input_chunks(self, context: Any, run_id: str, **kwargs) -> Iterator[Chunk]:
-        filtered_waveforms = context.get_data(run_id, "filtered_waveforms")
-        st_waveforms = context.get_data(run_id, "st_waveforms")
+        filtered_waveforms = as_padded_waveforms(context.get_data(run_id, "filtered_waveforms"))
+        st_waveforms = as_padded_waveforms(context.get_data(run_id, "st_waveforms"))
 
         if not isinstance(filtered_waveforms, np.ndarray) or not isinstance(
             st_waveforms, np.ndarray
@@ -338,6 +338,7 @@ class Plugin(abc.ABC):
     is_side_effect: bool = False
     uses_run_config: bool = False
     timeout: Optional[float] = None  # Plugin execution timeout in seconds (None = no timeout)
+    resource_hint: Literal["cpu", "io"] = "cpu"  # Scheduling hint for parallel plan execution
 
     # Metadata for tracking
     _registered_from_module: Optional[str] = None
@@ -573,6 +574,10 @@ class Plugin(abc.ABC):
         if self.output_kind not in ("static", "stream"):
             raise ValueError(f"Plugin {self.provides}: 'output_kind' must be 'static' or 'stream'")
 
+        # Validate resource_hint
+        if self.resource_hint not in ("cpu", "io"):
+            raise ValueError(f"Plugin {self.provides}: 'resource_hint' must be 'cpu' or 'io'")
+
         # Validate dtypes
         if self.output_dtype is not None and not isinstance(self.output_dtype, (np.dtype, type)):
             # Basic check, np.dtype constructor is very flexible
@@ -599,6 +604,20 @@ class Plugin(abc.ABC):
         """
         pass
 
+    def compute_incremental(
+        self, context: Any, run_id: str, previous: Any, update: Any
+    ) -> Optional[Tuple[Any, int]]:
+        """
+        Optional hook used by ``Context.refresh_run`` when new raw files were ingested.
+
+        ``previous`` is the cached result before the refresh and ``update`` an
+        ``IncrementalUpdate`` (``update.stable_rows`` holds the unchanged prefix length
+        of every dependency already refreshed). Return ``(tail, stable_rows)`` meaning
+        the new result is ``previous[:stable_rows]`` followed by ``tail``, or None to
+        have the cached result cleared and recomputed in full on next access.
+        """
+        return None
+
     def on_error(self, context: Any, exception: Exception):
         """
         Optional hook called when compute() raises an exception.
@@ -24,7 +24,7 @@
    - 包装非 Chunk 输出
    - 按 main_start/main_end 裁剪输出
 4. _validate_chunk 校验时间边界，保障 endtime ≤ chunk.end
-5. 并行模式下使用 ExecutorManager 批量提交任务并按顺序产出结果
+5. 并行模式下使用 ExecutorManager 滑动窗口提交任务，队首完成即按顺序产出结果
 
 Examples:
     from waveform_analysis.core.plugins.core.streaming import get_streaming_context
@@ -44,6 +44,15 @@ import warnings
 import numpy as np
 
 from waveform_analysis.core.execution.config import get_config
+from waveform_analysis.core.execution.shm_transport import (
+    SharedChunkRef,
+    attach_chunk,
+    discard_array,
+    ensure_resource_tracker,
+    receive_chunk,
+    release_shared,
+    share_chunk,
+)
 from waveform_analysis.core.foundation.utils import exporter
 from waveform_analysis.core.processing.chunk import (
     DEFAULT_BREAK_THRESHOLD_PS,
@@ -72,12 +81,14 @@ _STREAMING_CONFIG_KEYS = {
     "executor_type",
     "max_workers",
     "parallel_batch_size",
+    "max_inflight_bytes",
     "break_threshold_ps",
     "required_halo_ns",
     "required_halo_left_ns",
     "required_halo_right_ns",
     "clip_strict",
     "executor_config",
+    "process_transport",
 }
 
 
@@ -103,6 +114,62 @@ def _process_chunk_worker(
     return result
 
 
+# 共享内存传输的 worker 端状态（每个 worker 进程由 initializer 设置一次）
+_SHM_WORKER_STATE: dict[str, Any] = {}
+
+
+def _init_shm_worker(
+    context_factory: Any,
+    plugin: "StreamingPlugin | None",
+    provides: str,
+    run_id: str,
+    kwargs: dict[str, Any],
+) -> None:
+    context = context_factory()
+    if plugin is None:
+        plugin = context.get_plugin(provides)
+    _SHM_WORKER_STATE.update(context=context, plugin=plugin, run_id=run_id, kwargs=kwargs)
+
+
+def _process_shared_chunk_worker(ref: SharedChunkRef) -> SharedChunkRef | None:
+    """共享内存模式的 worker：零拷贝 attach 输入，结果写入新段后返回描述符。"""
+    state = _SHM_WORKER_STATE
+    shm, chunk = attach_chunk(ref)
+    out_shm = None
+    out_ref = None
+    try:
+        result = _process_chunk_worker(
+            state["plugin"], chunk, state["context"], state["run_id"], state["kwargs"]
+        )
+        if result is not None:
+            out_shm, out_ref = share_chunk(result)
+        del result
+    finally:
+        del chunk
+        release_shared(shm)
+    # 输出段只关闭句柄，由主进程拷贝后 unlink
+    release_shared(out_shm)
+    return out_ref
+
+
+def _discard_shared_result(future: Any) -> None:
+    """丢弃已放弃任务的输出段（取消/提前结束时作为 done callback）。"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    ref = future.result()
+    if ref is not None:
+        discard_array(ref.data)
+
+
+_END_OF_STREAM = object()
+
+
+def _chunk_nbytes(chunk: Any) -> int:
+    """估算在途 chunk 的输入字节数（用于背压）。"""
+    data = getattr(chunk, "data", chunk)
+    return int(getattr(data, "nbytes", 0) or 0)
+
+
 def _pick_time_field(data: np.ndarray, preferred: str) -> str | None:
     """选择可用的时间字段名（优先使用 preferred）。"""
     if not hasattr(data, "dtype") or data.dtype.names is None:
@@ -142,7 +209,9 @@ class StreamingPlugin(Plugin):
     - break_threshold_ps: 断点阈值（单位与 time_field 一致，默认 ps）
     - required_halo_ns/left/right: halo 扩展范围
     - parallel/executor_type/max_workers: 并行策略
-    - parallel_batch_size: 并行批处理大小（None=自动）
+    - parallel_batch_size: 并行滑动窗口大小，即最多在途 chunk 数（None=自动）
+    - max_inflight_bytes: 在途输入 chunk 的字节上限，超过后暂停拉取输入（背压）
+    - process_transport: 进程池下 chunk 的传输方式（"shm" 共享内存描述符 / "pickle"）
     - executor_config: 统一执行器配置，覆盖类属性
     - load_balancer_config.worker_buckets: discrete worker buckets (e.g. [2, 4, 8])
     - is_stateful/reset_on_break: 状态插件在分段切换时的处理策略
@@ -152,8 +221,10 @@ class StreamingPlugin(Plugin):
     # 流式处理相关配置
     chunk_size: int = 50000  # 默认 chunk 大小
     parallel: bool = True  # 是否并行处理
-    parallel_batch_size: int | None = None  # 并行处理批量大小（None=自动）
+    parallel_batch_size: int | None = None  # 并行窗口大小：最多在途 chunk 数（None=自动）
+    max_inflight_bytes: int | None = None  # 在途输入 chunk 字节上限（None=不限制）
     executor_type: str = "thread"  # 执行器类型
+    process_transport: str = "shm"  # 进程池传输方式："shm"（共享内存）或 "pickle"
     max_workers: int | None = None  # 最大工作线程/进程数
     time_field: str = TIMESTAMP_FIELD  # 时间字段名（默认 timestamp）
     dt_field: str = DT_FIELD  # 采样间隔字段名
@@ -746,12 +817,16 @@ class StreamingPlugin(Plugin):
         **kwargs,
     ) -> Generator[Chunk, None, None]:
         """
-        并行处理 chunk 流（优化版：批量处理，避免完全物化，支持负载均衡）。
-
-        改进：
-        - 不再将整个流物化到列表
-        - 分批处理：每次处理 batch_size 个 chunk
-        - 保持流式处理的内存优势
+        并行处理 chunk 流（滑动窗口流水线，避免完全物化，支持负载均衡）。
+
+        调度方式：
+        - 最多保持 window 个 chunk 在途（parallel_batch_size，None=自动）
+        - 队首 chunk 完成即按输入顺序产出，同时继续补充新任务，
+          不再等待整批中最慢的 chunk
+        - 在途输入字节达到 max_inflight_bytes 时暂停拉取输入（至少保留 1 个在途）
+        - 进程池 + process_transport="shm" 时，worker 通过 initializer 只构建一次
+          轻量 Context（create_context_factory），chunk 以共享内存描述符往返：
+          worker 端零拷贝读取输入，输出由主进程拷贝一次后立即 unlink
         - 可选的动态负载均衡
 
         Args:
@@ -763,8 +838,7 @@ class StreamingPlugin(Plugin):
         Yields:
             处理后的 chunk（保持顺序；异常会重新抛出并取消未完成任务）
         """
-        from concurrent.futures import as_completed
-        import itertools
+        from collections import deque
 
         from waveform_analysis.core.execution.manager import ExecutorManager
 
@@ -785,7 +859,12 @@ class StreamingPlugin(Plugin):
             )
             max_workers = self._quantize_workers(suggested_workers, max_workers_cap)
 
-        if executor_type == "process":
+        # 进程池优先使用共享内存传输：worker 只初始化一次，chunk 以描述符传递
+        shm_factory = None
+        if executor_type == "process" and self.process_transport == "shm":
+            shm_factory = self._build_shm_context_factory(context, kwargs)
+
+        if executor_type == "process" and shm_factory is None:
             if (
                 not _is_pickleable(self)
                 or not _is_pickleable(context)
@@ -798,79 +877,124 @@ class StreamingPlugin(Plugin):
                 )
                 executor_type = "thread"
 
-        # 批量大小：优先使用配置值，否则根据worker数量自动计算
+        # 窗口大小：优先使用配置值，否则根据worker数量自动计算
         if self.parallel_batch_size is not None:
-            batch_size = self.parallel_batch_size
+            window = max(1, int(self.parallel_batch_size))
         else:
-            batch_size = max(10, (max_workers or 4) * 3)
+            window = max(10, (max_workers or 4) * 3)
+        max_inflight_bytes = self.max_inflight_bytes
 
         # 记录开始时间(用于统计)
         start_time = time.time() if self._load_balancer else None
         processed_chunks = 0
         success = True
 
-        # 分批处理流
         shutdown_wait = True
         manager = ExecutorManager()
-        executor_name = f"stream_{self.provides}"
-        executor = manager.get_executor(
-            executor_name,
-            executor_type=executor_type,
-            max_workers=max_workers,
-            reuse=reuse,
-        )
+        if shm_factory is not None:
+            # initializer 参数随进程池固定，因此使用独立的、不复用的进程池
+            ensure_resource_tracker()
+            executor_name = f"stream_shm_{self.provides}"
+            executor = manager.get_executor(
+                executor_name,
+                executor_type="process",
+                max_workers=max_workers,
+                reuse=False,
+                initializer=_init_shm_worker,
+                initargs=(
+                    shm_factory,
+                    self if _is_pickleable(self) else None,
+                    self.provides,
+                    run_id,
+                    kwargs,
+                ),
+            )
+        else:
+            executor_name = f"stream_{self.provides}"
+            executor = manager.get_executor(
+                executor_name,
+                executor_type=executor_type,
+                max_workers=max_workers,
+                reuse=reuse,
+            )
+        pending: deque = deque()  # (future, nbytes, idx, shm)，按输入顺序排列
         try:
             chunk_iter = iter(input_chunks)
+            inflight_bytes = 0
+            next_idx = 0
+            exhausted = False
 
             while True:
-                # 取一批 chunk
-                batch = list(itertools.islice(chunk_iter, batch_size))
-                if not batch:
+                # 补充窗口（背压：在途字节超限时暂停拉取输入）
+                while not exhausted and len(pending) < window:
+                    if (
+                        max_inflight_bytes is not None
+                        and pending
+                        and inflight_bytes >= max_inflight_bytes
+                    ):
+                        break
+                    chunk = next(chunk_iter, _END_OF_STREAM)
+                    if chunk is _END_OF_STREAM:
+                        exhausted = True
+                        break
+                    nbytes = _chunk_nbytes(chunk)
+                    shm = None
+                    if shm_factory is not None:
+                        shm, ref = share_chunk(chunk)
+                        try:
+                            future = executor.submit(_process_shared_chunk_worker, ref)
+                        except BaseException:
+                            release_shared(shm, unlink=True)
+                            raise
+                    else:
+                        future = executor.submit(
+                            _process_chunk_worker, self, chunk, context, run_id, kwargs
+                        )
+                    pending.append((future, nbytes, next_idx, shm))
+                    inflight_bytes += nbytes
+                    next_idx += 1
+
+                if not pending:
                     break  # 流已耗尽
 
-                # 提交批量任务
-                future_to_idx = {
-                    executor.submit(
-                        _process_chunk_worker, self, chunk, context, run_id, kwargs
-                    ): idx
-                    for idx, chunk in enumerate(batch)
-                }
-
-                # 收集结果（保持顺序）
-                results = [None] * len(batch)
-                for future in as_completed(future_to_idx):
-                    idx = future_to_idx[future]
-                    try:
-                        result = future.result()
-                        results[idx] = result
-                    except Exception as e:
-                        success = False
-                        shutdown_wait = False
-                        _logger = logging.getLogger(__name__)
-                        _logger.error(f"Error processing chunk {idx}: {e}")
-                        for pending in future_to_idx:
-                            if pending is future:
-                                continue
-                            if not pending.done():
-                                pending.cancel()
-                        raise  # 失败即停：异常向上抛出
-
-                # 按顺序 yield 结果
-                for result in results:
-                    if result is not None:
-                        processed_chunks += 1
-                        yield result
+                # 等待队首完成并按顺序产出
+                future, nbytes, idx, shm = pending.popleft()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    success = False
+                    shutdown_wait = False
+                    logger.error(f"Error processing chunk {idx}: {e}")
+                    raise  # 失败即停：异常向上抛出
+                finally:
+                    release_shared(shm, unlink=True)
+                inflight_bytes -= nbytes
+                if shm_factory is not None and result is not None:
+                    result = receive_chunk(result)  # 拷贝一次后立即释放输出段
+
+                if result is not None:
+                    processed_chunks += 1
+                    yield result
         except Exception:
             success = False
             shutdown_wait = False
             raise
         finally:
-            manager.release_executor(
-                executor_name,
-                executor_type=executor_type,
-                max_workers=max_workers,
-                wait=shutdown_wait,
-            )
+            # 提前结束（异常或消费方关闭生成器）时取消尚未开始的任务
+            for future, _, _, shm in pending:
+                future.cancel()
+                if shm is not None:
+                    future.add_done_callback(_discard_shared_result)
+                    release_shared(shm, unlink=True)
+            if shm_factory is not None:
+                executor.shutdown(wait=shutdown_wait, cancel_futures=True)
+            else:
+                manager.release_executor(
+                    executor_name,
+                    executor_type=executor_type,
+                    max_workers=max_workers,
+                    wait=shutdown_wait,
+                )
             # 记录统计信息
             if self._load_balancer and start_time:
                 duration = time.time() - start_time
@@ -879,6 +1003,30 @@ class StreamingPlugin(Plugin):
                     success=success,
                 )
 
+    def _build_shm_context_factory(self, context: Any, kwargs: dict[str, Any]) -> Any | None:
+        """
+        构建共享内存传输所需的 context_factory。
+
+        要求 Context 能生成可 pickle 的轻量工厂（MemmapStorage + 可导入的插件类），
+        且工厂在本进程中能成功重建；否则返回 None，回退到逐任务 pickle 的传输方式。
+        """
+        create_factory = getattr(context, "create_context_factory", None)
+        if create_factory is None or not _is_pickleable(kwargs):
+            return None
+        try:
+            factory = create_factory()
+            if not _is_pickleable(factory):
+                return None
+            factory()  # 提前验证 worker 端能重建 Context，避免进程池初始化失败
+        except Exception as exc:
+            logger.debug(
+                "Shared-memory transport unavailable for %s (%s); using pickled tasks.",
+                self.provides,
+                exc,
+            )
+            return None
+        return factory
+
     def _validate_chunk(self, chunk: Chunk):
         """
         验证 chunk 的时间边界。
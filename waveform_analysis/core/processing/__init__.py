@@ -60,9 +60,21 @@ from .chunk import (
 )
 
 # 信号处理
-from .dtypes import EVENTS_DTYPE, PEAK_DTYPE, RECORDS_DTYPE, ST_WAVEFORM_DTYPE
+from .dtypes import (
+    EVENTS_DTYPE,
+    PACKED_WAVEFORM_DTYPE,
+    PEAK_DTYPE,
+    POLARITY_CODES,
+    RECORDS_DTYPE,
+    ST_WAVEFORM_DTYPE,
+    decode_polarity,
+    encode_polarity,
+)
 from .event_grouping import find_hits, group_multi_channel_hits
+from .event_table import EventTable
+from .incremental import IncrementalUpdate
 from .loader import WaveformLoaderCSV
+from .packed_waveforms import PackedWaveforms
 from .records_builder import (
     EventsBundle,
     RecordsBundle,
@@ -103,11 +115,18 @@ __all__ = [
     "WaveformStruct",
     "WaveformStructConfig",
     "group_multi_channel_hits",
+    "EventTable",
+    "PackedWaveforms",
+    "IncrementalUpdate",
     "find_hits",
     "ST_WAVEFORM_DTYPE",
+    "PACKED_WAVEFORM_DTYPE",
     "PEAK_DTYPE",
     "RECORDS_DTYPE",
     "EVENTS_DTYPE",
+    "POLARITY_CODES",
+    "encode_polarity",
+    "decode_polarity",
     "RecordsBundle",
     "EventsBundle",
     "build_records_from_st_waveforms",
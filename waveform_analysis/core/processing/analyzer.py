@@ -5,7 +5,7 @@ Analyzer 模块 - 高层事件分析与配对逻辑。
 以及跨通道的事件配对 (Pairing)，是生成最终物理分析结果的关键步骤。
 """
 
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -13,6 +13,7 @@ import pandas as pd
 from waveform_analysis.core.foundation.utils import exporter
 
 from .event_grouping import group_multi_channel_hits
+from .event_table import EventTable
 
 # 初始化 exporter
 export, __all__ = exporter()
@@ -46,7 +47,8 @@ class EventAnalyzer:
         time_window_ns: Optional[float] = None,
         use_numba: bool = True,
         n_processes: Optional[int] = None,
-    ) -> pd.DataFrame:
+        as_table: bool = False,
+    ) -> Union[pd.DataFrame, EventTable]:
         """
         按时间窗口聚类多通道事件。
 
@@ -54,17 +56,24 @@ class EventAnalyzer:
             df: 包含 timestamp, channel, area, height 列的 DataFrame
             time_window_ns: 时间窗口（纳秒）
             use_numba: 是否使用numba加速（默认True）
-            n_processes: 多进程数量（None=单进程，>1=多进程）
+            n_processes: 兼容保留（事件表已向量化构建）
+            as_table: True 时返回列式 EventTable
         """
         if time_window_ns is not None:
             self.time_window_ns = time_window_ns
 
         return group_multi_channel_hits(
-            df, self.time_window_ns, use_numba=use_numba, n_processes=n_processes
+            df,
+            self.time_window_ns,
+            use_numba=use_numba,
+            n_processes=n_processes,
+            as_table=as_table,
         )
 
     def pair_events(
-        self, df_events: pd.DataFrame, time_window_ns: Optional[float] = None
+        self,
+        df_events: Union[pd.DataFrame, EventTable],
+        time_window_ns: Optional[float] = None,
     ) -> pd.DataFrame:
         """
         筛选成对的 N 通道事件。
@@ -74,10 +83,13 @@ class EventAnalyzer:
         - 不严格要求所有通道都存在，只要时间窗口满足即可
 
         参数:
-            df_events: 分组后的事件DataFrame
+            df_events: 分组后的事件DataFrame 或 EventTable
             time_window_ns: 时间窗口（纳秒），默认使用self.time_window_ns
         """
         tw = time_window_ns if time_window_ns is not None else self.time_window_ns
+        if isinstance(df_events, EventTable):
+            # 先在列式表上筛选，只物化通过的事件
+            df_events = df_events.take(df_events["dt/ns"] <= tw).to_pandas()
 
         # 筛选条件：事件时间跨度在时间窗口内
         # dt/ns列已经在group_events中计算好了
@@ -110,11 +122,15 @@ class EventAnalyzer:
         return df_paired
 
     def pair_events_with(
-        self, df_events: pd.DataFrame, strategy: Callable[[pd.DataFrame, int], pd.DataFrame]
+        self,
+        df_events: Union[pd.DataFrame, EventTable],
+        strategy: Callable[[pd.DataFrame, int], pd.DataFrame],
     ) -> pd.DataFrame:
         """
         使用自定义策略对 df_events 进行配对过滤。
         """
+        if isinstance(df_events, EventTable):
+            df_events = df_events.to_pandas()
         df_paired = strategy(df_events, self.n_channels).copy()
 
         # 若策略未计算 delta_t，这里进行补充
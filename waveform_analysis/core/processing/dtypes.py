@@ -11,6 +11,49 @@ from waveform_analysis.core.foundation.utils import exporter
 # 初始化 exporter
 export, __all__ = exporter()
 
+# 极性编码：polarity 字段存为 int8（1 字节），取代 U8（32 字节）字符串
+POLARITY_UNKNOWN = export(0, name="POLARITY_UNKNOWN")
+POLARITY_NEGATIVE = export(-1, name="POLARITY_NEGATIVE")
+POLARITY_POSITIVE = export(1, name="POLARITY_POSITIVE")
+POLARITY_CODES = export(
+    {"unknown": POLARITY_UNKNOWN, "negative": POLARITY_NEGATIVE, "positive": POLARITY_POSITIVE},
+    name="POLARITY_CODES",
+)
+# 按 code + 1 索引的名称表
+_POLARITY_NAMES = np.array(["negative", "unknown", "positive"], dtype="U8")
+
+
+@export
+def encode_polarity(values):
+    """
+    把极性名称编码为 int8（positive=1, negative=-1, 其余=0）。
+
+    同时接受已编码的整数与旧版 U8 字符串列，因此可以直接用于读取任意版本的
+    polarity 字段；标量输入返回 np.int8。
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iub":
+        codes = arr.astype(np.int8)
+    elif arr.size == 0:
+        codes = np.zeros(arr.shape, dtype=np.int8)
+    else:
+        names, inverse = np.unique(arr.astype(str), return_inverse=True)
+        lut = np.array([POLARITY_CODES.get(name, POLARITY_UNKNOWN) for name in names], np.int8)
+        codes = lut[inverse].reshape(arr.shape)
+    return codes[()] if codes.ndim == 0 else codes
+
+
+@export
+def decode_polarity(codes):
+    """把 int8 极性编码（或旧版字符串列）解码为 'positive' | 'negative' | 'unknown'。"""
+    arr = np.asarray(codes)
+    if arr.dtype.kind in "US":
+        names = arr.astype("U8")
+    else:
+        names = _POLARITY_NAMES[np.clip(arr.astype(np.int64), -1, 1) + 1]
+    return str(names) if names.ndim == 0 else names
+
+
 # Strax-inspired dtypes for structured data
 # Record: A single waveform with metadata
 DEFAULT_WAVE_LENGTH = export(1500, name="DEFAULT_WAVE_LENGTH")
@@ -19,7 +62,7 @@ ST_WAVEFORM_DTYPE = export(
     [
         ("baseline", "f8"),  # float64 for baseline (computed by WaveformStruct)
         ("baseline_upstream", "f8"),  # float64 for upstream baseline (optional)
-        ("polarity", "U8"),  # hardware truth polarity: positive | negative | unknown
+        ("polarity", "i1"),  # hardware truth polarity code (POLARITY_CODES)
         ("timestamp", "i8"),  # int64 for ps-level timestamps (ADC raw)
         ("record_id", "i8"),  # sequential record id within the structured waveform array
         ("dt", "i4"),  # sample interval (ns, aligned to time)
@@ -52,7 +95,7 @@ def create_record_dtype(wave_length: int) -> np.dtype:
         [
             ("baseline", "f8"),  # float64 for baseline (computed)
             ("baseline_upstream", "f8"),  # float64 for upstream baseline (optional)
-            ("polarity", "U8"),  # hardware truth polarity
+            ("polarity", "i1"),  # hardware truth polarity code (POLARITY_CODES)
             ("timestamp", "i8"),  # int64 for ps-level timestamps (ADC raw)
             ("record_id", "i8"),  # sequential record id within the structured waveform array
             ("dt", "i4"),  # sample interval (ns, aligned to time)
@@ -64,6 +107,26 @@ def create_record_dtype(wave_length: int) -> np.dtype:
     )
 
 
+# Packed st_waveforms: ST_WAVEFORM_DTYPE 去掉定长 wave，样本按 wave_offset 存放在扁平波形池中
+PACKED_WAVEFORM_DTYPE = export(
+    np.dtype(
+        [
+            ("baseline", "f8"),  # float64 for baseline (computed by WaveformStruct)
+            ("baseline_upstream", "f8"),  # float64 for upstream baseline (optional)
+            ("polarity", "i1"),  # hardware truth polarity code (POLARITY_CODES)
+            ("timestamp", "i8"),  # int64 for ps-level timestamps (ADC raw)
+            ("record_id", "i8"),  # sequential record id within the structured waveform array
+            ("dt", "i4"),  # sample interval (ns, aligned to time)
+            ("event_length", "i4"),  # number of valid samples in the pool
+            ("board", "i2"),  # int16 for board index
+            ("channel", "i2"),  # int16 for channel index (physical channel number)
+            ("wave_offset", "i8"),  # index of the first sample in the wave pool
+        ]
+    ),
+    name="PACKED_WAVEFORM_DTYPE",
+)
+
+
 # Peak: A detected peak in a waveform
 PEAK_DTYPE = export(
     [
@@ -86,7 +149,7 @@ RECORDS_DTYPE = export(
             ("channel", "i2"),  # physical channel
             ("baseline", "f8"),  # baseline (computed by WaveformStruct)
             ("baseline_upstream", "f8"),  # baseline from upstream plugin (optional)
-            ("polarity", "U8"),  # hardware truth polarity
+            ("polarity", "i1"),  # hardware truth polarity code (POLARITY_CODES)
             ("record_id", "i8"),  # sequential record id after sorting
             ("dt", "i4"),  # sample interval (ns, aligned to time)
             ("trigger_type", "i2"),  # trigger type code
@@ -4,6 +4,9 @@ Event grouping utilities for hit finding and clustering.
 核心功能包括：
 1. **寻峰**：`find_hits` 进行向量化 hit 检测。
 2. **事件聚类**：`group_multi_channel_hits` 基于时间窗口将多通道 hit 聚类为事件。
+
+事件结果以列式 EventTable（标量事件列 + 扁平 hit 列）构建，
+``as_table=False`` 时再转换为数组列 DataFrame 以保持旧接口。
 """
 
 from __future__ import annotations
@@ -14,9 +17,9 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
-from waveform_analysis.core.execution.manager import get_executor
 from waveform_analysis.core.foundation.utils import exporter
 from waveform_analysis.core.processing.dtypes import PEAK_DTYPE as _PEAK_DTYPE
+from waveform_analysis.core.processing.event_table import EventTable
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -101,7 +104,8 @@ def group_multi_channel_hits(
     time_window_ns: float,
     use_numba: bool = True,
     n_processes: int | None = None,
-) -> pd.DataFrame:
+    as_table: bool = False,
+) -> pd.DataFrame | EventTable:
     """
     在 df 中按 timestamp 聚类，找"同一事件的多通道触发"，并在簇内部
     按 channel 从小到大对 (channels, areas, heights, timestamps) 同步排序。
@@ -113,7 +117,8 @@ def group_multi_channel_hits(
             - 内部会转换为 ps 单位与 timestamp 进行比较
             - 例如：100ns = 100,000ps
         use_numba: 是否使用numba加速（默认True，如果numba可用）
-        n_processes: 多进程数量（None=单进程，>1=多进程，默认None）
+        n_processes: 兼容保留；事件表已整体向量化构建，不再分进程处理
+        as_table: True 时返回列式 EventTable，否则返回数组列 DataFrame
 
     注意:
         - timestamp 列的单位为 ps（皮秒）
@@ -122,19 +127,14 @@ def group_multi_channel_hits(
 
     性能优化:
         - 使用numba JIT编译加速边界查找（如果可用）
-        - 支持多进程并行处理事件簇（适用于超大数据集）
-        - 优化DataFrame构建方式
-        - 减少不必要的数组复制
+        - 簇内排序与事件列一次性向量化完成（lexsort + 边界索引），不逐事件构建字典
 
     示例:
         # 使用numba加速（单进程），时间窗口100ns
         df_events = group_multi_channel_hits(df, time_window_ns=100)
 
-        # 使用多进程（4个进程）
-        df_events = group_multi_channel_hits(df, time_window_ns=100, n_processes=4)
-
-        # 禁用numba，使用多进程
-        df_events = group_multi_channel_hits(df, time_window_ns=100, use_numba=False, n_processes=4)
+        # 列式事件表（可 memmap 缓存）
+        table = group_multi_channel_hits(df, time_window_ns=100, as_table=True)
     """
     time_window_ps = time_window_ns * 1e3
 
@@ -153,6 +153,10 @@ def group_multi_channel_hits(
 
     n = len(df_sorted)
     if n == 0:
+        if as_table:
+            return _multi_channel_table(
+                np.zeros(1, dtype=np.int64), ts_all, ch_all, area_all, height_all
+            )
         return pd.DataFrame(
             columns=[
                 "event_id",
@@ -179,108 +183,89 @@ def group_multi_channel_hits(
             curr = next_idx
         boundaries = np.array(boundaries)
 
-    n_events = len(boundaries) - 1
+    table = _multi_channel_table(
+        np.asarray(boundaries, dtype=np.int64), ts_all, ch_all, area_all, height_all
+    )
+    return table if as_table else table.to_pandas()
 
-    # 多进程处理（适用于超大数据集）
-    if n_processes and n_processes > 1 and n_events > 1000:  # 只有事件数足够多时才使用多进程
-        # 将事件分块
-        chunk_size = max(1, n_events // n_processes)
-        chunks = []
-        for i in range(0, n_events, chunk_size):
-            chunks.append((i, min(i + chunk_size, n_events)))
-
-        # 准备参数
-        args_list = [
-            (ts_all, ch_all, area_all, height_all, boundaries, start, end) for start, end in chunks
-        ]
-
-        # 多进程处理（使用全局执行器管理器）
-        records = []
-        from concurrent.futures import as_completed
-
-        with get_executor(
-            "event_grouping", executor_type="process", max_workers=n_processes, reuse=True
-        ) as executor:
-            futures = {executor.submit(_process_event_chunk, args): args for args in args_list}
-            for future in as_completed(futures):
-                try:
-                    chunk_records = future.result()
-                    records.extend(chunk_records)
-                except (MemoryError, KeyboardInterrupt):
-                    # 致命错误：立即抛出
-                    raise
-                except Exception as e:
-                    logger.warning(
-                        f"Multiprocessing chunk failed ({e}), falling back to single-process"
-                    )
-                    # 可恢复错误：回退到单进程处理该块
-                    args = futures[future]
-                    chunk_records = _process_event_chunk(args)
-                    records.extend(chunk_records)
-
-        # 按event_id排序（因为多进程处理顺序可能不同）
-        records.sort(key=lambda x: x["event_id"])
-
-        # 构建DataFrame
-        return pd.DataFrame(records)
 
-    else:
-        # 单进程处理（优化版本）
-        event_ids = np.arange(n_events, dtype=np.int64)
-        t_mins = np.zeros(n_events, dtype=np.int64)
-        t_maxs = np.zeros(n_events, dtype=np.int64)
-        dt_ns = np.zeros(n_events, dtype=np.float64)
-        n_hits_list = np.zeros(n_events, dtype=np.int32)
-
-        channels_list = []
-        areas_list = []
-        heights_list = []
-        timestamps_list = []
-
-        # 处理每个事件
-        for event_id in range(n_events):
-            start, end = boundaries[event_id], boundaries[event_id + 1]
-
-            ts = ts_all[start:end]
-            chs = ch_all[start:end]
-            areas = area_all[start:end]
-            heights = height_all[start:end]
-
-            # 按channel排序
-            sort_idx = np.argsort(chs)
-            ts_sorted = ts[sort_idx]
-            chs_sorted = chs[sort_idx]
-            areas_sorted = areas[sort_idx]
-            heights_sorted = heights[sort_idx]
-
-            t_min = ts_sorted[0]
-            t_max = ts_sorted[-1]
-
-            # 存储结果
-            t_mins[event_id] = t_min
-            t_maxs[event_id] = t_max
-            dt_ns[event_id] = (t_max - t_min) / 1e3
-            n_hits_list[event_id] = len(ts_sorted)
-
-            channels_list.append(chs_sorted)
-            areas_list.append(areas_sorted)
-            heights_list.append(heights_sorted)
-            timestamps_list.append(ts_sorted)
-
-        # 使用字典方式构建DataFrame
-        return pd.DataFrame(
-            {
-                "event_id": event_ids,
-                "t_min": t_mins,
-                "t_max": t_maxs,
-                "dt/ns": dt_ns,
-                "n_hits": n_hits_list,
-                "channels": channels_list,
-                "areas": areas_list,
-                "heights": heights_list,
-                "timestamps": timestamps_list,
-            }
-        )
+def _multi_channel_table(
+    boundaries: np.ndarray,
+    ts_all: np.ndarray,
+    ch_all: np.ndarray,
+    area_all: np.ndarray,
+    height_all: np.ndarray,
+) -> EventTable:
+    """由已排序 hit 与簇边界构建事件表：簇内按 channel 稳定排序。"""
+    n_events = len(boundaries) - 1
+    counts = np.diff(boundaries)
+    event_of_hit = np.repeat(np.arange(n_events, dtype=np.int64), counts)
+    order = np.lexsort((ch_all, event_of_hit))
+    ts_sorted = ts_all[order]
+
+    # 与逐事件实现一致：t_min/t_max 取簇内按 channel 排序后的首/尾 hit
+    t_mins = ts_sorted[boundaries[:-1]].astype(np.int64)
+    t_maxs = ts_sorted[boundaries[1:] - 1].astype(np.int64)
+    return EventTable.from_columns(
+        {
+            "event_id": np.arange(n_events, dtype=np.int64),
+            "t_min": t_mins,
+            "t_max": t_maxs,
+            "dt/ns": (t_maxs - t_mins) / 1e3,
+            "n_hits": counts.astype(np.int32),
+        },
+        {
+            "channels": ch_all[order],
+            "areas": area_all[order],
+            "heights": height_all[order],
+            "timestamps": ts_sorted,
+        },
+    )
+
+
+# hit_grouped 事件表的列（顺序即 DataFrame 列顺序）
+_HIT_WINDOW_EVENT_FIELDS = (
+    ("event_id", np.int64),
+    ("t_min", np.int64),
+    ("t_max", np.int64),
+    ("dt/ns", np.float64),
+    ("n_hits", np.int64),
+)
+_HIT_WINDOW_HIT_FIELDS = (
+    ("dt", np.int32),
+    ("boards", np.int16),
+    ("channels", np.int16),
+    ("heights", np.float32),
+    ("integrals", np.float32),
+    ("timestamps", np.int64),
+    ("record_ids", np.int64),
+    ("sample_starts", np.int32),
+    ("sample_ends", np.int32),
+)
+
+
+def _chain_window_breaks(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    gap_ps: float,
+    use_numba: bool = True,
+) -> np.ndarray:
+    """
+    Event breaks of windows sorted by start (1 where a new event begins, first is 0).
+
+    A window joins the current event when it starts within ``gap_ps`` of the furthest
+    end so far. With ``ends >= starts`` the furthest end of the current event equals the
+    running max over all earlier windows (every earlier event ended more than ``gap_ps``
+    before this one started), so breaks come from one ``np.maximum.accumulate``.
+    """
+    if use_numba and NUMBA_AVAILABLE:
+        return _chain_window_breaks_numba(starts, ends, gap_ps)
+    if not np.all(ends >= starts):
+        # 反向窗口会让全局累计最大值偏大，退回逐个扫描
+        return _chain_window_breaks_numba(starts, ends, gap_ps)
+    breaks = np.zeros(len(starts), dtype=np.int64)
+    breaks[1:] = ~(starts[1:] <= np.maximum.accumulate(ends)[:-1] + gap_ps)
+    return breaks
 
 
 @export
@@ -290,29 +275,27 @@ def group_hit_windows(
     dt_values: np.ndarray | None = None,
     component_rows: np.ndarray | None = None,
     component_hits: np.ndarray | None = None,
-) -> pd.DataFrame:
-    """Group ``hit_merged`` rows into multi-channel events using absolute hit windows."""
-    columns = [
-        "event_id",
-        "t_min",
-        "t_max",
-        "dt/ns",
-        "n_hits",
-        "dt",
-        "boards",
-        "channels",
-        "heights",
-        "integrals",
-        "timestamps",
-        "record_ids",
-        "sample_starts",
-        "sample_ends",
-    ]
+    as_table: bool = False,
+    use_numba: bool = True,
+) -> pd.DataFrame | EventTable:
+    """
+    Group ``hit_merged`` rows into multi-channel events using absolute hit windows.
 
+    ``as_table=True`` returns the columnar EventTable (events + flat hits);
+    otherwise the table is converted to the array-column DataFrame.
+    ``use_numba`` selects the compiled break scan when numba is installed; the NumPy
+    path uses a running max of window ends and gives the same events.
+    """
     if not isinstance(hits, np.ndarray):
         raise ValueError("hits must be a single structured array")
     if len(hits) == 0:
-        return pd.DataFrame(columns=columns)
+        table = EventTable.from_columns(
+            {name: np.zeros(0, dtype=dtype) for name, dtype in _HIT_WINDOW_EVENT_FIELDS},
+            {name: np.zeros(0, dtype=dtype) for name, dtype in _HIT_WINDOW_HIT_FIELDS},
+        )
+        if as_table:
+            return table
+        return pd.DataFrame(columns=table.columns)
 
     if time_window_ns < 0:
         raise ValueError("time_window_ns must be >= 0")
@@ -388,87 +371,97 @@ def group_hit_windows(
             + (component_edge_ends - component_positions) * component_dt_ps
         )
 
-        component_offsets = None
-        component_counts = None
+        invalid = np.flatnonzero(invalid_window_mask)
+        # 每个无效窗口的组件行区间 [offset, offset + count)（在 source 中）
         if "component_offset" in names and "component_count" in names:
-            component_offsets = np.asarray(hits["component_offset"], dtype=np.int64)
-            component_counts = np.asarray(hits["component_count"], dtype=np.int32)
+            source = hit_indices
+            offsets = np.asarray(hits["component_offset"], dtype=np.int64)[invalid]
+            counts = np.asarray(hits["component_count"], dtype=np.int64)[invalid]
         else:
             merged_indices = np.asarray(component_rows["merged_index"], dtype=np.int64)
-
-        for merged_idx in np.flatnonzero(invalid_window_mask):
-            if component_offsets is not None and component_counts is not None:
-                offset = int(component_offsets[merged_idx])
-                count = int(component_counts[merged_idx])
-                if count <= 0:
-                    raise ValueError(
-                        f"missing hit_merged_components rows for hit_merged index {int(merged_idx)}"
-                    )
-                subset = hit_indices[offset : offset + count]
-            else:
-                component_mask = merged_indices == int(merged_idx)
-                if not np.any(component_mask):
-                    raise ValueError(
-                        f"missing hit_merged_components rows for hit_merged index {int(merged_idx)}"
-                    )
-                subset = hit_indices[component_mask]
-            abs_starts[merged_idx] = float(np.min(component_abs_starts[subset]))
-            abs_ends[merged_idx] = float(np.max(component_abs_ends[subset]))
-
-    order = np.lexsort((record_ids, timestamps, dt_values, abs_starts))
-    gap_ps = time_window_ns * 1e3
-
-    def build_event(event_id: int, idxs: list[int]) -> dict[str, object]:
-        subset = np.asarray(idxs, dtype=np.int64)
-        sort_idx = np.lexsort(
-            (
-                record_ids[subset],
-                timestamps[subset],
-                abs_starts[subset],
-                dt_values[subset],
-                channels[subset],
-                boards[subset],
-            )
+            by_merged = np.argsort(merged_indices, kind="stable")
+            source = hit_indices[by_merged]
+            sorted_merged = merged_indices[by_merged]
+            offsets = np.searchsorted(sorted_merged, invalid, side="left")
+            counts = np.searchsorted(sorted_merged, invalid, side="right") - offsets
+        if np.any(counts <= 0):
+            missing = int(invalid[np.argmax(counts <= 0)])
+            raise ValueError(f"missing hit_merged_components rows for hit_merged index {missing}")
+        group_starts = np.cumsum(counts) - counts
+        rows = np.arange(int(counts.sum()), dtype=np.int64) + np.repeat(
+            offsets - group_starts, counts
+        )
+        subset = source[rows]
+        abs_starts[invalid] = np.minimum.reduceat(component_abs_starts[subset], group_starts)
+        abs_ends[invalid] = np.maximum.reduceat(component_abs_ends[subset], group_starts)
+
+    if np.all(abs_ends >= abs_starts):
+        # 起点相同的窗口必然落在同一事件，事件内顺序由下面的 lexsort 决定，
+        # 因此链式扫描只需按起点稳定排序
+        order = np.argsort(abs_starts, kind="stable")
+    else:
+        order = np.lexsort((record_ids, timestamps, dt_values, abs_starts))
+    # 沿窗口起点顺序链式合并，为每个 hit 分配事件号
+    # ``hit_grouped`` works on absolute hit windows in ps. Once upstream has
+    # normalized timestamps, different per-hit ``dt`` values remain comparable
+    # and should not block coincidence grouping.
+    event_of_sorted = np.cumsum(
+        _chain_window_breaks(
+            abs_starts[order], abs_ends[order], time_window_ns * 1e3, use_numba=use_numba
         )
-        subset = subset[sort_idx]
-        t_min = int(np.min(abs_starts[subset]))
-        t_max = int(np.max(abs_ends[subset]))
-        return {
-            "event_id": event_id,
+    )
+    n_events = int(event_of_sorted[-1]) + 1
+    event_of_hit = np.empty(len(hits), dtype=np.int64)
+    event_of_hit[order] = event_of_sorted
+    # 事件内按 board -> channel -> dt -> 窗口起点 -> timestamp -> record_id 排序
+    hit_order = np.lexsort(
+        (record_ids, timestamps, abs_starts, dt_values, channels, boards, event_of_hit)
+    )
+    counts = np.bincount(event_of_hit, minlength=n_events)
+    starts = np.zeros(n_events, dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+    t_min = np.minimum.reduceat(abs_starts[hit_order], starts).astype(np.int64)
+    t_max = np.maximum.reduceat(abs_ends[hit_order], starts).astype(np.int64)
+
+    table = EventTable.from_columns(
+        {
+            "event_id": np.arange(n_events, dtype=np.int64),
             "t_min": t_min,
             "t_max": t_max,
             "dt/ns": (t_max - t_min) / 1e3,
-            "n_hits": int(len(subset)),
-            "dt": dt_values[subset].astype(np.int32, copy=True),
-            "boards": boards[subset].copy(),
-            "channels": channels[subset].copy(),
-            "heights": heights[subset].copy(),
-            "integrals": integrals[subset].copy(),
-            "timestamps": timestamps[subset].copy(),
-            "record_ids": record_ids[subset].copy(),
-            "sample_starts": sample_starts_rel[subset].astype(np.int32, copy=True),
-            "sample_ends": sample_ends_rel[subset].astype(np.int32, copy=True),
-        }
-
-    records: list[dict[str, object]] = []
-    current_indices = [int(order[0])]
-    cluster_end = float(abs_ends[order[0]])
-
-    for idx in order[1:]:
-        idx = int(idx)
-        # ``hit_grouped`` works on absolute hit windows in ps. Once upstream has
-        # normalized timestamps, different per-hit ``dt`` values remain comparable
-        # and should not block coincidence grouping.
-        if abs_starts[idx] <= cluster_end + gap_ps:
-            current_indices.append(idx)
-            cluster_end = max(cluster_end, float(abs_ends[idx]))
+            "n_hits": counts.astype(np.int64),
+        },
+        {
+            "dt": dt_values[hit_order],
+            "boards": boards[hit_order],
+            "channels": channels[hit_order],
+            "heights": heights[hit_order],
+            "integrals": integrals[hit_order],
+            "timestamps": timestamps[hit_order],
+            "record_ids": record_ids[hit_order],
+            "sample_starts": sample_starts_rel[hit_order],
+            "sample_ends": sample_ends_rel[hit_order],
+        },
+    )
+    return table if as_table else table.to_pandas()
+
+
+@jit(nopython=True, cache=True)
+def _chain_window_breaks_numba(starts: np.ndarray, ends: np.ndarray, gap_ps: float) -> np.ndarray:
+    """逐窗口扫描的事件断点（numba 不可用时作为普通函数运行）。"""
+    n = len(starts)
+    breaks = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return breaks
+    cluster_end = ends[0]
+    for i in range(1, n):
+        if starts[i] <= cluster_end + gap_ps:
+            if ends[i] > cluster_end:
+                cluster_end = ends[i]
         else:
-            records.append(build_event(len(records), current_indices))
-            current_indices = [idx]
-            cluster_end = float(abs_ends[idx])
-
-    records.append(build_event(len(records), current_indices))
-    return pd.DataFrame(records, columns=columns)
+            breaks[i] = 1
+            cluster_end = ends[i]
+    return breaks
 
 
 # Numba加速的边界查找函数（模块级别定义，numba要求）
@@ -523,62 +516,3 @@ else:
             boundaries.append(next_idx)
             curr = next_idx
         return np.array(boundaries)
-
-
-def _process_event_chunk(args: tuple) -> list[dict]:
-    """
-    处理事件块（用于多进程）。
-
-    参数:
-        args: (ts_all, ch_all, q_all, p_all, boundaries, start_idx, end_idx)
-        注意：numpy数组在多进程间传递时需要确保是可序列化的
-
-    返回:
-        事件记录列表
-    """
-    # 解包参数
-    ts_all, ch_all, area_all, height_all, boundaries, start_idx, end_idx = args
-
-    # 确保是numpy数组（多进程传递后可能变成列表）
-    ts_all = np.asarray(ts_all)
-    ch_all = np.asarray(ch_all)
-    area_all = np.asarray(area_all)
-    height_all = np.asarray(height_all)
-    boundaries = np.asarray(boundaries)
-
-    records = []
-    for i in range(start_idx, end_idx):
-        if i >= len(boundaries) - 1:
-            break
-        start, end = int(boundaries[i]), int(boundaries[i + 1])
-
-        ts = ts_all[start:end]
-        chs = ch_all[start:end]
-        areas = area_all[start:end]
-        heights = height_all[start:end]
-
-        # 按channel排序
-        sort_idx = np.argsort(chs)
-        ts_sorted = ts[sort_idx]
-        chs_sorted = chs[sort_idx]
-        areas_sorted = areas[sort_idx]
-        heights_sorted = heights[sort_idx]
-
-        t_min = int(ts_sorted[0])
-        t_max = int(ts_sorted[-1])
-
-        records.append(
-            {
-                "event_id": int(i),
-                "t_min": t_min,
-                "t_max": t_max,
-                "dt/ns": float((t_max - t_min) / 1e3),
-                "n_hits": int(len(ts_sorted)),
-                "channels": chs_sorted,  # 只读访问，无需复制
-                "areas": areas_sorted,
-                "heights": heights_sorted,
-                "timestamps": ts_sorted,
-            }
-        )
-
-    return records
@@ -0,0 +1,183 @@
+# DOC: docs/features/context/DATA_ACCESS.md#列式事件表
+"""
+列式事件表模块 - 不定长（ragged）事件的紧凑表示。
+
+事件分组（df_events / hit_grouped）的每个事件包含数量不定的 hit。
+以 DataFrame 的 object 列保存“每事件一个数组”既慢又占内存，也无法 memmap。
+EventTable 改为两张定长结构化数组：
+
+- events: 每个事件一行的标量列（event_id、t_min、t_max、n_hits ...）
+- hits:   所有事件的 hit 依次拼接的扁平列（channels、heights ...）
+
+第 i 个事件的 hit 为 ``hits[offsets[i]:offsets[i + 1]]``，offsets 由 n_hits 累加得到。
+两张表都可以直接 memmap 缓存；需要旧的 DataFrame 形态时调用 ``to_pandas()``。
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+# hits 表在存储中的键后缀（events 表使用插件的缓存键本身）
+EVENT_TABLE_HITS_SUFFIX = export("_hits", name="EVENT_TABLE_HITS_SUFFIX")
+COUNT_FIELD = "n_hits"
+
+
+@export
+def build_struct_array(columns: dict[str, np.ndarray], n: int | None = None) -> np.ndarray:
+    """按列字典构建结构化数组（字段顺序与字典顺序一致）。"""
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    if n is None:
+        n = len(next(iter(arrays.values()))) if arrays else 0
+    out = np.empty(n, dtype=[(name, arr.dtype) for name, arr in arrays.items()])
+    for name, arr in arrays.items():
+        out[name] = arr
+    return out
+
+
+@export
+class EventTable:
+    """
+    列式不定长事件表。
+
+    Args:
+        events: 每事件一行的结构化数组，必须包含 ``n_hits`` 字段
+        hits: 扁平 hit 结构化数组，长度等于 ``events["n_hits"].sum()``
+
+    Examples:
+        >>> table = ctx.get_data("run_001", "hit_grouped")
+        >>> table["t_min"]                 # 标量列（ndarray）
+        >>> table.event_hits(0)["channels"]  # 第 0 个事件的 hit
+        >>> table.hit_event_index()        # 每个 hit 所属的事件行号
+        >>> df = table.to_pandas()         # 旧的 DataFrame（数组列）形态
+    """
+
+    def __init__(self, events: np.ndarray, hits: np.ndarray):
+        if events.dtype.names is None or COUNT_FIELD not in events.dtype.names:
+            raise ValueError(f"events must be a structured array with a '{COUNT_FIELD}' field")
+        if hits.dtype.names is None:
+            raise ValueError("hits must be a structured array")
+        self.events = events
+        self.hits = hits
+        self._offsets: np.ndarray | None = None
+        total = int(self.offsets[-1])
+        if total != len(hits):
+            raise ValueError(f"events declare {total} hits but hits table has {len(hits)} rows")
+
+    @classmethod
+    def from_columns(
+        cls, event_columns: dict[str, np.ndarray], hit_columns: dict[str, np.ndarray]
+    ) -> "EventTable":
+        """由标量列与扁平 hit 列构建（字段顺序即 to_pandas() 的列顺序）。"""
+        return cls(build_struct_array(event_columns), build_struct_array(hit_columns))
+
+    # ------------------------------------------------------------------
+    # 形状与列
+    # ------------------------------------------------------------------
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """事件在 hits 中的起始偏移，长度 n_events + 1。"""
+        if self._offsets is None:
+            offsets = np.zeros(len(self.events) + 1, dtype=np.int64)
+            np.cumsum(self.events[COUNT_FIELD], out=offsets[1:])
+            self._offsets = offsets
+        return self._offsets
+
+    @property
+    def event_columns(self) -> list[str]:
+        return list(self.events.dtype.names)
+
+    @property
+    def hit_columns(self) -> list[str]:
+        return list(self.hits.dtype.names)
+
+    @property
+    def columns(self) -> list[str]:
+        return self.event_columns + self.hit_columns
+
+    @property
+    def empty(self) -> bool:
+        return len(self.events) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.events.nbytes + self.hits.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __repr__(self) -> str:
+        return f"EventTable(events={len(self.events)}, hits={len(self.hits)})"
+
+    def __getitem__(self, name: str) -> Any:
+        """标量列返回 ndarray；hit 列返回每个事件一个视图的列表。"""
+        if name in self.events.dtype.names:
+            return self.events[name]
+        if name in self.hits.dtype.names:
+            return self.ragged(name)
+        raise KeyError(name)
+
+    # ------------------------------------------------------------------
+    # 不定长访问
+    # ------------------------------------------------------------------
+
+    def event_hits(self, i: int) -> np.ndarray:
+        """第 i 个事件的 hit（hits 的切片视图）。"""
+        n = len(self.events)
+        if i < -n or i >= n:
+            raise IndexError(f"event index {i} out of range for {n} events")
+        i = i + n if i < 0 else i
+        return self.hits[self.offsets[i] : self.offsets[i + 1]]
+
+    def ragged(self, name: str) -> list[np.ndarray]:
+        """把 hit 列切分为每个事件一个视图。"""
+        if len(self.events) == 0:
+            return []
+        return np.split(self.hits[name], self.offsets[1:-1])
+
+    def hit_event_index(self) -> np.ndarray:
+        """每个 hit 所属事件的行号（长度等于 hits）。"""
+        return np.repeat(np.arange(len(self.events), dtype=np.int64), self.events[COUNT_FIELD])
+
+    def take(self, selection: Any) -> "EventTable":
+        """按事件行号或布尔掩码选取子表（hit 同步选取）。"""
+        idx = np.asarray(selection)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        idx = idx.astype(np.int64, copy=False)
+        counts = np.asarray(self.events[COUNT_FIELD], dtype=np.int64)[idx]
+        starts = self.offsets[idx]
+        total = int(counts.sum())
+        # 每个选中事件的 hit 区间 [start, start + count) 展开为行号
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        hit_idx = np.arange(total, dtype=np.int64) + shift
+        return EventTable(self.events[idx], self.hits[hit_idx])
+
+    # ------------------------------------------------------------------
+    # 转换
+    # ------------------------------------------------------------------
+
+    def to_pandas(self) -> pd.DataFrame:
+        """转换为每行一个事件、hit 列为数组的 DataFrame（按需物化）。"""
+        data: dict[str, Any] = {
+            name: np.asarray(self.events[name]) for name in self.events.dtype.names
+        }
+        for name in self.hits.dtype.names:
+            column = np.empty(len(self.events), dtype=object)
+            for i, part in enumerate(self.ragged(name)):
+                column[i] = np.array(part)
+            data[name] = column
+        return pd.DataFrame(data, columns=self.columns)
+
+    def __getstate__(self) -> dict:
+        return {"events": np.asarray(self.events), "hits": np.asarray(self.hits)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.events = state["events"]
+        self.hits = state["hits"]
+        self._offsets = None
@@ -0,0 +1,197 @@
+# DOC: docs/features/context/DATA_ACCESS.md#增量刷新正在采集的运行
+"""
+增量摄取模块 - 正在采集的运行（DAQ 持续写入新的 RAW 文件）的增量刷新。
+
+- 已摄取文件清单（manifest）：raw_files 在增量模式下记录每个文件的 size/mtime，
+  以缓存附属文件的形式与 raw_files 的缓存键放在一起
+- diff_raw_file_manifest: 对比清单与当前扫描结果，区分“只新增文件”与“已摄取文件被改动”
+- IncrementalUpdate: ``Context.refresh_run`` 传给插件 ``compute_incremental`` 的刷新描述
+"""
+
+from dataclasses import dataclass, field
+import json
+import os
+import time
+from typing import Any
+
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+# 清单附属文件名（位于 raw_files 缓存键之下）
+RAW_FILE_MANIFEST_SIDECAR = export("ingested.json", name="RAW_FILE_MANIFEST_SIDECAR")
+_MANIFEST_VERSION = 1
+
+
+@export
+@dataclass
+class RawFileDiff:
+    """已摄取清单与当前扫描结果的差异。"""
+
+    # 按通道分组的新增文件（与 raw_files 分组对齐）
+    new_files: list[list[str]]
+    # 已摄取但被修改、删除或不再是分组前缀的文件；非空时无法增量刷新
+    changed: list[str]
+
+    @property
+    def n_new(self) -> int:
+        return sum(len(group) for group in self.new_files)
+
+
+@export
+@dataclass
+class IncrementalUpdate:
+    """
+    一次增量刷新的描述。
+
+    Attributes:
+        run_id: 运行标识符
+        new_files: 本次新增的文件（按通道分组，与 raw_files 分组对齐）
+        all_files: 刷新后的全部已摄取文件
+        stable_rows: 已刷新数据名 -> 与刷新前相同的前缀行数（之后的行为新增或重排）
+        scratch: 同一次刷新内插件之间共享的临时结果（如 records/wave_pool 共用的合并结果）
+    """
+
+    run_id: str
+    new_files: list[list[str]]
+    all_files: list[list[str]]
+    stable_rows: dict[str, int] = field(default_factory=dict)
+    scratch: dict[str, Any] = field(default_factory=dict)
+
+
+@export
+def stat_raw_files(raw_files: list[list[str]]) -> list[list[dict[str, Any]]]:
+    """为每个文件记录 path/size/mtime_ns（文件不存在时 size 记为 -1）。"""
+    groups = []
+    for group in raw_files:
+        entries = []
+        for path in group:
+            try:
+                st = os.stat(path)
+                entries.append({"path": str(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+            except OSError:
+                entries.append({"path": str(path), "size": -1, "mtime_ns": 0})
+        groups.append(entries)
+    return groups
+
+
+@export
+def settled_entries(
+    entries: list[list[dict[str, Any]]], settle_seconds: float, now: float | None = None
+) -> list[list[dict[str, Any]]]:
+    """
+    去掉仍在写入的文件：每个分组只保留最近 ``settle_seconds`` 秒内未被修改的前缀。
+
+    文件按编号顺序写入，遇到第一个未稳定（或不存在）的文件后，其后的文件也不摄取。
+    """
+    if now is None:
+        now = time.time()
+    cutoff_ns = int((now - max(float(settle_seconds), 0.0)) * 1e9)
+    settled = []
+    for group in entries:
+        kept = []
+        for entry in group:
+            if entry["size"] < 0 or (settle_seconds > 0 and entry["mtime_ns"] > cutoff_ns):
+                break
+            kept.append(entry)
+        settled.append(kept)
+    return settled
+
+
+@export
+def manifest_files(entries: list[list[dict[str, Any]]]) -> list[list[str]]:
+    """清单条目转换为 raw_files 形式的路径分组。"""
+    return [[entry["path"] for entry in group] for group in entries]
+
+
+@export
+def diff_raw_file_manifest(
+    ingested: list[list[dict[str, Any]]], current: list[list[dict[str, Any]]]
+) -> RawFileDiff:
+    """
+    对比已摄取清单与当前扫描结果。
+
+    每个分组中已摄取的文件必须仍是当前分组的前缀且 size/mtime 不变，之后的文件视为新增；
+    否则记入 ``changed``（调用方应完整重建）。
+    """
+    n_groups = max(len(ingested), len(current))
+    new_files: list[list[str]] = []
+    changed: list[str] = []
+    for idx in range(n_groups):
+        old = ingested[idx] if idx < len(ingested) else []
+        cur = current[idx] if idx < len(current) else []
+        for pos, entry in enumerate(old):
+            match = cur[pos] if pos < len(cur) else None
+            if (
+                match is None
+                or match["path"] != entry["path"]
+                or match["size"] != entry["size"]
+                or match["mtime_ns"] != entry["mtime_ns"]
+            ):
+                changed.append(entry["path"])
+        new_files.append([entry["path"] for entry in cur[len(old) :]])
+    return RawFileDiff(new_files=new_files, changed=changed)
+
+
+@export
+def raw_file_manifest_path(context: Any, run_id: str) -> str | None:
+    """返回 run 的已摄取清单路径；存储不支持附属文件时返回 None。"""
+    storage = context._get_storage_for_data_name("raw_files")
+    if not hasattr(storage, "sidecar_path"):
+        return None
+    key = context.key_for(run_id, "raw_files")
+    return context._storage_call(storage, "sidecar_path", key, run_id, RAW_FILE_MANIFEST_SIDECAR)
+
+
+@export
+def load_raw_file_manifest(path: str | None) -> list[list[dict[str, Any]]] | None:
+    """读取已摄取清单；不存在或无法解析时返回 None。"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != _MANIFEST_VERSION:
+        return None
+    return payload.get("groups")
+
+
+@export
+def save_raw_file_manifest(path: str | None, entries: list[list[dict[str, Any]]]) -> None:
+    """原子写入已摄取清单。"""
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": _MANIFEST_VERSION, "groups": entries}, f)
+    os.replace(tmp_path, path)
+
+
+@export
+def drop_raw_file_manifest(path: str | None) -> None:
+    """删除已摄取清单（下次计算 raw_files 时重新扫描）。"""
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+@export
+def ingest_raw_files(
+    context: Any, run_id: str, raw_files: list[list[str]], settle_seconds: float
+) -> list[list[str]]:
+    """
+    增量模式下 raw_files 的结果：返回已摄取的文件快照。
+
+    已有清单且其中的文件未被改动时原样返回清单中的文件（新文件留给 ``refresh_run``
+    摄取，保证与已缓存的下游数据一致）；否则以当前已稳定的文件重新建立清单。
+    """
+    path = raw_file_manifest_path(context, run_id)
+    current = stat_raw_files(raw_files)
+    ingested = load_raw_file_manifest(path)
+    if ingested is not None and not diff_raw_file_manifest(ingested, current).changed:
+        return manifest_files(ingested)
+    settled = settled_entries(current, settle_seconds)
+    save_raw_file_manifest(path, settled)
+    return manifest_files(settled)
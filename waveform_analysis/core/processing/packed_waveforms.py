@@ -0,0 +1,274 @@
+# DOC: docs/features/context/DATA_ACCESS.md#紧凑波形布局
+"""
+紧凑波形模块 - 不定长 st_waveforms 的 packed 表示。
+
+默认的 st_waveforms 把每个事件的 ``wave`` 填充到整个 run 的最大长度，
+记录长度不一致时大量内存与磁盘被填充值占用。PackedWaveforms 改为两张数组：
+
+- events: 每个事件一行的元数据（PACKED_WAVEFORM_DTYPE，含 wave_offset/event_length）
+- pool:   所有事件的有效样本依次拼接的一维波形池
+
+第 i 个事件的样本为 ``pool[wave_offset[i]:wave_offset[i] + event_length[i]]``，
+与 records/wave_pool 的布局一致。两张表都可以直接 memmap 缓存；
+需要定长二维波形的插件调用 ``padded()`` / ``to_padded()`` 按需物化。
+"""
+
+from typing import Any
+
+import numpy as np
+
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+# pool 在存储中的键后缀（events 使用插件的缓存键本身）
+PACKED_WAVEFORMS_POOL_SUFFIX = export("_pool", name="PACKED_WAVEFORMS_POOL_SUFFIX")
+
+# 按需物化时每块的目标单元数（行数 x 填充长度），限制临时索引数组的内存
+_GATHER_BLOCK_CELLS = 1 << 22
+
+
+@export
+def packed_event_dtype(source_dtype: np.dtype) -> np.dtype:
+    """由定长波形 dtype 推导 packed 元数据 dtype（去掉 wave，追加 wave_offset）。"""
+    names = source_dtype.names or ()
+    fields: list[tuple[Any, ...]] = []
+    for name in names:
+        if name in ("wave", "wave_offset"):
+            continue
+        field_dtype = source_dtype.fields[name][0]
+        if field_dtype.subdtype is None:
+            fields.append((name, field_dtype))
+        else:
+            base_dtype, shape = field_dtype.subdtype
+            fields.append((name, base_dtype, shape))
+    if "event_length" not in names:
+        fields.append(("event_length", np.int32))
+    fields.append(("wave_offset", np.int64))
+    return np.dtype(fields)
+
+
+@export
+class PackedWaveforms:
+    """
+    packed 布局的 st_waveforms / filtered_waveforms。
+
+    Args:
+        events: 每事件一行的结构化数组，必须包含 ``wave_offset`` 与 ``event_length``
+        pool: 一维波形池
+
+    Examples:
+        >>> st = ctx.get_data("run_001", "st_waveforms")   # wave_layout="packed"
+        >>> st["baseline"]                 # 元数据列（ndarray）
+        >>> st.wave(0)                     # 第 0 个事件的有效样本（pool 视图）
+        >>> waves = st.padded([0, 5, 9])   # 按需填充为二维数组
+        >>> legacy = st.to_padded()        # 旧的定长 ST_WAVEFORM_DTYPE 数组
+    """
+
+    def __init__(self, events: np.ndarray, pool: np.ndarray):
+        names = events.dtype.names or ()
+        if "wave_offset" not in names or "event_length" not in names:
+            raise ValueError(
+                "events must be a structured array with 'wave_offset' and 'event_length' fields"
+            )
+        if pool.ndim != 1:
+            raise ValueError("pool must be a 1D array")
+        self.events = events
+        self.pool = pool
+        if len(events):
+            offsets = self.offsets
+            ends = offsets + self.lengths
+            if int(offsets.min()) < 0 or int(self.lengths.min()) < 0 or int(ends.max()) > len(pool):
+                raise ValueError(
+                    f"events reference samples outside the wave pool (pool size={len(pool)})"
+                )
+
+    @classmethod
+    def from_padded(cls, waveforms: np.ndarray) -> "PackedWaveforms":
+        """
+        把定长 ``wave`` 的结构化数组压缩为 packed 形式。
+
+        每行保留前 ``event_length`` 个样本（缺少该字段时保留整行）。
+        """
+        names = waveforms.dtype.names or ()
+        if "wave" not in names:
+            raise ValueError("waveforms must be a structured array with a 'wave' field")
+        n = len(waveforms)
+        waves = waveforms["wave"]
+        width = int(waves.shape[1]) if waves.ndim == 2 else 0
+        if "event_length" in names:
+            lengths = np.clip(waveforms["event_length"].astype(np.int64), 0, width)
+        else:
+            lengths = np.full(n, width, dtype=np.int64)
+
+        offsets = np.zeros(n, dtype=np.int64)
+        if n > 1:
+            np.cumsum(lengths[:-1], out=offsets[1:])
+        pool = np.empty(int(lengths.sum()), dtype=waves.dtype)
+        cols = np.arange(width, dtype=np.int64)
+        step = max(1, _GATHER_BLOCK_CELLS // max(width, 1))
+        for start in range(0, n, step):
+            stop = min(start + step, n)
+            block_lengths = lengths[start:stop]
+            valid = cols[None, :] < block_lengths[:, None]
+            first = int(offsets[start])
+            pool[first : first + int(block_lengths.sum())] = np.asarray(waves[start:stop])[valid]
+
+        events = np.zeros(n, dtype=packed_event_dtype(waveforms.dtype))
+        for name in events.dtype.names:
+            if name in names and name != "event_length":
+                events[name] = waveforms[name]
+        events["event_length"] = lengths
+        events["wave_offset"] = offsets
+        return cls(events, pool)
+
+    # ------------------------------------------------------------------
+    # 形状与列
+    # ------------------------------------------------------------------
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """每个事件在 pool 中的起始位置。"""
+        return self.events["wave_offset"].astype(np.int64, copy=False)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """每个事件的有效样本数。"""
+        return self.events["event_length"].astype(np.int64, copy=False)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """元数据 dtype（不含 wave）。"""
+        return self.events.dtype
+
+    @property
+    def max_length(self) -> int:
+        return int(self.lengths.max()) if len(self.events) else 0
+
+    @property
+    def empty(self) -> bool:
+        return len(self.events) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.events.nbytes + self.pool.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __repr__(self) -> str:
+        return (
+            f"PackedWaveforms(events={len(self.events)}, pool={len(self.pool)}, "
+            f"pool_dtype={self.pool.dtype})"
+        )
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """元数据列返回 ndarray；``"wave"`` 返回按需填充的二维波形。"""
+        if name == "wave":
+            return self.padded()
+        if name in self.events.dtype.names:
+            return self.events[name]
+        raise KeyError(name)
+
+    # ------------------------------------------------------------------
+    # 波形访问
+    # ------------------------------------------------------------------
+
+    def wave(self, i: int) -> np.ndarray:
+        """第 i 个事件的有效样本（pool 的切片视图）。"""
+        n = len(self.events)
+        if i < -n or i >= n:
+            raise IndexError(f"event index {i} out of range for {n} events")
+        i = i + n if i < 0 else i
+        start = int(self.events["wave_offset"][i])
+        return self.pool[start : start + int(self.events["event_length"][i])]
+
+    def padded(
+        self,
+        indices: Any = None,
+        pad_to: int | None = None,
+        fill: Any = 0,
+    ) -> np.ndarray:
+        """
+        把选中事件的样本填充为 (rows, pad_to) 二维数组。
+
+        Args:
+            indices: 事件行号或布尔掩码；None 表示全部事件
+            pad_to: 填充长度；None 时取选中事件的最大长度，更长的事件被截断
+            fill: 填充值
+        """
+        if indices is None:
+            rows = np.arange(len(self.events), dtype=np.int64)
+        else:
+            rows = np.asarray(indices)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            rows = rows.astype(np.int64, copy=False).reshape(-1)
+        lengths = self.lengths[rows]
+        if pad_to is None:
+            pad_to = int(lengths.max()) if lengths.size else 0
+        lengths = np.minimum(lengths, int(pad_to))
+        offsets = self.offsets[rows]
+
+        out = np.full((len(rows), int(pad_to)), fill, dtype=self.pool.dtype)
+        cols = np.arange(int(pad_to), dtype=np.int64)
+        step = max(1, _GATHER_BLOCK_CELLS // max(int(pad_to), 1))
+        for start in range(0, len(rows), step):
+            stop = min(start + step, len(rows))
+            valid = cols[None, :] < lengths[start:stop, None]
+            src = offsets[start:stop, None] + cols[None, :]
+            out[start:stop][valid] = self.pool[src[valid]]
+        return out
+
+    def take(self, selection: Any) -> "PackedWaveforms":
+        """按事件行号或布尔掩码选取子集（pool 同步压缩）。"""
+        idx = np.asarray(selection)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        idx = idx.astype(np.int64, copy=False).reshape(-1)
+        lengths = self.lengths[idx]
+        starts = self.offsets[idx]
+        new_offsets = np.cumsum(lengths) - lengths
+        # 每个选中事件的样本区间 [start, start + length) 展开为 pool 下标
+        shift = np.repeat(starts - new_offsets, lengths)
+        pool_idx = np.arange(int(lengths.sum()), dtype=np.int64) + shift
+        events = self.events[idx]
+        events["wave_offset"] = new_offsets
+        return PackedWaveforms(events, self.pool[pool_idx])
+
+    # ------------------------------------------------------------------
+    # 转换
+    # ------------------------------------------------------------------
+
+    def to_padded(self, pad_to: int | None = None) -> np.ndarray:
+        """转换为带定长 ``wave`` 字段的结构化数组（旧的 st_waveforms 形态）。"""
+        if pad_to is None:
+            pad_to = self.max_length
+        fields: list[tuple[Any, ...]] = []
+        for name in self.events.dtype.names:
+            if name == "wave_offset":
+                continue
+            field_dtype = self.events.dtype.fields[name][0]
+            fields.append((name, field_dtype))
+        fields.append(("wave", self.pool.dtype, (int(pad_to),)))
+        out = np.zeros(len(self.events), dtype=fields)
+        for name, *_ in fields[:-1]:
+            out[name] = self.events[name]
+        out["event_length"] = np.minimum(self.lengths, int(pad_to))
+        out["wave"] = self.padded(pad_to=pad_to)
+        return out
+
+    def __getstate__(self) -> dict:
+        return {"events": np.asarray(self.events), "pool": np.asarray(self.pool)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.events = state["events"]
+        self.pool = state["pool"]
+
+
+@export
+def as_padded_waveforms(data: Any) -> Any:
+    """PackedWaveforms 物化为定长结构化数组；其它输入原样返回。"""
+    if isinstance(data, PackedWaveforms):
+        return data.to_padded()
+    return data
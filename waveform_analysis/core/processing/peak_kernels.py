@@ -0,0 +1,485 @@
+# DOC: docs/plugins/reference/builtin/auto/hit.md
+"""
+峰值检测内核模块 - 按块处理多条波形的 find_peaks 等价实现。
+
+HitFinderPlugin 原先对每条波形调用一次 scipy.signal.find_peaks；本模块把一块波形
+拼接成扁平数组（offsets 标记每行边界），一次调用完成整块的峰值检测：
+
+- numba 可用时使用编译内核（逐行循环，nogil，可被线程池并行）
+- 否则使用 NumPy 向量化实现（对整块的所有峰同时推进扫描）
+
+两种实现都复现 find_peaks 的 height / threshold / distance / prominence / width
+（rel_height=0.5）语义，返回峰位置与 left_ips / right_ips。
+"""
+
+import math
+
+import numpy as np
+
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+# 尝试导入numba（可选）
+try:
+    from numba import jit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def jit(*args, **kwargs):
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+export(NUMBA_AVAILABLE, name="NUMBA_AVAILABLE")
+
+PEAK_KERNEL_BACKENDS = ("auto", "numba", "numpy")
+
+# 向量化扫描窗口的初始/最大宽度
+_SCAN_WINDOW_START = 8
+_SCAN_WINDOW_MAX = 4096
+
+
+def _scalar_condition(name: str, value) -> float | None:
+    if value is None:
+        return None
+    if np.ndim(value) != 0:
+        raise ValueError(f"peak kernel only supports a scalar lower bound for '{name}'")
+    return float(value)
+
+
+@export
+def resolve_peak_backend(backend: str = "auto") -> str:
+    """把 'auto' 解析为可用的具体实现（numba 优先）。"""
+    backend = str(backend).lower()
+    if backend not in PEAK_KERNEL_BACKENDS:
+        raise ValueError(
+            f"unknown peak kernel backend '{backend}', expected {PEAK_KERNEL_BACKENDS}"
+        )
+    if backend == "auto":
+        return "numba" if NUMBA_AVAILABLE else "numpy"
+    if backend == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("peak kernel backend 'numba' requested but numba is not installed")
+    return backend
+
+
+@export
+def find_peaks_block(
+    x: np.ndarray,
+    offsets: np.ndarray,
+    height: float | None = None,
+    threshold: float | None = None,
+    distance: float | None = None,
+    prominence: float | None = None,
+    width: float | None = None,
+    rel_height: float = 0.5,
+    backend: str = "auto",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    对一块波形执行与 ``scipy.signal.find_peaks`` 等价的峰值检测。
+
+    Args:
+        x: 所有波形首尾拼接的一维信号
+        offsets: 行边界，长度 n_rows + 1，第 r 行为 ``x[offsets[r]:offsets[r + 1]]``
+        height / threshold / distance / prominence / width: 与 find_peaks 相同的下限条件
+            （只支持标量；None 表示不筛选）
+        rel_height: 宽度测量的相对高度（find_peaks 默认 0.5）
+        backend: 'auto' | 'numba' | 'numpy'
+
+    Returns:
+        (rows, peaks, left_ips, right_ips)：峰所在行、行内位置与行内插值边缘，
+        按 (行, 位置) 升序排列
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    hmin = _scalar_condition("height", height)
+    tmin = _scalar_condition("threshold", threshold)
+    pmin = _scalar_condition("prominence", prominence)
+    wmin = _scalar_condition("width", width)
+    dist = 1.0
+    if distance is not None:
+        if distance < 1:
+            raise ValueError("`distance` must be greater or equal to 1")
+        dist = float(math.ceil(distance))
+
+    if resolve_peak_backend(backend) == "numba":
+        return find_peaks_block_loops(x, offsets, hmin, tmin, dist, pmin, wmin, rel_height)
+    return _find_peaks_block_numpy(x, offsets, hmin, tmin, dist, pmin, wmin, rel_height)
+
+
+@export
+def find_peaks_block_loops(
+    x: np.ndarray,
+    offsets: np.ndarray,
+    hmin: float | None,
+    tmin: float | None,
+    distance: float,
+    pmin: float | None,
+    wmin: float | None,
+    rel_height: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """逐行循环实现（numba 编译；未安装 numba 时为纯 Python，仅用于校验）。"""
+    n_candidates, candidates, counts = _candidate_peaks_kernel(
+        x,
+        offsets,
+        hmin is not None,
+        0.0 if hmin is None else hmin,
+        tmin is not None,
+        0.0 if tmin is None else tmin,
+    )
+    candidates = candidates[:n_candidates]
+    cand_offsets = np.zeros(len(offsets), dtype=np.int64)
+    np.cumsum(counts, out=cand_offsets[1:])
+    if distance > 1:
+        order = _distance_priority_order(x, candidates, cand_offsets)
+    else:
+        order = np.zeros(0, dtype=np.int64)
+    count, rows, peaks, left_ips, right_ips = _finish_peaks_kernel(
+        x,
+        offsets,
+        candidates,
+        cand_offsets,
+        order,
+        distance,
+        pmin is not None,
+        0.0 if pmin is None else pmin,
+        wmin is not None,
+        0.0 if wmin is None else wmin,
+        rel_height,
+    )
+    return rows[:count], peaks[:count], left_ips[:count], right_ips[:count]
+
+
+def _distance_priority_order(
+    x: np.ndarray, candidates: np.ndarray, cand_offsets: np.ndarray
+) -> np.ndarray:
+    """
+    每行候选峰的 distance 优先级顺序（行内下标，峰高升序）。
+
+    scipy 用默认（不稳定）的 ``np.argsort(x[peaks])`` 排序，等高峰的先后取决于 NumPy
+    的排序实现，编译内核无法复现；因此在这里用 NumPy 计算。没有等高峰的行排序结果
+    唯一，整块一次 lexsort 即可，只有含等高峰的行逐行调用 ``np.argsort``。
+    """
+    counts = np.diff(cand_offsets)
+    row_of = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    priority = x[candidates]
+    by_height = np.lexsort((priority, row_of))
+    order = by_height - cand_offsets[row_of[by_height]]
+    sorted_priority = priority[by_height]
+    sorted_rows = row_of[by_height]
+    tied = (sorted_priority[1:] == sorted_priority[:-1]) & (sorted_rows[1:] == sorted_rows[:-1])
+    for r in np.unique(sorted_rows[1:][tied]).tolist():
+        lo, hi = int(cand_offsets[r]), int(cand_offsets[r + 1])
+        order[lo:hi] = np.argsort(priority[lo:hi])
+    return order
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _candidate_peaks_kernel(x, offsets, use_height, hmin, use_threshold, tmin):
+    n_rows = len(offsets) - 1
+    cap = len(x) // 2 + 1
+    peaks = np.empty(cap, dtype=np.int64)
+    counts = np.zeros(n_rows, dtype=np.int64)
+    m = 0
+
+    for r in range(n_rows):
+        rs = offsets[r]
+        re = offsets[r + 1]
+        row_start = m
+
+        # 局部极大值（平台取中点），与 scipy._local_maxima_1d 相同
+        i = rs + 1
+        i_max = re - 1
+        while i < i_max:
+            if x[i - 1] < x[i]:
+                i_ahead = i + 1
+                while i_ahead < i_max and x[i_ahead] == x[i]:
+                    i_ahead += 1
+                if x[i_ahead] < x[i]:
+                    p = (i + i_ahead - 1) // 2
+                    # height / threshold
+                    if (not use_height or hmin <= x[p]) and (
+                        not use_threshold or tmin <= min(x[p] - x[p - 1], x[p] - x[p + 1])
+                    ):
+                        peaks[m] = p
+                        m += 1
+                    i = i_ahead
+            i += 1
+        counts[r] = m - row_start
+
+    return m, peaks, counts
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _finish_peaks_kernel(
+    x,
+    offsets,
+    candidates,
+    cand_offsets,
+    order,
+    distance,
+    use_prominence,
+    pmin,
+    use_width,
+    wmin,
+    rel_height,
+):
+    n_rows = len(offsets) - 1
+    cap = len(candidates)
+    out_rows = np.empty(cap, dtype=np.int64)
+    out_peaks = np.empty(cap, dtype=np.int64)
+    out_left = np.empty(cap, dtype=np.float64)
+    out_right = np.empty(cap, dtype=np.float64)
+    peaks = np.empty(cap, dtype=np.int64)
+    keep = np.empty(cap, dtype=np.bool_)
+    count = 0
+
+    for r in range(n_rows):
+        rs = offsets[r]
+        re = offsets[r + 1]
+        cs = cand_offsets[r]
+        m = cand_offsets[r + 1] - cs
+        for k in range(m):
+            peaks[k] = candidates[cs + k]
+
+        # distance：按给定的峰高顺序从高到低贪心保留
+        if distance > 1 and m > 1:
+            for k in range(m):
+                keep[k] = True
+            for oi in range(m - 1, -1, -1):
+                j = order[cs + oi]
+                if not keep[j]:
+                    continue
+                k = j - 1
+                while 0 <= k and peaks[j] - peaks[k] < distance:
+                    keep[k] = False
+                    k -= 1
+                k = j + 1
+                while k < m and peaks[k] - peaks[j] < distance:
+                    keep[k] = False
+                    k += 1
+            n_keep = 0
+            for k in range(m):
+                if keep[k]:
+                    peaks[n_keep] = peaks[k]
+                    n_keep += 1
+            m = n_keep
+
+        # prominence 与 width（rel_height）
+        for k in range(m):
+            p = peaks[k]
+            left_min = x[p]
+            left_base = p
+            i = p
+            while rs <= i and x[i] <= x[p]:
+                if x[i] < left_min:
+                    left_min = x[i]
+                    left_base = i
+                i -= 1
+            right_min = x[p]
+            right_base = p
+            i = p
+            while i <= re - 1 and x[i] <= x[p]:
+                if x[i] < right_min:
+                    right_min = x[i]
+                    right_base = i
+                i += 1
+            prom = x[p] - max(left_min, right_min)
+            if use_prominence and not (pmin <= prom):
+                continue
+
+            level = x[p] - prom * rel_height
+            i = p
+            while left_base < i and level < x[i]:
+                i -= 1
+            left_ip = float(i - rs)
+            if x[i] < level:
+                left_ip += (level - x[i]) / (x[i + 1] - x[i])
+            i = p
+            while i < right_base and level < x[i]:
+                i += 1
+            right_ip = float(i - rs)
+            if x[i] < level:
+                right_ip -= (level - x[i]) / (x[i - 1] - x[i])
+            if use_width and not (wmin <= right_ip - left_ip):
+                continue
+
+            out_rows[count] = r
+            out_peaks[count] = p - rs
+            out_left[count] = left_ip
+            out_right[count] = right_ip
+            count += 1
+
+    return count, out_rows, out_peaks, out_left, out_right
+
+
+# ---------------------------------------------------------------------------
+# NumPy 向量化实现
+# ---------------------------------------------------------------------------
+
+_SCAN_LE = 0  # 继续条件 x[i] <= ref
+_SCAN_GT = 1  # 继续条件 ref < x[i]
+_SCAN_EQ = 2  # 继续条件 x[i] == ref
+
+
+def _scan(
+    x: np.ndarray,
+    start: np.ndarray,
+    bound: np.ndarray,
+    direction: int,
+    ref: np.ndarray,
+    mode: int,
+    track_min: bool = False,
+) -> tuple[np.ndarray, np.ndarray | None, np.ndarray | None]:
+    """
+    从 start 沿 direction 同时推进所有扫描，返回每个扫描第一个不满足条件的下标。
+
+    越过 bound（含）时返回 bound + direction；bound 必须是合法下标。窗口宽度逐轮
+    翻倍，长扫描只需 O(log n) 轮。track_min=True 时同时返回扫描区间内的最小值与
+    其首次出现的位置（初值为 ref 与 start，只有严格更小才更新）。
+    """
+    n = len(start)
+    stop = np.empty(n, dtype=np.int64)
+    minima = ref.astype(np.float64, copy=True) if track_min else None
+    where = start.astype(np.int64, copy=True) if track_min else None
+    active = np.arange(n, dtype=np.int64)
+    cursor = start.astype(np.int64, copy=True)
+    window = _SCAN_WINDOW_START
+    while active.size:
+        cur = cursor[active]
+        lim = bound[active]
+        steps = np.arange(window, dtype=np.int64)
+        idx = cur[:, None] + direction * steps[None, :]
+        inside = (lim[:, None] - idx) * direction >= 0
+        values = x[np.where(inside, idx, lim[:, None])]
+        r = ref[active][:, None]
+        if mode == _SCAN_LE:
+            cont = values <= r
+        elif mode == _SCAN_GT:
+            cont = r < values
+        else:
+            cont = values == r
+        cont &= inside
+        failed = ~cont
+        done = failed.any(axis=1)
+        first = np.where(done, failed.argmax(axis=1), window)
+        if track_min:
+            # 只统计失败位置之前（已扫描）的采样
+            scanned = steps[None, :] < first[:, None]
+            masked = np.where(scanned, values, np.inf)
+            pos = masked.argmin(axis=1)
+            low = masked[np.arange(len(active)), pos]
+            better = low < minima[active]
+            upd = active[better]
+            minima[upd] = low[better]
+            where[upd] = cur[better] + direction * pos[better]
+        stop[active[done]] = cur[done] + direction * first[done]
+        cursor[active[~done]] = cur[~done] + direction * window
+        active = active[~done]
+        window = min(window * 2, _SCAN_WINDOW_MAX)
+    return stop, minima, where
+
+
+def _select_by_distance(x: np.ndarray, peaks: np.ndarray, distance: float) -> np.ndarray:
+    """单行的 find_peaks distance 贪心筛选（与 scipy 相同的优先级顺序）。"""
+    keep = np.ones(len(peaks), dtype=bool)
+    order = np.argsort(x[peaks])
+    for j in order[::-1].tolist():
+        if not keep[j]:
+            continue
+        k = j - 1
+        while 0 <= k and peaks[j] - peaks[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < len(peaks) and peaks[k] - peaks[j] < distance:
+            keep[k] = False
+            k += 1
+    return keep
+
+
+def _find_peaks_block_numpy(
+    x: np.ndarray,
+    offsets: np.ndarray,
+    hmin: float | None,
+    tmin: float | None,
+    distance: float,
+    pmin: float | None,
+    wmin: float | None,
+    rel_height: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    empty = (
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.float64),
+        np.zeros(0, dtype=np.float64),
+    )
+    if len(x) < 3:
+        return empty
+
+    # 局部极大值：上升进入 (x[i-1] < x[i]) 后跨过平台、下一个不同值更小即为峰。
+    # 峰值等于平台值，因此 height 条件可以先作用在上升点上，大幅减少候选。
+    cand = np.flatnonzero(x[1:] > x[:-1]) + 1
+    if hmin is not None:
+        cand = cand[hmin <= x[cand]]
+    rows = np.searchsorted(offsets, cand, side="right") - 1
+    row_start = offsets[rows]
+    row_last = offsets[rows + 1] - 1
+    ok = (cand > row_start) & (cand < row_last)
+    cand, rows, row_last = cand[ok], rows[ok], row_last[ok]
+    xc = x[cand]
+    ahead, _, _ = _scan(x, cand + 1, row_last - 1, 1, xc, _SCAN_EQ)
+    sel = x[ahead] < xc
+    peaks = (cand[sel] + ahead[sel] - 1) // 2
+    rows = rows[sel]
+    xp = xc[sel]
+
+    if tmin is not None:
+        ok = tmin <= np.minimum(xp - x[peaks - 1], xp - x[peaks + 1])
+        peaks, rows, xp = peaks[ok], rows[ok], xp[ok]
+    if distance > 1 and len(peaks) > 1:
+        close = (np.diff(peaks) < distance) & (rows[1:] == rows[:-1])
+        if close.any():
+            keep = np.ones(len(peaks), dtype=bool)
+            bounds = np.searchsorted(rows, np.arange(len(offsets)))
+            for r in np.unique(rows[1:][close]).tolist():
+                lo, hi = int(bounds[r]), int(bounds[r + 1])
+                keep[lo:hi] = _select_by_distance(x, peaks[lo:hi], distance)
+            peaks, rows, xp = peaks[keep], rows[keep], xp[keep]
+    if len(peaks) == 0:
+        return empty
+
+    # prominence：左右扫描到第一个高于峰的采样（或行边界），同时记录区间最小值
+    base = offsets[rows]
+    _, left_min, left_base = _scan(x, peaks, base, -1, xp, _SCAN_LE, track_min=True)
+    _, right_min, right_base = _scan(
+        x, peaks, offsets[rows + 1] - 1, 1, xp, _SCAN_LE, track_min=True
+    )
+    prom = xp - np.maximum(left_min, right_min)
+    if pmin is not None:
+        ok = pmin <= prom
+        peaks, rows, xp, prom, base = peaks[ok], rows[ok], xp[ok], prom[ok], base[ok]
+        left_base, right_base = left_base[ok], right_base[ok]
+
+    # width：在 [left_base, right_base] 内找穿过 rel_height 水平线的位置并线性插值；
+    # 插值在行内坐标上进行，保证与逐行调用 find_peaks 的浮点结果一致
+    level = xp - prom * rel_height
+    li, _, _ = _scan(x, peaks, left_base + 1, -1, level, _SCAN_GT)
+    ri, _, _ = _scan(x, peaks, right_base - 1, 1, level, _SCAN_GT)
+    left_ip = (li - base).astype(np.float64)
+    below = x[li] < level
+    idx = li[below]
+    left_ip[below] += (level[below] - x[idx]) / (x[idx + 1] - x[idx])
+    right_ip = (ri - base).astype(np.float64)
+    below = x[ri] < level
+    idx = ri[below]
+    right_ip[below] -= (level[below] - x[idx]) / (x[idx - 1] - x[idx])
+    if wmin is not None:
+        ok = wmin <= right_ip - left_ip
+        peaks, rows, base = peaks[ok], rows[ok], base[ok]
+        left_ip, right_ip = left_ip[ok], right_ip[ok]
+    return rows, peaks - base, left_ip, right_ip
@@ -5,15 +5,19 @@ This module provides a lightweight event index (records) paired with a
 contiguous wave_pool for variable-length waveforms.
 """
 
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from contextlib import nullcontext
 from dataclasses import dataclass
+import functools
+import logging
 from pathlib import Path
 import tempfile
 import time
+from typing import Any
 
 import numpy as np
 
+from waveform_analysis.core.execution.worker_pools import WorkerPoolService, get_worker_pools
 from waveform_analysis.core.foundation.utils import exporter
 from waveform_analysis.core.hardware.channel import (
     HardwareChannel,
@@ -22,12 +26,18 @@ from waveform_analysis.core.hardware.channel import (
 from waveform_analysis.core.processing.dtypes import (
     EVENTS_DTYPE as _EVENTS_DTYPE,
 )
+from waveform_analysis.core.processing.dtypes import (
+    POLARITY_UNKNOWN,
+    encode_polarity,
+)
 from waveform_analysis.core.processing.dtypes import (
     RECORDS_DTYPE as _RECORDS_DTYPE,
 )
 
 export, __all__ = exporter()
 
+logger = logging.getLogger(__name__)
+
 RECORDS_DTYPE = export(_RECORDS_DTYPE, name="RECORDS_DTYPE")
 EVENTS_DTYPE = export(_EVENTS_DTYPE, name="EVENTS_DTYPE")
 
@@ -120,6 +130,145 @@ def _records_sort_order(records: np.ndarray) -> np.ndarray:
     )
 
 
+@export
+def extend_records(
+    records: np.ndarray, wave_pool_size: int, new_bundle: RecordsBundle
+) -> tuple[np.ndarray, int]:
+    """
+    Merge records built from newly ingested files into existing sorted records.
+
+    The waveforms of ``new_bundle`` are assumed to be appended after the existing
+    wave_pool (``wave_offset`` is shifted by ``wave_pool_size``). Existing rows that
+    sort before the earliest new timestamp keep their position and ``record_id``;
+    the returned tail replaces ``records[stable_rows:]`` and continues the
+    ``record_id`` sequence from ``stable_rows``.
+
+    Returns:
+        (tail, stable_rows)
+    """
+    new_records = np.array(new_bundle.records, dtype=RECORDS_DTYPE, copy=True)
+    new_records["wave_offset"] += np.int64(wave_pool_size)
+    if len(new_records) == 0:
+        return new_records, len(records)
+    first_ts = new_records["timestamp"].min()
+    stable_rows = int(np.searchsorted(records["timestamp"], first_ts, side="left"))
+    tail = np.concatenate([np.asarray(records[stable_rows:], dtype=RECORDS_DTYPE), new_records])
+    tail = tail[_records_sort_order(tail)]
+    tail["record_id"] = np.arange(stable_rows, stable_rows + len(tail), dtype=np.int64)
+    return tail, stable_rows
+
+
+# 向量化 gather 每批展开的最大样本数（限制临时索引数组的大小）
+_SEGMENT_GATHER_SAMPLES = 1 << 22
+# 合并后平均段长不小于该值时逐段切片拷贝，否则批量 gather
+_SEGMENT_SLICE_MIN_SAMPLES = 4096
+
+
+def _coalesce_segments(
+    src_starts: np.ndarray, dst_starts: np.ndarray, lengths: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge adjacent segments that are contiguous in both source and destination."""
+    if len(lengths) <= 1:
+        return src_starts, dst_starts, lengths
+    ends_src = src_starts[:-1] + lengths[:-1]
+    ends_dst = dst_starts[:-1] + lengths[:-1]
+    breaks = np.flatnonzero((src_starts[1:] != ends_src) | (dst_starts[1:] != ends_dst)) + 1
+    run_starts = np.concatenate(([0], breaks))
+    return src_starts[run_starts], dst_starts[run_starts], np.add.reduceat(lengths, run_starts)
+
+
+def _copy_segments(
+    src: np.ndarray,
+    src_starts: np.ndarray,
+    dst: np.ndarray,
+    dst_starts: np.ndarray,
+    lengths: np.ndarray,
+) -> None:
+    """Copy ``src[s:s+n]`` to ``dst[d:d+n]`` for every segment with block copies."""
+    keep = lengths > 0
+    src_starts, dst_starts, lengths = _coalesce_segments(
+        src_starts[keep], dst_starts[keep], lengths[keep]
+    )
+    n_segments = len(lengths)
+    if n_segments == 0:
+        return
+    cum = np.cumsum(lengths)
+    if int(cum[-1]) >= n_segments * _SEGMENT_SLICE_MIN_SAMPLES:
+        for s, d, n in zip(src_starts.tolist(), dst_starts.tolist(), lengths.tolist(), strict=True):
+            dst[d : d + n] = src[s : s + n]
+        return
+
+    begin = 0
+    while begin < n_segments:
+        base = int(cum[begin - 1]) if begin else 0
+        end = int(np.searchsorted(cum, base + _SEGMENT_GATHER_SAMPLES, side="right"))
+        end = max(end, begin + 1)
+        seg_lengths = lengths[begin:end]
+        total = int(cum[end - 1]) - base
+        # 段内相对位置：0..n-1
+        rel = np.arange(total, dtype=np.int64) - np.repeat(
+            cum[begin:end] - seg_lengths - base, seg_lengths
+        )
+        dst[np.repeat(dst_starts[begin:end], seg_lengths) + rel] = src[
+            np.repeat(src_starts[begin:end], seg_lengths) + rel
+        ]
+        begin = end
+
+
+def _merge_sorted_records(
+    records_parts: Sequence[np.ndarray],
+    wave_pool_parts: Sequence[np.ndarray],
+    records_out: np.ndarray | None = None,
+    wave_pool_out: np.ndarray | None = None,
+) -> RecordsBundle:
+    """
+    Merge records parts (each sorted) into a global order with one stable lexsort.
+
+    Ties keep (part, row) order, matching a k-way merge of the sorted parts. Waves
+    are moved with bulk offset arithmetic; outputs may be preallocated (e.g. memmaps).
+    """
+    sizes = np.array([len(r) for r in records_parts], dtype=np.int64)
+    part_starts = np.concatenate(([0], np.cumsum(sizes)))
+    records_all = np.concatenate([np.asarray(r) for r in records_parts])
+    lengths_src = np.maximum(records_all["event_length"].astype(np.int64), 0)
+    src_offsets = records_all["wave_offset"].astype(np.int64)
+
+    order = _records_sort_order(records_all)
+    lengths = lengths_src[order]
+    dst_offsets = np.zeros(len(order), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=dst_offsets[1:])
+    total_samples = int(lengths.sum())
+
+    if records_out is None:
+        records_out = np.empty(len(order), dtype=RECORDS_DTYPE)
+    elif len(records_out) != len(order):
+        raise ValueError(f"records_out has {len(records_out)} rows, expected {len(order)}")
+    if wave_pool_out is None:
+        wave_pool_out = np.zeros(total_samples, dtype=np.uint16)
+    elif len(wave_pool_out) < total_samples:
+        raise ValueError(f"wave_pool_out has {len(wave_pool_out)} samples, need {total_samples}")
+
+    records_out[:] = records_all[order]
+    del records_all
+    records_out["wave_offset"] = dst_offsets
+
+    # 每个源行在输出中的位置；各 part 的行在输出中保持相对顺序
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order), dtype=np.int64)
+    for part_idx, wave_pool in enumerate(wave_pool_parts):
+        lo, hi = int(part_starts[part_idx]), int(part_starts[part_idx + 1])
+        if lo == hi:
+            continue
+        _copy_segments(
+            wave_pool,
+            src_offsets[lo:hi],
+            wave_pool_out,
+            dst_offsets[position[lo:hi]],
+            lengths_src[lo:hi],
+        )
+    return RecordsBundle(records=records_out, wave_pool=wave_pool_out)
+
+
 @export
 def split_by_hardware_channel(st_waveforms: np.ndarray) -> list[tuple[HardwareChannel, np.ndarray]]:
     """Split a structured array into per-hardware-channel views."""
@@ -179,7 +328,7 @@ def _build_records_from_wave_list(
         records["channel"][i] = channel
         records["baseline"][i] = baseline
         records["baseline_upstream"][i] = np.nan
-        records["polarity"][i] = "unknown"
+        records["polarity"][i] = POLARITY_UNKNOWN
         records["dt"][i] = np.int32(default_dt_ns)
         records["trigger_type"][i] = 0
         records["flags"][i] = np.uint32(flags)
@@ -209,6 +358,42 @@ def _build_records_from_wave_list(
     return RecordsBundle(records=records, wave_pool=wave_pool)
 
 
+def _build_records_from_v1725_index(
+    file_path: str,
+    index: np.ndarray,
+    timestamp_ps: np.ndarray,
+    default_dt_ns: int,
+) -> RecordsBundle:
+    from waveform_analysis.utils.formats.v1725 import gather_v1725_samples
+
+    lengths = index["length"]
+    if len(lengths) and int(lengths.max()) > np.iinfo(np.int32).max:
+        raise ValueError("event_length exceeds int32 range")
+
+    records = np.zeros(len(index), dtype=RECORDS_DTYPE)
+    records["timestamp"] = timestamp_ps
+    records["board"] = index["board"]
+    records["channel"] = index["channel"]
+    records["baseline"] = index["baseline"]
+    records["baseline_upstream"] = np.nan
+    records["polarity"] = POLARITY_UNKNOWN
+    records["dt"] = np.int32(default_dt_ns)
+    records["flags"] = index["trunc"].astype(np.uint32)
+    records["event_length"] = lengths
+    records["time"] = records["timestamp"] // 1000
+
+    order = _records_sort_order(records)
+    records = records[order]
+    wave_pool = gather_v1725_samples(file_path, index[order])
+
+    offsets = np.zeros(len(records), dtype=np.int64)
+    if len(records) > 1:
+        np.cumsum(records["event_length"][:-1], out=offsets[1:])
+    records["wave_offset"] = offsets
+    records["record_id"] = np.arange(len(records), dtype=np.int64)
+    return RecordsBundle(records=records, wave_pool=wave_pool)
+
+
 def _build_records_part_from_raw_array(
     raw_arr: np.ndarray,
     *,
@@ -272,7 +457,7 @@ def _build_records_part_from_raw_array(
     records["channel"] = channel_vals.astype(np.int16, copy=False)
     records["baseline"] = baseline_vals.astype(np.float64, copy=False)
     records["baseline_upstream"] = np.nan
-    records["polarity"] = "unknown"
+    records["polarity"] = POLARITY_UNKNOWN
     records["dt"] = np.int32(default_dt_ns)
     records["trigger_type"] = 0
     records["flags"] = np.uint32(0)
@@ -360,12 +545,6 @@ def _merge_records_part_refs(parts: Sequence[_RecordsPartRef]) -> RecordsBundle:
     if total_records == 0:
         return RecordsBundle(np.zeros(0, dtype=RECORDS_DTYPE), np.zeros(0, dtype=np.uint16))
 
-    total_samples = sum(part.n_samples for part in parts)
-    records_out = np.zeros(total_records, dtype=RECORDS_DTYPE)
-    wave_pool_out = np.zeros(total_samples, dtype=np.uint16)
-
-    import heapq
-
     records_parts = [
         np.memmap(part.records_path, dtype=RECORDS_DTYPE, mode="r", shape=(part.n_records,))
         for part in parts
@@ -374,63 +553,25 @@ def _merge_records_part_refs(parts: Sequence[_RecordsPartRef]) -> RecordsBundle:
         np.memmap(part.wave_pool_path, dtype=np.uint16, mode="r", shape=(part.n_samples,))
         for part in parts
     ]
+    merged = _merge_sorted_records(records_parts, wave_pool_parts)
+    merged.records["record_id"] = np.arange(total_records, dtype=np.int64)
+    return merged
 
-    heap = []
-    for part_idx, records in enumerate(records_parts):
-        if len(records) == 0:
-            continue
-        rec = records[0]
-        key = (
-            int(rec["timestamp"]),
-            int(rec["pid"]),
-            int(rec["board"]),
-            int(rec["channel"]),
-            part_idx,
-            0,
-        )
-        heapq.heappush(heap, key)
-
-    out_idx = 0
-    wave_cursor = 0
-    while heap:
-        _, _, _, _, part_idx, row_idx = heapq.heappop(heap)
-        records = records_parts[part_idx]
-        rec = records[row_idx]
-        length = max(int(rec["event_length"]), 0)
-
-        if length > 0:
-            offset = int(rec["wave_offset"])
-            wave_pool_out[wave_cursor : wave_cursor + length] = wave_pool_parts[part_idx][
-                offset : offset + length
-            ]
 
-        records_out[out_idx] = rec
-        records_out[out_idx]["wave_offset"] = wave_cursor
-        out_idx += 1
-        wave_cursor += length
-
-        next_row = row_idx + 1
-        if next_row < len(records):
-            next_rec = records[next_row]
-            key = (
-                int(next_rec["timestamp"]),
-                int(next_rec["pid"]),
-                int(next_rec["board"]),
-                int(next_rec["channel"]),
-                part_idx,
-                next_row,
-            )
-            heapq.heappush(heap, key)
-
-    records_out["record_id"] = np.arange(total_records, dtype=np.int64)
-    return RecordsBundle(records=records_out, wave_pool=wave_pool_out)
+def _build_records_part_refs_for_entry(
+    entry: tuple[int, Sequence[str]], **kwargs: Any
+) -> tuple[int, list[_RecordsPartRef], dict[str, tuple[float, int]]]:
+    """map 适配：entry 为 (channel_idx, channel_files)。"""
+    channel_idx, channel_files = entry
+    return _build_records_part_refs_for_channel(
+        channel_idx=channel_idx, channel_files=channel_files, **kwargs
+    )
 
 
-def _build_records_part_refs_for_channel(
+def _iter_channel_records_parts(
     *,
     channel_idx: int,
     channel_files: Sequence[str],
-    part_root: str | Path,
     adapter_name: str,
     default_dt_ns: int,
     part_size: int | None,
@@ -440,7 +581,9 @@ def _build_records_part_refs_for_channel(
     n_jobs: int | None,
     chunksize: int | None,
     use_process_pool: bool,
-) -> tuple[int, list[_RecordsPartRef], dict[str, tuple[float, int]]]:
+    profile: dict[str, list],
+) -> Iterator[RecordsBundle]:
+    """Parse one channel's files and yield sorted records parts (read/build time in ``profile``)."""
     from waveform_analysis.utils.formats import get_adapter
 
     adapter = get_adapter(adapter_name)
@@ -449,8 +592,6 @@ def _build_records_part_refs_for_channel(
 
     effective_n_jobs = 1 if n_jobs is None else max(int(n_jobs), 1)
     file_batch_size = max(1, effective_n_jobs)
-    channel_part_dir = Path(part_root) / f"channel_{channel_idx}"
-    channel_part_dir.mkdir(parents=True, exist_ok=True)
 
     try:
         raw_iter = reader.read_files_generator(
@@ -465,13 +606,6 @@ def _build_records_part_refs_for_channel(
     except TypeError:
         raw_iter = reader.read_files_generator(list(channel_files), chunk_size=file_batch_size)
 
-    part_refs: list[_RecordsPartRef] = []
-    profile = {
-        "records.read": [0.0, 0],
-        "records.part_build": [0.0, 0],
-    }
-    part_idx = 0
-
     while True:
         read_started = time.perf_counter()
         try:
@@ -508,10 +642,35 @@ def _build_records_part_refs_for_channel(
                 part.records["time"] = np.int64(epoch_ns) + (
                     part.records["timestamp"].astype(np.int64, copy=False) // 1000
                 )
-            part_ref = _write_records_part(part, channel_part_dir, part_idx)
-            part_idx += 1
-            if part_ref is not None:
-                part_refs.append(part_ref)
+            yield part
+
+
+def _new_channel_profile() -> dict[str, list]:
+    return {
+        "records.read": [0.0, 0],
+        "records.part_build": [0.0, 0],
+    }
+
+
+def _build_records_part_refs_for_channel(
+    *,
+    channel_idx: int,
+    channel_files: Sequence[str],
+    part_root: str | Path,
+    **kwargs: Any,
+) -> tuple[int, list[_RecordsPartRef], dict[str, tuple[float, int]]]:
+    channel_part_dir = Path(part_root) / f"channel_{channel_idx}"
+    channel_part_dir.mkdir(parents=True, exist_ok=True)
+
+    part_refs: list[_RecordsPartRef] = []
+    profile = _new_channel_profile()
+    parts = _iter_channel_records_parts(
+        channel_idx=channel_idx, channel_files=channel_files, profile=profile, **kwargs
+    )
+    for part_idx, part in enumerate(parts):
+        part_ref = _write_records_part(part, channel_part_dir, part_idx)
+        if part_ref is not None:
+            part_refs.append(part_ref)
 
     return (
         channel_idx,
@@ -520,6 +679,170 @@ def _build_records_part_refs_for_channel(
     )
 
 
+@dataclass
+class _SharedChannelRegion:
+    """One channel's reserved rows/samples in the shared records/wave_pool memmaps."""
+
+    channel_idx: int
+    channel_files: list[str]
+    record_start: int
+    record_capacity: int
+    sample_start: int
+    sample_capacity: int
+
+
+def _scan_channel_capacity(reader: Any, cols: Any, channel_files: Sequence[str]) -> tuple[int, int]:
+    """Upper bounds of (records, samples) for one channel from the reader's row-count prepass."""
+    n_records = 0
+    n_samples = 0
+    for idx, file_path in enumerate(channel_files):
+        rows, n_cols = reader.scan_file_shape(file_path, is_first_file=(idx == 0))
+        samples_end = n_cols if cols.samples_end is None else min(int(cols.samples_end), n_cols)
+        n_records += rows
+        n_samples += rows * max(samples_end - int(cols.samples_start), 0)
+    return n_records, n_samples
+
+
+def _build_channel_records_into_shared(
+    region: _SharedChannelRegion,
+    *,
+    records_path: str,
+    wave_pool_path: str,
+    total_records: int,
+    total_samples: int,
+    **kwargs: Any,
+) -> tuple[int, int, int, dict[str, tuple[float, int]]]:
+    """
+    Parse one channel and write its parts straight into its region of the shared memmaps.
+
+    Runs in a worker process; ``wave_offset`` is written relative to the whole shared
+    wave_pool. Returns (channel_idx, records written, samples written, profile).
+    """
+    records_out = np.memmap(records_path, dtype=RECORDS_DTYPE, mode="r+", shape=(total_records,))
+    wave_pool_out = np.memmap(wave_pool_path, dtype=np.uint16, mode="r+", shape=(total_samples,))
+    profile = _new_channel_profile()
+    n_records = 0
+    n_samples = 0
+    parts = _iter_channel_records_parts(
+        channel_idx=region.channel_idx,
+        channel_files=region.channel_files,
+        profile=profile,
+        **kwargs,
+    )
+    for part in parts:
+        rows = len(part.records)
+        samples = len(part.wave_pool)
+        if (
+            n_records + rows > region.record_capacity
+            or n_samples + samples > region.sample_capacity
+        ):
+            raise ValueError(
+                f"channel {region.channel_idx} produced more data than the row-count prepass "
+                f"reserved ({region.record_capacity} records, {region.sample_capacity} samples)"
+            )
+        sample_lo = region.sample_start + n_samples
+        part.records["wave_offset"] += np.int64(sample_lo)
+        record_lo = region.record_start + n_records
+        records_out[record_lo : record_lo + rows] = part.records
+        wave_pool_out[sample_lo : sample_lo + samples] = part.wave_pool
+        n_records += rows
+        n_samples += samples
+    records_out.flush()
+    wave_pool_out.flush()
+    del records_out, wave_pool_out
+    return (
+        region.channel_idx,
+        n_records,
+        n_samples,
+        {key: (float(values[0]), int(values[1])) for key, values in profile.items()},
+    )
+
+
+def _build_records_shared_output(
+    channels: Sequence[tuple[int, Sequence[str]]],
+    *,
+    work_dir: Path,
+    adapter_name: str,
+    pools: WorkerPoolService,
+    max_workers: int,
+    on_result: Any = None,
+    timer: Any = None,
+    **kwargs: Any,
+) -> RecordsBundle:
+    """
+    Process-parallel channel build without intermediate part files.
+
+    A newline-count prepass sizes one records memmap and one wave_pool memmap with a
+    region per channel; each worker process parses its channel and writes its parts
+    into that region. The regions are then merged with the same global lexsort as
+    the part-file path, so the output is identical.
+    """
+    from waveform_analysis.utils.formats import get_adapter
+
+    adapter = get_adapter(adapter_name)
+    regions: list[_SharedChannelRegion] = []
+    record_cursor = 0
+    sample_cursor = 0
+    with timer("records.prepass") if timer else nullcontext():
+        for channel_idx, channel_files in channels:
+            n_records, n_samples = _scan_channel_capacity(
+                adapter.format_reader, adapter.format_spec.columns, channel_files
+            )
+            regions.append(
+                _SharedChannelRegion(
+                    channel_idx=channel_idx,
+                    channel_files=list(channel_files),
+                    record_start=record_cursor,
+                    record_capacity=n_records,
+                    sample_start=sample_cursor,
+                    sample_capacity=n_samples,
+                )
+            )
+            record_cursor += n_records
+            sample_cursor += n_samples
+
+    # 空文件无法 mmap，容量至少为 1
+    total_records = max(record_cursor, 1)
+    total_samples = max(sample_cursor, 1)
+    records_path = work_dir / "records_shared.dat"
+    wave_pool_path = work_dir / "wave_pool_shared.dat"
+    np.memmap(records_path, dtype=RECORDS_DTYPE, mode="w+", shape=(total_records,)).flush()
+    np.memmap(wave_pool_path, dtype=np.uint16, mode="w+", shape=(total_samples,)).flush()
+
+    build_channel = functools.partial(
+        _build_channel_records_into_shared,
+        records_path=str(records_path),
+        wave_pool_path=str(wave_pool_path),
+        total_records=total_records,
+        total_samples=total_samples,
+        adapter_name=adapter_name,
+        **kwargs,
+    )
+    results = pools.map(
+        build_channel,
+        regions,
+        name="records_channel_build",
+        executor_type="process",
+        max_workers=max_workers,
+        on_result=on_result,
+    )
+    written = {channel_idx: n_records for channel_idx, n_records, _, _ in results}
+
+    with timer("records.merge") if timer else nullcontext():
+        records_in = np.memmap(records_path, dtype=RECORDS_DTYPE, mode="r", shape=(total_records,))
+        wave_pool_in = np.memmap(wave_pool_path, dtype=np.uint16, mode="r", shape=(total_samples,))
+        records_parts = [
+            records_in[region.record_start : region.record_start + written[region.channel_idx]]
+            for region in regions
+        ]
+        if sum(len(part) for part in records_parts) == 0:
+            return RecordsBundle(np.zeros(0, dtype=RECORDS_DTYPE), np.zeros(0, dtype=np.uint16))
+        merged = _merge_sorted_records(records_parts, [wave_pool_in] * len(records_parts))
+        merged.records["record_id"] = np.arange(len(merged.records), dtype=np.int64)
+        del records_in, wave_pool_in, records_parts
+        return merged
+
+
 @export
 def build_records_from_raw_files_streaming(
     raw_files: list[list[str]],
@@ -536,6 +859,7 @@ def build_records_from_raw_files_streaming(
     channel_workers: int | None = None,
     channel_executor: str = "thread",
     profiler=None,
+    pools: WorkerPoolService | None = None,
 ) -> RecordsBundle:
     _validate_baseline_samples(baseline_samples)
 
@@ -595,45 +919,64 @@ def build_records_from_raw_files_streaming(
                         profiler.durations[key] += duration
                         profiler.counts[key] += count
         else:
-            from concurrent.futures import as_completed
+            pbar = iterator if hasattr(iterator, "update") else None
 
-            from waveform_analysis.core.execution.manager import get_executor
+            def record_profile(profile: dict[str, tuple[float, int]]) -> None:
+                if profiler:
+                    for key, (duration, count) in profile.items():
+                        profiler.durations[key] += duration
+                        profiler.counts[key] += count
+                if pbar is not None:
+                    pbar.update(1)
 
-            max_workers = min(effective_channel_workers, len(nonempty_channels))
-            with get_executor(
-                "records_channel_build",
+            def collect(_idx: int, result) -> None:
+                result_idx, result_parts, profile = result
+                channel_results[result_idx] = result_parts
+                record_profile(profile)
+
+            if pools is None:
+                pools = get_worker_pools()
+            if channel_executor == "process":
+                # 进程模式：各通道直接写入共享 memmap 的预留区域，不落中间 part 文件
+                return _build_records_shared_output(
+                    nonempty_channels,
+                    work_dir=part_dir,
+                    adapter_name=adapter_name,
+                    pools=pools,
+                    max_workers=effective_channel_workers,
+                    on_result=lambda _idx, result: record_profile(result[-1]),
+                    timer=timer,
+                    default_dt_ns=default_dt_ns,
+                    part_size=part_size,
+                    baseline_samples=baseline_samples,
+                    epoch_ns=epoch_ns,
+                    parse_engine=parse_engine,
+                    n_jobs=n_jobs,
+                    chunksize=chunksize,
+                    use_process_pool=use_process_pool,
+                )
+            # 线程模式：各通道写 part 文件，最后统一归并
+            build_channel = functools.partial(
+                _build_records_part_refs_for_entry,
+                part_root=part_dir,
+                adapter_name=adapter_name,
+                default_dt_ns=default_dt_ns,
+                part_size=part_size,
+                baseline_samples=baseline_samples,
+                epoch_ns=epoch_ns,
+                parse_engine=parse_engine,
+                n_jobs=n_jobs,
+                chunksize=chunksize,
+                use_process_pool=use_process_pool,
+            )
+            pools.map(
+                build_channel,
+                nonempty_channels,
+                name="records_channel_build",
                 executor_type=channel_executor,
-                max_workers=max_workers,
-                reuse=True,
-            ) as executor:
-                futures = {
-                    executor.submit(
-                        _build_records_part_refs_for_channel,
-                        channel_idx=channel_idx,
-                        channel_files=channel_files,
-                        part_root=part_dir,
-                        adapter_name=adapter_name,
-                        default_dt_ns=default_dt_ns,
-                        part_size=part_size,
-                        baseline_samples=baseline_samples,
-                        epoch_ns=epoch_ns,
-                        parse_engine=parse_engine,
-                        n_jobs=n_jobs,
-                        chunksize=chunksize,
-                        use_process_pool=use_process_pool,
-                    ): channel_idx
-                    for channel_idx, channel_files in nonempty_channels
-                }
-                pbar = iterator if hasattr(iterator, "update") else None
-                for future in as_completed(futures):
-                    result_idx, result_parts, profile = future.result()
-                    channel_results[result_idx] = result_parts
-                    if profiler:
-                        for key, (duration, count) in profile.items():
-                            profiler.durations[key] += duration
-                            profiler.counts[key] += count
-                    if pbar is not None:
-                        pbar.update(1)
+                max_workers=effective_channel_workers,
+                on_result=collect,
+            )
 
         for channel_idx, _ in channel_entries:
             part_refs.extend(channel_results.get(channel_idx, []))
@@ -690,9 +1033,9 @@ def _build_records_from_channels(
             records["baseline_upstream"][cursor : cursor + count] = np.nan
 
         if "polarity" in ch.dtype.names:
-            records["polarity"][cursor : cursor + count] = ch["polarity"]
+            records["polarity"][cursor : cursor + count] = encode_polarity(ch["polarity"])
         else:
-            records["polarity"][cursor : cursor + count] = "unknown"
+            records["polarity"][cursor : cursor + count] = POLARITY_UNKNOWN
 
         if "event_length" in ch.dtype.names:
             lengths = ch["event_length"].astype(np.int64, copy=False)
@@ -798,30 +1141,34 @@ def build_records_from_st_waveforms(
 def build_records_from_v1725_files(
     file_paths: list[str],
     dt_ns: int,
+    use_index_sidecar: bool = True,
 ) -> RecordsBundle:
+    """Build records + wave_pool from V1725 .bin files via the header offset index.
+
+    Each file is scanned once for event/channel headers (or its ``.idx.npz``
+    sidecar is reused), then samples are gathered from a memmap directly into
+    the sorted wave_pool without per-wave Python objects.
+    """
     if not file_paths:
         return RecordsBundle(np.zeros(0, dtype=RECORDS_DTYPE), np.zeros(0, dtype=np.uint16))
 
     from waveform_analysis.utils.formats import get_adapter
+    from waveform_analysis.utils.formats.v1725 import load_v1725_index
 
     adapter = get_adapter("v1725")
-    reader = adapter.format_reader
-    if not hasattr(reader, "iter_waves"):
-        raise RuntimeError("V1725 adapter does not provide iter_waves")
 
     parts = []
     for file_path in file_paths:
-        waves = []
-        for wave in reader.iter_waves([file_path]):
-            timestamp_ps = int(
-                adapter.normalize_timestamp_to_ps(np.array([wave.timestamp]), dt_ns=dt_ns)[0]
-            )
-            flags = 1 if wave.trunc else 0
-            waves.append(
-                (int(wave.board), wave.channel, timestamp_ps, wave.baseline, flags, wave.waveform)
-            )
-        if waves:
-            parts.append(_build_records_from_wave_list(waves, default_dt_ns=dt_ns))
+        if not Path(file_path).exists():
+            logger.warning("File not found: %s", file_path)
+            continue
+        index = load_v1725_index(file_path, use_sidecar=use_index_sidecar)
+        if len(index) == 0:
+            continue
+        timestamp_ps = adapter.normalize_timestamp_to_ps(
+            index["timestamp"].astype(np.int64, copy=False), dt_ns=dt_ns
+        )
+        parts.append(_build_records_from_v1725_index(file_path, index, timestamp_ps, dt_ns))
 
     if not parts:
         return RecordsBundle(np.zeros(0, dtype=RECORDS_DTYPE), np.zeros(0, dtype=np.uint16))
@@ -846,8 +1193,16 @@ def build_records_from_raw_files(
     channel_workers: int | None = None,
     channel_executor: str = "thread",
     profiler=None,
+    pools: WorkerPoolService | None = None,
 ) -> RecordsBundle:
-    """Build records + wave_pool from raw files using the streaming part builder."""
+    """Build records + wave_pool from raw files using the streaming part builder.
+
+    ``pools`` is the worker pool service used for channel-level parallelism
+    (``channel_workers > 1``); defaults to the process-wide service. With
+    ``channel_executor="process"`` each channel is parsed in a worker process and
+    written straight into a shared records/wave_pool memmap sized by a row-count
+    prepass, instead of going through per-part temp files.
+    """
     return build_records_from_raw_files_streaming(
         raw_files=raw_files,
         adapter_name=adapter_name,
@@ -863,15 +1218,23 @@ def build_records_from_raw_files(
         channel_workers=channel_workers,
         channel_executor=channel_executor,
         profiler=profiler,
+        pools=pools,
     )
 
 
 @export
-def merge_records_parts(parts: Sequence[RecordsBundle]) -> RecordsBundle:
+def merge_records_parts(
+    parts: Sequence[RecordsBundle],
+    records_out: np.ndarray | None = None,
+    wave_pool_out: np.ndarray | None = None,
+) -> RecordsBundle:
     """
     Merge sorted records parts and build a global wave_pool.
 
     Each part must have records sorted by (timestamp, pid, board, channel).
+    The global order comes from one stable lexsort (ties keep part order);
+    waves are gathered with block copies. ``records_out`` / ``wave_pool_out``
+    may be preallocated arrays (e.g. memmaps) to write the result into directly.
     """
     if not parts:
         return RecordsBundle(np.zeros(0, dtype=RECORDS_DTYPE), np.zeros(0, dtype=np.uint16))
@@ -880,69 +1243,16 @@ def merge_records_parts(parts: Sequence[RecordsBundle]) -> RecordsBundle:
     if total_records == 0:
         return RecordsBundle(np.zeros(0, dtype=RECORDS_DTYPE), np.zeros(0, dtype=np.uint16))
 
-    total_samples = 0
-    for part in parts:
-        if len(part.records) > 0:
-            total_samples += int(part.records["event_length"].astype(np.int64, copy=False).sum())
-
-    records_out = np.zeros(total_records, dtype=RECORDS_DTYPE)
-    wave_pool_out = np.zeros(total_samples, dtype=np.uint16)
-
-    import heapq
-
-    heap = []
-    for part_idx, part in enumerate(parts):
-        if len(part.records) == 0:
-            continue
-        rec = part.records[0]
-        key = (
-            int(rec["timestamp"]),
-            int(rec["pid"]),
-            int(rec["board"]),
-            int(rec["channel"]),
-            part_idx,
-            0,
-        )
-        heapq.heappush(heap, key)
-
-    out_idx = 0
-    wave_cursor = 0
-    while heap:
-        _, _, _, _, part_idx, row_idx = heapq.heappop(heap)
-        part = parts[part_idx]
-        rec = part.records[row_idx]
-        length = int(rec["event_length"])
-        if length < 0:
-            length = 0
-
-        if length > 0:
-            offset = int(rec["wave_offset"])
-            wave_pool_out[wave_cursor : wave_cursor + length] = part.wave_pool[
-                offset : offset + length
-            ]
-
-        records_out[out_idx] = rec
-        records_out[out_idx]["wave_offset"] = wave_cursor
-        out_idx += 1
-        wave_cursor += length
-
-        next_row = row_idx + 1
-        if next_row < len(part.records):
-            next_rec = part.records[next_row]
-            key = (
-                int(next_rec["timestamp"]),
-                int(next_rec["pid"]),
-                int(next_rec["board"]),
-                int(next_rec["channel"]),
-                part_idx,
-                next_row,
-            )
-            heapq.heappush(heap, key)
-
-    record_ids = records_out["record_id"].astype(np.int64, copy=False)
+    merged = _merge_sorted_records(
+        [part.records for part in parts],
+        [part.wave_pool for part in parts],
+        records_out=records_out,
+        wave_pool_out=wave_pool_out,
+    )
+    record_ids = merged.records["record_id"].astype(np.int64, copy=False)
     if len(np.unique(record_ids)) != len(record_ids):
-        records_out["record_id"] = np.arange(total_records, dtype=np.int64)
-    return RecordsBundle(records=records_out, wave_pool=wave_pool_out)
+        merged.records["record_id"] = np.arange(total_records, dtype=np.int64)
+    return merged
 
 
 @export
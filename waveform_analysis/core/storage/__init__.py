@@ -8,6 +8,7 @@ Storage 子模块 - 存储层统一接口
 - StorageBackend: 可插拔存储后端接口
 - CacheManager: 缓存管理器
 - CompressionManager: 压缩管理器
+- BlockCompressedArray: 分块压缩缓存的随机访问视图
 - IntegrityChecker: 数据完整性检查
 
 缓存管理工具（新增）：
@@ -32,6 +33,9 @@ from .backends import (
     validate_storage_backend,
 )
 
+# 分块压缩
+from .block_compression import BlockCompressedArray, write_block_compressed
+
 # 缓存管理
 from .cache import CacheManager
 
@@ -62,6 +66,9 @@ from .integrity import (
 )
 from .memmap import BufferedStreamWriter, MemmapStorage
 
+# 内存结果缓存记账
+from .result_cache import ResultMemoryTracker, estimate_resident_bytes
+
 __all__ = [
     # Memmap 存储
     "MemmapStorage",
@@ -81,6 +88,8 @@ __all__ = [
     "GzipCompression",
     "CompressionManager",
     "get_compression_manager",
+    "BlockCompressedArray",
+    "write_block_compressed",
     # 完整性检查
     "IntegrityChecker",
     "get_integrity_checker",
@@ -100,4 +109,7 @@ __all__ = [
     "format_size",
     "format_age",
     "CacheEntryFilter",
+    # 内存结果缓存
+    "ResultMemoryTracker",
+    "estimate_resident_bytes",
 ]
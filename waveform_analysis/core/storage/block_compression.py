@@ -0,0 +1,334 @@
+# DOC: docs/features/context/DATA_ACCESS.md#memmap-存储零拷贝访问
+"""
+分块压缩模块 - 支持随机访问的压缩缓存布局
+
+整文件压缩需要在每次加载时完整解压，失去 memmap 的按需读取语义。
+本模块把缓存文件按固定记录数切分为独立压缩的块，并在元数据中保存块偏移表：
+
+- write_block_compressed: 从未压缩的 .bin 流式写出分块压缩文件（每次只读一个块）
+- BlockCompressedArray: 只读的懒加载数组视图，按需解压所需块，带小型 LRU 块缓存
+
+文件布局:
+    {key}.bin{ext}   依次拼接的压缩块
+    {key}.json       metadata["block_records"]  每块记录数（最后一块可能更短）
+                     metadata["block_offsets"]  压缩块字节偏移表（长度 n_blocks + 1）
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterator
+import threading
+from typing import Any
+
+import numpy as np
+
+from waveform_analysis.core.foundation.utils import exporter
+
+export, __all__ = exporter()
+
+BLOCKED_LAYOUT = "blocked"
+
+
+@export
+def block_records_for(
+    dtype: np.dtype, shape: tuple[int, ...], block_bytes: int, min_records: int = 1
+) -> int:
+    """根据目标块字节数计算每块记录数（至少 min_records）。"""
+    row_bytes = int(np.dtype(dtype).itemsize) * int(np.prod(shape[1:], dtype=np.int64))
+    if row_bytes <= 0:
+        return max(1, min_records)
+    return max(min_records, int(block_bytes) // row_bytes)
+
+
+@export
+def write_block_compressed(
+    src_path: str,
+    dst_path: str,
+    backend: Any,
+    row_bytes: int,
+    block_records: int,
+) -> list[int]:
+    """
+    将未压缩的二进制文件写成分块压缩文件。
+
+    Args:
+        src_path: 未压缩的 .bin 文件
+        dst_path: 输出的压缩文件路径
+        backend: 压缩后端（需提供 compress()）
+        row_bytes: 每条记录（首维一行）的字节数
+        block_records: 每块记录数
+
+    Returns:
+        压缩块字节偏移表，长度为 n_blocks + 1
+    """
+    block_nbytes = int(row_bytes) * int(block_records)
+    if block_nbytes <= 0:
+        raise ValueError("block size must be positive")
+
+    offsets = [0]
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        while True:
+            raw = src.read(block_nbytes)
+            if not raw:
+                break
+            if len(raw) % row_bytes != 0:
+                raise ValueError(
+                    f"Truncated record in {src_path}: block of {len(raw)} bytes is not a "
+                    f"multiple of the {row_bytes}-byte record size"
+                )
+            compressed = backend.compress(raw)
+            dst.write(compressed)
+            offsets.append(offsets[-1] + len(compressed))
+    return offsets
+
+
+@export
+class BlockCompressedArray:
+    """
+    分块压缩缓存的只读懒加载视图。
+
+    行为尽量贴近只读 memmap：``len()``/``shape``/``dtype`` 不触发解压，
+    整数和切片索引只解压覆盖到的块，字段访问与 ``np.asarray()`` 才会按块拼出完整结果。
+    最近使用的解压块保存在 LRU 中（``cache_blocks`` 控制容量）。
+
+    Examples:
+        >>> arr = storage.load_memmap(key, run_id="run_001")  # BlockCompressedArray
+        >>> head = arr[:1000]            # 只解压第一个块
+        >>> rows = arr.read(5000, 6000)  # 按记录范围读取
+        >>> times = arr["time"]          # 逐块拼出单个字段
+        >>> full = np.asarray(arr)       # 完整物化
+    """
+
+    def __init__(
+        self,
+        path: str,
+        backend: Any,
+        dtype: np.dtype,
+        shape: tuple[int, ...],
+        block_records: int,
+        block_offsets: list[int],
+        cache_blocks: int = 8,
+    ):
+        self.path = path
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(int(s) for s in shape)
+        self.block_records = int(block_records)
+        self.block_offsets = np.asarray(block_offsets, dtype=np.int64)
+        self.cache_blocks = max(0, int(cache_blocks))
+        self._cache: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.decoded_blocks = 0  # 实际解压次数（用于诊断 LRU 命中情况）
+
+        expected_blocks = -(-self.shape[0] // self.block_records) if self.shape[0] else 0
+        if len(self.block_offsets) != expected_blocks + 1:
+            raise ValueError(
+                f"Block offset table for {path} has {len(self.block_offsets) - 1} blocks, "
+                f"expected {expected_blocks}"
+            )
+
+    # ------------------------------------------------------------------
+    # ndarray-like attributes
+    # ------------------------------------------------------------------
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self.block_offsets) - 1
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return (
+            f"BlockCompressedArray(shape={self.shape}, dtype={self.dtype}, "
+            f"blocks={self.n_blocks}, block_records={self.block_records})"
+        )
+
+    # ------------------------------------------------------------------
+    # Block access
+    # ------------------------------------------------------------------
+
+    def _block_bounds(self, block_idx: int) -> tuple[int, int]:
+        start = block_idx * self.block_records
+        return start, min(start + self.block_records, self.shape[0])
+
+    def _decode_block(self, block_idx: int) -> np.ndarray:
+        begin = int(self.block_offsets[block_idx])
+        end = int(self.block_offsets[block_idx + 1])
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            payload = f.read(end - begin)
+        raw = self.backend.decompress(payload)
+        block = np.frombuffer(raw, dtype=self.dtype).reshape((-1,) + self.shape[1:])
+        start, stop = self._block_bounds(block_idx)
+        if len(block) != stop - start:
+            raise ValueError(
+                f"Block {block_idx} of {self.path} decoded to {len(block)} records, "
+                f"expected {stop - start}"
+            )
+        return block
+
+    def block(self, block_idx: int) -> np.ndarray:
+        """返回解压后的单个块（只读），优先使用 LRU 缓存。"""
+        if block_idx < 0 or block_idx >= self.n_blocks:
+            raise IndexError(f"block index {block_idx} out of range [0, {self.n_blocks})")
+        with self._lock:
+            cached = self._cache.get(block_idx)
+            if cached is not None:
+                self._cache.move_to_end(block_idx)
+                return cached
+        block = self._decode_block(block_idx)
+        with self._lock:
+            self.decoded_blocks += 1
+            if self.cache_blocks > 0:
+                self._cache[block_idx] = block
+                self._cache.move_to_end(block_idx)
+                while len(self._cache) > self.cache_blocks:
+                    self._cache.popitem(last=False)
+        return block
+
+    def clear_cache(self) -> None:
+        """清空解压块缓存。"""
+        with self._lock:
+            self._cache.clear()
+
+    def iter_blocks(self, start: int = 0, stop: int | None = None) -> Iterator[np.ndarray]:
+        """按块迭代记录范围 [start, stop)，每次产出一个块内的连续片段。"""
+        n = self.shape[0]
+        stop = n if stop is None else min(int(stop), n)
+        start = max(0, int(start))
+        if start >= stop:
+            return
+        first = start // self.block_records
+        last = (stop - 1) // self.block_records
+        for block_idx in range(first, last + 1):
+            block_start, _ = self._block_bounds(block_idx)
+            block = self.block(block_idx)
+            lo = max(start - block_start, 0)
+            hi = min(stop - block_start, len(block))
+            yield block[lo:hi]
+
+    def read(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """读取记录范围 [start, stop) 为独立的 ndarray。"""
+        n = self.shape[0]
+        stop = n if stop is None else min(int(stop), n)
+        start = max(0, int(start))
+        out = np.empty((max(0, stop - start),) + self.shape[1:], dtype=self.dtype)
+        pos = 0
+        for part in self.iter_blocks(start, stop):
+            out[pos : pos + len(part)] = part
+            pos += len(part)
+        return out
+
+    def _take(self, indices: np.ndarray) -> np.ndarray:
+        indices = np.asarray(indices, dtype=np.int64)
+        n = self.shape[0]
+        if indices.size and (indices.min() < -n or indices.max() >= n):
+            raise IndexError(f"index out of bounds for axis 0 with size {n}")
+        indices = np.where(indices < 0, indices + n, indices)
+        out = np.empty(indices.shape + self.shape[1:], dtype=self.dtype)
+        if indices.size == 0:
+            return out
+        flat = indices.ravel()
+        flat_out = out.reshape((-1,) + self.shape[1:])
+        block_ids = flat // self.block_records
+        order = np.argsort(block_ids, kind="stable")
+        sorted_blocks = block_ids[order]
+        bounds = np.flatnonzero(np.diff(sorted_blocks)) + 1
+        for group in np.split(order, bounds):
+            block_idx = int(block_ids[group[0]])
+            block = self.block(block_idx)
+            flat_out[group] = block[flat[group] - block_idx * self.block_records]
+        return out
+
+    def _field(self, names: Any) -> np.ndarray:
+        sample = np.empty(0, dtype=self.dtype)[names]
+        out = np.empty(self.shape + sample.shape[1:], dtype=sample.dtype)
+        pos = 0
+        for part in self.iter_blocks():
+            out[pos : pos + len(part)] = part[names]
+            pos += len(part)
+        return out
+
+    def __getitem__(self, item: Any) -> Any:
+        if isinstance(item, str) or (
+            isinstance(item, list) and item and all(isinstance(x, str) for x in item)
+        ):
+            return self._field(item)
+        if isinstance(item, tuple):
+            if not item:
+                return self.read()
+            head = self[item[0]]
+            rest = item[1:]
+            if isinstance(item[0], (int, np.integer)):
+                return head[rest] if rest else head
+            return head[(slice(None),) + rest]
+        if isinstance(item, (int, np.integer)):
+            n = self.shape[0]
+            idx = int(item)
+            if idx < -n or idx >= n:
+                raise IndexError(f"index {idx} is out of bounds for axis 0 with size {n}")
+            if idx < 0:
+                idx += n
+            block_idx = idx // self.block_records
+            return self.block(block_idx)[idx - block_idx * self.block_records]
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.shape[0])
+            if step == 1:
+                return self.read(start, stop)
+            return self._take(np.arange(start, stop, step))
+        arr = np.asarray(item)
+        if arr.dtype == bool:
+            if arr.shape[:1] != self.shape[:1]:
+                raise IndexError(
+                    f"boolean index of length {len(arr)} does not match axis 0 of size "
+                    f"{self.shape[0]}"
+                )
+            return self._take(np.flatnonzero(arr))
+        if np.issubdtype(arr.dtype, np.integer):
+            return self._take(arr)
+        raise TypeError(f"Unsupported index type for BlockCompressedArray: {type(item)!r}")
+
+    def __iter__(self) -> Iterator[Any]:
+        for part in self.iter_blocks():
+            yield from part
+
+    def to_numpy(self) -> np.ndarray:
+        """完整物化为 ndarray。"""
+        return self.read()
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        arr = self.read()
+        if dtype is not None and np.dtype(dtype) != arr.dtype:
+            arr = arr.astype(dtype)
+        return arr
+
+    @property
+    def compressed_size(self) -> int:
+        return int(self.block_offsets[-1]) if len(self.block_offsets) else 0
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def is_blocked_metadata(meta: dict | None) -> bool:
+    """元数据是否描述分块压缩布局。"""
+    return bool(meta) and meta.get("compression_layout") == BLOCKED_LAYOUT
@@ -37,6 +37,7 @@ class CacheStatistics:
         by_run: 按运行分组的统计
         by_data_type: 按数据类型分组的统计
         scan_time: 扫描时间
+        memory: Context 内存结果缓存的计数器（预算、常驻大小、命中/淘汰等）
     """
 
     total_runs: int
@@ -50,6 +51,7 @@ class CacheStatistics:
     by_run: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     by_data_type: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     scan_time: float = 0.0
+    memory: Dict[str, Any] = field(default_factory=dict)
 
     @property
     def total_size_human(self) -> str:
@@ -82,6 +84,7 @@ class CacheStatistics:
             "scan_time": self.scan_time,
             "by_run": self.by_run,
             "by_data_type": self.by_data_type,
+            "memory": self.memory,
         }
 
         # 序列化 CacheEntry 对象
@@ -315,6 +318,25 @@ class CacheStatsCollector:
             print(f"  {stats.newest_entry.key}")
             print(f"  创建于: {stats.newest_entry.created_at_str}")
 
+        if stats.memory:
+            memory = stats.memory
+            budget = memory.get("budget_bytes")
+            print("\n【内存缓存】")
+            print(f"  预算: {format_size(budget) if budget else '不限制'}")
+            print(
+                f"  常驻: {format_size(memory.get('resident_bytes', 0))} "
+                f"(峰值 {format_size(memory.get('peak_bytes', 0))}, "
+                f"{memory.get('entries', 0)} 项)"
+            )
+            print(
+                f"  命中/未命中: {memory.get('hits', 0)}/{memory.get('misses', 0)} "
+                f"({memory.get('hit_rate', 0.0) * 100:.1f}%)"
+            )
+            print(
+                f"  淘汰: {memory.get('evictions', 0)} "
+                f"(落盘 {memory.get('spills', 0)}, 重新加载 {memory.get('reloads', 0)})"
+            )
+
         if detailed:
             # 按运行统计
             if stats.by_run:
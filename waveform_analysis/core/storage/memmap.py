@@ -8,7 +8,7 @@ Storage 模块 - 负责数据的持久化与加载。
 存储架构：
 - 分层结构：work_dir/{run_id}/_cache/{key}.bin
 - 支持数据压缩（blosc2, lz4, zstd, gzip）
-- 压缩数据不支持 memmap，但节省存储空间
+- 压缩数据不支持 memmap，但节省存储空间；可选的分块压缩布局支持按块随机访问
 """
 
 import fcntl
@@ -22,6 +22,14 @@ import warnings
 import numpy as np
 import pandas as pd
 
+from waveform_analysis.core.storage.block_compression import (
+    BLOCKED_LAYOUT,
+    BlockCompressedArray,
+    block_records_for,
+    is_blocked_metadata,
+    write_block_compressed,
+)
+
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 
@@ -79,6 +87,7 @@ class MemmapStorage:
     """
 
     STORAGE_VERSION = "1.0.1"  # Bumped to support compression
+    METADATA_CACHE_SIZE = 4096  # 缓存的元数据文件数上限（超出时整体清空）
 
     def __init__(
         self,
@@ -91,6 +100,8 @@ class MemmapStorage:
         verify_on_load: bool = False,
         data_subdir: str = "_cache",
         side_effects_subdir: str = "side_effects",
+        compression_block_bytes: Optional[int] = None,
+        compression_cache_blocks: int = 8,
     ):
         """
         Initialize MemmapStorage with hierarchical storage structure.
@@ -107,6 +118,10 @@ class MemmapStorage:
             verify_on_load: Verify checksum when loading data (may impact performance)
             data_subdir: Subdirectory name for data files (default: "_cache")
             side_effects_subdir: Subdirectory name for side effect outputs (default: "side_effects")
+            compression_block_bytes: Target uncompressed block size for the blocked compression
+                        layout. None keeps the whole-file layout; an int compresses the cache
+                        in independent blocks and loads it as a lazy BlockCompressedArray.
+            compression_cache_blocks: Number of decompressed blocks kept in the per-array LRU
 
         Storage Structure:
             work_dir/
@@ -128,6 +143,12 @@ class MemmapStorage:
         self.verify_on_load = verify_on_load
         self.data_subdir = data_subdir
         self.side_effects_subdir = side_effects_subdir
+        self.compression_block_bytes = (
+            int(compression_block_bytes) if compression_block_bytes else None
+        )
+        self.compression_cache_blocks = int(compression_cache_blocks)
+        # 元数据读取缓存: meta_path -> ((mtime_ns, size), metadata)，文件变化时自动失效
+        self._metadata_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
 
         # 确保工作目录存在
         if not os.path.exists(work_dir):
@@ -303,6 +324,7 @@ class MemmapStorage:
     def save_metadata(self, key: str, metadata: Dict[str, Any], run_id: Optional[str] = None):
         """Atomically save metadata for a key."""
         _, meta_path, _ = self._get_paths(key, run_id)
+        self._metadata_cache.pop(meta_path, None)
         tmp_meta_path = meta_path + ".tmp"
         with open(tmp_meta_path, "w") as f:
             json.dump(metadata, f, default=str)
@@ -333,24 +355,45 @@ class MemmapStorage:
             compressed = False
             compression_ratio = 1.0
             compressed_size = 0  # 初始化以避免未绑定警告
+            block_records = None
+            block_offsets = None
             original_size = os.path.getsize(bin_path)
             final_file_path = bin_path  # Track which file to compute checksum on
 
             if self.compression_backend is not None:
                 try:
                     with self._timeit("storage.compress"):
-                        # Read uncompressed data
-                        with open(bin_path, "rb") as f:
-                            data = f.read()
+                        compressed_path = bin_path + self.compression_backend.extension
+                        if self.compression_block_bytes:
+                            # Blocked layout: compress block by block, never holding the
+                            # whole file in memory, and record the offset table.
+                            row_shape = tuple(shape)[1:] if shape else ()
+                            block_records = block_records_for(
+                                dtype, (total_count,) + row_shape, self.compression_block_bytes
+                            )
+                            row_bytes = np.dtype(dtype).itemsize * int(
+                                np.prod(row_shape, dtype=np.int64)
+                            )
+                            block_offsets = write_block_compressed(
+                                bin_path,
+                                compressed_path,
+                                self.compression_backend,
+                                row_bytes,
+                                block_records,
+                            )
+                            compressed_size = block_offsets[-1]
+                        else:
+                            # Read uncompressed data
+                            with open(bin_path, "rb") as f:
+                                data = f.read()
 
-                        # Compress
-                        compressed_data = self.compression_backend.compress(data)
-                        compressed_size = len(compressed_data)
+                            # Compress
+                            compressed_data = self.compression_backend.compress(data)
+                            compressed_size = len(compressed_data)
 
-                        # Write compressed file (with different extension)
-                        compressed_path = bin_path + self.compression_backend.extension
-                        with open(compressed_path, "wb") as f:
-                            f.write(compressed_data)
+                            # Write compressed file (with different extension)
+                            with open(compressed_path, "wb") as f:
+                                f.write(compressed_data)
 
                         # Remove original uncompressed file
                         os.remove(bin_path)
@@ -363,6 +406,7 @@ class MemmapStorage:
                     warnings.warn(f"Compression failed for {key}: {e}, storing uncompressed")
                     # Keep uncompressed file
                     compressed = False
+                    block_offsets = None
                     # Clean up any partial compressed file
                     compressed_path = bin_path + self.compression_backend.extension
                     if os.path.exists(compressed_path):
@@ -409,6 +453,10 @@ class MemmapStorage:
                 metadata["compression_ratio"] = compression_ratio
                 metadata["original_size"] = original_size
                 metadata["compressed_size"] = compressed_size
+                if block_offsets is not None:
+                    metadata["compression_layout"] = BLOCKED_LAYOUT
+                    metadata["block_records"] = block_records
+                    metadata["block_offsets"] = block_offsets
 
             if checksum is not None:
                 metadata["checksum"] = checksum
@@ -505,25 +553,177 @@ class MemmapStorage:
         extra_metadata: Optional[Dict[str, Any]] = None,
         run_id: Optional[str] = None,
     ):
-        """Save a single numpy array to storage."""
+        """Save a single numpy array to storage.
+
+        If ``data`` is backed (from offset 0, covering the whole file) by the
+        staging file of the same key (see ``staging_path``), the file is adopted
+        by rename instead of being copied.
+        """
         if data is None or data.size == 0:
             return
+        if self._is_staged_for(key, data, run_id):
+            self._adopt_staged(key, data, extra_metadata, run_id)
+            return
         self.save_stream(
             key, iter([data]), data.dtype, extra_metadata, shape=data.shape, run_id=run_id
         )
 
+    def append_memmap(
+        self,
+        key: str,
+        data: np.ndarray,
+        run_id: Optional[str] = None,
+    ) -> bool:
+        """
+        在已有缓存文件末尾追加行（增量刷新），返回是否追加成功。
+
+        只支持未压缩的缓存，且 dtype 与行形状必须与已有数据一致；不满足时返回 False，
+        调用方应改为 ``save_memmap`` 整体重写。先写数据再更新元数据：中途失败时
+        文件大小与元数据不符，下次加载按缓存损坏处理并重新计算，不会读到半截数据。
+        """
+        data = np.ascontiguousarray(data)
+        meta = self.get_metadata(key, run_id)
+        if not meta or meta.get("compressed", False):
+            return False
+        dtype = self._dtype_from_metadata(meta)
+        shape = tuple(meta.get("shape", (meta["count"],)))
+        if dtype is None or data.dtype != dtype or tuple(data.shape[1:]) != shape[1:]:
+            return False
+        if len(data) == 0:
+            return True
+
+        with self._timeit("storage.save"):
+            bin_path, _, lock_path = self._get_paths(key, run_id)
+            lock_fd = self._acquire_lock(lock_path)
+            if lock_fd is None:
+                raise RuntimeError(f"Could not acquire lock for {key} after timeout.")
+            try:
+                expected_size = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+                if not os.path.exists(bin_path) or os.path.getsize(bin_path) != expected_size:
+                    return False
+                with open(bin_path, "r+b") as f:
+                    f.seek(expected_size)
+                    data.tofile(f)
+
+                count = int(shape[0]) + len(data)
+                meta["count"] = count
+                meta["shape"] = (count,) + shape[1:]
+                meta["timestamp"] = time.time()
+                if "checksum" in meta:
+                    from waveform_analysis.core.storage.integrity import get_integrity_checker
+
+                    algorithm = meta.get("checksum_algorithm", self.checksum_algorithm)
+                    meta["checksum"] = get_integrity_checker().compute_checksum(bin_path, algorithm)
+                self.save_metadata(key, meta, run_id)
+                return True
+            finally:
+                self._release_lock(lock_fd, lock_path)
+
+    @staticmethod
+    def _dtype_from_metadata(meta: Dict[str, Any]) -> Optional[np.dtype]:
+        try:
+            if "dtype_descr" in meta:
+                return np.dtype(
+                    [
+                        tuple(item) if isinstance(item, list) else item
+                        for item in meta["dtype_descr"]
+                    ]
+                )
+            return np.dtype(meta["dtype"])
+        except Exception:
+            return None
+
+    def staging_path(self, key: str, run_id: Optional[str] = None) -> str:
+        """
+        返回 key 的暂存文件路径（与最终缓存文件位于同一目录）。
+
+        生产者可以把结果直接写入该文件并以 memmap 形式返回，之后
+        ``save_memmap`` 会通过重命名采纳它，避免再复制一遍完整数据。
+        """
+        bin_path, _, _ = self._get_paths(key, run_id)
+        return bin_path + ".staging"
+
+    def sidecar_path(self, key: str, name: str, run_id: Optional[str] = None) -> str:
+        """
+        返回 key 的附属文件路径前缀（如持久化时间索引）。
+
+        附属文件与缓存数据位于同一目录、以 ``{key}.sidecar.`` 开头，
+        ``delete(key)`` 时一并删除；调用方负责自行校验其与数据是否一致。
+        """
+        bin_path, _, _ = self._get_paths(key, run_id)
+        return f"{bin_path[:-4]}.sidecar.{name}"
+
+    @staticmethod
+    def _memmap_base(data: np.ndarray) -> Any:
+        base = data
+        while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+            base = base.base
+        return base
+
+    def _is_staged_for(self, key: str, data: np.ndarray, run_id: Optional[str]) -> bool:
+        base = self._memmap_base(data)
+        filename = getattr(base, "filename", None)
+        if not filename or getattr(base, "offset", 0) != 0:
+            return False
+        if os.path.abspath(filename) != os.path.abspath(self.staging_path(key, run_id)):
+            return False
+        if not data.flags.c_contiguous or data.ctypes.data != base.ctypes.data:
+            return False
+        return os.path.exists(filename) and os.path.getsize(filename) == data.nbytes
+
+    def _adopt_staged(
+        self,
+        key: str,
+        data: np.ndarray,
+        extra_metadata: Optional[Dict[str, Any]],
+        run_id: Optional[str],
+    ) -> None:
+        with self._timeit("storage.save"):
+            bin_path, _, lock_path = self._get_paths(key, run_id)
+            lock_fd = self._acquire_lock(lock_path)
+            if lock_fd is None:
+                raise RuntimeError(f"Could not acquire lock for {key} after timeout.")
+            try:
+                base = self._memmap_base(data)
+                if isinstance(base, np.memmap):
+                    base.flush()
+                os.replace(self.staging_path(key, run_id), bin_path + ".tmp")
+                self.finalize_save(
+                    key, len(data), data.dtype, extra_metadata, shape=data.shape, run_id=run_id
+                )
+            finally:
+                self._release_lock(lock_fd, lock_path)
+
     def get_metadata(self, key: str, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        """Retrieve metadata for a given key."""
+        """
+        Retrieve metadata for a key.
+
+        Parsed metadata is cached per file and revalidated with a single ``stat``
+        (mtime_ns + size), so repeated cache probes do not re-read the JSON.
+        """
         with self._timeit("storage.get_metadata"):
             _, meta_path, _ = self._get_paths(key, run_id)
-            if not os.path.exists(meta_path):
+            try:
+                st = os.stat(meta_path)
+            except OSError:
+                self._metadata_cache.pop(meta_path, None)
                 return None
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._metadata_cache.get(meta_path)
+            if cached is not None and cached[0] == stamp:
+                return dict(cached[1])
             try:
                 with open(meta_path) as f:
-                    return json.load(f)
+                    meta = json.load(f)
             except (OSError, json.JSONDecodeError) as e:
                 warnings.warn(f"Failed to read metadata at {meta_path}: {str(e)}")
                 return None
+            if isinstance(meta, dict):
+                if len(self._metadata_cache) >= self.METADATA_CACHE_SIZE:
+                    self._metadata_cache.clear()
+                self._metadata_cache[meta_path] = (stamp, meta)
+                return dict(meta)
+            return meta
 
     def load_memmap(self, key: str, run_id: Optional[str] = None) -> Optional[np.ndarray]:
         """
@@ -556,19 +756,9 @@ class MemmapStorage:
             is_compressed = meta.get("compressed", False)
 
             # Reconstruct dtype
-            try:
-                if "dtype_descr" in meta:
-                    descr = []
-                    for item in meta["dtype_descr"]:
-                        if isinstance(item, list):
-                            descr.append(tuple(item))
-                        else:
-                            descr.append(item)
-                    dtype = np.dtype(descr)
-                else:
-                    dtype = np.dtype(meta["dtype"])
-            except Exception as e:
-                warnings.warn(f"Failed to reconstruct dtype for {key}: {str(e)}")
+            dtype = self._dtype_from_metadata(meta)
+            if dtype is None:
+                warnings.warn(f"Failed to reconstruct dtype for {key}")
                 return None
 
             # Handle compressed data
@@ -619,8 +809,8 @@ class MemmapStorage:
         dtype: np.dtype,
         shape: Tuple[int, ...],
         run_id: Optional[str] = None,
-    ) -> Optional[np.ndarray]:
-        """Load compressed data (returns in-memory array, not memmap)"""
+    ) -> Optional[Union[np.ndarray, BlockCompressedArray]]:
+        """Load compressed data (in-memory array, or lazy BlockCompressedArray for blocked layout)"""
         bin_path, _, _ = self._get_paths(key, run_id)
 
         # Get compression algorithm
@@ -667,6 +857,21 @@ class MemmapStorage:
             except Exception as e:
                 warnings.warn(f"Failed to verify checksum for {key}: {e}")
 
+        if is_blocked_metadata(meta):
+            try:
+                return BlockCompressedArray(
+                    compressed_path,
+                    backend,
+                    dtype,
+                    tuple(shape),
+                    meta["block_records"],
+                    meta["block_offsets"],
+                    cache_blocks=self.compression_cache_blocks,
+                )
+            except Exception as e:
+                warnings.warn(f"Invalid block index for {key}: {e}")
+                return None
+
         try:
             with self._timeit("storage.decompress"):
                 # Read compressed data
@@ -810,9 +1015,18 @@ class MemmapStorage:
     def delete(self, key: str, run_id: Optional[str] = None):
         """Delete data and metadata for a key."""
         bin_path, meta_path, lock_path = self._get_paths(key, run_id)
-        for p in [bin_path, meta_path, lock_path]:
+        self._metadata_cache.pop(meta_path, None)
+        for p in [bin_path, meta_path, lock_path, bin_path + ".staging"]:
             if os.path.exists(p):
                 os.remove(p)
+        root = os.path.dirname(bin_path)
+        prefix = f"{key}.sidecar."
+        for f in os.listdir(root):
+            if f.startswith(prefix):
+                try:
+                    os.remove(os.path.join(root, f))
+                except FileNotFoundError:
+                    pass
 
     def list_keys(self, run_id: Optional[str] = None) -> List[str]:
         """
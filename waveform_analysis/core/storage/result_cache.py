@@ -0,0 +1,186 @@
+# DOC: docs/features/context/DATA_ACCESS.md#内存缓存预算
+"""
+内存结果缓存记账模块 - 为 Context._results 提供大小感知的 LRU 统计。
+
+Context 的内存缓存 (_results) 默认会无限增长。本模块只负责记账：
+- 估算每个缓存值占用的常驻内存（memmap 等磁盘映射视为 0）
+- 维护 LRU 顺序与固定（pin）集合
+- 统计 hits / misses / evictions / spills / reloads
+
+真正的淘汰（落盘为 memmap、删除内存引用）由 ContextCacheDomain 完成。
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterator
+import sys
+from typing import Any
+
+import numpy as np
+
+from ..foundation.utils import exporter
+
+export, __all__ = exporter()
+
+ResultKey = tuple[str, str]
+
+
+@export
+def estimate_resident_bytes(value: Any, _depth: int = 0) -> int:
+    """
+    估算缓存值占用的常驻内存字节数。
+
+    - np.memmap（以及其视图）与分块压缩视图由磁盘支撑，记为 0
+    - ndarray 使用 nbytes；DataFrame 使用 memory_usage
+    - list/tuple/dict 与普通对象的属性递归累加（限制深度）
+    """
+    if value is None or _depth > 3:
+        return 0
+    if isinstance(value, np.ndarray):
+        base = value
+        while isinstance(base, np.ndarray):
+            if isinstance(base, np.memmap):
+                return 0
+            base = base.base
+        return int(value.nbytes)
+    if hasattr(value, "block_offsets") and hasattr(value, "block_records"):
+        # BlockCompressedArray: 只有少量解压块驻留内存
+        return 0
+    try:
+        import pandas as pd
+
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return int(value.memory_usage(index=True, deep=False).sum())
+    except ImportError:  # pragma: no cover - pandas 是核心依赖
+        pass
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_resident_bytes(v, _depth + 1) for v in value)
+    if isinstance(value, dict):
+        return sum(estimate_resident_bytes(v, _depth + 1) for v in value.values())
+    if hasattr(value, "__next__"):
+        # 生成器只在消费时产生数据
+        return 0
+    attrs = getattr(value, "__dict__", None)
+    if isinstance(attrs, dict) and attrs:
+        return sum(estimate_resident_bytes(v, _depth + 1) for v in attrs.values())
+    return int(sys.getsizeof(value))
+
+
+@export
+class ResultMemoryTracker:
+    """
+    内存结果缓存的 LRU 记账器。
+
+    Examples:
+        >>> tracker = ResultMemoryTracker()
+        >>> tracker.record(("run_001", "hit"), hits)
+        >>> tracker.touch(("run_001", "hit"))
+        >>> list(tracker.eviction_candidates(max_bytes=1 << 30))
+    """
+
+    def __init__(self):
+        self._sizes: OrderedDict[ResultKey, int] = OrderedDict()
+        self._pinned_keys: set[ResultKey] = set()
+        self._pinned_names: set[str] = set()
+        self._demoted: set[ResultKey] = set()
+        self.total_bytes = 0
+        self.peak_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self.reloads = 0
+
+    # ------------------------------------------------------------------
+    # 记账
+    # ------------------------------------------------------------------
+
+    def record(self, key: ResultKey, value: Any) -> int:
+        """记录（或更新）一个缓存值并移动到 LRU 末尾，返回估算大小。"""
+        nbytes = estimate_resident_bytes(value)
+        previous = self._sizes.pop(key, 0)
+        self._sizes[key] = nbytes
+        self.total_bytes += nbytes - previous
+        self.peak_bytes = max(self.peak_bytes, self.total_bytes)
+        if key in self._demoted:
+            self._demoted.discard(key)
+            self.reloads += 1
+        return nbytes
+
+    def touch(self, key: ResultKey) -> None:
+        if key in self._sizes:
+            self._sizes.move_to_end(key)
+
+    def discard(self, key: ResultKey) -> None:
+        """移除记账（不计入淘汰次数）。"""
+        self.total_bytes -= self._sizes.pop(key, 0)
+
+    def mark_evicted(self, key: ResultKey, spilled: bool = False) -> None:
+        self.discard(key)
+        self._demoted.add(key)
+        self.evictions += 1
+        if spilled:
+            self.spills += 1
+
+    def keys(self) -> list:
+        return list(self._sizes)
+
+    def size_of(self, key: ResultKey) -> int:
+        return self._sizes.get(key, 0)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    # ------------------------------------------------------------------
+    # 固定（pin）
+    # ------------------------------------------------------------------
+
+    def pin(self, data_name: str, run_id: str | None = None) -> None:
+        if run_id is None:
+            self._pinned_names.add(data_name)
+        else:
+            self._pinned_keys.add((run_id, data_name))
+
+    def unpin(self, data_name: str, run_id: str | None = None) -> None:
+        if run_id is None:
+            self._pinned_names.discard(data_name)
+        else:
+            self._pinned_keys.discard((run_id, data_name))
+
+    def is_pinned(self, key: ResultKey) -> bool:
+        return key in self._pinned_keys or key[1] in self._pinned_names
+
+    # ------------------------------------------------------------------
+    # 淘汰
+    # ------------------------------------------------------------------
+
+    def eviction_candidates(
+        self, max_bytes: int, protect: ResultKey | None = None
+    ) -> Iterator[ResultKey]:
+        """按 LRU 顺序产出需要淘汰的键，直到记账总量回到预算以内。"""
+        for key in list(self._sizes):
+            if self.total_bytes <= max_bytes:
+                return
+            if key == protect or self.is_pinned(key) or self._sizes.get(key, 0) == 0:
+                continue
+            yield key
+
+    def snapshot(self, max_bytes: int | None = None) -> dict[str, Any]:
+        """返回计数器快照（用于 cache_stats）。"""
+        lookups = self.hits + self.misses
+        return {
+            "budget_bytes": max_bytes,
+            "resident_bytes": self.total_bytes,
+            "peak_bytes": self.peak_bytes,
+            "entries": len(self._sizes),
+            "pinned": sorted(self._pinned_names)
+            + sorted(f"{run_id}:{name}" for run_id, name in self._pinned_keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "reloads": self.reloads,
+        }
@@ -32,7 +32,6 @@ Examples:
 
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import logging
 import os
@@ -299,24 +298,20 @@ class DAQRun:
         if not file_infos:
             return
 
-        max_workers = min(8, os.cpu_count() or 1, len(file_infos))
-        if max_workers <= 1:
-            for file_info in file_infos:
-                min_t, max_t = self._parse_csv_file(file_info["path"])
-                file_info["timetag_min"] = min_t
-                file_info["timetag_max"] = max_t
-            return
+        from waveform_analysis.core.execution.worker_pools import get_worker_pools
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_file_info = {
-                executor.submit(self._parse_csv_file, file_info["path"]): file_info
-                for file_info in file_infos
-            }
-            for future in as_completed(future_to_file_info):
-                file_info = future_to_file_info[future]
-                min_t, max_t = future.result()
-                file_info["timetag_min"] = min_t
-                file_info["timetag_max"] = max_t
+        # 只读取文件首尾的 IO 型任务：不占用 CPU 并发令牌，复用进程级工作池
+        max_workers = min(8, os.cpu_count() or 1, len(file_infos))
+        timetags = get_worker_pools().map(
+            self._parse_csv_file,
+            [file_info["path"] for file_info in file_infos],
+            name="daq_file_timetags",
+            max_workers=max_workers,
+            cpu_bound=False,
+        )
+        for file_info, (min_t, max_t) in zip(file_infos, timetags, strict=True):
+            file_info["timetag_min"] = min_t
+            file_info["timetag_max"] = max_t
 
     def compute_acquisition_times(self, force_reparse: bool = False) -> dict[int, dict]:
         if self.channel_stats and not force_reparse:
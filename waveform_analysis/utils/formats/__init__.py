@@ -78,11 +78,14 @@ from .registry import (
 )
 from .v1725 import (
     V1725_ADAPTER,
+    V1725_INDEX_DTYPE,
     V1725_LAYOUT,
     V1725_SPEC,
     V1725Adapter,
     V1725Reader,
     V1725Spec,
+    gather_v1725_samples,
+    load_v1725_index,
 )
 
 # VX2730 完整适配器（包含格式规范、目录布局、读取器）
@@ -92,6 +95,8 @@ from .vx2730 import (
     VX2730_SPEC,
     VX2730Reader,
     VX2730Spec,
+    convert_vx2730_to_sidecar,
+    load_vx2730_sidecar,
 )
 
 # 自动注册内置格式
@@ -130,6 +135,8 @@ __all__ = [
     "VX2730_LAYOUT",
     "VX2730_SPEC",
     "VX2730Spec",
+    "convert_vx2730_to_sidecar",
+    "load_vx2730_sidecar",
     # V1725 adapter
     "V1725Reader",
     "V1725Adapter",
@@ -137,4 +144,7 @@ __all__ = [
     "V1725_LAYOUT",
     "V1725_SPEC",
     "V1725Spec",
+    "V1725_INDEX_DTYPE",
+    "load_v1725_index",
+    "gather_v1725_samples",
 ]
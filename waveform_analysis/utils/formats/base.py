@@ -31,6 +31,9 @@ from waveform_analysis.core.foundation.utils import exporter
 
 export, __all__ = exporter()
 
+# scan_file_shape 统计换行符时每次读取的字节数
+_SCAN_BLOCK_BYTES = 1 << 24
+
 
 @export
 class TimestampUnit(Enum):
@@ -279,21 +282,54 @@ class FormatReader(ABC):
         """
         pass
 
-    def count_total_rows(self, file_paths: list[str | Path]) -> int:
-        """Count total rows using the reader's configured header policy."""
-        total = 0
-        for idx, fp in enumerate(file_paths):
-            fp = Path(fp)
-            if not fp.exists() or fp.stat().st_size == 0:
-                continue
+    def _resolve_skiprows(self, file_path: Path, is_first_file: bool) -> int:
+        """文件需要跳过的头部行数（默认按 spec 配置，子类可按文件内容检测）"""
+        return (
+            self.spec.header_rows_first_file if is_first_file else self.spec.header_rows_other_files
+        )
 
-            skiprows = (
-                self.spec.header_rows_first_file if idx == 0 else self.spec.header_rows_other_files
-            )
-            with open(fp, "rb") as handle:
-                line_count = sum(1 for _ in handle)
-            total += max(0, line_count - skiprows)
-        return total
+    def scan_file_shape(self, file_path: str | Path, is_first_file: bool = True) -> tuple[int, int]:
+        """快速统计单个文件的数据行数与列数（不解析数值）
+
+        按块统计换行符得到行数，列数取第一行数据的分隔符个数 + 1。
+        结果是解析后行数的上界（空行、无效时间戳行在解析时会被丢弃），
+        用于预分配输出。
+
+        Returns:
+            (数据行数, 列数)；文件不存在或为空时为 (0, 0)
+        """
+        fp = Path(file_path)
+        if not fp.exists() or fp.stat().st_size == 0:
+            return 0, 0
+
+        skiprows = self._resolve_skiprows(fp, is_first_file=is_first_file)
+        line_count = 0
+        last_byte = b"\n"
+        with open(fp, "rb") as handle:
+            while True:
+                block = handle.read(_SCAN_BLOCK_BYTES)
+                if not block:
+                    break
+                line_count += block.count(b"\n")
+                last_byte = block[-1:]
+        if last_byte != b"\n":
+            line_count += 1
+
+        n_cols = 0
+        with open(fp, "rb") as handle:
+            for _ in range(skiprows):
+                handle.readline()
+            first_line = handle.readline().strip()
+            if first_line:
+                n_cols = first_line.count(self.spec.delimiter.encode()) + 1
+        return max(0, line_count - skiprows), n_cols
+
+    def count_total_rows(self, file_paths: list[str | Path]) -> int:
+        """Count total rows using the reader's header policy (see scan_file_shape)."""
+        return sum(
+            self.scan_file_shape(fp, is_first_file=(idx == 0))[0]
+            for idx, fp in enumerate(file_paths)
+        )
 
     def read_files_streaming(
         self,
@@ -314,7 +350,42 @@ class FormatReader(ABC):
 
         total_rows = self.count_total_rows(file_paths)
         output = np.memmap(output_path, dtype=output_dtype, mode="w+", shape=(total_rows,))
+        offset = self.read_files_streaming_into(
+            file_paths,
+            output,
+            structurizer,
+            show_progress=show_progress,
+            chunksize=chunksize,
+            n_jobs=n_jobs,
+            use_process_pool=use_process_pool,
+            parse_engine=parse_engine,
+        )
+
+        output.flush()
+        if offset < total_rows:
+            return np.memmap(output_path, dtype=output_dtype, mode="r+", shape=(offset,))
+        return output
 
+    def read_files_streaming_into(
+        self,
+        file_paths: list[str | Path],
+        output: np.ndarray,
+        structurizer,
+        offset: int = 0,
+        show_progress: bool = False,
+        *,
+        chunksize: int | None = None,
+        n_jobs: int | None = None,
+        use_process_pool: bool = False,
+        parse_engine: str | None = "auto",
+    ) -> int:
+        """Stream files into a preallocated output starting at ``offset``.
+
+        Returns the number of rows written. The caller sizes ``output`` (for
+        example via count_total_rows), so several file groups can share one
+        memmap.
+        """
+        _ = (chunksize, n_jobs, use_process_pool, parse_engine)
         if show_progress:
             try:
                 from tqdm import tqdm
@@ -325,17 +396,14 @@ class FormatReader(ABC):
         else:
             iterator = file_paths
 
-        offset = 0
+        start = int(offset)
+        offset = start
         for idx, fp in enumerate(iterator):
             arr = self.read_file(fp, is_first_file=(idx == 0))
             if arr.size == 0:
                 continue
             offset += int(structurizer(arr, output, offset))
-
-        output.flush()
-        if offset < total_rows:
-            return np.memmap(output_path, dtype=output_dtype, mode="r+", shape=(offset,))
-        return output
+        return offset - start
 
     def extract_columns(self, data: np.ndarray) -> dict[str, np.ndarray]:
         """从原始数据提取各列
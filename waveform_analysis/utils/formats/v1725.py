@@ -2,13 +2,22 @@
 CAEN V1725 DAW_DEMO binary adapter.
 
 Parses multi-channel waveforms stored in a single .bin file.
+
+Bulk paths first scan the event/channel headers into an offset index
+(``load_v1725_index``, persisted as a ``.idx.npz`` sidecar beside the .bin)
+and then gather samples straight from a memmap (``gather_v1725_samples``).
 """
 
+from array import array
 from collections.abc import Iterator
 from dataclasses import dataclass
 import logging
+import mmap
+import os
 from pathlib import Path
 import re
+import struct
+import tempfile
 
 import numpy as np
 
@@ -41,6 +50,202 @@ def _one_loc(num: int) -> list[int]:
     return index_list
 
 
+# 偏移索引：每个波形一行，sample_offset/length 以 int16 采样点为单位（相对文件起点）
+V1725_INDEX_DTYPE = export(
+    np.dtype(
+        [
+            ("board", "i2"),
+            ("channel", "i2"),
+            ("timestamp", "i8"),
+            ("baseline", "u2"),
+            ("trunc", "b1"),
+            ("sample_offset", "i8"),
+            ("length", "i8"),
+        ]
+    ),
+    name="V1725_INDEX_DTYPE",
+)
+
+_INDEX_VERSION = 1
+_INDEX_SIDECAR_SUFFIX = ".idx.npz"
+_EVENT_HEADER_BYTES = 4 << 2
+_CH_HEADER_BYTES = 3 << 2
+_CH_HEADER = struct.Struct("<IIHH")
+_GATHER_SAMPLES = 1 << 22
+
+
+def _index_sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + _INDEX_SIDECAR_SUFFIX)
+
+
+def _scan_v1725_headers(path: Path, board_id: int) -> np.ndarray:
+    """只遍历 event/channel header 构建偏移索引，不读取波形采样。"""
+    cols = {name: array("q") for name in ("channel", "timestamp", "baseline", "trunc", "offset")}
+    lengths = array("q")
+    size = path.stat().st_size
+
+    if size > 0:
+        with path.open(mode="rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = 0
+            while pos < size:
+                if pos + _EVENT_HEADER_BYTES > size:
+                    logger.warning("Short event_header in %s", path)
+                    break
+                mask = buf[pos + 4] + (buf[pos + 11] << 8)
+                pos += _EVENT_HEADER_BYTES
+
+                truncated = False
+                ch = 0
+                while mask:
+                    if mask & 1:
+                        if pos + _CH_HEADER_BYTES > size:
+                            logger.warning("Short ch_header in %s", path)
+                            truncated = True
+                            break
+                        word0, ts_low, ts_high, baseline = _CH_HEADER.unpack_from(buf, pos)
+                        ch_size = word0 & ((1 << 22) - 1)
+                        if ch_size < 3:
+                            logger.warning("Malformed ch_header (size=%d) in %s", ch_size, path)
+                            truncated = True
+                            break
+                        sig_size = (ch_size - 3) << 2
+                        pos += _CH_HEADER_BYTES
+                        if pos + sig_size > size:
+                            logger.warning("Short waveform in %s", path)
+                            truncated = True
+                            break
+
+                        cols["channel"].append(ch)
+                        cols["timestamp"].append(ts_low | (ts_high << 32))
+                        cols["baseline"].append(baseline)
+                        cols["trunc"].append((word0 >> 30) & 1)
+                        cols["offset"].append(pos >> 1)
+                        lengths.append(sig_size >> 1)
+                        pos += sig_size
+                    ch += 1
+                    mask >>= 1
+                if truncated:
+                    break
+
+    index = np.zeros(len(lengths), dtype=V1725_INDEX_DTYPE)
+    index["board"] = board_id
+    index["channel"] = np.frombuffer(cols["channel"], dtype=np.int64)
+    index["timestamp"] = np.frombuffer(cols["timestamp"], dtype=np.int64)
+    index["baseline"] = np.frombuffer(cols["baseline"], dtype=np.int64)
+    index["trunc"] = np.frombuffer(cols["trunc"], dtype=np.int64).astype(bool)
+    index["sample_offset"] = np.frombuffer(cols["offset"], dtype=np.int64)
+    index["length"] = np.frombuffer(lengths, dtype=np.int64)
+    return index
+
+
+def _load_index_sidecar(sidecar: Path, stat: os.stat_result) -> np.ndarray | None:
+    try:
+        with np.load(sidecar, allow_pickle=False) as payload:
+            meta = payload["meta"]
+            if (
+                int(meta[0]) != _INDEX_VERSION
+                or int(meta[1]) != stat.st_size
+                or int(meta[2]) != stat.st_mtime_ns
+            ):
+                return None
+            index = payload["index"]
+    except (OSError, KeyError, ValueError) as exc:
+        logger.debug("Ignoring unreadable V1725 index sidecar %s: %s", sidecar, exc)
+        return None
+    if index.dtype != V1725_INDEX_DTYPE:
+        return None
+    return index
+
+
+def _write_index_sidecar(sidecar: Path, index: np.ndarray, stat: os.stat_result) -> None:
+    meta = np.array([_INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=sidecar.name, suffix=".tmp", dir=sidecar.parent)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, index=index, meta=meta)
+        os.replace(tmp_path, sidecar)
+        tmp_path = None
+    except OSError as exc:
+        logger.debug("Could not persist V1725 index sidecar %s: %s", sidecar, exc)
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+@export
+def load_v1725_index(
+    file_path: str | Path,
+    board: int | None = None,
+    *,
+    use_sidecar: bool = True,
+) -> np.ndarray:
+    """
+    返回 V1725 .bin 文件的波形偏移索引（V1725_INDEX_DTYPE）。
+
+    首次调用只扫描 header 并把索引写到 ``{file}.bin.idx.npz``；之后若源文件
+    大小与 mtime 未变则直接读取该 sidecar。目录不可写时静默跳过持久化。
+
+    Args:
+        file_path: .bin 文件路径
+        board: 板号；None 时从文件名 ``_b<N>`` 解析（缺省为 0）
+        use_sidecar: 是否读写 sidecar 索引
+    """
+    path = Path(file_path)
+    board_id = V1725Reader._extract_board_from_path(path) if board is None else int(board)
+    stat = path.stat()
+    sidecar = _index_sidecar_path(path)
+
+    if use_sidecar and sidecar.exists():
+        index = _load_index_sidecar(sidecar, stat)
+        if index is not None:
+            if len(index) and int(index["board"][0]) != board_id:
+                index = index.copy()
+                index["board"] = board_id
+            return index
+
+    index = _scan_v1725_headers(path, board_id)
+    if use_sidecar:
+        _write_index_sidecar(sidecar, index, stat)
+    return index
+
+
+@export
+def gather_v1725_samples(file_path: str | Path, index: np.ndarray) -> np.ndarray:
+    """
+    按索引顺序把波形采样直接从 memmap 拼接为 uint16 wave_pool。
+
+    int16 采样按位重解释为 uint16（与 ``astype(np.uint16)`` 的回绕结果一致）。
+    拼接按约 ``_GATHER_SAMPLES`` 个采样点分批向量化完成，不创建逐波形对象。
+    """
+    lengths = np.asarray(index["length"], dtype=np.int64)
+    total = int(lengths.sum())
+    wave_pool = np.empty(total, dtype=np.uint16)
+    if total == 0:
+        return wave_pool
+
+    path = Path(file_path)
+    n_samples = path.stat().st_size >> 1
+    samples = np.memmap(path, dtype=np.uint16, mode="r", shape=(n_samples,))
+
+    src_offsets = np.asarray(index["sample_offset"], dtype=np.int64)
+    dst_starts = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=dst_starts[1:])
+
+    row = 0
+    n_rows = len(lengths)
+    while row < n_rows:
+        stop = int(np.searchsorted(dst_starts, dst_starts[row] + _GATHER_SAMPLES, side="right"))
+        stop = min(max(stop - 1, row + 1), n_rows)
+        lo, hi = int(dst_starts[row]), int(dst_starts[stop])
+        if hi > lo:
+            shift = np.repeat(src_offsets[row:stop] - dst_starts[row:stop], lengths[row:stop])
+            wave_pool[lo:hi] = samples[shift + np.arange(lo, hi, dtype=np.int64)]
+        row = stop
+    del samples
+    return wave_pool
+
+
 @export
 @dataclass
 class V1725Wave:
@@ -52,6 +257,18 @@ class V1725Wave:
     waveform: np.ndarray
 
 
+_WAVE_ARRAY_DTYPE = np.dtype(
+    [
+        ("board", "i2"),
+        ("channel", "i2"),
+        ("timestamp", "i8"),
+        ("baseline", "f8"),  # 使用 float64 以匹配 RECORD_DTYPE
+        ("trunc", "b1"),
+        ("wave", "O"),
+    ]
+)
+
+
 @export
 class V1725Reader(FormatReader):
     """V1725 binary reader."""
@@ -113,10 +330,17 @@ class V1725Reader(FormatReader):
                             waveform=sig,
                         )
 
+    def read_index(self, file_path: str | Path, *, use_sidecar: bool = True) -> np.ndarray:
+        """返回单个文件的波形偏移索引（见 load_v1725_index）。"""
+        return load_v1725_index(file_path, use_sidecar=use_sidecar)
+
     def read_file(self, file_path: str | Path, is_first_file: bool = True) -> np.ndarray:
         _ = is_first_file
-        waves = list(self.iter_waves([file_path]))
-        return self._waves_to_array(waves)
+        path = Path(file_path)
+        if not path.exists():
+            logger.warning("File not found: %s", path)
+            return self._waves_to_array([])
+        return self._index_to_array(path, load_v1725_index(path))
 
     def read_files(
         self,
@@ -129,8 +353,11 @@ class V1725Reader(FormatReader):
         parse_engine: str | None = "auto",
     ) -> np.ndarray:
         _ = (show_progress, chunksize, n_jobs, use_process_pool, parse_engine)
-        waves = list(self.iter_waves(file_paths))
-        return self._waves_to_array(waves)
+        parts = [self.read_file(file_path) for file_path in file_paths]
+        parts = [part for part in parts if part.size]
+        if not parts:
+            return self._waves_to_array([])
+        return np.concatenate(parts)
 
     def read_files_generator(
         self,
@@ -176,21 +403,28 @@ class V1725Reader(FormatReader):
         _ = data
         return True
 
+    def _index_to_array(self, path: Path, index: np.ndarray) -> np.ndarray:
+        if len(index) == 0:
+            return self._waves_to_array([])
+        arr = np.empty(len(index), dtype=_WAVE_ARRAY_DTYPE)
+        for name in ("board", "channel", "timestamp", "trunc"):
+            arr[name] = index[name]
+        arr["baseline"] = index["baseline"].astype(np.float64)
+        n_samples = path.stat().st_size >> 1
+        samples = np.memmap(path, dtype=np.int16, mode="r", shape=(n_samples,))
+        waves = np.empty(len(index), dtype=object)
+        for i, (offset, length) in enumerate(
+            zip(index["sample_offset"], index["length"], strict=True)
+        ):
+            waves[i] = np.array(samples[offset : offset + length])
+        arr["wave"] = waves
+        return arr
+
     def _waves_to_array(self, waves: list[V1725Wave]) -> np.ndarray:
         if not waves:
             return np.array([]).reshape(0, 0)
 
-        dtype = np.dtype(
-            [
-                ("board", "i2"),
-                ("channel", "i2"),
-                ("timestamp", "i8"),
-                ("baseline", "f8"),  # 使用 float64 以匹配 RECORD_DTYPE
-                ("trunc", "b1"),
-                ("wave", "O"),
-            ]
-        )
-        arr = np.empty(len(waves), dtype=dtype)
+        arr = np.empty(len(waves), dtype=_WAVE_ARRAY_DTYPE)
         for i, wave in enumerate(waves):
             arr[i]["board"] = wave.board
             arr[i]["channel"] = wave.channel
@@ -15,6 +15,10 @@ CAEN VX2730 数字化仪完整适配器
 - 列布局: BOARD;CHANNEL;TIMETAG;...;SAMPLES[7:]
 - 目录结构: DAQ/{run_name}/RAW/*.CSV
 
+可选的二进制 sidecar（``convert_vx2730_to_sidecar``）把每个 CSV 一次性转码为
+``{file}.CSV.wfb``：int64 头部列块 + int16 采样块，可直接 memmap。源文件大小与
+mtime 未变时，读取器自动优先使用 sidecar，跳过 CSV 解析与头部探测。
+
 Examples:
     >>> from waveform_analysis.utils.formats import get_adapter
     >>> adapter = get_adapter("vx2730")
@@ -31,7 +35,9 @@ Examples:
 
 from collections.abc import Callable, Iterator
 import logging
+import os
 from pathlib import Path
+import tempfile
 from typing import Optional, Union
 
 import numpy as np
@@ -68,6 +74,172 @@ except ImportError:
     pa_csv = None
 
 
+# ============================================================================
+# 二进制 sidecar
+# ============================================================================
+
+# 文件布局：8 个 int64 的前导区，随后是行优先的头部列块 (rows, header_cols) int64
+# 与采样块 (rows, samples) int16。第 i 行位于各块的 i * 行宽处，无需额外的行偏移表。
+_SIDECAR_SUFFIX = ".wfb"
+_SIDECAR_MAGIC = int.from_bytes(b"WFVX2730", "little")
+_SIDECAR_VERSION = 1
+_SIDECAR_PREAMBLE = 8
+_SIDECAR_PREAMBLE_BYTES = _SIDECAR_PREAMBLE * 8
+
+
+def _sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + _SIDECAR_SUFFIX)
+
+
+def _read_sidecar_preamble(sidecar: Path, stat: os.stat_result) -> np.ndarray | None:
+    """返回有效 sidecar 的前导区；缺失、损坏或与源文件不匹配时返回 None。"""
+    try:
+        with open(sidecar, "rb") as handle:
+            meta = np.frombuffer(handle.read(_SIDECAR_PREAMBLE_BYTES), dtype="<i8")
+        sidecar_size = sidecar.stat().st_size
+    except OSError:
+        return None
+    if (
+        len(meta) != _SIDECAR_PREAMBLE
+        or int(meta[0]) != _SIDECAR_MAGIC
+        or int(meta[1]) != _SIDECAR_VERSION
+        or int(meta[2]) != stat.st_size
+        or int(meta[3]) != stat.st_mtime_ns
+    ):
+        return None
+    n_rows, n_header, n_samples = (int(v) for v in meta[4:7])
+    expected = _SIDECAR_PREAMBLE_BYTES + n_rows * (n_header * 8 + n_samples * 2)
+    if min(n_rows, n_header, n_samples) < 0 or sidecar_size != expected:
+        return None
+    return meta
+
+
+@export
+def load_vx2730_sidecar(file_path: str | Path) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    以 memmap 打开 CSV 对应的二进制 sidecar。
+
+    Returns:
+        (header, samples)：int64 (rows, samples_start) 头部列与 int16 (rows, n) 采样；
+        sidecar 不存在或已过期（源文件大小/mtime 变化）时返回 None
+    """
+    path = Path(file_path)
+    sidecar = _sidecar_path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if not sidecar.exists():
+        return None
+    meta = _read_sidecar_preamble(sidecar, stat)
+    if meta is None:
+        return None
+    n_rows, n_header, n_samples = (int(v) for v in meta[4:7])
+    if n_rows == 0:
+        return np.zeros((0, n_header), dtype=np.int64), np.zeros((0, n_samples), dtype=np.int16)
+    header = np.memmap(
+        sidecar, dtype="<i8", mode="r", offset=_SIDECAR_PREAMBLE_BYTES, shape=(n_rows, n_header)
+    )
+    samples = np.memmap(
+        sidecar,
+        dtype="<i2",
+        mode="r",
+        offset=_SIDECAR_PREAMBLE_BYTES + n_rows * n_header * 8,
+        shape=(n_rows, n_samples),
+    )
+    return header, samples
+
+
+def _write_sidecar(sidecar: Path, arr: np.ndarray, n_header: int, stat: os.stat_result) -> bool:
+    n_rows = int(arr.shape[0])
+    n_samples = int(arr.shape[1]) - n_header
+    meta = np.array(
+        [
+            _SIDECAR_MAGIC,
+            _SIDECAR_VERSION,
+            stat.st_size,
+            stat.st_mtime_ns,
+            n_rows,
+            n_header,
+            n_samples,
+            0,
+        ],
+        dtype="<i8",
+    )
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=sidecar.name, suffix=".tmp", dir=sidecar.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(meta.tobytes())
+            f.write(np.ascontiguousarray(arr[:, :n_header], dtype="<i8").tobytes())
+            f.write(np.ascontiguousarray(arr[:, n_header:], dtype="<i2").tobytes())
+        os.replace(tmp_path, sidecar)
+        tmp_path = None
+    except OSError as exc:
+        logger.warning("Could not write VX2730 sidecar %s: %s", sidecar, exc)
+        return False
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return True
+
+
+def _sidecar_convertible(arr: np.ndarray, n_header: int) -> bool:
+    """只有纯整数且采样落在 int16 范围内的数据才能无损转码。"""
+    if arr.ndim != 2 or arr.shape[1] < n_header:
+        return False
+    if not (np.issubdtype(arr.dtype, np.integer) or np.issubdtype(arr.dtype, np.floating)):
+        return False
+    if np.issubdtype(arr.dtype, np.floating):
+        if not np.all(np.isfinite(arr)) or not np.array_equal(arr, np.trunc(arr)):
+            return False
+    samples = arr[:, n_header:]
+    if samples.size and (
+        samples.min() < np.iinfo(np.int16).min or samples.max() > np.iinfo(np.int16).max
+    ):
+        return False
+    return True
+
+
+@export
+def convert_vx2730_to_sidecar(
+    file_paths: list[str | Path],
+    *,
+    overwrite: bool = False,
+    reader: Optional["VX2730Reader"] = None,
+) -> list[Path]:
+    """
+    一次性把一个通道的 VX2730 CSV 文件转码为二进制 sidecar（``{file}.wfb``）。
+
+    ``file_paths`` 按采集顺序给出（首文件的头部处理与 CSV 读取一致）。已有有效
+    sidecar 的文件默认跳过；空文件、含非整数字段或采样超出 int16 的文件保留 CSV
+    路径并记录警告。
+
+    Returns:
+        本次写入的 sidecar 路径
+    """
+    reader = reader or VX2730Reader()
+    n_header = int(reader.spec.columns.samples_start)
+    written: list[Path] = []
+    for idx, fp in enumerate(file_paths):
+        path = Path(fp)
+        if not path.exists() or path.stat().st_size == 0:
+            continue
+        sidecar = _sidecar_path(path)
+        if not overwrite and load_vx2730_sidecar(path) is not None:
+            continue
+        stat = path.stat()
+        arr = reader._read_csv_file(path, is_first_file=(idx == 0))
+        if arr.size == 0:
+            arr = np.zeros((0, n_header), dtype=np.int64)
+        if not _sidecar_convertible(arr, n_header):
+            logger.warning("Skipping VX2730 sidecar for %s: data is not int16 samples", path)
+            continue
+        if _write_sidecar(sidecar, arr, n_header, stat):
+            written.append(sidecar)
+    return written
+
+
 # ============================================================================
 # VX2730 格式规范
 # ============================================================================
@@ -147,6 +319,7 @@ class VX2730Reader(FormatReader):
 
     Attributes:
         spec: VX2730 格式规范
+        use_sidecar: 存在有效的二进制 sidecar 时优先读取（见 convert_vx2730_to_sidecar）
 
     Examples:
         >>> reader = VX2730Reader()
@@ -161,6 +334,7 @@ class VX2730Reader(FormatReader):
             spec: 格式规范（默认使用 VX2730_SPEC）
         """
         super().__init__(spec or VX2730_SPEC)
+        self.use_sidecar = True
 
     def _looks_like_vx2730_header(self, line: str) -> bool:
         if not line:
@@ -193,8 +367,57 @@ class VX2730Reader(FormatReader):
             self.spec.header_rows_first_file if is_first_file else self.spec.header_rows_other_files
         )
 
+    def _read_sidecar(self, file_path: Path) -> np.ndarray | None:
+        """从有效 sidecar 重建与 CSV 解析相同的二维 int64 数组；无可用 sidecar 时返回 None。"""
+        if not self.use_sidecar:
+            return None
+        loaded = load_vx2730_sidecar(file_path)
+        if loaded is None:
+            return None
+        header, samples = loaded
+        n_header = header.shape[1]
+        if len(header) == 0:
+            return np.array([]).reshape(0, 0)
+        arr = np.empty((len(header), n_header + samples.shape[1]), dtype=np.int64)
+        arr[:, :n_header] = header
+        arr[:, n_header:] = samples
+        return arr
+
+    def _read_sidecars(self, file_paths: list[str | Path]) -> np.ndarray | None:
+        """所有非空文件都有等宽的有效 sidecar 时返回堆叠结果，否则返回 None（走 CSV）。"""
+        if not self.use_sidecar:
+            return None
+        arrays = []
+        for fp in file_paths:
+            path = Path(fp)
+            if not path.exists() or path.stat().st_size == 0:
+                continue
+            arr = self._read_sidecar(path)
+            if arr is None:
+                return None
+            if arr.size:
+                arrays.append(arr)
+        if not arrays:
+            return np.array([]).reshape(0, 0)
+        if len({arr.shape[1] for arr in arrays}) != 1:
+            return None
+        return arrays[0] if len(arrays) == 1 else np.vstack(arrays)
+
+    def scan_file_shape(self, file_path: str | Path, is_first_file: bool = True) -> tuple[int, int]:
+        """有效 sidecar 直接给出行数与列数，否则按 CSV 统计"""
+        if self.use_sidecar:
+            path = Path(file_path)
+            try:
+                meta = _read_sidecar_preamble(_sidecar_path(path), path.stat())
+            except OSError:
+                meta = None
+            if meta is not None:
+                n_rows = int(meta[4])
+                return n_rows, (int(meta[5]) + int(meta[6])) if n_rows else 0
+        return super().scan_file_shape(file_path, is_first_file=is_first_file)
+
     def read_file(self, file_path: str | Path, is_first_file: bool = True) -> np.ndarray:
-        """读取单个 VX2730 CSV 文件
+        """读取单个 VX2730 CSV 文件（有效 sidecar 优先）
 
         Args:
             file_path: 文件路径
@@ -204,6 +427,13 @@ class VX2730Reader(FormatReader):
             二维数组，每行一条记录
         """
         file_path = Path(file_path)
+        arr = self._read_sidecar(file_path)
+        if arr is not None:
+            return arr
+        return self._read_csv_file(file_path, is_first_file=is_first_file)
+
+    def _read_csv_file(self, file_path: Path, is_first_file: bool = True) -> np.ndarray:
+        """解析 CSV 本身（不查看 sidecar）"""
 
         # 检查文件
         if not file_path.exists():
@@ -413,6 +643,9 @@ class VX2730Reader(FormatReader):
 
         if not file_paths:
             return np.array([]).reshape(0, 0)
+        stacked = self._read_sidecars(file_paths)
+        if stacked is not None:
+            return stacked
         first_file = Path(file_paths[0])
         skiprows = self._resolve_skiprows(first_file, is_first_file=True)
         return parse_and_stack_files(
@@ -455,6 +688,11 @@ class VX2730Reader(FormatReader):
             chunk_files = file_paths[i : i + chunk_size]
             if not chunk_files:
                 continue
+            arr = self._read_sidecars(chunk_files)
+            if arr is not None:
+                if arr.size > 0:
+                    yield arr
+                continue
             first_file = Path(chunk_files[0])
             skiprows = self._resolve_skiprows(first_file, is_first_file=(i == 0))
             arr = parse_and_stack_files(
@@ -470,30 +708,6 @@ class VX2730Reader(FormatReader):
             if arr.size > 0:
                 yield arr
 
-    def count_total_rows(self, file_paths: list[str | Path]) -> int:
-        """快速统计总行数（不加载数据）
-
-        Args:
-            file_paths: 文件路径列表
-
-        Returns:
-            总行数（不含头部）
-        """
-        total = 0
-        for idx, fp in enumerate(file_paths):
-            fp = Path(fp)
-            if not fp.exists() or fp.stat().st_size == 0:
-                continue
-
-            skiprows = self._resolve_skiprows(fp, is_first_file=(idx == 0))
-
-            # 快速行计数（使用二进制模式）
-            with open(fp, "rb") as f:
-                line_count = sum(1 for _ in f)
-            total += max(0, line_count - skiprows)
-
-        return total
-
     def read_files_streaming(
         self,
         file_paths: list[str | Path],
@@ -548,6 +762,50 @@ class VX2730Reader(FormatReader):
         # 预分配 memmap
         output = np.memmap(output_path, dtype=output_dtype, mode="w+", shape=(total_rows,))
 
+        # 第二遍：逐文件读取并结构化
+        offset = self.read_files_streaming_into(
+            file_paths,
+            output,
+            structurizer,
+            show_progress=show_progress,
+            chunksize=chunksize,
+            n_jobs=n_jobs,
+            use_process_pool=use_process_pool,
+            parse_engine=parse_engine,
+        )
+
+        # 刷新到磁盘
+        output.flush()
+
+        # 如果实际写入行数少于预估，返回截断的视图
+        if offset < total_rows:
+            logger.debug(f"实际写入 {offset} 行，预估 {total_rows} 行")
+            # 创建新的 memmap 视图
+            return np.memmap(output_path, dtype=output_dtype, mode="r+", shape=(offset,))
+
+        return output
+
+    def read_files_streaming_into(
+        self,
+        file_paths: list[str | Path],
+        output: np.ndarray,
+        structurizer: Callable[[np.ndarray, np.memmap, int], int],
+        offset: int = 0,
+        show_progress: bool = False,
+        *,
+        chunksize: int | None = None,
+        n_jobs: int | None = None,
+        use_process_pool: bool = False,
+        parse_engine: str | None = "auto",
+    ) -> int:
+        """逐文件读取并结构化，写入调用方预分配的输出（从 offset 开始）
+
+        多个文件组（如多个通道）可以依次写入同一个 memmap，调用方负责用
+        count_total_rows 预估容量。
+
+        Returns:
+            本次写入的行数
+        """
         # 可选进度条
         if show_progress:
             try:
@@ -559,17 +817,18 @@ class VX2730Reader(FormatReader):
         else:
             pbar = file_paths
 
-        # 第二遍：逐文件读取并结构化
-        offset = 0
+        start = int(offset)
+        offset = start
         for idx, fp in enumerate(pbar):
             is_first = idx == 0
-            if (
+            arr = self._read_sidecar(Path(fp))
+            if arr is None and (
                 chunksize is None
                 and (parse_engine or "auto").lower() == "auto"
                 and not use_process_pool
             ):
-                arr = self.read_file(fp, is_first_file=is_first)
-            else:
+                arr = self._read_csv_file(Path(fp), is_first_file=is_first)
+            elif arr is None:
                 from waveform_analysis.utils.io import parse_and_stack_files
 
                 skiprows = self._resolve_skiprows(Path(fp), is_first_file=is_first)
@@ -588,19 +847,9 @@ class VX2730Reader(FormatReader):
                 continue
 
             # 调用结构化函数，写入 memmap
-            n_written = structurizer(arr, output, offset)
-            offset += n_written
+            offset += structurizer(arr, output, offset)
 
-        # 刷新到磁盘
-        output.flush()
-
-        # 如果实际写入行数少于预估，返回截断的视图
-        if offset < total_rows:
-            logger.debug(f"实际写入 {offset} 行，预估 {total_rows} 行")
-            # 创建新的 memmap 视图
-            return np.memmap(output_path, dtype=output_dtype, mode="r+", shape=(offset,))
-
-        return output
+        return offset - start
 
 
 # ============================================================================
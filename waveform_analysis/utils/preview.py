@@ -129,7 +129,7 @@ def _filter_records(
     records = rv.records
 
     if record_ids is not None:
-        selected = records[[rv._resolve_record_index(record_id) for record_id in record_ids]]
+        selected = records[rv._resolve_record_indices(record_ids)]
     else:
         mask = np.ones(len(records), dtype=bool)
         if board is not None:
@@ -36,6 +36,7 @@ Note:
 import numpy as np
 
 from waveform_analysis.core.hardware.channel import HardwareChannel
+from waveform_analysis.core.processing.packed_waveforms import as_padded_waveforms
 
 
 def _parse_channel_selector(channel: HardwareChannel | tuple[int, int] | str) -> HardwareChannel:
@@ -237,7 +238,7 @@ def create_interactive_browser(context, run_id: str):
     Returns a function that can be used with ipywidgets.interact to browse events.
     """
     # This is intended for use in a Jupyter Notebook
-    waveforms = context.get_data(run_id, "st_waveforms")
+    waveforms = as_padded_waveforms(context.get_data(run_id, "st_waveforms"))
     hits = context.get_data(run_id, "hit")
 
     def browse(event_index=0):